@@ -4,18 +4,21 @@ Includes caching, compression, rate limiting, and performance monitoring
 """
 
 import asyncio
+import fnmatch
+import os
 import time
 import gzip
 import json
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Awaitable, Iterable, Optional, Callable, Tuple, Union
 from functools import wraps
 import redis
+import redis.asyncio as redis_async
 import logging
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 import hashlib
 from dataclasses import dataclass, field
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 import threading
 
 logger = logging.getLogger(__name__)
@@ -46,7 +49,6 @@ class PerformanceMonitor:
     def _initialize_redis(self):
         """Initialize Redis for caching"""
         try:
-            import os
             redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
             self.redis_client = redis.from_url(redis_url, decode_responses=True)
             logger.info("Redis cache initialized successfully")
@@ -118,83 +120,264 @@ class PerformanceMonitor:
 
 class CacheManager:
     """
-    Redis-based caching system with TTL and compression
+    Two-tier response cache: an in-process LRU in front of async Redis
+    
+    Values are stored as JSON bytes with a one-byte format marker, gzipped
+    when large, so nothing is round-tripped through text encodings.
+    Concurrent misses for the same key share one computation (single-flight).
+    Keys can carry tags for group invalidation; Redis-side invalidation uses
+    SCAN and UNLINK rather than KEYS. The local tier keeps entries for at
+    most ``local_ttl`` seconds, which bounds staleness after another process
+    invalidates Redis.
     """
     
-    def __init__(self, redis_client: redis.Redis = None):
+    _RAW = b"j"
+    _GZIP = b"z"
+    
+    def __init__(
+        self,
+        redis_client: Optional["redis_async.Redis"] = None,
+        local_max_entries: int = 1024,
+        local_ttl: float = 30.0,
+        compress_threshold: int = 1024
+    ):
         self.redis_client = redis_client
         self.default_ttl = 3600  # 1 hour
+        self.local_max_entries = local_max_entries
+        self.local_ttl = local_ttl
+        self.compress_threshold = compress_threshold
+        self.redis_retry_after = 5.0  # skip Redis this long after a connection error
+        
+        # key -> (expiry, payload, tags)
+        self._local: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._local_tags: Dict[str, set] = defaultdict(set)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis_down_until = 0.0
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "coalesced": 0, "redis_errors": 0}
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate cache key from arguments"""
         key_data = f"{prefix}:{args}:{sorted(kwargs.items())}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        return f"{prefix}:{hashlib.md5(key_data.encode()).hexdigest()}"
+    
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"cache-tag:{tag}"
+    
+    def _encode(self, value: Any) -> bytes:
+        data = json.dumps(value).encode()
+        if len(data) > self.compress_threshold:
+            compressed = gzip.compress(data)
+            if len(compressed) < len(data):
+                return self._GZIP + compressed
+        return self._RAW + data
+    
+    def _decode(self, payload: bytes) -> Any:
+        marker, body = payload[:1], payload[1:]
+        if marker == self._GZIP:
+            body = gzip.decompress(body)
+        elif marker != self._RAW:
+            raise ValueError("unknown cache payload format")
+        return json.loads(body)
+    
+    def _redis_usable(self) -> bool:
+        return self.redis_client is not None and time.monotonic() >= self._redis_down_until
+    
+    def _redis_failed(self, operation: str, error: Exception):
+        self.stats["redis_errors"] += 1
+        self._redis_down_until = time.monotonic() + self.redis_retry_after
+        logger.warning(f"Cache {operation} error: {error}")
+    
+    def _local_get(self, key: str) -> Optional[bytes]:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        if item[0] < time.monotonic():
+            self._local_drop(key)
+            return None
+        self._local.move_to_end(key)
+        return item[1]
+    
+    def _local_put(self, key: str, payload: bytes, ttl: float, tags: Tuple[str, ...] = ()):
+        self._local_drop(key)
+        self._local[key] = (time.monotonic() + min(ttl, self.local_ttl), payload, tags)
+        for tag in tags:
+            self._local_tags[tag].add(key)
+        while len(self._local) > self.local_max_entries:
+            self._local_drop(next(iter(self._local)))
+    
+    def _local_drop(self, key: str) -> bool:
+        item = self._local.pop(key, None)
+        if item is None:
+            return False
+        for tag in item[2]:
+            keys = self._local_tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._local_tags[tag]
+        return True
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        if not self.redis_client:
-            return None
+        payload = self._local_get(key)
+        if payload is not None:
+            self.stats["local_hits"] += 1
+            return self._decode(payload)
         
-        try:
-            cached_data = self.redis_client.get(key)
-            if cached_data:
-                # Try to decompress if it's compressed
+        if self._redis_usable():
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.ttl(key)
+                payload, ttl = await pipe.execute()
+            except Exception as e:
+                self._redis_failed("get", e)
+                payload = None
+            
+            if payload is not None:
                 try:
-                    decompressed = gzip.decompress(cached_data.encode('latin1'))
-                    return json.loads(decompressed.decode())
-                except:
-                    # Fallback to regular JSON
-                    return json.loads(cached_data)
-            return None
-        except Exception as e:
-            logger.warning(f"Cache get error: {e}")
-            return None
+                    value = self._decode(payload)
+                except (ValueError, OSError, EOFError) as e:
+                    logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+                else:
+                    self.stats["redis_hits"] += 1
+                    self._local_put(key, payload, ttl if ttl and ttl > 0 else self.local_ttl)
+                    return value
+        
+        self.stats["misses"] += 1
+        return None
     
-    async def set(self, key: str, value: Any, ttl: int = None) -> bool:
-        """Set value in cache with optional compression"""
-        if not self.redis_client:
+    async def set(self, key: str, value: Any, ttl: int = None, tags: Iterable[str] = ()) -> bool:
+        """Set value in both tiers, compressing large payloads"""
+        try:
+            payload = self._encode(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Cache set error: {e}")
             return False
         
+        ttl = ttl or self.default_ttl
+        tags = tuple(tags)
+        self._local_put(key, payload, ttl, tags)
+        
+        if not self._redis_usable():
+            return self.redis_client is None
+        
         try:
-            json_data = json.dumps(value)
-            
-            # Compress if data is large
-            if len(json_data) > 1024:  # 1KB threshold
-                compressed = gzip.compress(json_data.encode())
-                data_to_store = compressed.decode('latin1')
-            else:
-                data_to_store = json_data
-            
-            ttl = ttl or self.default_ttl
-            return self.redis_client.setex(key, ttl, data_to_store)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.set(key, payload, ex=ttl)
+            for tag in tags:
+                # Keep each tag set alive as long as its longest-lived member (Redis >= 7)
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), ttl, nx=True)
+                pipe.expire(self._tag_key(tag), ttl, gt=True)
+            await pipe.execute()
+            return True
         except Exception as e:
-            logger.warning(f"Cache set error: {e}")
+            self._redis_failed("set", e)
             return False
     
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = None,
+        tags: Iterable[str] = ()
+    ) -> Any:
+        """
+        Return the cached value, or compute and cache it.
+        
+        Callers that miss while a computation for the same key is running
+        wait for its result instead of computing again.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The computing request was cancelled (e.g. client went away); take over
+                return await self.get_or_compute(key, compute, ttl, tags)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+            if value is not None:
+                await self.set(key, value, ttl, tags)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn when there were none
+            raise
+        finally:
+            self._inflight.pop(key, None)
+    
     async def delete(self, key: str) -> bool:
         """Delete value from cache"""
-        if not self.redis_client:
-            return False
+        deleted = self._local_drop(key)
+        if not self._redis_usable():
+            return deleted
         
         try:
-            return bool(self.redis_client.delete(key))
+            return bool(await self.redis_client.unlink(key)) or deleted
         except Exception as e:
-            logger.warning(f"Cache delete error: {e}")
-            return False
+            self._redis_failed("delete", e)
+            return deleted
     
-    async def clear_pattern(self, pattern: str) -> int:
-        """Clear all keys matching pattern"""
-        if not self.redis_client:
-            return 0
+    async def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Clear all keys matching a glob pattern, scanning Redis incrementally"""
+        local_keys = [key for key in self._local if fnmatch.fnmatchcase(key, pattern)]
+        for key in local_keys:
+            self._local_drop(key)
+        if not self._redis_usable():
+            return len(local_keys)
         
+        removed = 0
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
-            return 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    removed += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                removed += await self.redis_client.unlink(*batch)
         except Exception as e:
-            logger.warning(f"Cache clear pattern error: {e}")
-            return 0
+            self._redis_failed("clear pattern", e)
+        return max(removed, len(local_keys))
+    
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every entry cached under any of the given tags"""
+        keys = set()
+        for tag in tags:
+            keys.update(self._local_tags.get(tag, ()))
+        
+        if self._redis_usable():
+            try:
+                for tag in tags:
+                    keys.update(
+                        member.decode() if isinstance(member, bytes) else member
+                        for member in await self.redis_client.smembers(self._tag_key(tag))
+                    )
+                if tags:
+                    await self.redis_client.unlink(*keys, *(self._tag_key(tag) for tag in tags))
+            except Exception as e:
+                self._redis_failed("invalidate tags", e)
+        
+        for key in keys:
+            self._local_drop(key)
+        return len(keys)
 
 class RateLimiter:
     """
@@ -250,32 +433,49 @@ class RateLimiter:
             
             return False
 
+def _create_async_cache_client() -> Optional["redis_async.Redis"]:
+    """Binary-mode async Redis client for the response cache"""
+    try:
+        return redis_async.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+    except Exception as e:
+        logger.warning(f"Could not initialize async Redis cache: {e}")
+        return None
+
 # Global instances
 performance_monitor = PerformanceMonitor()
-cache_manager = CacheManager(performance_monitor.redis_client)
+cache_manager = CacheManager(_create_async_cache_client())
 rate_limiter = RateLimiter(performance_monitor.redis_client)
 
-def cache_response(ttl: int = 3600, key_prefix: str = "api"):
-    """Decorator for caching API responses"""
+def cache_response(
+    ttl: int = 3600,
+    key_prefix: str = "api",
+    tags: Union[Iterable[str], Callable[..., Iterable[str]]] = ()
+):
+    """
+    Decorator for caching API responses
+    
+    ``tags`` is a list of tags or a callable receiving the endpoint's
+    arguments and returning them; ``cache_manager.invalidate_tags`` then
+    drops every response cached under a tag.
+    """
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
             cache_key = cache_manager._generate_key(key_prefix, func.__name__, *args, **kwargs)
+            computed = False
             
-            # Try to get from cache
-            cached_result = await cache_manager.get(cache_key)
-            if cached_result is not None:
-                performance_monitor.record_cache_hit(func.__name__)
-                return cached_result
-            
-            # Execute function
-            performance_monitor.record_cache_miss(func.__name__)
-            result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
+            async def compute():
+                nonlocal computed
+                computed = True
+                performance_monitor.record_cache_miss(func.__name__)
+                return await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
             
-            # Cache result
-            await cache_manager.set(cache_key, result, ttl)
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            result = await cache_manager.get_or_compute(cache_key, compute, ttl, entry_tags)
             
+            if not computed:
+                performance_monitor.record_cache_hit(func.__name__)
             return result
         return wrapper
     return decorator
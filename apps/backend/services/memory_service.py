@@ -6,16 +6,25 @@ Provides graceful degradation when advanced memory systems are unavailable
 import asyncio
 import json
 import logging
+import re
 import time
 import sqlite3
 import aiosqlite
-from typing import Dict, List, Optional, Any, Union
+import numpy as np
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
+import sys
 from pathlib import Path
 import structlog
 
+# Add packages to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from packages.memory.embedding_store import EmbeddingStore
+
 logger = structlog.get_logger(__name__)
 
 class MemoryType(Enum):
@@ -46,6 +55,7 @@ class MemoryEntry:
     user_id: Optional[str] = None
     session_id: Optional[str] = None
     agent_id: Optional[str] = None
+    embedding: Optional[List[float]] = None  # written by providers that support vector search
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -95,6 +105,11 @@ class BaseMemoryProvider:
         """Search memory entries"""
         raise NotImplementedError
     
+    async def vector_search(self, embedding: List[float], memory_type: MemoryType = None,
+                            limit: int = 10) -> List[Tuple[MemoryEntry, float]]:
+        """Cosine-similarity search over stored embeddings"""
+        raise NotImplementedError
+    
     async def list_entries(self, memory_type: MemoryType = None, user_id: str = None, 
                           session_id: str = None, limit: int = 100) -> List[MemoryEntry]:
         """List memory entries with filters"""
@@ -216,20 +231,71 @@ class InMemoryProvider(BaseMemoryProvider):
             del self.storage[entry_id]
 
 class SQLiteProvider(BaseMemoryProvider):
-    """SQLite storage provider"""
+    """
+    SQLite storage provider
+    
+    Search uses an FTS5 index over the entry content (kept in sync by
+    triggers, ranked with BM25) and an optional float32 embedding column
+    scored with NumPy in fixed-size chunks. Writes go through a single
+    writer task that group-commits queued statements in WAL mode.
+    """
+    
+    _COLUMNS = ("id", "type", "content", "metadata", "timestamp", "user_id", "session_id", "agent_id")
+    _SELECT = ", ".join(_COLUMNS)
+    
+    _UPSERT_SQL = """
+        INSERT INTO memory_entries
+        (id, type, content, metadata, timestamp, user_id, session_id, agent_id, embedding)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            type = excluded.type, content = excluded.content, metadata = excluded.metadata,
+            timestamp = excluded.timestamp, user_id = excluded.user_id,
+            session_id = excluded.session_id, agent_id = excluded.agent_id,
+            embedding = excluded.embedding
+    """
+    
+    # External-content FTS table over memory_entries.content. Upserts fire the
+    # UPDATE trigger (INSERT OR REPLACE would skip the DELETE trigger).
+    _FTS_SCHEMA = [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+            content, content='memory_entries', content_rowid='rowid', tokenize='unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS memory_entries_ai AFTER INSERT ON memory_entries BEGIN
+            INSERT INTO memory_fts(rowid, content) VALUES (new.rowid, new.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS memory_entries_ad AFTER DELETE ON memory_entries BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS memory_entries_au AFTER UPDATE OF content ON memory_entries BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+            INSERT INTO memory_fts(rowid, content) VALUES (new.rowid, new.content);
+        END"""
+    ]
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.db_path = config.get("db_path", "data/memory.db")
-        self.db = None
+        self.write_batch_size = config.get("write_batch_size", 256)
+        self.vector_scan_chunk = config.get("vector_scan_chunk", 8192)
+        self.db = None  # writer connection
+        self.read_db = None  # separate reader so WAL reads don't queue behind commits
+        self.fts_enabled = False
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.write_stats = {"statements": 0, "commits": 0}
     
     async def initialize(self) -> bool:
         """Initialize SQLite database"""
         try:
-            # Create directory if it doesn't exist
-            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            in_memory = self.db_path == ":memory:"
+            if not in_memory:
+                # Create directory if it doesn't exist
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
             
             self.db = await aiosqlite.connect(self.db_path)
+            if not in_memory:
+                await self.db.execute("PRAGMA journal_mode=WAL")
+                await self.db.execute("PRAGMA synchronous=NORMAL")
             
             # Create table
             await self.db.execute("""
@@ -241,33 +307,160 @@ class SQLiteProvider(BaseMemoryProvider):
                     timestamp REAL NOT NULL,
                     user_id TEXT,
                     session_id TEXT,
-                    agent_id TEXT
+                    agent_id TEXT,
+                    embedding BLOB
                 )
             """)
             
+            cursor = await self.db.execute("PRAGMA table_info(memory_entries)")
+            if "embedding" not in [row[1] for row in await cursor.fetchall()]:
+                await self.db.execute("ALTER TABLE memory_entries ADD COLUMN embedding BLOB")
+            
             # Create indexes
             await self.db.execute("CREATE INDEX IF NOT EXISTS idx_type ON memory_entries(type)")
             await self.db.execute("CREATE INDEX IF NOT EXISTS idx_user_id ON memory_entries(user_id)")
             await self.db.execute("CREATE INDEX IF NOT EXISTS idx_session_id ON memory_entries(session_id)")
             await self.db.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON memory_entries(timestamp)")
             
+            await self._create_fts_index()
+            
             await self.db.commit()
+            
+            self.read_db = self.db if in_memory else await aiosqlite.connect(self.db_path)
+            self._write_queue = asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._writer_loop())
+            
             self.is_available = True
-            logger.info(f"SQLite storage initialized: {self.db_path}")
+            logger.info(f"SQLite storage initialized: {self.db_path} (fts5={self.fts_enabled})")
             return True
             
         except Exception as e:
             logger.error(f"Error initializing SQLite storage: {e}")
             return False
     
+    async def _create_fts_index(self):
+        """Create the FTS5 index and triggers, backfilling rows stored before it existed"""
+        try:
+            cursor = await self.db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_fts'"
+            )
+            existed = await cursor.fetchone() is not None
+            
+            for statement in self._FTS_SCHEMA:
+                await self.db.execute(statement)
+            if not existed:
+                await self.db.execute("INSERT INTO memory_fts(memory_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, falling back to LIKE search: {e}")
+    
+    async def close(self):
+        """Flush queued writes and close connections"""
+        if self._writer_task:
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._writer_task = None
+        if self.read_db is not None and self.read_db is not self.db:
+            await self.read_db.close()
+        if self.db is not None:
+            await self.db.close()
+        self.db = self.read_db = None
+        self.is_available = False
+    
+    async def _write(self, sql: str, params: Tuple = ()) -> int:
+        """Queue a write for the next group commit and return its rowcount"""
+        if self._writer_task is None or self._writer_task.done():
+            raise RuntimeError("SQLite writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((sql, params, future))
+        return await future
+    
+    async def _writer_loop(self):
+        """Execute queued writes in batches, one commit per batch"""
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < self.write_batch_size and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            
+            try:
+                rowcounts = []
+                for sql, params, _ in batch:
+                    cursor = await self.db.execute(sql, params)
+                    rowcounts.append(cursor.rowcount)
+                await self.db.commit()
+                self.write_stats["commits"] += 1
+                for (_, _, future), rowcount in zip(batch, rowcounts):
+                    if not future.done():
+                        future.set_result(rowcount)
+            except Exception as batch_error:
+                # Retry one by one so a single bad statement doesn't fail its neighbours
+                await self._rollback()
+                logger.warning(f"SQLite group commit failed, retrying individually: {batch_error}")
+                for sql, params, future in batch:
+                    try:
+                        cursor = await self.db.execute(sql, params)
+                        await self.db.commit()
+                        self.write_stats["commits"] += 1
+                        if not future.done():
+                            future.set_result(cursor.rowcount)
+                    except Exception as e:
+                        await self._rollback()
+                        if not future.done():
+                            future.set_exception(e)
+            finally:
+                self.write_stats["statements"] += len(batch)
+                # Nobody may be left waiting, even if the writer is being cancelled
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("SQLite writer stopped"))
+                    self._write_queue.task_done()
+    
+    async def _rollback(self):
+        """Roll back the writer connection; a failure here must not stop the writer loop"""
+        try:
+            await self.db.rollback()
+        except Exception as e:
+            logger.error(f"SQLite rollback failed: {e}")
+    
+    @staticmethod
+    def _encode_embedding(embedding: Optional[List[float]]) -> Optional[bytes]:
+        """Normalized float32 bytes, so similarity is a plain dot product"""
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector = vector / norm
+        return vector.tobytes()
+    
+    @classmethod
+    def _row_to_entry(cls, row) -> MemoryEntry:
+        return MemoryEntry(
+            id=row[0],
+            type=MemoryType(row[1]),
+            content=json.loads(row[2]),
+            metadata=json.loads(row[3]),
+            timestamp=row[4],
+            user_id=row[5],
+            session_id=row[6],
+            agent_id=row[7]
+        )
+    
+    @staticmethod
+    def _fts_query(query: str) -> Optional[str]:
+        """Turn free text into an FTS5 AND query; the last term also matches as a prefix"""
+        terms = re.findall(r"\w+", query, flags=re.UNICODE)
+        if not terms:
+            return None
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+    
     async def store(self, entry: MemoryEntry) -> bool:
         """Store entry in SQLite"""
         try:
-            await self.db.execute("""
-                INSERT OR REPLACE INTO memory_entries 
-                (id, type, content, metadata, timestamp, user_id, session_id, agent_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            await self._write(self._UPSERT_SQL, (
                 entry.id,
                 entry.type.value,
                 json.dumps(entry.content),
@@ -275,9 +468,9 @@ class SQLiteProvider(BaseMemoryProvider):
                 entry.timestamp,
                 entry.user_id,
                 entry.session_id,
-                entry.agent_id
+                entry.agent_id,
+                self._encode_embedding(entry.embedding)
             ))
-            await self.db.commit()
             return True
         except Exception as e:
             logger.error(f"Error storing entry in SQLite: {e}")
@@ -286,66 +479,119 @@ class SQLiteProvider(BaseMemoryProvider):
     async def retrieve(self, entry_id: str) -> Optional[MemoryEntry]:
         """Retrieve entry from SQLite"""
         try:
-            cursor = await self.db.execute(
-                "SELECT * FROM memory_entries WHERE id = ?", (entry_id,)
+            cursor = await self.read_db.execute(
+                f"SELECT {self._SELECT} FROM memory_entries WHERE id = ?", (entry_id,)
             )
             row = await cursor.fetchone()
             
             if row:
-                return MemoryEntry(
-                    id=row[0],
-                    type=MemoryType(row[1]),
-                    content=json.loads(row[2]),
-                    metadata=json.loads(row[3]),
-                    timestamp=row[4],
-                    user_id=row[5],
-                    session_id=row[6],
-                    agent_id=row[7]
-                )
+                return self._row_to_entry(row)
             return None
         except Exception as e:
             logger.error(f"Error retrieving entry from SQLite: {e}")
             return None
     
     async def search(self, query: str, memory_type: MemoryType = None, limit: int = 10) -> List[MemoryEntry]:
-        """Search entries in SQLite"""
+        """Search entries in SQLite, best BM25 match first"""
         try:
-            sql = "SELECT * FROM memory_entries WHERE content LIKE ?"
-            params = [f"%{query}%"]
+            if not self.fts_enabled:
+                return await self._like_search(query, memory_type, limit)
+            
+            match = self._fts_query(query)
+            if match is None:
+                return []
+            
+            columns = ", ".join(f"m.{column}" for column in self._COLUMNS)
+            sql = (
+                f"SELECT {columns} FROM memory_fts "
+                "JOIN memory_entries m ON m.rowid = memory_fts.rowid "
+                "WHERE memory_fts MATCH ?"
+            )
+            params: List[Any] = [match]
             
             if memory_type:
-                sql += " AND type = ?"
+                sql += " AND m.type = ?"
                 params.append(memory_type.value)
             
-            sql += " ORDER BY timestamp DESC LIMIT ?"
+            sql += " ORDER BY bm25(memory_fts), m.timestamp DESC LIMIT ?"
             params.append(limit)
             
-            cursor = await self.db.execute(sql, params)
-            rows = await cursor.fetchall()
-            
-            results = []
-            for row in rows:
-                results.append(MemoryEntry(
-                    id=row[0],
-                    type=MemoryType(row[1]),
-                    content=json.loads(row[2]),
-                    metadata=json.loads(row[3]),
-                    timestamp=row[4],
-                    user_id=row[5],
-                    session_id=row[6],
-                    agent_id=row[7]
-                ))
-            
-            return results
+            cursor = await self.read_db.execute(sql, params)
+            return [self._row_to_entry(row) for row in await cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error searching entries in SQLite: {e}")
             return []
     
+    async def _like_search(self, query: str, memory_type: MemoryType = None, limit: int = 10) -> List[MemoryEntry]:
+        """Substring scan, used only when SQLite was built without FTS5"""
+        sql = f"SELECT {self._SELECT} FROM memory_entries WHERE content LIKE ?"
+        params: List[Any] = [f"%{query}%"]
+        
+        if memory_type:
+            sql += " AND type = ?"
+            params.append(memory_type.value)
+        
+        sql += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        
+        cursor = await self.read_db.execute(sql, params)
+        return [self._row_to_entry(row) for row in await cursor.fetchall()]
+    
+    async def vector_search(self, embedding: List[float], memory_type: MemoryType = None,
+                            limit: int = 10) -> List[Tuple[MemoryEntry, float]]:
+        """Cosine-similarity search over stored embeddings, best first"""
+        try:
+            query = np.frombuffer(self._encode_embedding(embedding), dtype=np.float32)
+            dimension = query.shape[0]
+            
+            sql = "SELECT rowid, embedding FROM memory_entries WHERE length(embedding) = ?"
+            params: List[Any] = [dimension * 4]
+            if memory_type:
+                sql += " AND type = ?"
+                params.append(memory_type.value)
+            
+            best_rowids = np.empty(0, dtype=np.int64)
+            best_scores = np.empty(0, dtype=np.float32)
+            
+            cursor = await self.read_db.execute(sql, params)
+            while True:
+                rows = await cursor.fetchmany(self.vector_scan_chunk)
+                if not rows:
+                    break
+                
+                matrix = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), dimension)
+                rowids = np.concatenate([best_rowids, np.fromiter((row[0] for row in rows), np.int64, len(rows))])
+                scores = np.concatenate([best_scores, matrix @ query])
+                
+                if len(scores) > limit:
+                    top = np.argpartition(-scores, limit - 1)[:limit]
+                    rowids, scores = rowids[top], scores[top]
+                best_rowids, best_scores = rowids, scores
+            
+            if len(best_rowids) == 0:
+                return []
+            
+            order = np.argsort(-best_scores)
+            placeholders = ", ".join("?" * len(order))
+            cursor = await self.read_db.execute(
+                f"SELECT rowid, {self._SELECT} FROM memory_entries WHERE rowid IN ({placeholders})",
+                [int(rowid) for rowid in best_rowids]
+            )
+            entries = {row[0]: self._row_to_entry(row[1:]) for row in await cursor.fetchall()}
+            
+            return [
+                (entries[int(best_rowids[i])], float(best_scores[i]))
+                for i in order if int(best_rowids[i]) in entries
+            ]
+        except Exception as e:
+            logger.error(f"Error in SQLite vector search: {e}")
+            return []
+    
     async def list_entries(self, memory_type: MemoryType = None, user_id: str = None, 
                           session_id: str = None, limit: int = 100) -> List[MemoryEntry]:
         """List entries with filters"""
         try:
-            sql = "SELECT * FROM memory_entries WHERE 1=1"
+            sql = f"SELECT {self._SELECT} FROM memory_entries WHERE 1=1"
             params = []
             
             if memory_type:
@@ -363,23 +609,8 @@ class SQLiteProvider(BaseMemoryProvider):
             sql += " ORDER BY timestamp DESC LIMIT ?"
             params.append(limit)
             
-            cursor = await self.db.execute(sql, params)
-            rows = await cursor.fetchall()
-            
-            results = []
-            for row in rows:
-                results.append(MemoryEntry(
-                    id=row[0],
-                    type=MemoryType(row[1]),
-                    content=json.loads(row[2]),
-                    metadata=json.loads(row[3]),
-                    timestamp=row[4],
-                    user_id=row[5],
-                    session_id=row[6],
-                    agent_id=row[7]
-                ))
-            
-            return results
+            cursor = await self.read_db.execute(sql, params)
+            return [self._row_to_entry(row) for row in await cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error listing entries from SQLite: {e}")
             return []
@@ -387,8 +618,7 @@ class SQLiteProvider(BaseMemoryProvider):
     async def delete(self, entry_id: str) -> bool:
         """Delete entry from SQLite"""
         try:
-            await self.db.execute("DELETE FROM memory_entries WHERE id = ?", (entry_id,))
-            await self.db.commit()
+            await self._write("DELETE FROM memory_entries WHERE id = ?", (entry_id,))
             return True
         except Exception as e:
             logger.error(f"Error deleting entry from SQLite: {e}")
@@ -400,11 +630,7 @@ class SQLiteProvider(BaseMemoryProvider):
             if older_than is None:
                 older_than = time.time() - (7 * 24 * 60 * 60)  # 7 days
             
-            cursor = await self.db.execute(
-                "DELETE FROM memory_entries WHERE timestamp < ?", (older_than,)
-            )
-            await self.db.commit()
-            return cursor.rowcount
+            return await self._write("DELETE FROM memory_entries WHERE timestamp < ?", (older_than,))
         except Exception as e:
             logger.error(f"Error cleaning up SQLite entries: {e}")
             return 0
@@ -466,21 +692,101 @@ class CogneeProvider(BaseMemoryProvider):
     
     # Implement other methods as needed...
 
+class ReadThroughCache:
+    """Small TTL + LRU cache for federated read results"""
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Tuple) -> Optional[Any]:
+        item = self._entries.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[1]
+    
+    def put(self, key: Tuple, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def discard(self, key: Tuple):
+        self._entries.pop(key, None)
+    
+    def discard_kind(self, kind: str):
+        """Drop every cached result of one query kind (e.g. all searches)"""
+        for key in [key for key in self._entries if key[0] == kind]:
+            del self._entries[key]
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def reciprocal_rank_fusion(result_lists: List[List[MemoryEntry]], k: int = 60) -> List[MemoryEntry]:
+    """Merge ranked lists, deduplicating by entry id; score is sum(1 / (k + rank))"""
+    scores: Dict[str, float] = {}
+    entries: Dict[str, MemoryEntry] = {}
+    for results in result_lists:
+        for rank, entry in enumerate(results, start=1):
+            scores[entry.id] = scores.get(entry.id, 0.0) + 1.0 / (k + rank)
+            entries.setdefault(entry.id, entry)
+    
+    ordered = sorted(scores, key=lambda entry_id: (-scores[entry_id], -entries[entry_id].timestamp))
+    return [entries[entry_id] for entry_id in ordered]
+
 class UnifiedMemoryService:
     """
     Unified memory service with graceful degradation
+    
+    By default reads go to the primary provider and fall back to the
+    secondary one. With ``federated.enabled`` they fan out to every provider
+    concurrently, each bounded by its own deadline, and results are merged
+    with reciprocal rank fusion behind a read-through cache.
     """
     
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, embedding_store: Optional[EmbeddingStore] = None):
         self.config = config or {}
         self.providers: Dict[MemoryProvider, BaseMemoryProvider] = {}
         self.primary_provider: Optional[BaseMemoryProvider] = None
         self.fallback_provider: Optional[BaseMemoryProvider] = None
+        
+        # Optional float32 embedding store; pass the recall engine's store to share it
+        embeddings_config = self.config.get("embeddings")
+        if embedding_store is None and embeddings_config:
+            embedding_store = EmbeddingStore(
+                embeddings_config.get("dimension", 384),
+                path=embeddings_config.get("path")
+            )
+        self.embedding_store = embedding_store
+        self.vector_oversample = (embeddings_config or {}).get("oversample", 4)
+        
+        federated_config = self.config.get("federated", {})
+        self.federated = federated_config.get("enabled", False)
+        self.provider_deadlines: Dict[str, float] = federated_config.get("deadlines", {})
+        self.default_deadline = federated_config.get("default_deadline", 0.5)
+        self.rrf_k = federated_config.get("rrf_k", 60)
+        self.read_cache = ReadThroughCache(
+            federated_config.get("cache_max_entries", 1024),
+            federated_config.get("cache_ttl_seconds", 30.0)
+        )
+        
         self.stats = {
             "entries_stored": 0,
             "entries_retrieved": 0,
             "searches_performed": 0,
-            "errors_encountered": 0
+            "errors_encountered": 0,
+            "provider_timeouts": 0
         }
     
     async def initialize(self):
@@ -519,9 +825,14 @@ class UnifiedMemoryService:
     
     async def store(self, memory_type: MemoryType, content: Dict[str, Any], 
                    metadata: Dict[str, Any] = None, user_id: str = None, 
-                   session_id: str = None, agent_id: str = None) -> str:
+                   session_id: str = None, agent_id: str = None,
+                   embedding: List[float] = None) -> str:
         """Store a memory entry"""
         entry_id = str(uuid.uuid4())
+        # Embeddings live in the shared store when there is one, otherwise with the provider
+        if embedding is not None and self.embedding_store is not None:
+            self.embedding_store.put(entry_id, embedding)
+            embedding = None
         entry = MemoryEntry(
             id=entry_id,
             type=memory_type,
@@ -530,21 +841,26 @@ class UnifiedMemoryService:
             timestamp=time.time(),
             user_id=user_id,
             session_id=session_id,
-            agent_id=agent_id
+            agent_id=agent_id,
+            embedding=embedding
         )
         
         # Try primary provider first
         if await self._store_with_provider(self.primary_provider, entry):
             self.stats["entries_stored"] += 1
+            self._invalidate_cached_reads()
             return entry_id
         
         # Fallback to secondary provider
         if self.fallback_provider and await self._store_with_provider(self.fallback_provider, entry):
             self.stats["entries_stored"] += 1
+            self._invalidate_cached_reads()
             logger.warning("Used fallback provider for storage")
             return entry_id
         
         self.stats["errors_encountered"] += 1
+        if self.embedding_store is not None:
+            self.embedding_store.delete(entry_id)
         raise RuntimeError("Failed to store memory entry")
     
     async def _store_with_provider(self, provider: BaseMemoryProvider, entry: MemoryEntry) -> bool:
@@ -557,6 +873,9 @@ class UnifiedMemoryService:
     
     async def retrieve(self, entry_id: str) -> Optional[MemoryEntry]:
         """Retrieve a memory entry"""
+        if self.federated:
+            return await self._federated_retrieve(entry_id)
+        
         # Try primary provider first
         entry = await self._retrieve_with_provider(self.primary_provider, entry_id)
         if entry:
@@ -585,6 +904,9 @@ class UnifiedMemoryService:
         """Search memory entries"""
         self.stats["searches_performed"] += 1
         
+        if self.federated:
+            return await self._federated_search(query, memory_type, limit)
+        
         # Try primary provider first
         results = await self._search_with_provider(self.primary_provider, query, memory_type, limit)
         if results:
@@ -608,9 +930,86 @@ class UnifiedMemoryService:
             logger.error(f"Error searching with provider: {e}")
             return []
     
+    async def vector_search(self, embedding: List[float], memory_type: MemoryType = None,
+                            limit: int = 10) -> List[Tuple[MemoryEntry, float]]:
+        """
+        Find the entries whose embeddings are most similar to ``embedding``.
+        
+        Searches the embedding store when the service has one and the
+        providers' own vector search otherwise, matching where ``store``
+        put the embeddings. Returns (entry, cosine similarity) pairs, best first.
+        """
+        self.stats["searches_performed"] += 1
+        
+        if self.embedding_store is not None:
+            return await self._store_vector_search(embedding, memory_type, limit)
+        
+        for provider in (self.primary_provider, self.fallback_provider):
+            if provider is None:
+                continue
+            try:
+                results = await provider.vector_search(embedding, memory_type, limit)
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                logger.error(f"Error in vector search with provider: {e}")
+                continue
+            if results:
+                return results
+        
+        return []
+    
+    async def _store_vector_search(self, embedding: List[float], memory_type: MemoryType = None,
+                                   limit: int = 10) -> List[Tuple[MemoryEntry, float]]:
+        """
+        Score the embedding store and resolve its best rows to entries.
+        
+        Only the top ``limit * vector_oversample`` rows are resolved, in one
+        concurrent batch, so type filtering or ids the store shares with a
+        recall engine can leave fewer than ``limit`` results.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        if query.shape != (self.embedding_store.dimension,) or limit <= 0:
+            return []
+        norm = float(np.linalg.norm(query))
+        if norm > 0:
+            query = query / norm
+        
+        live = self.embedding_store.live_mask
+        scores = self.embedding_store.matrix @ query
+        scores[~live] = -np.inf
+        
+        k = min(limit * self.vector_oversample, int(live.sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        entries = await asyncio.gather(*(
+            self._lookup_entry(self.embedding_store.id_at(int(row))) for row in top
+        ))
+        results = [
+            (entry, float(scores[row])) for row, entry in zip(top, entries)
+            if entry is not None and (memory_type is None or entry.type == memory_type)
+        ]
+        return results[:limit]
+    
+    async def _lookup_entry(self, entry_id: str) -> Optional[MemoryEntry]:
+        """Fetch an entry from the providers store() writes to, without retrieve()'s stats or caching"""
+        for provider in (self.primary_provider, self.fallback_provider):
+            if provider is None:
+                continue
+            entry = await self._retrieve_with_provider(provider, entry_id)
+            if entry is not None:
+                return entry
+        return None
+    
     async def list_entries(self, memory_type: MemoryType = None, user_id: str = None, 
                           session_id: str = None, limit: int = 100) -> List[MemoryEntry]:
         """List memory entries with filters"""
+        if self.federated:
+            return await self._federated_list(memory_type, user_id, session_id, limit)
+        
         # Try primary provider first
         results = await self._list_with_provider(self.primary_provider, memory_type, user_id, session_id, limit)
         if results:
@@ -634,10 +1033,122 @@ class UnifiedMemoryService:
             logger.error(f"Error listing with provider: {e}")
             return []
     
+    def _invalidate_cached_reads(self):
+        """Drop cached searches and listings after a write may have changed them"""
+        self.read_cache.discard_kind("search")
+        self.read_cache.discard_kind("list")
+    
+    async def _fan_out(
+        self,
+        call: Callable[[BaseMemoryProvider], Awaitable[Any]],
+        first_result: bool = False
+    ) -> List[Any]:
+        """
+        Run ``call`` against every provider at once, each under its deadline.
+        
+        Returns results in provider preference order, skipping providers that
+        failed, timed out or do not implement the operation. With
+        ``first_result`` it returns as soon as one provider yields a truthy
+        result and cancels the rest.
+        """
+        tasks = {
+            asyncio.ensure_future(asyncio.wait_for(
+                call(provider),
+                self.provider_deadlines.get(provider_type.value, self.default_deadline)
+            )): provider_type
+            for provider_type, provider in self.providers.items()
+        }
+        order = list(self.providers)
+        results: Dict[MemoryProvider, Any] = {}
+        
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider_type = tasks[task]
+                    error = task.exception()
+                    if isinstance(error, asyncio.TimeoutError):
+                        self.stats["provider_timeouts"] += 1
+                        logger.warning(f"Memory provider {provider_type.value} missed its deadline")
+                    elif isinstance(error, NotImplementedError):
+                        continue
+                    elif error is not None:
+                        self.stats["errors_encountered"] += 1
+                        logger.error(f"Error querying {provider_type.value}: {error}")
+                    else:
+                        results[provider_type] = task.result()
+                        if first_result and results[provider_type]:
+                            return [results[provider_type]]
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        return [results[provider_type] for provider_type in order if provider_type in results]
+    
+    async def _federated_search(self, query: str, memory_type: MemoryType = None, limit: int = 10) -> List[MemoryEntry]:
+        """Search every provider concurrently and fuse the rankings"""
+        cache_key = ("search", query, memory_type, limit)
+        cached = self.read_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        result_lists = await self._fan_out(lambda provider: provider.search(query, memory_type, limit))
+        results = reciprocal_rank_fusion([r for r in result_lists if r], self.rrf_k)[:limit]
+        self.read_cache.put(cache_key, results)
+        return list(results)
+    
+    async def _federated_retrieve(self, entry_id: str) -> Optional[MemoryEntry]:
+        """Return the entry from whichever provider answers first"""
+        cache_key = ("retrieve", entry_id)
+        cached = self.read_cache.get(cache_key)
+        if cached is not None:
+            self.stats["entries_retrieved"] += 1
+            return cached
+        
+        found = await self._fan_out(lambda provider: provider.retrieve(entry_id), first_result=True)
+        entry = next((result for result in found if result), None)
+        if entry is not None:
+            self.stats["entries_retrieved"] += 1
+            self.read_cache.put(cache_key, entry)
+        return entry
+    
+    async def _federated_list(self, memory_type: MemoryType = None, user_id: str = None,
+                              session_id: str = None, limit: int = 100) -> List[MemoryEntry]:
+        """List from every provider concurrently, deduplicated and newest first"""
+        cache_key = ("list", memory_type, user_id, session_id, limit)
+        cached = self.read_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        result_lists = await self._fan_out(
+            lambda provider: provider.list_entries(memory_type, user_id, session_id, limit)
+        )
+        merged: Dict[str, MemoryEntry] = {}
+        for results in result_lists:
+            for entry in results or []:
+                merged.setdefault(entry.id, entry)
+        
+        results = sorted(merged.values(), key=lambda entry: entry.timestamp, reverse=True)[:limit]
+        self.read_cache.put(cache_key, results)
+        return list(results)
+    
+    def get_embedding(self, entry_id: str):
+        """Get a zero-copy view of an entry's embedding, if one was stored"""
+        if self.embedding_store is None:
+            return None
+        return self.embedding_store.get(entry_id)
+    
     async def delete(self, entry_id: str) -> bool:
         """Delete a memory entry"""
         success = False
         
+        if self.embedding_store is not None:
+            self.embedding_store.delete(entry_id)
+        
+        self.read_cache.discard(("retrieve", entry_id))
+        self._invalidate_cached_reads()
+        
         # Try to delete from all providers
         for provider in self.providers.values():
             try:
@@ -651,6 +1162,7 @@ class UnifiedMemoryService:
     async def cleanup(self, older_than: float = None) -> int:
         """Clean up old entries from all providers"""
         total_cleaned = 0
+        self.read_cache.clear()
         
         for provider in self.providers.values():
             try:
@@ -667,7 +1179,14 @@ class UnifiedMemoryService:
             **self.stats,
             "primary_provider": type(self.primary_provider).__name__ if self.primary_provider else None,
             "fallback_provider": type(self.fallback_provider).__name__ if self.fallback_provider else None,
-            "providers_available": len(self.providers)
+            "providers_available": len(self.providers),
+            "federated": self.federated,
+            "read_cache": {
+                "size": len(self.read_cache),
+                "hits": self.read_cache.hits,
+                "misses": self.read_cache.misses
+            },
+            "embeddings": self.embedding_store.memory_stats() if self.embedding_store else None
         }
 
 # Global memory service instance
@@ -682,9 +1201,10 @@ async def initialize_memory_service(config: Dict[str, Any] = None):
 
 async def store_memory(memory_type: MemoryType, content: Dict[str, Any], 
                       metadata: Dict[str, Any] = None, user_id: str = None, 
-                      session_id: str = None, agent_id: str = None) -> str:
+                      session_id: str = None, agent_id: str = None,
+                      embedding: List[float] = None) -> str:
     """Store a memory entry"""
-    return await memory_service.store(memory_type, content, metadata, user_id, session_id, agent_id)
+    return await memory_service.store(memory_type, content, metadata, user_id, session_id, agent_id, embedding)
 
 async def retrieve_memory(entry_id: str) -> Optional[MemoryEntry]:
     """Retrieve a memory entry"""
@@ -694,6 +1214,11 @@ async def search_memory(query: str, memory_type: MemoryType = None, limit: int =
     """Search memory entries"""
     return await memory_service.search(query, memory_type, limit)
 
+async def vector_search_memory(embedding: List[float], memory_type: MemoryType = None,
+                               limit: int = 10) -> List[Tuple[MemoryEntry, float]]:
+    """Search memory entries by embedding similarity"""
+    return await memory_service.vector_search(embedding, memory_type, limit)
+
 async def list_memory(memory_type: MemoryType = None, user_id: str = None, 
                      session_id: str = None, limit: int = 100) -> List[MemoryEntry]:
     """List memory entries"""
@@ -0,0 +1,589 @@
+"""
+Continuous Batching - Iteration-level scheduling for local causal LMs
+
+Instead of running each request to completion (or in fixed-size chunks),
+the scheduler keeps one in-flight batch on the model. Between decode steps
+it retires finished sequences and admits waiting ones, so short requests are
+not held hostage by long ones and the model always runs as wide a batch as
+there is work for. Every request gets its own async stream of text chunks.
+
+The scheduler is model-agnostic: a ``DecodeBackend`` owns the tensors.
+``TransformersBatchBackend`` implements it for Hugging Face causal LMs with
+a single left-padded KV cache shared by all rows.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+try:
+    import torch
+    import torch.nn.functional as F
+except ImportError:
+    torch = None
+    F = None
+
+from .streaming_decode import IncrementalDetokenizer, StopSequenceMatcher
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a BatchStream
+_STREAM_END = object()
+
+
+@dataclass
+class BatchSequence:
+    """One request inside the continuous batch"""
+    id: str
+    prompt: str
+    max_new_tokens: int = 256
+    temperature: float = 0.7
+    top_p: float = 1.0
+    stop_sequences: Optional[List[str]] = None
+    max_length: Optional[int] = None  # cap on prompt plus generated tokens
+    prompt_tokens: int = 0
+    token_ids: List[int] = field(default_factory=list)
+    finish_reason: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+@dataclass
+class BatchingStats:
+    """Aggregate scheduler statistics"""
+    submitted: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    tokens_generated: int = 0
+    prefill_steps: int = 0
+    decode_steps: int = 0
+    decode_rows: int = 0
+    peak_batch_size: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.decode_rows / self.decode_steps if self.decode_steps else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens_generated / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class DecodeBackend(ABC):
+    """
+    Model side of the continuous batch.
+
+    The backend keeps one row per active sequence, in the order the scheduler
+    admitted them. All methods are called from a single worker thread.
+    """
+
+    tokenizer: Any = None
+    eos_token_id: Optional[int] = None
+
+    @abstractmethod
+    def prefill(self, sequences: List[BatchSequence]) -> List[int]:
+        """Encode new sequences, append them as rows and return each one's first token"""
+
+    @abstractmethod
+    def decode(self, sequences: List[BatchSequence]) -> List[int]:
+        """Run one decode step over every row and return the next token per row"""
+
+    @abstractmethod
+    def release(self, keep: List[int]) -> None:
+        """Keep only the given row indices (in order)"""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Drop all rows"""
+
+
+class BatchStream:
+    """
+    Per-request handle returned by ContinuousBatchScheduler.submit.
+
+    Iterate it with ``async for`` to receive text chunks as they are decoded,
+    or await ``text()`` for the complete output.
+    """
+
+    def __init__(self, sequence: BatchSequence, tokenizer: Any):
+        self.sequence = sequence
+        self.cancelled = False
+        self._detokenizer = IncrementalDetokenizer(tokenizer)
+        self._stop_matcher = StopSequenceMatcher(sequence.stop_sequences)
+        self._chunks: asyncio.Queue = asyncio.Queue()
+        self._parts: List[str] = []
+        self._result: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    @property
+    def id(self) -> str:
+        return self.sequence.id
+
+    @property
+    def done(self) -> bool:
+        return self._result.done()
+
+    def __aiter__(self) -> "BatchStream":
+        return self
+
+    async def __anext__(self) -> str:
+        item = await self._chunks.get()
+        if item is _STREAM_END:
+            self._chunks.put_nowait(_STREAM_END)
+            raise StopAsyncIteration
+        if isinstance(item, Exception):
+            self._chunks.put_nowait(item)
+            raise item
+        return item
+
+    async def text(self) -> str:
+        """Wait for the request to finish and return the full generated text"""
+        return await asyncio.shield(self._result)
+
+    def cancel(self) -> None:
+        """Stop generating; the row is retired at the next step"""
+        self.cancelled = True
+
+    def _add_token(self, token_id: int) -> None:
+        sequence = self.sequence
+        if sequence.first_token_at is None:
+            sequence.first_token_at = time.time()
+        sequence.token_ids.append(token_id)
+
+        text, stopped = self._stop_matcher.feed(self._detokenizer.add(token_id))
+        self._push(text)
+        if stopped:
+            self._finish("stop_sequence")
+        elif len(sequence.token_ids) >= sequence.max_new_tokens:
+            self._finish("length")
+        elif sequence.max_length is not None and sequence.prompt_tokens + len(sequence.token_ids) >= sequence.max_length:
+            self._finish("length")
+
+    def _push(self, text: str) -> None:
+        if text:
+            self._parts.append(text)
+            self._chunks.put_nowait(text)
+
+    def _finish(self, reason: str) -> None:
+        if self.done:
+            return
+        if reason in ("stop", "length"):
+            tail, _ = self._stop_matcher.feed(self._detokenizer.flush())
+            self._push(tail + self._stop_matcher.flush())
+        self.sequence.finish_reason = reason
+        self.sequence.finished_at = time.time()
+        self._chunks.put_nowait(_STREAM_END)
+        self._result.set_result("".join(self._parts))
+
+    def _fail(self, error: Exception) -> None:
+        if self.done:
+            return
+        self.sequence.finish_reason = "error"
+        self.sequence.finished_at = time.time()
+        self._chunks.put_nowait(error)
+        self._result.set_exception(error)
+        # Mark retrieved so an unawaited failure doesn't log a warning
+        self._result.exception()
+
+
+class ContinuousBatchScheduler:
+    """
+    Iteration-level scheduler in front of a DecodeBackend.
+
+    Requests wait in a FIFO queue until a batch slot frees up. Each loop
+    iteration either prefills newly admitted requests or runs one decode step
+    for the whole batch, then retires rows that hit EOS, a stop sequence,
+    their token limit, or were cancelled. Model calls run on one dedicated thread
+    so the event loop keeps serving streams while the model works.
+    """
+
+    def __init__(self, backend: DecodeBackend, max_batch_size: int = 8):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.stats = BatchingStats()
+
+        self._waiting: Deque[BatchStream] = deque()
+        self._active: List[BatchStream] = []
+        self._wakeup = asyncio.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        """Start the scheduling loop (submit() also starts it on demand)"""
+        self._ensure_running()
+
+    async def stop(self) -> None:
+        """Stop the loop and fail every unfinished request"""
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+        error = RuntimeError("Continuous batch scheduler stopped")
+        for stream in list(self._active) + list(self._waiting):
+            stream._fail(error)
+        self._active.clear()
+        self._waiting.clear()
+        self.backend.reset()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def submit(
+        self,
+        prompt: str,
+        max_new_tokens: int = 256,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        request_id: Optional[str] = None,
+        max_length: Optional[int] = None
+    ) -> BatchStream:
+        """
+        Queue a request and return its stream.
+
+        ``max_length`` bounds prompt plus generated tokens, like
+        transformers' ``max_length``; ``max_new_tokens`` bounds the output alone.
+        """
+        sequence = BatchSequence(
+            id=request_id or f"batch-{uuid.uuid4().hex[:12]}",
+            prompt=prompt,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop_sequences=stop_sequences,
+            max_length=max_length
+        )
+        stream = BatchStream(sequence, self.backend.tokenizer)
+        if max_new_tokens <= 0:
+            stream._finish("length")
+            return stream
+
+        self._waiting.append(stream)
+        self.stats.submitted += 1
+        self._ensure_running()
+        self._wakeup.set()
+        return stream
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """Submit a request and wait for its full text"""
+        return await self.submit(prompt, **kwargs).text()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scheduler statistics"""
+        stats = self.stats
+        return {
+            "waiting": len(self._waiting),
+            "active": len(self._active),
+            "max_batch_size": self.max_batch_size,
+            "submitted": stats.submitted,
+            "completed": stats.completed,
+            "cancelled": stats.cancelled,
+            "failed": stats.failed,
+            "tokens_generated": stats.tokens_generated,
+            "prefill_steps": stats.prefill_steps,
+            "decode_steps": stats.decode_steps,
+            "average_batch_size": round(stats.average_batch_size, 2),
+            "peak_batch_size": stats.peak_batch_size,
+            "tokens_per_second": round(stats.tokens_per_second, 2)
+        }
+
+    def _ensure_running(self) -> None:
+        if self._executor is None:
+            # One thread: the model is only ever touched by a single caller
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-decode")
+        if not self.running:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if not self._active and not self._waiting:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            started = time.perf_counter()
+            try:
+                admitted = self._admit()
+                if admitted:
+                    await self._prefill(admitted)
+                elif self._active:
+                    await self._decode()
+                await self._retire()
+            except Exception as e:
+                # The backend's rows may no longer match _active: start over with an empty batch
+                logger.error(f"Batch step failed with {len(self._active)} active requests: {e}")
+                await self._fail_active(e)
+            self.stats.busy_seconds += time.perf_counter() - started
+
+    def _admit(self) -> List[BatchStream]:
+        admitted = []
+        while self._waiting and len(self._active) + len(admitted) < self.max_batch_size:
+            stream = self._waiting.popleft()
+            if stream.cancelled:
+                self._close(stream, "cancelled")
+                continue
+            admitted.append(stream)
+        return admitted
+
+    async def _prefill(self, admitted: List[BatchStream]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            tokens = await loop.run_in_executor(
+                self._executor, self.backend.prefill, [stream.sequence for stream in admitted]
+            )
+        except Exception as e:
+            # The backend appends rows only after a successful forward pass
+            logger.error(f"Prefill failed for {len(admitted)} requests: {e}")
+            for stream in admitted:
+                self._close(stream, error=e)
+            return
+
+        self.stats.prefill_steps += 1
+        self._active.extend(admitted)
+        self.stats.peak_batch_size = max(self.stats.peak_batch_size, len(self._active))
+        self._accept(admitted, tokens)
+
+    async def _decode(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            tokens = await loop.run_in_executor(
+                self._executor, self.backend.decode, [stream.sequence for stream in self._active]
+            )
+        except Exception as e:
+            logger.error(f"Decode step failed with {len(self._active)} active requests: {e}")
+            await self._fail_active(e)
+            return
+
+        self.stats.decode_steps += 1
+        self.stats.decode_rows += len(self._active)
+        self._accept(self._active, tokens)
+
+    def _accept(self, streams: Sequence[BatchStream], tokens: Sequence[int]) -> None:
+        eos_token_id = self.backend.eos_token_id
+        for stream, token_id in zip(streams, tokens):
+            if stream.done:
+                continue
+            if token_id == eos_token_id:
+                self._close(stream, "stop")
+                continue
+            self.stats.tokens_generated += 1
+            stream._add_token(token_id)
+            if stream.done:
+                self.stats.completed += 1
+
+    async def _retire(self) -> None:
+        for stream in self._active:
+            if stream.cancelled and not stream.done:
+                self._close(stream, "cancelled")
+
+        keep = [index for index, stream in enumerate(self._active) if not stream.done]
+        if len(keep) == len(self._active):
+            return
+
+        self._active = [self._active[index] for index in keep]
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.backend.release, keep)
+
+    async def _fail_active(self, error: Exception) -> None:
+        """Fail every active request and drop the backend's rows"""
+        for stream in self._active:
+            self._close(stream, error=error)
+        self._active.clear()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.backend.reset)
+        except Exception as e:
+            logger.error(f"Backend reset failed: {e}")
+
+    def _close(self, stream: BatchStream, reason: str = "", error: Optional[Exception] = None) -> None:
+        if stream.done:
+            return
+        if error is not None:
+            stream._fail(error)
+            self.stats.failed += 1
+        else:
+            stream._finish(reason)
+            if reason == "cancelled":
+                self.stats.cancelled += 1
+            else:
+                self.stats.completed += 1
+
+
+def sample_next_token(logits: "torch.Tensor", temperature: float, top_p: float) -> "torch.Tensor":
+    """Pick the next token from one row of logits (temperature + top-p, or greedy)"""
+    if temperature <= 0:
+        return torch.argmax(logits, dim=-1, keepdim=True)
+
+    probs = F.softmax(logits / temperature, dim=-1)
+
+    # Top-p sampling
+    if top_p < 1.0:
+        sorted_probs, sorted_indices = torch.sort(probs, descending=True)
+        cumulative_probs = torch.cumsum(sorted_probs, dim=-1)
+        sorted_indices_to_remove = cumulative_probs > top_p
+        sorted_indices_to_remove[1:] = sorted_indices_to_remove[:-1].clone()
+        sorted_indices_to_remove[0] = 0
+        probs[sorted_indices[sorted_indices_to_remove]] = 0
+        probs = probs / probs.sum()
+
+    return torch.multinomial(probs, num_samples=1)
+
+
+class TransformersBatchBackend(DecodeBackend):
+    """
+    DecodeBackend for Hugging Face causal LMs.
+
+    Rows share one KV cache, left-padded to a common length. New requests are
+    prefilled as their own small batch and then concatenated onto the running
+    cache; retired rows are sliced out and columns that became padding for
+    every remaining row are trimmed. Position ids come from the attention
+    mask so padding never shifts a sequence's positions.
+    """
+
+    def __init__(self, model: Any, tokenizer: Any, device: Any = None, max_prompt_tokens: int = 4096):
+        if torch is None:
+            raise ImportError("TransformersBatchBackend requires torch")
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device if device is not None else getattr(model, "device", "cpu")
+        self.max_prompt_tokens = max_prompt_tokens
+        self.eos_token_id = tokenizer.eos_token_id
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else (self.eos_token_id or 0)
+
+        self._past: Optional[tuple] = None       # per layer (key, value), [rows, heads, length, dim]
+        self._mask: Optional["torch.Tensor"] = None         # [rows, length]
+        self._last_tokens: Optional["torch.Tensor"] = None  # [rows, 1]
+
+    def prefill(self, sequences: List[BatchSequence]) -> List[int]:
+        encoded = []
+        for sequence in sequences:
+            ids = self.tokenizer(
+                sequence.prompt, truncation=True, max_length=self.max_prompt_tokens
+            )["input_ids"]
+            ids = ids or [self.tokenizer.bos_token_id or self.pad_token_id]
+            sequence.prompt_tokens = len(ids)
+            encoded.append(ids)
+
+        width = max(len(ids) for ids in encoded)
+        input_ids = torch.full((len(encoded), width), self.pad_token_id, dtype=torch.long)
+        mask = torch.zeros((len(encoded), width), dtype=torch.long)
+        for row, ids in enumerate(encoded):
+            input_ids[row, width - len(ids):] = torch.tensor(ids, dtype=torch.long)
+            mask[row, width - len(ids):] = 1
+        input_ids = input_ids.to(self.device)
+        mask = mask.to(self.device)
+
+        with torch.inference_mode():
+            outputs = self.model(
+                input_ids=input_ids,
+                attention_mask=mask,
+                position_ids=(mask.cumsum(-1) - 1).clamp(min=0),
+                use_cache=True
+            )
+            tokens = self._sample(outputs.logits[:, -1, :], sequences)
+
+        self._merge(self._to_legacy(outputs.past_key_values), mask, tokens.view(-1, 1))
+        return tokens.tolist()
+
+    def decode(self, sequences: List[BatchSequence]) -> List[int]:
+        mask = torch.cat([self._mask, self._mask.new_ones((self._mask.shape[0], 1))], dim=1)
+        with torch.inference_mode():
+            outputs = self.model(
+                input_ids=self._last_tokens,
+                attention_mask=mask,
+                position_ids=self._mask.sum(dim=-1, keepdim=True),
+                past_key_values=self._to_model_cache(self._past),
+                use_cache=True
+            )
+            tokens = self._sample(outputs.logits[:, -1, :], sequences)
+
+        self._past = self._to_legacy(outputs.past_key_values)
+        self._mask = mask
+        self._last_tokens = tokens.view(-1, 1)
+        return tokens.tolist()
+
+    def release(self, keep: List[int]) -> None:
+        if not keep:
+            self.reset()
+            return
+
+        index = torch.tensor(keep, dtype=torch.long, device=self._mask.device)
+        mask = self._mask.index_select(0, index)
+        # Leading columns that are padding for every remaining row
+        lead = int((mask.sum(dim=0) == 0).long().cumprod(dim=0).sum())
+
+        self._mask = mask[:, lead:]
+        self._last_tokens = self._last_tokens.index_select(0, index)
+        self._past = tuple(
+            (key.index_select(0, index)[:, :, lead:], value.index_select(0, index)[:, :, lead:])
+            for key, value in self._past
+        )
+
+    def reset(self) -> None:
+        self._past = None
+        self._mask = None
+        self._last_tokens = None
+
+    def _sample(self, logits: "torch.Tensor", sequences: List[BatchSequence]) -> "torch.Tensor":
+        return torch.cat([
+            sample_next_token(logits[row], sequence.temperature, sequence.top_p)
+            for row, sequence in enumerate(sequences)
+        ])
+
+    def _merge(self, past: tuple, mask: "torch.Tensor", tokens: "torch.Tensor") -> None:
+        if self._past is None:
+            self._past, self._mask, self._last_tokens = past, mask, tokens
+            return
+
+        width = max(self._mask.shape[1], mask.shape[1])
+        self._past = tuple(
+            (
+                torch.cat([self._left_pad(old_key, width, 2), self._left_pad(new_key, width, 2)], dim=0),
+                torch.cat([self._left_pad(old_value, width, 2), self._left_pad(new_value, width, 2)], dim=0)
+            )
+            for (old_key, old_value), (new_key, new_value) in zip(self._past, past)
+        )
+        self._mask = torch.cat([self._left_pad(self._mask, width, 1), self._left_pad(mask, width, 1)], dim=0)
+        self._last_tokens = torch.cat([self._last_tokens, tokens], dim=0)
+
+    @staticmethod
+    def _left_pad(tensor: "torch.Tensor", width: int, dim: int) -> "torch.Tensor":
+        missing = width - tensor.shape[dim]
+        if missing <= 0:
+            return tensor
+        shape = list(tensor.shape)
+        shape[dim] = missing
+        return torch.cat([tensor.new_zeros(shape), tensor], dim=dim)
+
+    @staticmethod
+    def _to_legacy(past: Any) -> tuple:
+        if hasattr(past, "to_legacy_cache"):
+            return past.to_legacy_cache()
+        return tuple(past)
+
+    @staticmethod
+    def _to_model_cache(past: tuple) -> Any:
+        try:
+            from transformers import DynamicCache
+        except ImportError:
+            return past
+        if hasattr(DynamicCache, "from_legacy_cache"):
+            return DynamicCache.from_legacy_cache(past)
+        return past
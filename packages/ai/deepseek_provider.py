@@ -86,6 +86,12 @@ class ModelConfig:
     load_in_4bit: bool = False
     use_cache: bool = True
     cache_dir: Optional[str] = None
+    continuous_batching: bool = False  # opt-in: the batch supports only BATCH_GENERATION_KWARGS
+    max_batch_size: int = 8
+
+
+# Generation options the continuous batch understands
+BATCH_GENERATION_KWARGS = frozenset({"max_length", "max_new_tokens", "temperature", "top_p", "do_sample", "stop"})
 
 
 class SystemDetector:
@@ -221,6 +227,7 @@ class DeepSeekTransformersProvider:
         self.model = None
         self.tokenizer = None
         self.pipeline = None
+        self.batch_scheduler = None
         self.is_loaded = False
         
     async def load_model(self) -> bool:
@@ -287,6 +294,11 @@ class DeepSeekTransformersProvider:
                 device_map=self.config.device_map
             )
             
+            if self.config.continuous_batching:
+                from .continuous_batching import ContinuousBatchScheduler, TransformersBatchBackend
+                backend = TransformersBatchBackend(self.model, self.tokenizer)
+                self.batch_scheduler = ContinuousBatchScheduler(backend, max_batch_size=self.config.max_batch_size)
+            
             self.is_loaded = True
             logger.info("DeepSeek R1 model loaded successfully")
             return True
@@ -302,6 +314,11 @@ class DeepSeekTransformersProvider:
         if not self.is_loaded:
             raise RuntimeError("Model not loaded")
         
+        # Requests using options the batch can't honor take the pipeline path instead
+        extra_kwargs = {key: value for key, value in kwargs.items() if key not in BATCH_GENERATION_KWARGS}
+        if self.batch_scheduler and not extra_kwargs:
+            return await self.stream(messages, **kwargs).text()
+        
         try:
             # Prepare generation parameters
             generation_kwargs = {
@@ -310,7 +327,8 @@ class DeepSeekTransformersProvider:
                 "top_p": kwargs.get("top_p", self.config.top_p),
                 "do_sample": kwargs.get("do_sample", self.config.do_sample),
                 "pad_token_id": self.tokenizer.eos_token_id,
-                "return_full_text": False
+                "return_full_text": False,
+                **extra_kwargs
             }
             
             # Generate using pipeline
@@ -325,6 +343,41 @@ class DeepSeekTransformersProvider:
             logger.error(f"Error generating text: {e}")
             raise
     
+    def stream(self, messages: List[Dict[str, str]], **kwargs):
+        """
+        Queue a request on the continuous batch and return its stream.
+        
+        Iterate the result with ``async for`` for text chunks, or await
+        ``text()`` for the full completion.
+        """
+        if not self.batch_scheduler:
+            raise RuntimeError("Continuous batching is not enabled")
+        
+        unsupported = sorted(set(kwargs) - BATCH_GENERATION_KWARGS)
+        if unsupported:
+            raise ValueError(f"Not supported with continuous batching: {', '.join(unsupported)}")
+        
+        # max_length counts the prompt too, as in generate(); max_new_tokens only the output
+        max_length = kwargs.get("max_length", self.config.max_length)
+        do_sample = kwargs.get("do_sample", self.config.do_sample)
+        return self.batch_scheduler.submit(
+            self._messages_to_prompt(messages),
+            max_new_tokens=kwargs.get("max_new_tokens", max_length),
+            max_length=None if "max_new_tokens" in kwargs else max_length,
+            temperature=kwargs.get("temperature", self.config.temperature) if do_sample else 0.0,
+            top_p=kwargs.get("top_p", self.config.top_p),
+            stop_sequences=kwargs.get("stop")
+        )
+    
+    def _messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
+        """Render chat messages with the tokenizer's chat template."""
+        if getattr(self.tokenizer, "chat_template", None):
+            return self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        
+        lines = [f"{message.get('role', 'user').capitalize()}: {message.get('content', '')}" for message in messages]
+        lines.append("Assistant:")
+        return "\n".join(lines)
+    
     async def generate_simple(self, prompt: str, **kwargs) -> str:
         """Generate text from a simple prompt."""
         messages = [{"role": "user", "content": prompt}]
@@ -332,6 +385,13 @@ class DeepSeekTransformersProvider:
     
     def unload_model(self):
         """Unload the model to free memory."""
+        if self.batch_scheduler:
+            try:
+                asyncio.get_running_loop().create_task(self.batch_scheduler.stop())
+            except RuntimeError:
+                pass  # No running loop: the scheduler's loop task is already gone
+            self.batch_scheduler = None
+        
         if self.model:
             del self.model
             self.model = None
@@ -10,13 +10,13 @@ import asyncio
 import logging
 import time
 import gc
-from typing import Any, Dict, List, Optional, Union, AsyncGenerator
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Union, AsyncGenerator
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
 import torch
-import torch.nn.functional as F
 from transformers import (
     AutoTokenizer, AutoModelForCausalLM, 
     BitsAndBytesConfig, GenerationConfig
@@ -25,6 +25,14 @@ from accelerate import init_empty_weights, load_checkpoint_and_dispatch
 import psutil
 import GPUtil
 
+from .continuous_batching import (
+    BatchStream, ContinuousBatchScheduler, TransformersBatchBackend, sample_next_token
+)
+from .streaming_decode import IncrementalDetokenizer, StopSequenceMatcher
+
+# Marks the end of a stream_generate worker's output
+_STREAM_END = object()
+
 
 class LlamaModelSize(Enum):
     """Llama model sizes"""
@@ -71,6 +79,7 @@ class LlamaConfig:
     gpu_memory_fraction: float
     cache_dir: Optional[str] = None
     custom_model_path: Optional[str] = None
+    max_batch_size: int = 8
 
 
 @dataclass
@@ -124,6 +133,9 @@ class LlamaLocalIntegration:
         self.device = None
         self.generation_config = None
         
+        # Continuous batching (created on first batched request)
+        self.batch_scheduler: Optional[ContinuousBatchScheduler] = None
+        
         # Performance tracking
         self.performance_metrics = {
             "total_requests": 0,
@@ -274,110 +286,187 @@ class LlamaLocalIntegration:
         """
         Stream text generation in real-time.
         
+        Decoding runs in a worker thread so the event loop stays responsive;
+        each step feeds only the newest token and reuses the model's KV cache.
+        Closing the generator stops the worker after its current step.
+        
         Args:
             request: Generation request
             
         Yields:
             Generated text chunks
         """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        stats = {"tokens": 0}
+        start_time = time.time()
+        
+        def emit(item: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                # Event loop already closed; nobody is listening anymore
+                cancelled.set()
+        
+        def decode_worker() -> None:
+            try:
+                for chunk in self._decode_stream(request, cancelled, stats):
+                    emit(chunk)
+            except Exception as e:
+                emit(e)
+            finally:
+                emit(_STREAM_END)
+        
+        loop.run_in_executor(None, decode_worker)
+        
         try:
-            # Prepare prompt
-            formatted_prompt = self._format_prompt(request)
-            
-            # Tokenize input
-            inputs = self.tokenizer(
-                formatted_prompt,
-                return_tensors="pt",
-                truncation=True,
-                max_length=4096
-            ).to(self.device)
-            
-            prompt_length = inputs.input_ids.shape[1]
-            
-            # Generate tokens one by one
-            with torch.no_grad():
-                for _ in range(request.max_tokens):
-                    # Generate next token
-                    outputs = self.model(**inputs)
-                    logits = outputs.logits[0, -1, :]
-                    
-                    # Apply temperature and sampling
-                    if request.temperature > 0:
-                        logits = logits / request.temperature
-                        probs = F.softmax(logits, dim=-1)
-                        
-                        # Top-p sampling
-                        if request.top_p < 1.0:
-                            sorted_probs, sorted_indices = torch.sort(probs, descending=True)
-                            cumulative_probs = torch.cumsum(sorted_probs, dim=-1)
-                            sorted_indices_to_remove = cumulative_probs > request.top_p
-                            sorted_indices_to_remove[1:] = sorted_indices_to_remove[:-1].clone()
-                            sorted_indices_to_remove[0] = 0
-                            indices_to_remove = sorted_indices[sorted_indices_to_remove]
-                            probs[indices_to_remove] = 0
-                            probs = probs / probs.sum()
-                        
-                        next_token = torch.multinomial(probs, num_samples=1)
-                    else:
-                        next_token = torch.argmax(logits, dim=-1, keepdim=True)
-                    
-                    # Check for EOS token
-                    if next_token.item() == self.tokenizer.eos_token_id:
-                        break
-                    
-                    # Decode and yield token
-                    token_text = self.tokenizer.decode(next_token, skip_special_tokens=True)
-                    yield token_text
-                    
-                    # Update inputs for next iteration
-                    inputs.input_ids = torch.cat([inputs.input_ids, next_token.unsqueeze(0)], dim=1)
-                    
-                    # Check stop sequences
-                    if request.stop_sequences:
-                        current_text = self.tokenizer.decode(
-                            inputs.input_ids[0][prompt_length:],
-                            skip_special_tokens=True
-                        )
-                        if any(stop_seq in current_text for stop_seq in request.stop_sequences):
-                            break
-                    
-                    # Memory management
-                    if inputs.input_ids.shape[1] > 8192:  # Prevent excessive memory usage
-                        break
-                        
-        except Exception as e:
-            self.logger.error(f"Streaming generation failed: {e}")
-            yield f"Error: {str(e)}"
+            while True:
+                item = await chunks.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    self.logger.error(f"Streaming generation failed: {item}")
+                    yield f"Error: {str(item)}"
+                    break
+                yield item
+        finally:
+            cancelled.set()
+        
+        generation_time = time.time() - start_time
+        if stats["tokens"] and generation_time > 0:
+            await self._update_performance_metrics(stats["tokens"], stats["tokens"] / generation_time)
+    
+    def _decode_stream(
+        self,
+        request: GenerationRequest,
+        cancelled: threading.Event,
+        stats: Dict[str, int]
+    ) -> Iterator[str]:
+        """Blocking incremental decode loop backing stream_generate"""
+        formatted_prompt = self._format_prompt(request)
+        inputs = self.tokenizer(
+            formatted_prompt,
+            return_tensors="pt",
+            truncation=True,
+            max_length=4096
+        ).to(self.device)
+        
+        input_ids = inputs.input_ids
+        attention_mask = inputs.get("attention_mask")
+        prompt_length = input_ids.shape[1]
+        past_key_values = None
+        
+        detokenizer = IncrementalDetokenizer(self.tokenizer)
+        stop_matcher = StopSequenceMatcher(request.stop_sequences)
+        
+        with torch.inference_mode():
+            for step in range(request.max_tokens):
+                if cancelled.is_set():
+                    return
+                
+                # Prefill on the first step, then only the newest token
+                outputs = self.model(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    past_key_values=past_key_values,
+                    use_cache=True
+                )
+                past_key_values = outputs.past_key_values
+                next_token = self._sample_next_token(outputs.logits[0, -1, :], request)
+                token_id = int(next_token.item())
+                
+                if token_id == self.tokenizer.eos_token_id:
+                    break
+                stats["tokens"] += 1
+                
+                text, stopped = stop_matcher.feed(detokenizer.add(token_id))
+                if text:
+                    yield text
+                if stopped:
+                    return
+                
+                # Memory management
+                if prompt_length + step + 1 >= 8192:  # Prevent excessive memory usage
+                    break
+                
+                input_ids = next_token.view(1, 1)
+                if attention_mask is not None:
+                    attention_mask = torch.cat([attention_mask, attention_mask.new_ones((1, 1))], dim=1)
+        
+        tail, _ = stop_matcher.feed(detokenizer.flush())
+        tail += stop_matcher.flush()
+        if tail:
+            yield tail
+    
+    @staticmethod
+    def _sample_next_token(logits: "torch.Tensor", request: GenerationRequest) -> "torch.Tensor":
+        """Pick the next token from last-position logits (temperature + top-p, or greedy)"""
+        return sample_next_token(logits, request.temperature, request.top_p)
     
     async def batch_generate(self, requests: List[GenerationRequest]) -> List[GenerationResult]:
-        """Process multiple generation requests efficiently"""
+        """
+        Process multiple generation requests through the continuous batch.
+        
+        All requests share one in-flight batch on the model, together with any
+        other batched requests already running. Sampling uses temperature and
+        top-p; top_k and repetition_penalty only apply to generate().
+        """
         self.logger.info(f"Processing batch of {len(requests)} requests")
         
-        # Process requests with memory management
-        results = []
-        batch_size = 2  # Adjust based on available memory
+        streams = [self.submit_batched(request) for request in requests]
+        texts = await asyncio.gather(*(stream.text() for stream in streams), return_exceptions=True)
         
-        for i in range(0, len(requests), batch_size):
-            batch = requests[i:i + batch_size]
-            
-            # Process batch in parallel
-            batch_tasks = [self.generate(req) for req in batch]
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            # Handle results and exceptions
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    self.logger.error(f"Batch generation failed: {result}")
-                else:
-                    results.append(result)
+        results = []
+        for request, stream, text in zip(requests, streams, texts):
+            if isinstance(text, Exception):
+                self.logger.error(f"Batch generation failed: {text}")
+                continue
+            
+            sequence = stream.sequence
+            completion_tokens = len(sequence.token_ids)
+            generation_time = sequence.finished_at - sequence.submitted_at
+            tokens_per_second = completion_tokens / generation_time if generation_time > 0 else 0
+            await self._update_performance_metrics(completion_tokens, tokens_per_second)
             
-            # Memory cleanup between batches
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            gc.collect()
+            results.append(GenerationResult(
+                request_id=sequence.id,
+                generated_text=text,
+                prompt_tokens=sequence.prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=sequence.prompt_tokens + completion_tokens,
+                generation_time=generation_time,
+                tokens_per_second=tokens_per_second,
+                model_info={
+                    "model_size": self.config.model_size.value,
+                    "quantization": self.config.quantization.value,
+                    "device": str(self.device)
+                },
+                metadata={
+                    "task_type": request.task_type.value,
+                    "temperature": request.temperature,
+                    "top_p": request.top_p,
+                    "finish_reason": sequence.finish_reason
+                }
+            ))
         
         return results
     
+    def submit_batched(self, request: GenerationRequest) -> BatchStream:
+        """
+        Queue a request on the continuous batch scheduler.
+        
+        Returns:
+            Stream to iterate with ``async for`` (text chunks) or await via ``text()``
+        """
+        return self._get_batch_scheduler().submit(
+            self._format_prompt(request),
+            max_new_tokens=request.max_tokens,
+            temperature=request.temperature,
+            top_p=request.top_p,
+            stop_sequences=request.stop_sequences
+        )
+    
     async def get_performance_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics"""
         # Update system metrics
@@ -397,7 +486,10 @@ class LlamaLocalIntegration:
             "gpu_utilization": gpu_utilization
         })
         
-        return self.performance_metrics.copy()
+        metrics = self.performance_metrics.copy()
+        if self.batch_scheduler:
+            metrics["continuous_batching"] = self.batch_scheduler.get_stats()
+        return metrics
     
     async def optimize_model(self) -> Dict[str, Any]:
         """Optimize model for better performance"""
@@ -499,6 +591,13 @@ class LlamaLocalIntegration:
         
         self.logger.info(f"Loaded {model_name} with {self.config.quantization.value} quantization")
     
+    def _get_batch_scheduler(self) -> ContinuousBatchScheduler:
+        """Create the continuous batch scheduler on first use"""
+        if self.batch_scheduler is None:
+            backend = TransformersBatchBackend(self.model, self.tokenizer, self.device, max_prompt_tokens=4096)
+            self.batch_scheduler = ContinuousBatchScheduler(backend, max_batch_size=self.config.max_batch_size)
+        return self.batch_scheduler
+    
     def _setup_generation_config(self) -> None:
         """Setup generation configuration"""
         self.generation_config = GenerationConfig(
@@ -655,6 +754,9 @@ Response:"""
     
     async def cleanup(self) -> None:
         """Cleanup resources"""
+        if self.batch_scheduler:
+            await self.batch_scheduler.stop()
+            self.batch_scheduler = None
         if self.model:
             del self.model
         if self.tokenizer:
@@ -3,16 +3,21 @@ Advanced LLM Client with Multi-Provider Fallback Support
 Optimized for cost efficiency with DeepSeek R1 0528 as primary, Llama local, and cloud fallbacks
 """
 
-import asyncio
 import json
 import logging
 import time
-from typing import Dict, List, Optional, Any, Union
+from typing import AsyncIterator, Dict, List, Optional, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 import httpx
 import openai
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
+
+from .llm_streaming import LLMStreamChunk, ToolCallAssembler, iter_ndjson, iter_sse
+from .llm_transport import (
+    CLOUD_POOL, LOCAL_POOL, AllAttemptsFailed, HedgedRace, HedgingPolicy,
+    LatencyTracker, PoolSettings, build_http_client
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +42,7 @@ class LLMConfig:
     timeout: int = 30
     enabled: bool = True
     cost_per_token: float = 0.0  # Cost optimization tracking
+    pool: Optional[PoolSettings] = None  # Defaults to LOCAL_POOL / CLOUD_POOL
 
 
 @dataclass
@@ -59,10 +65,21 @@ class LLMClient:
     Secondary: Llama (local) - Cost: $0
     Fallback: OpenAI GPT-4 - Cost: Variable
     Emergency: Anthropic Claude - Cost: Variable
+    
+    Each provider gets its own pooled keep-alive HTTP client. With a
+    HedgingPolicy, a backup provider is started once the current one runs
+    past its recent latency percentile instead of after its full timeout.
     """
     
-    def __init__(self, configs: Dict[LLMProvider, LLMConfig]):
+    LOCAL_PROVIDERS = (LLMProvider.DEEPSEEK_LOCAL, LLMProvider.LLAMA_LOCAL)
+    
+    def __init__(self, configs: Dict[LLMProvider, LLMConfig], hedging: Optional[HedgingPolicy] = None):
         self.configs = configs
+        self.hedging = hedging
+        self.latency = LatencyTracker()
+        self.time_to_first_token = LatencyTracker()
+        self.hedges_fired = 0
+        self.http_clients: Dict[LLMProvider, httpx.AsyncClient] = {}
         self.providers = self._initialize_providers()
         self.usage_stats = {provider: {"calls": 0, "tokens": 0, "cost": 0.0} for provider in LLMProvider}
         self.fallback_order = [
@@ -80,20 +97,28 @@ class LLMClient:
         """Initialize provider clients."""
         providers = {}
         
+        # Pooled HTTP clients, one per provider so a slow local server can't starve the others
+        for provider, config in self.configs.items():
+            default_pool = LOCAL_POOL if provider in self.LOCAL_PROVIDERS else CLOUD_POOL
+            self.http_clients[provider] = build_http_client(config.pool or default_pool, config.timeout)
+        
         # OpenAI client
         if LLMProvider.OPENAI in self.configs:
             config = self.configs[LLMProvider.OPENAI]
             if config.api_key:
-                providers[LLMProvider.OPENAI] = openai.AsyncOpenAI(api_key=config.api_key)
+                providers[LLMProvider.OPENAI] = openai.AsyncOpenAI(
+                    api_key=config.api_key,
+                    http_client=self.http_clients[LLMProvider.OPENAI]
+                )
         
         # Anthropic client
         if LLMProvider.ANTHROPIC in self.configs:
             config = self.configs[LLMProvider.ANTHROPIC]
             if config.api_key:
-                providers[LLMProvider.ANTHROPIC] = Anthropic(api_key=config.api_key)
-        
-        # HTTP client for local providers
-        providers["http_client"] = httpx.AsyncClient(timeout=30.0)
+                providers[LLMProvider.ANTHROPIC] = AsyncAnthropic(
+                    api_key=config.api_key,
+                    http_client=self.http_clients[LLMProvider.ANTHROPIC]
+                )
         
         return providers
     
@@ -114,36 +139,35 @@ class LLMClient:
         """
         start_time = time.time()
         
-        # Determine provider order
-        provider_order = self.fallback_order.copy()
-        if preferred_provider and preferred_provider in provider_order:
-            provider_order.remove(preferred_provider)
-            provider_order.insert(0, preferred_provider)
+        candidates = [
+            (provider, self._provider_call(provider, messages, tools))
+            for provider in self._provider_order(preferred_provider)
+        ]
+        race = HedgedRace(
+            candidates,
+            hedge_delay=self._hedge_delay,
+            max_in_flight=self.hedging.max_in_flight if self.hedging else 1,
+            on_success=self.latency.record,
+            on_failure=self._on_provider_failure
+        )
         
         last_error = None
-        
-        for provider in provider_order:
-            if not self._is_provider_available(provider):
-                continue
+        try:
+            provider, response = await race.run()
             
-            try:
-                logger.info(f"Attempting LLM call with {provider.value}")
-                response = await self._call_provider(provider, messages, tools)
-                
-                # Update success stats
-                self._update_provider_health(provider, success=True)
-                self._update_usage_stats(provider, response)
-                
-                response.response_time = time.time() - start_time
-                logger.info(f"LLM call successful with {provider.value} in {response.response_time:.2f}s")
-                
-                return response
-                
-            except Exception as e:
-                last_error = str(e)
-                logger.warning(f"LLM call failed with {provider.value}: {e}")
-                self._update_provider_health(provider, success=False, error=str(e))
-                continue
+            # Update success stats
+            self._update_provider_health(provider, success=True)
+            self._update_usage_stats(provider, response)
+            
+            response.response_time = time.time() - start_time
+            logger.info(f"LLM call successful with {provider.value} in {response.response_time:.2f}s")
+            
+            return response
+        
+        except AllAttemptsFailed as e:
+            last_error = str(e.errors[-1][1]) if e.errors else None
+        finally:
+            self.hedges_fired += race.hedges_fired
         
         # All providers failed
         error_response = LLMResponse(
@@ -159,6 +183,140 @@ class LLMClient:
         logger.error(f"All LLM providers failed. Last error: {last_error}")
         return error_response
     
+    async def stream_chat_completion(self,
+                                   messages: List[Dict[str, str]],
+                                   tools: Optional[List[Dict[str, Any]]] = None,
+                                   preferred_provider: Optional[LLMProvider] = None) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+        
+        Providers are tried (and hedged on time-to-first-token) in the same
+        order as chat_completion until one produces its first chunk; from then
+        on the stream stays with that provider. The final chunk has done=True
+        and carries function calls, token usage, time_to_first_token and the
+        total response_time.
+        
+        Args:
+            messages: Chat messages in OpenAI format
+            tools: Function calling tools schema
+            preferred_provider: Override default fallback order
+        
+        Yields:
+            LLMStreamChunk content deltas, then one final chunk
+        """
+        start_time = time.time()
+        
+        candidates = [
+            (provider, self._first_chunk_call(provider, messages, tools))
+            for provider in self._provider_order(preferred_provider)
+        ]
+        race = HedgedRace(
+            candidates,
+            hedge_delay=lambda provider: self._hedge_delay(provider, self.time_to_first_token),
+            max_in_flight=self.hedging.max_in_flight if self.hedging else 1,
+            on_success=self.time_to_first_token.record,
+            on_failure=self._on_provider_failure,
+            on_discard=lambda provider, opened: opened[0].aclose()
+        )
+        
+        try:
+            provider, (stream, chunk) = await race.run()
+        except AllAttemptsFailed as e:
+            last_error = str(e.errors[-1][1]) if e.errors else None
+            logger.error(f"All LLM providers failed to stream. Last error: {last_error}")
+            yield LLMStreamChunk(
+                content="I'm experiencing technical difficulties. Please try again in a moment.",
+                provider=LLMProvider.DEEPSEEK_LOCAL,
+                model="error",
+                done=True,
+                response_time=time.time() - start_time,
+                error=f"All providers failed. Last error: {last_error}"
+            )
+            return
+        finally:
+            self.hedges_fired += race.hedges_fired
+        
+        time_to_first_token = time.time() - start_time
+        logger.info(f"LLM stream started with {provider.value}, first token after {time_to_first_token:.2f}s")
+        
+        try:
+            while not chunk.done:
+                yield chunk
+                chunk = await stream.__anext__()
+        except Exception as e:
+            # Already committed to this provider, so report instead of falling back
+            self._on_provider_failure(provider, e)
+            yield LLMStreamChunk(
+                content="",
+                provider=provider,
+                model=chunk.model,
+                done=True,
+                time_to_first_token=time_to_first_token,
+                response_time=time.time() - start_time,
+                error=str(e)
+            )
+            return
+        finally:
+            await stream.aclose()
+        
+        chunk.time_to_first_token = time_to_first_token
+        chunk.response_time = time.time() - start_time
+        self._update_provider_health(provider, success=True)
+        self._update_usage_stats(provider, chunk)
+        yield chunk
+    
+    def _provider_order(self, preferred_provider: Optional[LLMProvider]) -> List[LLMProvider]:
+        """Available providers in fallback order, preferred provider first."""
+        provider_order = self.fallback_order.copy()
+        if preferred_provider and preferred_provider in provider_order:
+            provider_order.remove(preferred_provider)
+            provider_order.insert(0, preferred_provider)
+        return [provider for provider in provider_order if self._is_provider_available(provider)]
+    
+    def _first_chunk_call(self, provider: LLMProvider, messages: List[Dict[str, str]],
+                          tools: Optional[List[Dict[str, Any]]]):
+        """Bind "open a provider stream and wait for its first chunk" for HedgedRace."""
+        async def call():
+            logger.info(f"Attempting LLM stream with {provider.value}")
+            stream = self._stream_provider(provider, messages, tools)
+            try:
+                return stream, await stream.__anext__()
+            except BaseException:
+                await stream.aclose()
+                raise
+        return call
+    
+    def _provider_call(self, provider: LLMProvider, messages: List[Dict[str, str]],
+                       tools: Optional[List[Dict[str, Any]]]):
+        """Bind a provider call for HedgedRace."""
+        async def call() -> LLMResponse:
+            logger.info(f"Attempting LLM call with {provider.value}")
+            return await self._call_provider(provider, messages, tools)
+        return call
+    
+    def _hedge_delay(self, provider: LLMProvider, tracker: Optional[LatencyTracker] = None) -> Optional[float]:
+        """How long to wait on a provider before starting a backup (None = no hedging)."""
+        if not self.hedging:
+            return None
+        
+        policy = self.hedging
+        tracker = tracker or self.latency
+        delay = None
+        if tracker.count(provider) >= policy.min_samples:
+            delay = tracker.percentile(provider, policy.percentile)
+        if delay is None:
+            delay = policy.initial_delay
+        
+        delay = max(policy.min_delay, delay)
+        if policy.max_delay is not None:
+            delay = min(policy.max_delay, delay)
+        return delay
+    
+    def _on_provider_failure(self, provider: LLMProvider, error: BaseException):
+        """Record a failed provider attempt."""
+        logger.warning(f"LLM call failed with {provider.value}: {error}")
+        self._update_provider_health(provider, success=False, error=str(error))
+    
     async def _call_provider(self, 
                            provider: LLMProvider, 
                            messages: List[Dict[str, str]], 
@@ -182,7 +340,7 @@ class LLMClient:
                                  tools: Optional[List[Dict[str, Any]]], 
                                  config: LLMConfig) -> LLMResponse:
         """Call DeepSeek R1 0528 local instance."""
-        http_client = self.providers["http_client"]
+        http_client = self.http_clients[LLMProvider.DEEPSEEK_LOCAL]
         
         payload = {
             "model": config.model or "deepseek-r1-0528",
@@ -233,7 +391,7 @@ class LLMClient:
                               tools: Optional[List[Dict[str, Any]]], 
                               config: LLMConfig) -> LLMResponse:
         """Call Llama local instance (Ollama or similar)."""
-        http_client = self.providers["http_client"]
+        http_client = self.http_clients[LLMProvider.LLAMA_LOCAL]
         
         # Convert messages to Llama format
         prompt = self._convert_messages_to_prompt(messages)
@@ -327,7 +485,42 @@ class LLMClient:
                             config: LLMConfig) -> LLMResponse:
         """Call Anthropic Claude API."""
         client = self.providers[LLMProvider.ANTHROPIC]
+        kwargs = self._anthropic_kwargs(messages, tools, config)
+        
+        response = await client.messages.create(**kwargs)
+        
+        content = ""
+        function_calls = None
+        
+        for content_block in response.content:
+            if content_block.type == "text":
+                content += content_block.text
+            elif content_block.type == "tool_use":
+                if function_calls is None:
+                    function_calls = []
+                function_calls.append({
+                    "name": content_block.name,
+                    "arguments": content_block.input
+                })
         
+        tokens_used = response.usage.input_tokens + response.usage.output_tokens
+        cost = tokens_used * config.cost_per_token
+        
+        return LLMResponse(
+            content=content,
+            provider=LLMProvider.ANTHROPIC,
+            model=kwargs["model"],
+            tokens_used=tokens_used,
+            response_time=0.0,
+            cost=cost,
+            function_calls=function_calls
+        )
+    
+    def _anthropic_kwargs(self, 
+                          messages: List[Dict[str, str]], 
+                          tools: Optional[List[Dict[str, Any]]], 
+                          config: LLMConfig) -> Dict[str, Any]:
+        """Build Anthropic messages.create arguments from OpenAI-format input."""
         # Convert OpenAI format to Anthropic format
         system_message = ""
         anthropic_messages = []
@@ -351,33 +544,235 @@ class LLMClient:
         if tools:
             kwargs["tools"] = self._convert_tools_to_anthropic_format(tools)
         
-        response = await asyncio.to_thread(client.messages.create, **kwargs)
+        return kwargs
+    
+    # Streaming provider calls: yield content chunks, then one done=True chunk
+    
+    def _stream_provider(self, 
+                         provider: LLMProvider, 
+                         messages: List[Dict[str, str]], 
+                         tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Open a streaming call to a specific LLM provider."""
+        config = self.configs[provider]
         
-        content = ""
+        if provider == LLMProvider.DEEPSEEK_LOCAL:
+            return self._stream_deepseek_local(messages, tools, config)
+        elif provider == LLMProvider.LLAMA_LOCAL:
+            return self._stream_llama_local(messages, tools, config)
+        elif provider == LLMProvider.OPENAI:
+            return self._stream_openai(messages, tools, config)
+        elif provider == LLMProvider.ANTHROPIC:
+            return self._stream_anthropic(messages, tools, config)
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+    
+    async def _stream_deepseek_local(self, 
+                                   messages: List[Dict[str, str]], 
+                                   tools: Optional[List[Dict[str, Any]]], 
+                                   config: LLMConfig) -> AsyncIterator[LLMStreamChunk]:
+        """Stream from DeepSeek R1 0528 local instance (OpenAI-compatible SSE)."""
+        http_client = self.http_clients[LLMProvider.DEEPSEEK_LOCAL]
+        model = config.model or "deepseek-r1-0528"
+        
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": config.max_tokens,
+            "temperature": config.temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = "auto"
+        
+        tool_calls = ToolCallAssembler()
+        tokens_used = 0
+        finish_reason = None
+        
+        async with http_client.stream(
+            "POST",
+            f"{config.endpoint}/v1/chat/completions",
+            json=payload,
+            timeout=config.timeout
+        ) as response:
+            response.raise_for_status()
+            
+            async for data in iter_sse(response):
+                if data.get("usage"):
+                    tokens_used = data["usage"].get("total_tokens", tokens_used)
+                
+                for choice in data.get("choices") or []:
+                    delta = choice.get("delta") or {}
+                    if delta.get("tool_calls"):
+                        tool_calls.add_openai_delta(delta["tool_calls"])
+                    if delta.get("content"):
+                        yield LLMStreamChunk(content=delta["content"], provider=LLMProvider.DEEPSEEK_LOCAL, model=model)
+                    finish_reason = choice.get("finish_reason") or finish_reason
+        
+        yield LLMStreamChunk(
+            content="",
+            provider=LLMProvider.DEEPSEEK_LOCAL,
+            model=model,
+            done=True,
+            function_calls=tool_calls.complete(),
+            tokens_used=tokens_used,
+            cost=0.0,  # Free local model
+            finish_reason=finish_reason
+        )
+    
+    async def _stream_llama_local(self, 
+                                messages: List[Dict[str, str]], 
+                                tools: Optional[List[Dict[str, Any]]], 
+                                config: LLMConfig) -> AsyncIterator[LLMStreamChunk]:
+        """Stream from Llama local instance (Ollama NDJSON)."""
+        http_client = self.http_clients[LLMProvider.LLAMA_LOCAL]
+        model = config.model or "llama3.1:8b"
+        
+        payload = {
+            "model": model,
+            "prompt": self._convert_messages_to_prompt(messages),
+            "stream": True,
+            "options": {
+                "temperature": config.temperature,
+                "num_predict": config.max_tokens
+            }
+        }
+        
+        content_parts = []
+        tokens_used = 0
+        finish_reason = None
+        
+        async with http_client.stream(
+            "POST",
+            f"{config.endpoint}/api/generate",
+            json=payload,
+            timeout=config.timeout
+        ) as response:
+            response.raise_for_status()
+            
+            async for data in iter_ndjson(response):
+                text = data.get("response", "")
+                if text:
+                    content_parts.append(text)
+                    yield LLMStreamChunk(content=text, provider=LLMProvider.LLAMA_LOCAL, model=model)
+                if data.get("done"):
+                    tokens_used = data.get("prompt_eval_count", 0) + data.get("eval_count", 0)
+                    finish_reason = data.get("done_reason")
+                    break
+        
+        # Local models without native function calling describe calls in text
+        content = "".join(content_parts)
         function_calls = None
+        if tools and "function_call:" in content.lower():
+            function_calls = self._extract_function_calls_from_text(content)
         
-        for content_block in response.content:
-            if content_block.type == "text":
-                content += content_block.text
-            elif content_block.type == "tool_use":
-                if function_calls is None:
-                    function_calls = []
-                function_calls.append({
-                    "name": content_block.name,
-                    "arguments": content_block.input
-                })
+        yield LLMStreamChunk(
+            content="",
+            provider=LLMProvider.LLAMA_LOCAL,
+            model=model,
+            done=True,
+            function_calls=function_calls,
+            tokens_used=tokens_used,
+            cost=0.0,  # Free local model
+            finish_reason=finish_reason
+        )
+    
+    async def _stream_openai(self, 
+                           messages: List[Dict[str, str]], 
+                           tools: Optional[List[Dict[str, Any]]], 
+                           config: LLMConfig) -> AsyncIterator[LLMStreamChunk]:
+        """Stream from OpenAI API."""
+        client = self.providers[LLMProvider.OPENAI]
+        model = config.model or "gpt-4-turbo-preview"
         
-        tokens_used = response.usage.input_tokens + response.usage.output_tokens
-        cost = tokens_used * config.cost_per_token
+        kwargs = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": config.max_tokens,
+            "temperature": config.temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
         
-        return LLMResponse(
-            content=content,
+        if tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "auto"
+        
+        tool_calls = ToolCallAssembler()
+        tokens_used = 0
+        finish_reason = None
+        
+        stream = await client.chat.completions.create(**kwargs)
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    tokens_used = chunk.usage.total_tokens
+                
+                for choice in chunk.choices:
+                    delta = choice.delta
+                    if delta.tool_calls:
+                        tool_calls.add_openai_delta([call.model_dump() for call in delta.tool_calls])
+                    if delta.content:
+                        yield LLMStreamChunk(content=delta.content, provider=LLMProvider.OPENAI, model=model)
+                    finish_reason = choice.finish_reason or finish_reason
+        finally:
+            await stream.close()
+        
+        yield LLMStreamChunk(
+            content="",
+            provider=LLMProvider.OPENAI,
+            model=model,
+            done=True,
+            function_calls=tool_calls.complete(),
+            tokens_used=tokens_used,
+            cost=tokens_used * config.cost_per_token,
+            finish_reason=finish_reason
+        )
+    
+    async def _stream_anthropic(self, 
+                              messages: List[Dict[str, str]], 
+                              tools: Optional[List[Dict[str, Any]]], 
+                              config: LLMConfig) -> AsyncIterator[LLMStreamChunk]:
+        """Stream from Anthropic Claude API."""
+        client = self.providers[LLMProvider.ANTHROPIC]
+        kwargs = self._anthropic_kwargs(messages, tools, config)
+        model = kwargs["model"]
+        
+        tool_calls = ToolCallAssembler()
+        input_tokens = 0
+        output_tokens = 0
+        finish_reason = None
+        
+        stream = await client.messages.create(**kwargs, stream=True)
+        try:
+            async for event in stream:
+                if event.type == "message_start":
+                    input_tokens = event.message.usage.input_tokens
+                elif event.type == "content_block_start" and event.content_block.type == "tool_use":
+                    tool_calls.start(event.index, event.content_block.name, event.content_block.id)
+                elif event.type == "content_block_delta":
+                    if event.delta.type == "text_delta":
+                        yield LLMStreamChunk(content=event.delta.text, provider=LLMProvider.ANTHROPIC, model=model)
+                    elif event.delta.type == "input_json_delta":
+                        tool_calls.append_arguments(event.index, event.delta.partial_json)
+                elif event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+                    finish_reason = event.delta.stop_reason
+        finally:
+            await stream.close()
+        
+        tokens_used = input_tokens + output_tokens
+        yield LLMStreamChunk(
+            content="",
             provider=LLMProvider.ANTHROPIC,
-            model=kwargs["model"],
+            model=model,
+            done=True,
+            function_calls=tool_calls.complete(),
             tokens_used=tokens_used,
-            response_time=0.0,
-            cost=cost,
-            function_calls=function_calls
+            cost=tokens_used * config.cost_per_token,
+            finish_reason=finish_reason
         )
     
     def _convert_messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
@@ -490,7 +885,12 @@ class LLMClient:
             "total_cost": sum(stats["cost"] for stats in self.usage_stats.values()),
             "total_tokens": sum(stats["tokens"] for stats in self.usage_stats.values()),
             "total_calls": sum(stats["calls"] for stats in self.usage_stats.values()),
-            "provider_health": self.provider_health
+            "provider_health": self.provider_health,
+            "latency": {provider.value: self.latency.summary(provider) for provider in self.configs},
+            "time_to_first_token": {
+                provider.value: self.time_to_first_token.summary(provider) for provider in self.configs
+            },
+            "hedges_fired": self.hedges_fired
         }
     
     def get_optimal_provider(self) -> LLMProvider:
@@ -531,4 +931,13 @@ class LLMClient:
                 
                 self._update_provider_health(provider, success=False, error=str(e))
         
-        return health_results
\ No newline at end of file
+        return health_results
+    
+    async def close(self):
+        """Close SDK clients and pooled HTTP connections."""
+        for provider in (LLMProvider.OPENAI, LLMProvider.ANTHROPIC):
+            client = self.providers.get(provider)
+            if client is not None:
+                await client.close()
+        for http_client in self.http_clients.values():
+            await http_client.aclose()
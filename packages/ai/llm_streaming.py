@@ -0,0 +1,115 @@
+"""
+LLM Streaming Helpers
+SSE / NDJSON chunk parsing and incremental tool-call assembly for streamed chat completions
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMStreamChunk:
+    """
+    One piece of a streamed chat completion.
+
+    Intermediate chunks carry a ``content`` delta. The last chunk has
+    ``done=True`` and carries the assembled function calls, token usage and
+    timing for the whole response.
+    """
+    content: str
+    provider: Any
+    model: str
+    done: bool = False
+    function_calls: Optional[List[Dict[str, Any]]] = None
+    tokens_used: int = 0
+    cost: float = 0.0
+    time_to_first_token: Optional[float] = None
+    response_time: Optional[float] = None
+    finish_reason: Optional[str] = None
+    error: Optional[str] = None
+
+
+async def iter_sse(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the JSON payload of each ``data:`` event until ``[DONE]``."""
+    data_lines: List[str] = []
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+            continue
+        if line.strip() or not data_lines:
+            continue  # comments / other fields, or a blank line with nothing buffered
+
+        data = "\n".join(data_lines)
+        data_lines = []
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+    if data_lines and data_lines != ["[DONE]"]:
+        yield json.loads("\n".join(data_lines))
+
+
+async def iter_ndjson(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one JSON object per non-empty line."""
+    async for line in response.aiter_lines():
+        if line.strip():
+            yield json.loads(line)
+
+
+class ToolCallAssembler:
+    """
+    Builds complete tool calls from streamed fragments.
+
+    Providers stream a call's name once and its JSON arguments as string
+    pieces keyed by a call index; the pieces are only parsed when the stream
+    ends.
+    """
+
+    def __init__(self):
+        self._calls: Dict[int, Dict[str, Any]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._calls)
+
+    def start(self, index: int, name: Optional[str] = None, call_id: Optional[str] = None) -> None:
+        call = self._calls.setdefault(index, {"id": None, "name": "", "arguments": []})
+        if call_id:
+            call["id"] = call_id
+        if name:
+            call["name"] = name
+
+    def append_arguments(self, index: int, fragment: Optional[str]) -> None:
+        self.start(index)
+        if fragment:
+            self._calls[index]["arguments"].append(fragment)
+
+    def add_openai_delta(self, tool_calls: List[Dict[str, Any]]) -> None:
+        """Apply the ``delta.tool_calls`` list of an OpenAI-format chunk."""
+        for position, call in enumerate(tool_calls):
+            index = call.get("index", position)
+            function = call.get("function") or {}
+            self.start(index, function.get("name"), call.get("id"))
+            self.append_arguments(index, function.get("arguments"))
+
+    def complete(self) -> Optional[List[Dict[str, Any]]]:
+        """Return the assembled calls with parsed arguments (None if there were none)."""
+        if not self._calls:
+            return None
+
+        function_calls = []
+        for index in sorted(self._calls):
+            call = self._calls[index]
+            raw = "".join(call["arguments"])
+            try:
+                arguments = json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                logger.warning(f"Tool call {call['name']} streamed invalid JSON arguments")
+                arguments = {"raw": raw}
+            function_calls.append({"name": call["name"], "arguments": arguments})
+        return function_calls
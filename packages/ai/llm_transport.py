@@ -0,0 +1,202 @@
+"""
+LLM Transport Layer
+Pooled keep-alive HTTP clients per provider and hedged provider racing for LLMClient
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class PoolSettings:
+    """Connection pool tuning for one provider."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    http2: bool = False
+
+
+# Local inference servers speak HTTP/1.1 and serve few concurrent requests;
+# cloud APIs benefit from HTTP/2 multiplexing over a larger warm pool.
+LOCAL_POOL = PoolSettings(max_connections=8, max_keepalive_connections=8, keepalive_expiry=60.0, connect_timeout=2.0)
+CLOUD_POOL = PoolSettings(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0, http2=True)
+
+
+def build_http_client(settings: PoolSettings, timeout: float, **kwargs) -> httpx.AsyncClient:
+    """Create an AsyncClient with the given pool limits and timeouts."""
+    http2 = settings.http2 and HTTP2_AVAILABLE
+    if settings.http2 and not HTTP2_AVAILABLE:
+        logger.debug("h2 not installed; using HTTP/1.1 keep-alive instead of HTTP/2")
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry
+        ),
+        timeout=httpx.Timeout(timeout, connect=settings.connect_timeout),
+        **kwargs
+    )
+
+
+@dataclass
+class HedgingPolicy:
+    """
+    When to fire a backup provider while the current one is still running.
+
+    The hedge delay is the ``percentile`` of the running provider's recent
+    successful latencies; until ``min_samples`` are collected,
+    ``initial_delay`` is used instead.
+    """
+    percentile: float = 95.0
+    min_samples: int = 20
+    initial_delay: float = 2.0
+    min_delay: float = 0.05
+    max_delay: Optional[float] = None
+    max_in_flight: int = 2
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per key."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Any, Deque[float]] = {}
+
+    def record(self, key: Any, latency: float) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def count(self, key: Any) -> int:
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: Any, percentile: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, int(round(percentile / 100.0 * len(ordered))) - 1))
+        return ordered[index]
+
+    def summary(self, key: Any) -> Dict[str, Optional[float]]:
+        return {
+            "samples": self.count(key),
+            "p50": self.percentile(key, 50),
+            "p95": self.percentile(key, 95),
+            "p99": self.percentile(key, 99)
+        }
+
+
+class AllAttemptsFailed(Exception):
+    """Raised by HedgedRace when every candidate failed."""
+
+    def __init__(self, errors: List[Tuple[Any, BaseException]]):
+        self.errors = errors
+        last = errors[-1][1] if errors else None
+        super().__init__(f"All attempts failed. Last error: {last}")
+
+
+class HedgedRace(Generic[K, T]):
+    """
+    Runs candidates in priority order, starting the next one when the current
+    one fails or when it has been running longer than its hedge delay.
+
+    The first success wins and every other in-flight attempt is cancelled.
+    Losers that succeeded anyway (e.g. finished in the same round as the
+    winner) are handed to ``on_discard`` so open resources such as streams
+    can be released; it may return an awaitable. Without a hedge delay this
+    is plain sequential fallback.
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[Tuple[K, Callable[[], Awaitable[T]]]],
+        hedge_delay: Callable[[K], Optional[float]] = lambda key: None,
+        max_in_flight: int = 2,
+        on_success: Optional[Callable[[K, float], None]] = None,
+        on_failure: Optional[Callable[[K, BaseException], None]] = None,
+        on_discard: Optional[Callable[[K, T], Optional[Awaitable[None]]]] = None
+    ):
+        self.candidates = list(candidates)
+        self.hedge_delay = hedge_delay
+        self.max_in_flight = max(1, max_in_flight)
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.on_discard = on_discard
+        self.hedges_fired = 0
+
+    async def run(self) -> Tuple[K, T]:
+        pending = deque(self.candidates)
+        running: Dict[asyncio.Task, Tuple[K, float]] = {}
+        errors: List[Tuple[K, BaseException]] = []
+
+        def launch() -> None:
+            key, call = pending.popleft()
+            running[asyncio.ensure_future(call())] = (key, time.perf_counter())
+
+        try:
+            if pending:
+                launch()
+            while running:
+                newest_key, newest_started = list(running.values())[-1]
+                delay = self.hedge_delay(newest_key) if pending and len(running) < self.max_in_flight else None
+                timeout = None if delay is None else max(0.0, newest_started + delay - time.perf_counter())
+
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges_fired += 1
+                    logger.info(f"Hedging: {newest_key} exceeded {delay:.3f}s, starting backup")
+                    launch()
+                    continue
+
+                for task in done:
+                    key, started = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if self.on_success:
+                            self.on_success(key, time.perf_counter() - started)
+                        return key, task.result()
+                    errors.append((key, error))
+                    if self.on_failure:
+                        self.on_failure(key, error)
+
+                # A failure hands over to the next candidate straight away
+                if pending and len(running) < self.max_in_flight:
+                    launch()
+            raise AllAttemptsFailed(errors)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+                for task, (key, _) in running.items():
+                    if not task.cancelled() and task.exception() is None:
+                        await self._discard(key, task.result())
+
+    async def _discard(self, key: K, result: T) -> None:
+        if self.on_discard is None:
+            return
+        try:
+            pending = self.on_discard(key, result)
+            if pending is not None:
+                await pending
+        except Exception as e:
+            logger.warning(f"Releasing discarded result from {key} failed: {e}")
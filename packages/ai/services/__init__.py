@@ -8,6 +8,7 @@ from .model_loader import ModelLoader
 from .response_generator import ResponseGenerator
 from .metrics_collector import MetricsCollector
 from .fallback_manager import FallbackManager
+from .generation_cache import GenerationCache
 from .resource_manager import ResourceManager
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     "ResponseGenerator", 
     "MetricsCollector",
     "FallbackManager",
+    "GenerationCache",
     "ResourceManager"
 ]
\ No newline at end of file
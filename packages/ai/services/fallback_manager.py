@@ -12,6 +12,7 @@ from enum import Enum
 import time
 
 from ..schemas import GenerationRequest, GenerationResponse
+from .generation_cache import GenerationCache
 
 logger = logging.getLogger(__name__)
 
@@ -50,9 +51,15 @@ class FallbackManager:
     def __init__(self):
         self.fallback_rules: List[FallbackRule] = []
         self.model_health: Dict[str, Dict[str, Any]] = {}
-        self.response_cache: Dict[str, GenerationResponse] = {}
         self.circuit_breakers: Dict[str, Dict[str, Any]] = {}
         self._setup_default_rules()
+        # Any model's earlier answer is an acceptable fallback, so ignore the model in keys
+        cache_ttl = next(
+            (rule.config.get("cache_ttl", 3600) for rule in self.fallback_rules
+             if rule.strategy == FallbackStrategy.CACHED_RESPONSE),
+            3600
+        )
+        self.response_cache = GenerationCache(max_entries=512, ttl_seconds=cache_ttl, include_model=False)
     
     def _setup_default_rules(self):
         """Setup default fallback rules."""
@@ -267,16 +274,16 @@ def mock_function():
     
     def _get_cached_response(self, request: GenerationRequest, start_time: float) -> Optional[GenerationResponse]:
         """Get cached response if available."""
-        cache_key = self._generate_cache_key(request)
-        
-        if cache_key in self.response_cache:
-            cached_response = self.response_cache[cache_key]
-            # Update response time and mark as cached
-            cached_response.response_time = time.time() - start_time
-            cached_response.fallback_used = True
-            cached_response.status = "cached_fallback"
+        cached_response = self.response_cache.get_exact(request)
+        
+        if cached_response:
+            # The cache hands out copies, so marking this one doesn't touch the stored entry
             logger.info("Returning cached response as fallback")
-            return cached_response
+            return cached_response.model_copy(update={
+                "response_time": time.time() - start_time,
+                "fallback_used": True,
+                "status": "cached_fallback"
+            })
         
         return None
     
@@ -360,19 +367,15 @@ def mock_function():
             self.circuit_breakers[model_id]["state"] = "open"
             logger.warning(f"Circuit breaker opened for model {model_id}")
     
-    def _generate_cache_key(self, request: GenerationRequest) -> str:
-        """Generate cache key for request."""
-        return f"{request.prompt[:100]}_{request.max_tokens}_{request.temperature}"
-    
     def cache_response(self, request: GenerationRequest, response: GenerationResponse):
         """Cache a successful response."""
-        cache_key = self._generate_cache_key(request)
-        self.response_cache[cache_key] = response
+        self.response_cache.put_exact(request, response)
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status of all models."""
         return {
             "model_health": self.model_health.copy(),
             "circuit_breakers": self.circuit_breakers.copy(),
-            "cache_size": len(self.response_cache)
+            "cache_size": len(self.response_cache),
+            "cache": self.response_cache.get_stats()
         }
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+Generation Cache Service
+
+Bounded response cache placed in front of model inference.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..schemas import GenerationRequest, GenerationResponse
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Awaitable[Sequence[float]]]
+
+# Rough per-entry bookkeeping overhead (dict slots, dataclass, pydantic model)
+_ENTRY_OVERHEAD_BYTES = 512
+
+
+@dataclass
+class GenerationCacheStats:
+    """Hit/miss and eviction metrics for a generation cache."""
+    lookups: int = 0
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.semantic_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+@dataclass
+class _CacheEntry:
+    response: GenerationResponse
+    signature: str
+    size_bytes: int
+    expires_at: float
+    embedding: Optional[np.ndarray] = None
+
+
+class GenerationCache:
+    """
+    Two-tier cache of generation responses.
+
+    Tiers:
+    - Exact: keyed on a hash of the full prompt, every generation parameter
+      and the model id.
+    - Semantic (optional): when an ``embedder`` is given, a miss on the exact
+      tier falls back to the most similar cached prompt that was generated
+      with the same model and parameters, if its cosine similarity reaches
+      ``similarity_threshold``.
+
+    Entries expire after ``ttl_seconds`` and the least recently used ones are
+    evicted to stay within ``max_entries`` and ``max_bytes``. Stored and
+    returned responses are copies, so callers can modify what they get back.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = 0.95,
+        include_model: bool = True
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.include_model = include_model
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._by_signature: Dict[str, Dict[str, np.ndarray]] = {}
+        self.bytes_used = 0
+        self.stats = GenerationCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, request: GenerationRequest, model_id: Optional[str] = None) -> Optional[GenerationResponse]:
+        """Look up a response, trying the exact tier first and then the semantic tier."""
+        start_time = time.time()
+        self.stats.lookups += 1
+        signature = self._signature(request, model_id)
+
+        entry = self._lookup(self._exact_key(request.prompt, signature))
+        if entry is not None:
+            self.stats.exact_hits += 1
+            return self._cached_copy(entry, start_time, tier="exact")
+
+        if self.embedder is not None and self._by_signature.get(signature):
+            match = self._nearest(await self._embed(request.prompt), signature)
+            if match is not None:
+                key, similarity = match
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.stats.semantic_hits += 1
+                    return self._cached_copy(entry, start_time, tier="semantic", similarity=similarity)
+
+        self.stats.misses += 1
+        return None
+
+    def get_exact(self, request: GenerationRequest, model_id: Optional[str] = None) -> Optional[GenerationResponse]:
+        """Exact-tier lookup only; usable from synchronous code."""
+        start_time = time.time()
+        self.stats.lookups += 1
+        entry = self._lookup(self._exact_key(request.prompt, self._signature(request, model_id)))
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self.stats.exact_hits += 1
+        return self._cached_copy(entry, start_time, tier="exact")
+
+    async def put(self, request: GenerationRequest, response: GenerationResponse, model_id: Optional[str] = None) -> bool:
+        """Store a successful response; returns False if it was not cacheable."""
+        embedding = None
+        if self.embedder is not None and self._cacheable(response):
+            embedding = await self._embed(request.prompt)
+        return self._store(request, response, model_id, embedding)
+
+    def put_exact(self, request: GenerationRequest, response: GenerationResponse, model_id: Optional[str] = None) -> bool:
+        """Store a response in the exact tier only; usable from synchronous code."""
+        return self._store(request, response, model_id, None)
+
+    def invalidate(self, model_id: Optional[str] = None) -> int:
+        """Drop every entry (or only those generated by ``model_id``); returns the count removed."""
+        keys = [
+            key for key, entry in self._entries.items()
+            if model_id is None or entry.response.model_used == model_id
+        ]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self.invalidate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size, memory use and hit-ratio metrics."""
+        stats = self.stats.to_dict()
+        stats.update({
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "semantic_enabled": self.embedder is not None
+        })
+        return stats
+
+    def _store(self, request: GenerationRequest, response: GenerationResponse,
+               model_id: Optional[str], embedding: Optional[np.ndarray]) -> bool:
+        if not self._cacheable(response):
+            return False
+
+        signature = self._signature(request, model_id)
+        key = self._exact_key(request.prompt, signature)
+        stored = response.model_copy(deep=True)
+        size_bytes = (
+            len(stored.content.encode("utf-8"))
+            + len(request.prompt.encode("utf-8"))
+            + (embedding.nbytes if embedding is not None else 0)
+            + _ENTRY_OVERHEAD_BYTES
+        )
+        if size_bytes > self.max_bytes:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _CacheEntry(
+            response=stored,
+            signature=signature,
+            size_bytes=size_bytes,
+            expires_at=time.time() + self.ttl_seconds,
+            embedding=embedding
+        )
+        if embedding is not None:
+            self._by_signature.setdefault(signature, {})[key] = embedding
+        self.bytes_used += size_bytes
+        self.stats.stores += 1
+
+        self._evict()
+        return True
+
+    def _lookup(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key)
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes_used > self.max_bytes):
+            key, entry = next(iter(self._entries.items()))
+            self._remove(key)
+            if entry.expires_at <= time.time():
+                self.stats.expirations += 1
+            else:
+                self.stats.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.bytes_used -= entry.size_bytes
+        bucket = self._by_signature.get(entry.signature)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._by_signature[entry.signature]
+
+    def _nearest(self, embedding: np.ndarray, signature: str) -> Optional[Tuple[str, float]]:
+        bucket = self._by_signature.get(signature)
+        if not bucket:
+            return None
+        keys = list(bucket)
+        scores = np.vstack([bucket[key] for key in keys]) @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        return keys[best], float(scores[best])
+
+    async def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(await self.embedder(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _signature(self, request: GenerationRequest, model_id: Optional[str]) -> str:
+        params = request.model_dump(exclude={"prompt"})
+        params["model"] = model_id if self.include_model else None
+        params["request_type"] = type(request).__name__
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _exact_key(prompt: str, signature: str) -> str:
+        return hashlib.sha256(f"{signature}\n{prompt}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cacheable(response: GenerationResponse) -> bool:
+        return response.status == "completed" and not response.fallback_used and bool(response.content)
+
+    @staticmethod
+    def _cached_copy(entry: _CacheEntry, start_time: float, tier: str,
+                     similarity: Optional[float] = None) -> GenerationResponse:
+        metadata = dict(entry.response.metadata or {})
+        metadata["cache"] = {"tier": tier, "similarity": similarity} if similarity is not None else {"tier": tier}
+        return entry.response.model_copy(deep=True, update={
+            "response_time": time.time() - start_time,
+            "metadata": metadata
+        })
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from ..schemas import GenerationRequest, GenerationResponse
 from .fallback_manager import FallbackManager
+from .generation_cache import GenerationCache
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +27,14 @@ class ResponseGenerator:
     - Handle generation errors gracefully
     - Track generation metrics
     - Implement fallback strategies
+    - Serve repeated prompts from the generation cache
     """
     
-    def __init__(self, model_loader, fallback_manager: Optional[FallbackManager] = None):
+    def __init__(self, model_loader, fallback_manager: Optional[FallbackManager] = None,
+                 generation_cache: Optional[GenerationCache] = None):
         self.model_loader = model_loader
         self.fallback_manager = fallback_manager or FallbackManager()
+        self.generation_cache = generation_cache if generation_cache is not None else GenerationCache()
         self.active_model: Optional[str] = None
         
     async def generate_text(self, request: GenerationRequest, model_id: Optional[str] = None) -> GenerationResponse:
@@ -56,6 +60,10 @@ class ResponseGenerator:
                 response_time=time.time() - start_time
             )
         
+        cached = await self.generation_cache.get(request, target_model)
+        if cached is not None:
+            return cached
+        
         if not self.model_loader.is_model_loaded(target_model):
             # Try fallback strategy
             fallback_result = await self.fallback_manager.handle_model_unavailable(target_model, request)
@@ -80,7 +88,7 @@ class ResponseGenerator:
             else:
                 content = await self._generate_text_response(model, request)
             
-            return GenerationResponse(
+            response = GenerationResponse(
                 content=content,
                 model_used=target_model,
                 status="completed",
@@ -88,6 +96,8 @@ class ResponseGenerator:
                 tokens_used=self._estimate_tokens(request.prompt + content),
                 timestamp=datetime.now().isoformat()
             )
+            await self.generation_cache.put(request, response, target_model)
+            return response
             
         except Exception as e:
             logger.error(f"Error generating response with model {target_model}: {e}")
@@ -179,5 +189,6 @@ class ResponseGenerator:
             "active_model": self.active_model,
             "loaded_models": list(self.model_loader.get_loaded_models().keys()),
             "fallback_available": self.fallback_manager is not None,
+            "generation_cache": self.generation_cache.get_stats(),
             "status": "healthy" if self.active_model else "no_active_model"
         }
\ No newline at end of file
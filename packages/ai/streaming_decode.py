@@ -0,0 +1,105 @@
+"""
+Streaming Decode Helpers - Incremental detokenization and stop matching
+
+Token-by-token streaming needs two things that are easy to get quadratic:
+turning token ids back into text, and noticing stop sequences. These
+helpers do both incrementally so each new token costs O(1) amortized work
+regardless of how long the stream already is. They only depend on a
+Hugging Face style ``tokenizer.decode`` and do not import torch.
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+class IncrementalDetokenizer:
+    """
+    Converts a growing list of token ids into text deltas.
+
+    Decoding tokens one at a time loses word-boundary spaces (SentencePiece)
+    and splits multi-byte characters (byte-level BPE). Instead, a small
+    window of recent tokens is decoded and only the text beyond the part
+    already emitted is returned; incomplete characters are held back.
+    """
+
+    def __init__(self, tokenizer: Any, skip_special_tokens: bool = True):
+        self.tokenizer = tokenizer
+        self.skip_special_tokens = skip_special_tokens
+        self.token_ids: List[int] = []
+        self._prefix_offset = 0
+        self._read_offset = 0
+
+    def add(self, token_id: int) -> str:
+        """Append a token and return the newly completed text (may be empty)."""
+        self.token_ids.append(token_id)
+
+        prefix_text = self._decode(self.token_ids[self._prefix_offset:self._read_offset])
+        new_text = self._decode(self.token_ids[self._prefix_offset:])
+
+        if len(new_text) > len(prefix_text) and not new_text.endswith("�"):
+            delta = new_text[len(prefix_text):]
+            self._prefix_offset = self._read_offset
+            self._read_offset = len(self.token_ids)
+            return delta
+        return ""
+
+    def flush(self) -> str:
+        """Return any text still held back (e.g. at end of stream)."""
+        prefix_text = self._decode(self.token_ids[self._prefix_offset:self._read_offset])
+        new_text = self._decode(self.token_ids[self._prefix_offset:])
+        self._prefix_offset = self._read_offset = len(self.token_ids)
+        return new_text[len(prefix_text):]
+
+    def _decode(self, token_ids: Sequence[int]) -> str:
+        if not token_ids:
+            return ""
+        return self.tokenizer.decode(token_ids, skip_special_tokens=self.skip_special_tokens)
+
+
+class StopSequenceMatcher:
+    """
+    Streams text while watching for stop sequences.
+
+    Text that could still be the start of a stop sequence is held back until
+    it is disambiguated, so a stop sequence is never partially emitted. Only
+    the held-back tail plus the new chunk is searched on each step.
+    """
+
+    def __init__(self, stop_sequences: Optional[Sequence[str]] = None):
+        self.stop_sequences = [s for s in (stop_sequences or []) if s]
+        self._holdback = max((len(s) for s in self.stop_sequences), default=1) - 1
+        self._pending = ""
+        self.stopped = False
+
+    def feed(self, text: str) -> Tuple[str, bool]:
+        """
+        Add generated text.
+
+        Returns:
+            (text safe to emit, whether a stop sequence was hit)
+        """
+        if self.stopped:
+            return "", True
+        if not self.stop_sequences:
+            return text, False
+
+        self._pending += text
+        cut = min(
+            (index for index in (self._pending.find(s) for s in self.stop_sequences) if index >= 0),
+            default=-1
+        )
+        if cut >= 0:
+            emit = self._pending[:cut]
+            self._pending = ""
+            self.stopped = True
+            return emit, True
+
+        safe = len(self._pending) - self._holdback
+        if safe <= 0:
+            return "", False
+        emit, self._pending = self._pending[:safe], self._pending[safe:]
+        return emit, False
+
+    def flush(self) -> str:
+        """Release held-back text once the stream has ended without a stop."""
+        emit, self._pending = self._pending, ""
+        return "" if self.stopped else emit
@@ -8,13 +8,14 @@ import json
 import logging
 import uuid
 from typing import Dict, List, Any, Optional, Callable, Union, Set
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 from datetime import datetime, timedelta
 import time
 
 from .enhanced_message_queue import EnhancedMessageQueue, EnhancedMessage, MessagePriority, RoutingStrategy
 from .agent_registry import AgentRegistry, AgentInfo, AgentCapability, AgentStatus, LoadBalancingStrategy
+from .deadlines import DeadlineScheduler, get_deadline_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,9 @@ class TaskStatus(Enum):
     CANCELLED = "cancelled"
     TIMEOUT = "timeout"
 
+# Statuses after which a task won't change again unless reassigned
+TERMINAL_TASK_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED})
+
 class WorkflowType(Enum):
     """Workflow execution types"""
     SEQUENTIAL = "sequential"
@@ -128,6 +132,13 @@ class Workflow:
     timeout: int = 3600  # seconds
     metadata: Dict[str, Any] = None
     
+    # Dependency bookkeeping, built on first use and kept current by mark_task_completed
+    _task_index: Dict[str, Task] = field(default=None, init=False, repr=False, compare=False)
+    _remaining_deps: Dict[str, int] = field(default=None, init=False, repr=False, compare=False)
+    _dependents: Dict[str, List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _completed_ids: Set[str] = field(default=None, init=False, repr=False, compare=False)
+    _ready: Dict[str, Task] = field(default=None, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now()
@@ -136,17 +147,56 @@ class Workflow:
         if not self.id:
             self.id = str(uuid.uuid4())
     
+    def _dependency_state(self):
+        """Build the dependency counts from current task statuses (again if tasks were added)"""
+        if self._task_index is not None and len(self._task_index) == len(self.tasks):
+            return
+        
+        self._task_index = {task.id: task for task in self.tasks}
+        self._completed_ids = {task.id for task in self.tasks if task.status == TaskStatus.COMPLETED}
+        self._dependents = {}
+        self._remaining_deps = {}
+        self._ready = {}
+        for task in self.tasks:
+            remaining = 0
+            for dep_id in task.dependencies:
+                self._dependents.setdefault(dep_id, []).append(task.id)
+                if dep_id not in self._completed_ids:
+                    remaining += 1
+            self._remaining_deps[task.id] = remaining
+            if remaining == 0 and task.id not in self._completed_ids:
+                self._ready[task.id] = task
+    
+    def has_task(self, task_id: str) -> bool:
+        """Check if the task belongs to this workflow"""
+        self._dependency_state()
+        return task_id in self._task_index
+    
+    def mark_task_completed(self, task_id: str) -> List[Task]:
+        """Record a completed task and return the tasks it made ready"""
+        self._dependency_state()
+        if task_id in self._completed_ids or task_id not in self._task_index:
+            return []
+        
+        self._completed_ids.add(task_id)
+        self._ready.pop(task_id, None)
+        newly_ready = []
+        for dependent_id in self._dependents.get(task_id, []):
+            self._remaining_deps[dependent_id] -= 1
+            if self._remaining_deps[dependent_id] == 0:
+                dependent = self._task_index[dependent_id]
+                self._ready[dependent_id] = dependent
+                newly_ready.append(dependent)
+        return newly_ready
+    
     def get_ready_tasks(self) -> List[Task]:
-        """Get tasks that are ready to execute"""
-        completed_task_ids = {
-            task.id for task in self.tasks 
-            if task.status == TaskStatus.COMPLETED
-        }
+        """Get tasks that are ready to execute
         
-        return [
-            task for task in self.tasks
-            if task.status == TaskStatus.PENDING and task.is_ready(completed_task_ids)
-        ]
+        Completions must be reported through mark_task_completed (the
+        coordinator does this in handle_task_completion).
+        """
+        self._dependency_state()
+        return [task for task in self._ready.values() if task.status == TaskStatus.PENDING]
     
     def get_progress(self) -> float:
         """Get workflow completion progress (0.0 to 1.0)"""
@@ -172,19 +222,26 @@ class AgentCoordinator:
     - Task distribution and load balancing
     - Workflow orchestration
     - Agent collaboration patterns
-    - Timeout and retry handling
+    - Timeout and retry handling (deadlines on the shared DeadlineScheduler)
     - Performance monitoring
     - Fault tolerance and recovery
     """
     
-    def __init__(self, message_queue: EnhancedMessageQueue, agent_registry: AgentRegistry):
+    def __init__(
+        self,
+        message_queue: EnhancedMessageQueue,
+        agent_registry: AgentRegistry,
+        deadlines: Optional[DeadlineScheduler] = None
+    ):
         self.message_queue = message_queue
         self.agent_registry = agent_registry
+        self.deadlines = deadlines or get_deadline_scheduler()
         
         # Active workflows and tasks
         self.workflows: Dict[str, Workflow] = {}
         self.tasks: Dict[str, Task] = {}
         self.task_assignments: Dict[str, str] = {}  # task_id -> agent_id
+        self.task_futures: Dict[str, asyncio.Future] = {}  # task_id -> resolved on terminal status
         
         # Coordination state
         self.active_collaborations: Dict[str, Dict[str, Any]] = {}
@@ -214,9 +271,7 @@ class AgentCoordinator:
     
     async def initialize(self):
         """Initialize coordinator"""
-        # Start background tasks
-        asyncio.create_task(self._workflow_monitor())
-        asyncio.create_task(self._timeout_monitor())
+        # Start background tasks (task and workflow timeouts fire from self.deadlines)
         asyncio.create_task(self._metrics_collector())
         
         logger.info("Agent coordinator initialized")
@@ -229,6 +284,10 @@ class AgentCoordinator:
             
             # Store workflow
             self.workflows[workflow.id] = workflow
+            self.deadlines.schedule(
+                ("agent_workflow", workflow.id), workflow.timeout,
+                lambda: self._expire_workflow(workflow.id)
+            )
             
             # Trigger workflow started event
             await self._trigger_event("workflow_started", workflow)
@@ -252,6 +311,7 @@ class AgentCoordinator:
             
         except Exception as e:
             workflow.status = TaskStatus.FAILED
+            self.deadlines.cancel(("agent_workflow", workflow.id))
             logger.error(f"Failed to execute workflow {workflow.id}: {e}")
             await self._trigger_event("workflow_failed", workflow, {"error": str(e)})
             raise
@@ -272,6 +332,7 @@ class AgentCoordinator:
             
             if not agent:
                 logger.warning(f"No available agent for task {task.id}")
+                await self._fail_unassigned(task, "No available agent")
                 return None
             
             # Assign task
@@ -303,6 +364,9 @@ class AgentCoordinator:
                 # Set timeout
                 timeout_time = datetime.now() + timedelta(seconds=task.timeout)
                 self.agent_timeouts[task.id] = timeout_time
+                self.deadlines.schedule(
+                    ("agent_task", task.id), task.timeout, lambda: self._expire_task(task.id)
+                )
                 
                 # Update agent load
                 agent.metrics.current_load += 1
@@ -317,16 +381,23 @@ class AgentCoordinator:
                 
                 return agent.agent_id
             else:
-                task.status = TaskStatus.FAILED
-                task.error = "Failed to send task to agent"
+                await self._fail_unassigned(task, "Failed to send task to agent")
                 return None
                 
         except Exception as e:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
             logger.error(f"Failed to assign task {task.id}: {e}")
+            await self._fail_unassigned(task, str(e))
             return None
     
+    async def _fail_unassigned(self, task: Task, error: str):
+        """Fail a task that could not be handed to an agent, so nothing waits on it forever"""
+        task.status = TaskStatus.FAILED
+        task.error = error
+        task.completed_at = datetime.now()
+        await self._trigger_event("task_failed", task, {"error": error})
+        await self._check_workflow_completion(task)
+        self._resolve_task(task)
+    
     async def handle_task_completion(self, task_id: str, result: Any, success: bool = True):
         """Handle task completion from agent"""
         try:
@@ -380,25 +451,51 @@ class AgentCoordinator:
             
             # Update agent load
             if agent_id:
-                agent = await self.agent_registry.get_agent(agent_id)
-                if agent:
-                    agent.metrics.current_load = max(0, agent.metrics.current_load - 1)
-                    await self.agent_registry.update_agent_status(
-                        agent_id,
-                        AgentStatus.IDLE if agent.metrics.current_load == 0 else AgentStatus.BUSY,
-                        agent.metrics
-                    )
+                await self._release_agent(agent_id)
             
-            # Remove timeout
-            if task_id in self.agent_timeouts:
+            # Remove timeout (a retry above has already scheduled a new one)
+            if task_id in self.agent_timeouts and task.status != TaskStatus.ASSIGNED:
                 del self.agent_timeouts[task_id]
+                self.deadlines.cancel(("agent_task", task_id))
             
             # Check if workflow is completed
             await self._check_workflow_completion(task)
             
+            # Wake anything waiting on the task (a retry leaves it in flight)
+            if task.status in TERMINAL_TASK_STATUSES:
+                self._resolve_task(task)
+            
         except Exception as e:
             logger.error(f"Error handling task completion {task_id}: {e}")
     
+    async def _release_agent(self, agent_id: str):
+        """Give back the load slot a task held on its agent"""
+        agent = await self.agent_registry.get_agent(agent_id)
+        if agent:
+            agent.metrics.current_load = max(0, agent.metrics.current_load - 1)
+            await self.agent_registry.update_agent_status(
+                agent_id,
+                AgentStatus.IDLE if agent.metrics.current_load == 0 else AgentStatus.BUSY,
+                agent.metrics
+            )
+    
+    async def wait_for_task(self, task: Task, timeout: Optional[float] = None) -> Task:
+        """Wait until the task completes, fails permanently or is cancelled"""
+        if task.status not in TERMINAL_TASK_STATUSES:
+            future = self.task_futures.get(task.id)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                self.task_futures[task.id] = future
+            # Shield so one waiter timing out doesn't cancel the future for the others
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        return task
+    
+    def _resolve_task(self, task: Task):
+        """Resolve the task's completion future, if anyone is waiting"""
+        future = self.task_futures.pop(task.id, None)
+        if future is not None and not future.done():
+            future.set_result(task)
+    
     async def start_collaboration(
         self, 
         collaboration_id: str,
@@ -518,14 +615,11 @@ class AgentCoordinator:
     async def _execute_sequential_workflow(self, workflow: Workflow):
         """Execute workflow tasks sequentially"""
         for task in workflow.tasks:
-            if workflow.status == TaskStatus.CANCELLED:
+            if workflow.status != TaskStatus.IN_PROGRESS:
                 break
             
             await self.assign_task(task)
-            
-            # Wait for task completion
-            while task.status in [TaskStatus.PENDING, TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS]:
-                await asyncio.sleep(1)
+            await self.wait_for_task(task)
             
             if task.status == TaskStatus.FAILED:
                 workflow.status = TaskStatus.FAILED
@@ -547,37 +641,32 @@ class AgentCoordinator:
         await self._execute_sequential_workflow(workflow)
     
     async def _execute_pipeline_workflow(self, workflow: Workflow):
-        """Execute workflow as a pipeline"""
-        # Execute tasks based on dependencies
-        completed_tasks = set()
-        
-        while len(completed_tasks) < len(workflow.tasks):
-            ready_tasks = [
-                task for task in workflow.tasks
-                if task.status == TaskStatus.PENDING and task.is_ready(completed_tasks)
-            ]
-            
-            if not ready_tasks:
-                # Check for deadlock or completion
-                if all(task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED] for task in workflow.tasks):
+        """Execute workflow as a pipeline, assigning each task as soon as its dependencies complete"""
+        waiting: Dict[str, asyncio.Task] = {}
+        try:
+            while workflow.status == TaskStatus.IN_PROGRESS:
+                for task in workflow.get_ready_tasks():
+                    if task.id not in waiting:
+                        await self.assign_task(task)
+                        waiting[task.id] = asyncio.create_task(self.wait_for_task(task))
+                
+                if not waiting:
+                    if not workflow.is_completed():
+                        logger.warning(f"Pipeline workflow {workflow.id} has tasks with unmet dependencies")
                     break
-                await asyncio.sleep(1)
-                continue
-            
-            # Assign ready tasks
-            for task in ready_tasks:
-                await self.assign_task(task)
-            
-            # Wait for at least one task to complete
-            while not any(task.id in completed_tasks for task in ready_tasks):
-                for task in ready_tasks:
-                    if task.status == TaskStatus.COMPLETED:
-                        completed_tasks.add(task.id)
-                    elif task.status == TaskStatus.FAILED:
+                
+                done, _ = await asyncio.wait(waiting.values(), return_when=asyncio.FIRST_COMPLETED)
+                for waiter in done:
+                    task = waiter.result()
+                    del waiting[task.id]
+                    if task.status == TaskStatus.FAILED:
                         workflow.status = TaskStatus.FAILED
                         return
-                
-                await asyncio.sleep(1)
+                    if task.status == TaskStatus.CANCELLED:
+                        return  # the workflow timed out or was cancelled
+        finally:
+            for waiter in waiting.values():
+                waiter.cancel()
     
     async def _execute_map_reduce_workflow(self, workflow: Workflow):
         """Execute workflow using map-reduce pattern"""
@@ -590,8 +679,9 @@ class AgentCoordinator:
             await self.assign_task(task)
         
         # Wait for all map tasks to complete
-        while any(task.status in [TaskStatus.PENDING, TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS] for task in map_tasks):
-            await asyncio.sleep(1)
+        await asyncio.gather(*(self.wait_for_task(task) for task in map_tasks))
+        if workflow.status != TaskStatus.IN_PROGRESS:
+            return
         
         # Execute reduce tasks
         for task in reduce_tasks:
@@ -603,71 +693,64 @@ class AgentCoordinator:
             if workflow.status != TaskStatus.IN_PROGRESS:
                 continue
             
-            if completed_task.id not in [task.id for task in workflow.tasks]:
+            if not workflow.has_task(completed_task.id):
                 continue
             
+            if completed_task.status == TaskStatus.COMPLETED:
+                workflow.mark_task_completed(completed_task.id)
+            
             if workflow.is_completed():
                 workflow.status = TaskStatus.COMPLETED
                 workflow.completed_at = datetime.now()
+                self.deadlines.cancel(("agent_workflow", workflow.id))
                 await self._trigger_event("workflow_completed", workflow)
                 logger.info(f"Workflow {workflow.id} completed")
             elif workflow.has_failed():
                 workflow.status = TaskStatus.FAILED
                 workflow.completed_at = datetime.now()
+                self.deadlines.cancel(("agent_workflow", workflow.id))
                 await self._trigger_event("workflow_failed", workflow)
                 logger.error(f"Workflow {workflow.id} failed")
     
-    async def _workflow_monitor(self):
-        """Monitor workflow execution"""
-        while True:
-            try:
-                current_time = datetime.now()
-                
-                for workflow in self.workflows.values():
-                    if workflow.status != TaskStatus.IN_PROGRESS:
-                        continue
-                    
-                    # Check workflow timeout
-                    if workflow.started_at:
-                        elapsed = (current_time - workflow.started_at).total_seconds()
-                        if elapsed > workflow.timeout:
-                            workflow.status = TaskStatus.TIMEOUT
-                            workflow.completed_at = current_time
-                            await self._trigger_event("workflow_failed", workflow, {"reason": "timeout"})
-                            logger.warning(f"Workflow {workflow.id} timed out")
-                
-                await asyncio.sleep(10)  # Check every 10 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in workflow monitor: {e}")
-                await asyncio.sleep(60)
+    async def _expire_workflow(self, workflow_id: str):
+        """Time out a workflow whose deadline passed while it was still running"""
+        workflow = self.workflows.get(workflow_id)
+        if not workflow or workflow.status != TaskStatus.IN_PROGRESS:
+            return
+        
+        workflow.status = TaskStatus.TIMEOUT
+        workflow.completed_at = datetime.now()
+        
+        # Abandon unfinished tasks so strategies waiting on them return; late reports are ignored
+        for task in workflow.tasks:
+            if task.status in TERMINAL_TASK_STATUSES:
+                continue
+            if self.tasks.pop(task.id, None) is not None:
+                self.agent_timeouts.pop(task.id, None)
+                self.deadlines.cancel(("agent_task", task.id))
+                agent_id = self.task_assignments.pop(task.id, None)
+                if agent_id:
+                    await self._release_agent(agent_id)
+            task.status = TaskStatus.CANCELLED
+            task.error = "Workflow timeout"
+            task.completed_at = datetime.now()
+            self._resolve_task(task)
+        
+        await self._trigger_event("workflow_failed", workflow, {"reason": "timeout"})
+        logger.warning(f"Workflow {workflow.id} timed out")
     
-    async def _timeout_monitor(self):
-        """Monitor task timeouts"""
-        while True:
-            try:
-                current_time = datetime.now()
-                timed_out_tasks = []
-                
-                for task_id, timeout_time in self.agent_timeouts.items():
-                    if current_time > timeout_time:
-                        timed_out_tasks.append(task_id)
-                
-                for task_id in timed_out_tasks:
-                    if task_id in self.tasks:
-                        task = self.tasks[task_id]
-                        task.status = TaskStatus.TIMEOUT
-                        task.completed_at = current_time
-                        task.error = "Task timeout"
-                        
-                        await self.handle_task_completion(task_id, None, False)
-                        logger.warning(f"Task {task_id} timed out")
-                
-                await asyncio.sleep(30)  # Check every 30 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in timeout monitor: {e}")
-                await asyncio.sleep(60)
+    async def _expire_task(self, task_id: str):
+        """Time out a task whose deadline passed before the agent reported back"""
+        if task_id not in self.tasks or task_id not in self.agent_timeouts:
+            return
+        
+        task = self.tasks[task_id]
+        task.status = TaskStatus.TIMEOUT
+        task.completed_at = datetime.now()
+        task.error = "Task timeout"
+        
+        await self.handle_task_completion(task_id, task.error, False)
+        logger.warning(f"Task {task_id} timed out")
     
     async def _metrics_collector(self):
         """Collect coordination metrics"""
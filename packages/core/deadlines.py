@@ -0,0 +1,176 @@
+"""
+Deadline Scheduler - Shared timeout tracking for coordinators
+
+Components register a deadline per key (a task, a workflow, a lock) with a
+callback instead of running their own periodic scan. Deadlines live in a
+min-heap; only the earliest one is armed on the event loop, so expirations
+fire on time and scheduling, rescheduling and firing cost O(log n).
+Cancellation is O(1): the heap entry is dropped lazily when it surfaces.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeadlineStats:
+    """Counters for a deadline scheduler."""
+    scheduled: int = 0
+    cancelled: int = 0
+    fired: int = 0
+    callback_errors: int = 0
+
+
+class _Entry:
+    __slots__ = ("when", "seq", "key", "callback", "cancelled")
+
+    def __init__(self, when: float, seq: int, key: Hashable, callback: Callable[[], Any]):
+        self.when = when
+        self.seq = seq
+        self.key = key
+        self.callback = callback
+        self.cancelled = False
+
+    def __lt__(self, other: "_Entry") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of keyed deadlines with cancellation.
+
+    Scheduling a key that already has a deadline replaces it. Callbacks may be
+    plain functions or coroutine functions; coroutines run as their own tasks
+    so a slow handler can't hold up later deadlines. Times are on the
+    ``time.monotonic`` clock.
+    """
+
+    def __init__(self):
+        self._heap: List[_Entry] = []
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_when: Optional[float] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._callback_tasks: Set[asyncio.Task] = set()
+        self.stats = DeadlineStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        """Monotonic time at which ``key`` expires, if it is scheduled."""
+        entry = self._entries.get(key)
+        return entry.when if entry else None
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], Any]):
+        """Call ``callback`` in ``delay`` seconds unless ``key`` is cancelled first."""
+        self.schedule_at(key, time.monotonic() + delay, callback)
+
+    def schedule_at(self, key: Hashable, when: float, callback: Callable[[], Any]):
+        """Call ``callback`` at monotonic time ``when`` unless ``key`` is cancelled first."""
+        self._discard(key)
+        entry = _Entry(when, next(self._seq), key, callback)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        self.stats.scheduled += 1
+        self._arm()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel the deadline for ``key``; returns False if none was scheduled."""
+        if not self._discard(key):
+            return False
+        self.stats.cancelled += 1
+        return True
+
+    async def close(self):
+        """Drop all deadlines and wait for callbacks that are still running."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_when = None
+        self._heap.clear()
+        self._entries.clear()
+        if self._callback_tasks:
+            await asyncio.gather(*self._callback_tasks, return_exceptions=True)
+
+    def _discard(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+        # Rebuild once dead entries dominate, so the heap stays O(live deadlines)
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [e for e in self._heap if not e.cancelled]
+            heapq.heapify(self._heap)
+        return True
+
+    def _arm(self):
+        """Make sure a loop timer is set for the earliest live deadline."""
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # armed by the next schedule() made from a running loop
+
+        when = self._heap[0].when
+        if self._timer is not None and self._timer_loop is loop and self._timer_when <= when:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(max(0.0, when - time.monotonic()), self._fire)
+        self._timer_loop = loop
+        self._timer_when = when
+
+    def _fire(self):
+        self._timer = self._timer_when = None
+        now = time.monotonic()
+        while self._heap and (self._heap[0].cancelled or self._heap[0].when <= now):
+            entry = heapq.heappop(self._heap)
+            if entry.cancelled:
+                continue
+            del self._entries[entry.key]
+            self.stats.fired += 1
+            self._run(entry)
+        self._arm()
+
+    def _run(self, entry: _Entry):
+        try:
+            result = entry.callback()
+            if asyncio.iscoroutine(result):
+                task = asyncio.ensure_future(result)
+                self._callback_tasks.add(task)
+                task.add_done_callback(self._callback_done)
+        except Exception as e:
+            self.stats.callback_errors += 1
+            logger.error(f"Deadline callback for {entry.key!r} failed: {e}")
+
+    def _callback_done(self, task: asyncio.Task):
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats.callback_errors += 1
+            logger.error(f"Deadline callback failed: {task.exception()}")
+
+
+# Global scheduler shared by coordinators
+deadline_scheduler = None
+
+def get_deadline_scheduler() -> DeadlineScheduler:
+    """Get or create the shared deadline scheduler"""
+    global deadline_scheduler
+    if deadline_scheduler is None:
+        deadline_scheduler = DeadlineScheduler()
+    return deadline_scheduler
@@ -4,11 +4,12 @@ Implements Redis-based message queuing with persistence, routing, and advanced f
 """
 
 import asyncio
+import hashlib
 import json
 import time
 import logging
 import uuid
-from typing import Dict, List, Any, Optional, Callable, Set
+from typing import Dict, List, Any, Optional, Callable, Set, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from datetime import datetime, timedelta
@@ -22,6 +23,11 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+try:
+    from .message_queue_scripts import MessageQueueScripts, encode_message
+except ImportError:
+    from message_queue_scripts import MessageQueueScripts, encode_message
+
 logger = logging.getLogger(__name__)
 
 class MessagePriority(Enum):
@@ -106,6 +112,9 @@ class EnhancedMessage:
             return False
         return (datetime.now() - self.created_at).total_seconds() > self.ttl
 
+class DuplicateMessage(Exception):
+    """Raised by the scripted send path when a message's dedup key is already claimed"""
+
 @dataclass
 class MessageBatch:
     """Batch of messages for efficient processing"""
@@ -128,12 +137,20 @@ class EnhancedMessageQueue:
     - Dead letter queues
     - Message deduplication
     - Topic-based routing
+    - Lua-scripted send/receive (one atomic round trip per message)
+    - Agent routing index (per-type sorted sets; optional heartbeat TTLs via agent_ttl)
     """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379", namespace: str = "revoagent"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", namespace: str = "revoagent",
+                 use_scripts: bool = True, agent_ttl: Optional[float] = None,
+                 agent_cache_ttl: float = 1.0):
         self.redis_url = redis_url
         self.namespace = namespace
+        self.use_scripts = use_scripts
+        self.agent_ttl = agent_ttl
+        self.agent_cache_ttl = agent_cache_ttl
         self.redis_client: Optional[redis.Redis] = None
+        self._scripts: Optional[MessageQueueScripts] = None
         self.message_handlers: Dict[str, Callable] = {}
         self.topic_subscribers: Dict[str, Set[str]] = {}
         self.agent_load: Dict[str, int] = {}  # Track agent load for routing
@@ -149,11 +166,19 @@ class EnhancedMessageQueue:
             MessagePriority.NORMAL: f"{namespace}:queue:normal",
             MessagePriority.LOW: f"{namespace}:queue:low"
         }
+        self.messages_key = f"{namespace}:messages"
         self.dead_letter_queue = f"{namespace}:queue:dead_letter"
         self.processing_queue = f"{namespace}:queue:processing"
         self.agent_queues_prefix = f"{namespace}:agent"
         self.topic_prefix = f"{namespace}:topic"
         
+        # Agent routing index: type -> sorted set of agent ids scored by expiry
+        self.agent_index_prefix = f"{namespace}:routing:type"
+        self.agent_types_key = f"{namespace}:routing:agent_types"
+        self.agent_events_channel = f"{namespace}:routing:events"
+        self._agent_cache: Dict[str, Tuple[float, List[str]]] = {}
+        self._agent_listener: Optional[asyncio.Task] = None
+        
         # Metrics
         self.metrics = {
             "messages_sent": 0,
@@ -174,12 +199,18 @@ class EnhancedMessageQueue:
             # Setup cleanup task
             asyncio.create_task(self._cleanup_expired_messages())
             
+            # Drop cached agent lists when another process changes membership
+            self._agent_listener = asyncio.create_task(self._listen_agent_events())
+            
         except Exception as e:
             logger.error(f"Failed to initialize message queue: {e}")
             raise
     
     async def close(self):
         """Close Redis connection"""
+        if self._agent_listener is not None:
+            self._agent_listener.cancel()
+            self._agent_listener = None
         if self.redis_client:
             await self.redis_client.close()
     
@@ -190,31 +221,39 @@ class EnhancedMessageQueue:
             await self.initialize()
         yield self.redis_client
     
+    def _get_scripts(self, redis_client) -> MessageQueueScripts:
+        """Scripts registered against the current client"""
+        if self._scripts is None or self._scripts.redis_client is not redis_client:
+            self._scripts = MessageQueueScripts(redis_client)
+        return self._scripts
+    
     async def send_message(self, message: EnhancedMessage) -> bool:
         """Send message with enhanced routing and persistence"""
         try:
-            # Check for duplicates
-            if await self._is_duplicate(message):
+            dedup_key = self._dedup_key(message)
+            
+            # Check for duplicates; the scripted path claims the Redis dedup
+            # key inside the send script instead of in separate round trips
+            if dedup_key in self.deduplication_cache or (
+                not self.use_scripts and await self._is_duplicate(message)
+            ):
                 logger.debug(f"Duplicate message detected: {message.id}")
                 return True
             
-            # Route message based on strategy
-            if message.routing_strategy == RoutingStrategy.DIRECT:
-                success = await self._send_direct(message)
-            elif message.routing_strategy == RoutingStrategy.ROUND_ROBIN:
-                success = await self._send_round_robin(message)
-            elif message.routing_strategy == RoutingStrategy.LEAST_BUSY:
-                success = await self._send_least_busy(message)
-            elif message.routing_strategy == RoutingStrategy.BROADCAST:
-                success = await self._send_broadcast(message)
-            elif message.routing_strategy == RoutingStrategy.TOPIC:
-                success = await self._send_topic(message)
-            else:
-                success = await self._send_direct(message)
+            claim_key = f"{self.namespace}:dedup:{dedup_key}" if self.use_scripts else None
+            try:
+                success = await self._route(message, claim_key)
+            except DuplicateMessage:
+                logger.debug(f"Duplicate message detected: {message.id}")
+                self.deduplication_cache.add(dedup_key)
+                return True
             
             if success:
                 self.metrics["messages_sent"] += 1
-                await self._add_to_deduplication_cache(message)
+                if self.use_scripts:
+                    self.deduplication_cache.add(dedup_key)
+                else:
+                    await self._add_to_deduplication_cache(message)
             else:
                 self.metrics["messages_failed"] += 1
             
@@ -225,15 +264,46 @@ class EnhancedMessageQueue:
             self.metrics["messages_failed"] += 1
             return False
     
-    async def _send_direct(self, message: EnhancedMessage) -> bool:
-        """Send message directly to specific agent"""
+    async def _route(self, message: EnhancedMessage, dedup_key: Optional[str] = None) -> bool:
+        """Route message based on its strategy"""
+        if message.routing_strategy == RoutingStrategy.ROUND_ROBIN:
+            return await self._send_round_robin(message, dedup_key)
+        elif message.routing_strategy == RoutingStrategy.LEAST_BUSY:
+            return await self._send_least_busy(message, dedup_key)
+        elif message.routing_strategy == RoutingStrategy.BROADCAST:
+            return await self._send_broadcast(message, dedup_key)
+        elif message.routing_strategy == RoutingStrategy.TOPIC:
+            return await self._send_topic(message, dedup_key)
+        return await self._send_direct(message, dedup_key)
+    
+    async def _send_direct(self, message: EnhancedMessage, dedup_key: Optional[str] = None) -> bool:
+        """
+        Send message directly to specific agent
+        
+        With scripts enabled, ``dedup_key`` is claimed atomically with the
+        write and DuplicateMessage is raised if it was already taken.
+        """
         async with self.get_redis() as redis_client:
             queue_name = f"{self.agent_queues_prefix}:{message.recipient}"
             priority_queue = self.priority_queues[message.priority]
             
+            if self.use_scripts:
+                sent = await self._get_scripts(redis_client).send(
+                    self.messages_key,
+                    priority_queue,
+                    queue_name,
+                    message.id,
+                    encode_message(message.to_dict()),
+                    self._get_priority_score(message),
+                    dedup_key=dedup_key
+                )
+                if not sent:
+                    raise DuplicateMessage(message.id)
+                return True
+            
             # Store message data
             message_data = json.dumps(message.to_dict())
-            await redis_client.hset(f"{self.namespace}:messages", message.id, message_data)
+            await redis_client.hset(self.messages_key, message.id, message_data)
             
             # Add to priority queue
             priority_score = self._get_priority_score(message)
@@ -248,7 +318,7 @@ class EnhancedMessageQueue:
             
             return True
     
-    async def _send_round_robin(self, message: EnhancedMessage) -> bool:
+    async def _send_round_robin(self, message: EnhancedMessage, dedup_key: Optional[str] = None) -> bool:
         """Send message using round-robin strategy"""
         agent_type = message.recipient  # recipient is agent type for round-robin
         available_agents = await self._get_available_agents(agent_type)
@@ -265,9 +335,9 @@ class EnhancedMessageQueue:
         
         # Update message recipient and send
         message.recipient = selected_agent
-        return await self._send_direct(message)
+        return await self._send_direct(message, dedup_key)
     
-    async def _send_least_busy(self, message: EnhancedMessage) -> bool:
+    async def _send_least_busy(self, message: EnhancedMessage, dedup_key: Optional[str] = None) -> bool:
         """Send message to least busy agent"""
         agent_type = message.recipient
         available_agents = await self._get_available_agents(agent_type)
@@ -280,9 +350,9 @@ class EnhancedMessageQueue:
                               key=lambda agent: self.agent_load.get(agent, 0))
         
         message.recipient = least_busy_agent
-        return await self._send_direct(message)
+        return await self._send_direct(message, dedup_key)
     
-    async def _send_broadcast(self, message: EnhancedMessage) -> bool:
+    async def _send_broadcast(self, message: EnhancedMessage, dedup_key: Optional[str] = None) -> bool:
         """Send message to all agents of specified type"""
         agent_type = message.recipient
         available_agents = await self._get_available_agents(agent_type)
@@ -304,12 +374,13 @@ class EnhancedMessageQueue:
                 metadata=message.metadata.copy()
             )
             
-            if await self._send_direct(message_copy):
+            # Only the first copy claims the dedup key
+            if await self._send_direct(message_copy, dedup_key if success_count == 0 else None):
                 success_count += 1
         
         return success_count > 0
     
-    async def _send_topic(self, message: EnhancedMessage) -> bool:
+    async def _send_topic(self, message: EnhancedMessage, dedup_key: Optional[str] = None) -> bool:
         """Send message using topic-based routing"""
         if not message.topic:
             logger.error("Topic routing requires message.topic to be set")
@@ -337,7 +408,8 @@ class EnhancedMessageQueue:
                 metadata=message.metadata.copy()
             )
             
-            if await self._send_direct(message_copy):
+            # Only the first copy claims the dedup key
+            if await self._send_direct(message_copy, dedup_key if success_count == 0 else None):
                 success_count += 1
         
         return success_count > 0
@@ -348,19 +420,15 @@ class EnhancedMessageQueue:
             async with self.get_redis() as redis_client:
                 queue_name = f"{self.agent_queues_prefix}:{agent_id}"
                 
-                # Try to get message from agent queue
-                if timeout:
-                    result = await redis_client.brpop(queue_name, timeout=timeout)
+                if self.use_scripts:
+                    claimed = await self._claim_scripted(redis_client, queue_name, timeout)
                 else:
-                    result = await redis_client.rpop(queue_name)
+                    claimed = await self._claim_legacy(redis_client, queue_name, timeout)
                 
-                if not result:
+                if not claimed:
                     return None
                 
-                message_id = result[1] if isinstance(result, tuple) else result
-                
-                # Get message data
-                message_data = await redis_client.hget(f"{self.namespace}:messages", message_id)
+                message_id, message_data = claimed
                 if not message_data:
                     logger.warning(f"Message data not found for ID: {message_id}")
                     return None
@@ -372,11 +440,12 @@ class EnhancedMessageQueue:
                     await self._move_to_dead_letter(message, "expired")
                     return None
                 
-                # Mark as processing
-                message.status = MessageStatus.PROCESSING
-                message.processed_at = datetime.now()
-                await redis_client.hset(f"{self.namespace}:messages", message_id, 
-                                      json.dumps(message.to_dict()))
+                # Mark as processing (the receive script already did so in Redis)
+                if message.status != MessageStatus.PROCESSING:
+                    message.status = MessageStatus.PROCESSING
+                    message.processed_at = datetime.now()
+                    await redis_client.hset(self.messages_key, message_id,
+                                          json.dumps(message.to_dict()))
                 
                 # Update agent load
                 self.agent_load[agent_id] = self.agent_load.get(agent_id, 0) + 1
@@ -388,6 +457,35 @@ class EnhancedMessageQueue:
             logger.error(f"Failed to receive message for {agent_id}: {e}")
             return None
     
+    async def _claim_scripted(self, redis_client, queue_name: str,
+                              timeout: Optional[float]) -> Optional[Tuple[str, Optional[str]]]:
+        """Pop and mark a message processing in one round trip"""
+        scripts = self._get_scripts(redis_client)
+        claimed = await scripts.receive(queue_name, self.messages_key)
+        if claimed is None and timeout:
+            # Scripts cannot block; wait for an id, then claim it
+            result = await redis_client.brpop(queue_name, timeout=timeout)
+            if result:
+                claimed = await scripts.receive(queue_name, self.messages_key, result[1])
+        return claimed
+    
+    async def _claim_legacy(self, redis_client, queue_name: str,
+                            timeout: Optional[float]) -> Optional[Tuple[str, Optional[str]]]:
+        """Pop a message id and load its body with separate commands"""
+        # Try to get message from agent queue
+        if timeout:
+            result = await redis_client.brpop(queue_name, timeout=timeout)
+        else:
+            result = await redis_client.rpop(queue_name)
+        
+        if not result:
+            return None
+        
+        message_id = result[1] if isinstance(result, (tuple, list)) else result
+        
+        # Get message data
+        return message_id, await redis_client.hget(self.messages_key, message_id)
+    
     async def acknowledge_message(self, message: EnhancedMessage, success: bool = True) -> bool:
         """Acknowledge message processing completion"""
         try:
@@ -439,7 +537,7 @@ class EnhancedMessageQueue:
                 try:
                     # Batch Redis operations
                     message_data = json.dumps(message.to_dict())
-                    pipe.hset(f"{self.namespace}:messages", message.id, message_data)
+                    pipe.hset(self.messages_key, message.id, message_data)
                     
                     queue_name = f"{self.agent_queues_prefix}:{message.recipient}"
                     pipe.lpush(queue_name, message.id)
@@ -508,20 +606,96 @@ class EnhancedMessageQueue:
         time_score = time.time()  # Earlier messages get higher priority
         return base_score + time_score
     
+    async def register_agent(self, agent_id: str, agent_type: str, ttl: Optional[float] = None) -> bool:
+        """
+        Add an agent to the routing index (also used as its heartbeat).
+        
+        The agent is evicted if it does not heartbeat again within ``ttl``
+        seconds (``agent_ttl`` by default; None keeps it until unregistered).
+        """
+        ttl = ttl if ttl is not None else self.agent_ttl
+        expires_at = time.time() + ttl if ttl else float("inf")
+        
+        async with self.get_redis() as redis_client:
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.zadd(f"{self.agent_index_prefix}:{agent_type}", {agent_id: expires_at})
+            pipe.hset(self.agent_types_key, agent_id, agent_type)
+            added, _ = await pipe.execute()
+            if added:
+                await redis_client.publish(self.agent_events_channel, agent_type)
+        
+        if added:
+            self._agent_cache.pop(agent_type, None)
+        return True
+    
+    async def heartbeat_agent(self, agent_id: str, agent_type: str, ttl: Optional[float] = None) -> bool:
+        """Extend an agent's routing TTL (re-adding it if it was evicted)"""
+        return await self.register_agent(agent_id, agent_type, ttl)
+    
+    async def unregister_agent(self, agent_id: str, agent_type: Optional[str] = None) -> bool:
+        """Remove an agent from the routing index"""
+        async with self.get_redis() as redis_client:
+            agent_type = agent_type or await redis_client.hget(self.agent_types_key, agent_id)
+            if not agent_type:
+                return False
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.zrem(f"{self.agent_index_prefix}:{agent_type}", agent_id)
+            pipe.hdel(self.agent_types_key, agent_id)
+            removed, _ = await pipe.execute()
+            if removed:
+                await redis_client.publish(self.agent_events_channel, agent_type)
+        
+        self._agent_cache.pop(agent_type, None)
+        self.agent_load.pop(agent_id, None)
+        return bool(removed)
+    
     async def _get_available_agents(self, agent_type: str) -> List[str]:
-        """Get list of available agents for given type"""
-        # This would integrate with agent registry
-        # For now, return mock data
+        """
+        Get list of available agents for given type
+        
+        Served from a short-lived local cache; on a miss, expired agents are
+        evicted and the live ones read from the type's sorted set in one
+        round trip (no keyspace scan).
+        """
+        cached = self._agent_cache.get(agent_type)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
         async with self.get_redis() as redis_client:
-            pattern = f"{self.agent_queues_prefix}:{agent_type}:*"
-            keys = await redis_client.keys(pattern)
-            return [key.split(':')[-1] for key in keys]
+            now = time.time()
+            index_key = f"{self.agent_index_prefix}:{agent_type}"
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.zremrangebyscore(index_key, "-inf", now)
+            pipe.zrangebyscore(index_key, now, "+inf")
+            _, agents = await pipe.execute()
+        
+        self._agent_cache[agent_type] = (time.monotonic() + self.agent_cache_ttl, agents)
+        return agents
+    
+    async def _listen_agent_events(self):
+        """Invalidate cached agent lists on membership changes from any process"""
+        pubsub = self.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(self.agent_events_channel)
+            async for event in pubsub.listen():
+                if event.get("type") == "message":
+                    self._agent_cache.pop(event["data"], None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Agent event listener stopped, relying on cache TTL: {e}")
+        finally:
+            await pubsub.close()
+    
+    def _dedup_key(self, message: EnhancedMessage) -> str:
+        """Deduplication key based on a content hash (stable across processes)"""
+        content = json.dumps(message.content, sort_keys=True).encode()
+        content_hash = hashlib.sha1(content).hexdigest()
+        return f"{message.sender}:{message.type}:{content_hash}"
     
     async def _is_duplicate(self, message: EnhancedMessage) -> bool:
         """Check if message is duplicate"""
-        # Simple deduplication based on content hash
-        content_hash = hash(json.dumps(message.content, sort_keys=True))
-        dedup_key = f"{message.sender}:{message.type}:{content_hash}"
+        dedup_key = self._dedup_key(message)
         
         if dedup_key in self.deduplication_cache:
             return True
@@ -533,8 +707,7 @@ class EnhancedMessageQueue:
     
     async def _add_to_deduplication_cache(self, message: EnhancedMessage):
         """Add message to deduplication cache"""
-        content_hash = hash(json.dumps(message.content, sort_keys=True))
-        dedup_key = f"{message.sender}:{message.type}:{content_hash}"
+        dedup_key = self._dedup_key(message)
         
         self.deduplication_cache.add(dedup_key)
         
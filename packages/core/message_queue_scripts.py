@@ -0,0 +1,120 @@
+"""
+Server-side Lua scripts for the Enhanced Message Queue.
+
+Each script performs one logical queue operation atomically in a single
+round trip:
+- send: dedup claim + message body + priority index + agent queue push
+- receive: pop from an agent queue + load body + mark it processing
+
+Scripts are registered with ``register_script`` so they run via EVALSHA and
+are reloaded transparently after a SCRIPT FLUSH or server restart.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# KEYS: messages hash, priority zset, agent queue, dedup key ("" disables dedup)
+# ARGV: message id, message json, priority score, dedup ttl seconds
+SEND_SCRIPT = """
+local dedup_key = KEYS[4]
+if dedup_key ~= '' then
+    if redis.call('SET', dedup_key, '1', 'NX', 'EX', tonumber(ARGV[4])) == false then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+redis.call('LPUSH', KEYS[3], ARGV[1])
+return 1
+"""
+
+# KEYS: agent queue, messages hash
+# ARGV: processed_at (ISO 8601), already-popped message id (optional)
+#
+# Bodies written by encode_message end with the status and processed_at
+# fields, so they are rewritten with a suffix match instead of a cjson
+# round trip (cjson turns empty arrays into objects).
+RECEIVE_SCRIPT = """
+local message_id = ARGV[2]
+if message_id == nil or message_id == '' then
+    message_id = redis.call('RPOP', KEYS[1])
+    if not message_id then
+        return nil
+    end
+end
+local data = redis.call('HGET', KEYS[2], message_id)
+if not data then
+    return {message_id}
+end
+local prefix = string.match(data, '^(.*), "status": "[%a_]+", "processed_at": [^}]*}$')
+if prefix then
+    data = prefix .. ', "status": "processing", "processed_at": "' .. ARGV[1] .. '"}'
+    redis.call('HSET', KEYS[2], message_id, data)
+end
+return {message_id, data}
+"""
+
+
+def encode_message(data: Dict[str, Any]) -> str:
+    """Serialize a message dict with ``status`` and ``processed_at`` last,
+    the layout RECEIVE_SCRIPT knows how to update in place."""
+    body = {k: v for k, v in data.items() if k not in ("status", "processed_at")}
+    body["status"] = data.get("status")
+    body["processed_at"] = data.get("processed_at")
+    return json.dumps(body)
+
+
+class MessageQueueScripts:
+    """Registered send/receive scripts bound to one Redis client."""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._send = redis_client.register_script(SEND_SCRIPT)
+        self._receive = redis_client.register_script(RECEIVE_SCRIPT)
+
+    async def send(
+        self,
+        messages_key: str,
+        priority_key: str,
+        queue_key: str,
+        message_id: str,
+        payload: str,
+        priority_score: float,
+        dedup_key: Optional[str] = None,
+        dedup_ttl: int = 3600
+    ) -> bool:
+        """
+        Store and enqueue a message.
+
+        Returns:
+            False if ``dedup_key`` was already claimed (nothing is written)
+        """
+        result = await self._send(
+            keys=[messages_key, priority_key, queue_key, dedup_key or ""],
+            args=[message_id, payload, repr(priority_score), dedup_ttl]
+        )
+        return bool(int(result))
+
+    async def receive(
+        self,
+        queue_key: str,
+        messages_key: str,
+        message_id: Optional[str] = None
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Pop the next message id (or claim ``message_id``) and mark it processing.
+
+        Returns:
+            None if the queue is empty, else ``(message_id, body)`` where body
+            is None if the message data is missing
+        """
+        result = await self._receive(
+            keys=[queue_key, messages_key],
+            args=[datetime.now().isoformat(), message_id or ""]
+        )
+        if not result:
+            return None
+        message_id = result[0]
+        data = result[1] if len(result) > 1 else None
+        return message_id, data
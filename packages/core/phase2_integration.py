@@ -11,7 +11,7 @@ from datetime import datetime
 import uuid
 
 from .enhanced_message_queue import EnhancedMessageQueue, EnhancedMessage, MessagePriority, RoutingStrategy
-from .agent_registry import AgentRegistry, AgentInfo, AgentCapability, AgentStatus, LoadBalancingStrategy
+from .agent_registry import AgentRegistry, AgentInfo, AgentMetrics, AgentCapability, AgentStatus, LoadBalancingStrategy
 from .agent_coordinator import AgentCoordinator, Task, Workflow, WorkflowType, CollaborationPattern
 from ..memory.enhanced_memory_coordinator import EnhancedMemoryCoordinator, LockType
 
@@ -169,7 +169,7 @@ class Phase2System:
             success = await self.agent_registry.register_agent(agent_info)
             if success:
                 # Register with message queue
-                self.message_queue.register_agent(agent_id)
+                await self.message_queue.register_agent(agent_id, agent_type)
                 
                 # Update status to idle
                 await self.agent_registry.update_agent_status(agent_id, AgentStatus.IDLE)
@@ -187,8 +187,9 @@ class Phase2System:
         """Unregister an agent from the system"""
         try:
             # Unregister from components
+            agent = await self.agent_registry.get_agent(agent_id)
             await self.agent_registry.unregister_agent(agent_id)
-            self.message_queue.unregister_agent(agent_id)
+            await self.message_queue.unregister_agent(agent_id, agent.agent_type if agent else None)
             
             logger.info(f"✅ Agent unregistered: {agent_id}")
             return True
@@ -197,6 +198,18 @@ class Phase2System:
             logger.error(f"❌ Failed to unregister agent {agent_id}: {e}")
             return False
     
+    async def agent_heartbeat(self, agent_id: str, metrics: Optional[AgentMetrics] = None) -> bool:
+        """Record an agent heartbeat and keep it in the message routing index"""
+        try:
+            agent = await self.agent_registry.get_agent(agent_id)
+            if not agent or not await self.agent_registry.heartbeat(agent_id, metrics):
+                return False
+            return await self.message_queue.heartbeat_agent(agent_id, agent.agent_type)
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to process heartbeat for {agent_id}: {e}")
+            return False
+    
     async def send_message_to_agent(
         self, 
         sender: str,
@@ -0,0 +1,396 @@
+"""
+Redis Streams backend for the Enhanced Message Queue
+
+Each recipient gets a stream consumed through a consumer group, so any
+number of consumer processes can share one agent's traffic:
+- Message bodies live in stream entries; the group's pending-entry list (PEL)
+  tracks in-flight messages instead of an ever-growing messages hash
+- Acknowledged entries are XACKed and XDELed, and streams are capped with
+  MAXLEN ~, so memory stays bounded
+- Entries left pending by a crashed consumer are redelivered with XAUTOCLAIM
+- Failed messages are retried through a delayed-retry sorted set promoted in
+  the background, so acknowledging never sleeps
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    from .enhanced_message_queue import (
+        DuplicateMessage, EnhancedMessage, EnhancedMessageQueue, MessageStatus
+    )
+except ImportError:
+    from enhanced_message_queue import (
+        DuplicateMessage, EnhancedMessage, EnhancedMessageQueue, MessageStatus
+    )
+
+logger = logging.getLogger(__name__)
+
+# KEYS: stream, dedup key ("" disables dedup)
+# ARGV: message json, maxlen, dedup ttl seconds
+STREAM_SEND_SCRIPT = """
+if KEYS[2] ~= '' then
+    if redis.call('SET', KEYS[2], '1', 'NX', 'EX', tonumber(ARGV[3])) == false then
+        return false
+    end
+end
+return redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[2], '*', 'data', ARGV[1])
+"""
+
+# KEYS: delayed zset
+# ARGV: now, batch limit, maxlen
+# Members are "<stream>\\n<message json>"
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, member in ipairs(due) do
+    local split = string.find(member, '\\n', 1, true)
+    if split then
+        redis.call('XADD', string.sub(member, 1, split - 1), 'MAXLEN', '~', ARGV[3], '*',
+                   'data', string.sub(member, split + 1))
+    end
+    redis.call('ZREM', KEYS[1], member)
+end
+return #due
+"""
+
+
+class StreamMessageQueue(EnhancedMessageQueue):
+    """
+    EnhancedMessageQueue on Redis Streams with consumer groups.
+
+    Routing, deduplication and topic subscriptions are inherited; storage,
+    delivery, acknowledgement and retries are stream based.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        namespace: str = "revoagent",
+        group: str = "agents",
+        consumer_name: Optional[str] = None,
+        max_stream_length: int = 100000,
+        claim_idle_ms: int = 30000,
+        claim_interval: float = 5.0,
+        max_deliveries: int = 5,
+        retry_poll_interval: float = 0.5,
+        max_retry_delay: float = 300.0
+    ):
+        super().__init__(redis_url, namespace, use_scripts=True)
+        self.group = group
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.max_stream_length = max_stream_length
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.max_deliveries = max_deliveries
+        self.retry_poll_interval = retry_poll_interval
+        self.max_retry_delay = max_retry_delay
+
+        self.stream_prefix = f"{namespace}:stream"
+        self.delayed_retry_key = f"{namespace}:stream:delayed"
+        self.dead_letter_stream = f"{namespace}:stream:dead_letter"
+
+        self._stream_scripts = None
+        self._groups_ready: Set[str] = set()
+        self._last_claim: Dict[str, float] = {}
+        self._background: Optional[asyncio.Task] = None
+
+        self.metrics["messages_redelivered"] = 0
+
+    async def initialize(self):
+        """Connect and start the delayed-retry promoter"""
+        await super().initialize()
+        self._background = asyncio.create_task(self._retry_promoter())
+
+    async def close(self):
+        if self._background is not None:
+            self._background.cancel()
+            self._background = None
+        await super().close()
+
+    def stream_for(self, recipient: str) -> str:
+        return f"{self.stream_prefix}:{recipient}"
+
+    def _get_stream_scripts(self, redis_client):
+        if self._stream_scripts is None or self._stream_scripts[0] is not redis_client:
+            self._stream_scripts = (
+                redis_client,
+                redis_client.register_script(STREAM_SEND_SCRIPT),
+                redis_client.register_script(PROMOTE_RETRIES_SCRIPT)
+            )
+        return self._stream_scripts
+
+    # Sending
+
+    async def _send_direct(self, message: EnhancedMessage, dedup_key: Optional[str] = None) -> bool:
+        """Append message to its recipient's stream (dedup claim included)"""
+        async with self.get_redis() as redis_client:
+            _, send_script, _ = self._get_stream_scripts(redis_client)
+            entry_id = await send_script(
+                keys=[self.stream_for(message.recipient), dedup_key or ""],
+                args=[self._encode(message), self.max_stream_length, 3600]
+            )
+            if not entry_id:
+                raise DuplicateMessage(message.id)
+            return True
+
+    async def send_batch(self, messages: List[EnhancedMessage]) -> int:
+        """Append a batch of messages in one pipelined round trip"""
+        if not messages:
+            return 0
+
+        async with self.get_redis() as redis_client:
+            pipe = redis_client.pipeline(transaction=False)
+            for message in messages:
+                pipe.xadd(
+                    self.stream_for(message.recipient),
+                    {"data": self._encode(message)},
+                    maxlen=self.max_stream_length,
+                    approximate=True
+                )
+            results = await pipe.execute(raise_on_error=False)
+
+        success_count = sum(1 for result in results if not isinstance(result, Exception))
+        self.metrics["messages_sent"] += success_count
+        self.metrics["batches_processed"] += 1
+        return success_count
+
+    # Receiving
+
+    async def receive_message(
+        self,
+        agent_id: str,
+        timeout: Optional[float] = None,
+        consumer: Optional[str] = None
+    ) -> Optional[EnhancedMessage]:
+        """
+        Receive the next message for ``agent_id`` as a member of the consumer group.
+
+        Entries another consumer left pending for longer than ``claim_idle_ms``
+        are reclaimed (at most every ``claim_interval`` seconds per stream)
+        before new entries are read.
+        """
+        consumer = consumer or self.consumer_name
+        stream = self.stream_for(agent_id)
+        try:
+            async with self.get_redis() as redis_client:
+                await self._ensure_group(redis_client, stream)
+
+                while True:
+                    entry = await self._claim_stale(redis_client, stream, consumer)
+                    if entry is None:
+                        entry = await self._read_new(redis_client, stream, consumer, timeout)
+                    if entry is None:
+                        return None
+
+                    message = await self._decode_entry(redis_client, stream, *entry)
+                    if message is not None:
+                        break
+
+                self.agent_load[agent_id] = self.agent_load.get(agent_id, 0) + 1
+                self.metrics["messages_received"] += 1
+                return message
+
+        except Exception as e:
+            logger.error(f"Failed to receive message for {agent_id}: {e}")
+            return None
+
+    async def _ensure_group(self, redis_client, stream: str):
+        if stream in self._groups_ready:
+            return
+        try:
+            await redis_client.xgroup_create(stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._groups_ready.add(stream)
+
+    async def _read_new(self, redis_client, stream: str, consumer: str,
+                        timeout: Optional[float]) -> Optional[Tuple[str, Dict[str, str]]]:
+        block = int(timeout * 1000) if timeout else None
+        result = await redis_client.xreadgroup(
+            self.group, consumer, {stream: ">"}, count=1, block=block
+        )
+        if not result or not result[0][1]:
+            return None
+        return result[0][1][0]
+
+    async def _claim_stale(self, redis_client, stream: str,
+                           consumer: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """Take over one entry left pending by a stalled consumer"""
+        now = time.monotonic()
+        if now - self._last_claim.get(stream, 0.0) < self.claim_interval:
+            return None
+        self._last_claim[stream] = now
+
+        result = await redis_client.xautoclaim(
+            stream, self.group, consumer, min_idle_time=self.claim_idle_ms,
+            start_id="0-0", count=1
+        )
+        claimed = result[1] if result else []
+        if not claimed:
+            return None
+
+        # More may be waiting; allow the next receive to claim again
+        self._last_claim[stream] = 0.0
+        entry_id, fields = claimed[0]
+        self.metrics["messages_redelivered"] += 1
+
+        pending = await redis_client.xpending_range(
+            stream, self.group, min=entry_id, max=entry_id, count=1
+        )
+        if pending and pending[0]["times_delivered"] > self.max_deliveries:
+            message = EnhancedMessage.from_dict(json.loads(fields["data"]))
+            await self._dead_letter(redis_client, stream, entry_id, message, "max_deliveries_exceeded")
+            return await self._claim_stale(redis_client, stream, consumer)
+        return entry_id, fields
+
+    async def _decode_entry(self, redis_client, stream: str, entry_id: str,
+                            fields: Dict[str, str]) -> Optional[EnhancedMessage]:
+        """Turn a stream entry into a message, dead-lettering expired ones"""
+        if not fields or "data" not in fields:
+            # Entry was trimmed or deleted while pending
+            await redis_client.xack(stream, self.group, entry_id)
+            return None
+
+        message = EnhancedMessage.from_dict(json.loads(fields["data"]))
+        message.metadata["stream"] = stream
+        message.metadata["stream_id"] = entry_id
+
+        if message.is_expired():
+            await self._dead_letter(redis_client, stream, entry_id, message, "expired")
+            return None
+
+        message.status = MessageStatus.PROCESSING
+        message.processed_at = datetime.now()
+        return message
+
+    # Acknowledgement and retries
+
+    async def acknowledge_message(self, message: EnhancedMessage, success: bool = True) -> bool:
+        """
+        Acknowledge a received message.
+
+        Failures are scheduled for a delayed retry (exponential backoff) or
+        dead-lettered; neither waits for the backoff.
+        """
+        stream = message.metadata.pop("stream", None)
+        entry_id = message.metadata.pop("stream_id", None)
+        if stream is None or entry_id is None:
+            logger.error(f"Message {message.id} was not received from a stream")
+            return False
+
+        try:
+            async with self.get_redis() as redis_client:
+                if success:
+                    message.status = MessageStatus.COMPLETED
+                    pipe = redis_client.pipeline(transaction=True)
+                    pipe.xack(stream, self.group, entry_id)
+                    pipe.xdel(stream, entry_id)
+                    await pipe.execute()
+                elif message.retry_count < message.max_retries:
+                    message.retry_count += 1
+                    message.status = MessageStatus.RETRY
+                    delay = min(self.max_retry_delay, 2 ** message.retry_count)
+                    pipe = redis_client.pipeline(transaction=True)
+                    pipe.zadd(self.delayed_retry_key, {
+                        f"{stream}\n{self._encode(message)}": time.time() + delay
+                    })
+                    pipe.xack(stream, self.group, entry_id)
+                    pipe.xdel(stream, entry_id)
+                    await pipe.execute()
+                    self.metrics["messages_retried"] += 1
+                else:
+                    await self._dead_letter(redis_client, stream, entry_id, message,
+                                            "max_retries_exceeded")
+
+            if message.recipient in self.agent_load:
+                self.agent_load[message.recipient] = max(0, self.agent_load[message.recipient] - 1)
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to acknowledge message {message.id}: {e}")
+            return False
+
+    async def promote_due_retries(self, limit: int = 100) -> int:
+        """Move retries whose backoff has elapsed back onto their streams"""
+        async with self.get_redis() as redis_client:
+            _, _, promote_script = self._get_stream_scripts(redis_client)
+            return int(await promote_script(
+                keys=[self.delayed_retry_key],
+                args=[time.time(), limit, self.max_stream_length]
+            ))
+
+    async def _retry_promoter(self):
+        """Background task that promotes due retries"""
+        while True:
+            try:
+                promoted = await self.promote_due_retries()
+                if promoted:
+                    logger.debug(f"Promoted {promoted} delayed retries")
+                    continue
+                await asyncio.sleep(self.retry_poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error promoting delayed retries: {e}")
+                await asyncio.sleep(self.retry_poll_interval * 10)
+
+    async def _dead_letter(self, redis_client, stream: str, entry_id: str,
+                           message: EnhancedMessage, reason: str):
+        message.status = MessageStatus.DEAD_LETTER
+        message.metadata.pop("stream", None)
+        message.metadata.pop("stream_id", None)
+        message.metadata["dead_letter_reason"] = reason
+        message.metadata["dead_letter_time"] = datetime.now().isoformat()
+
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.xadd(self.dead_letter_stream, {"data": self._encode(message), "stream": stream},
+                  maxlen=self.max_stream_length, approximate=True)
+        pipe.xack(stream, self.group, entry_id)
+        pipe.xdel(stream, entry_id)
+        await pipe.execute()
+
+        self.metrics["messages_dead_lettered"] += 1
+        logger.warning(f"Message {message.id} moved to dead letter stream: {reason}")
+
+    # Introspection
+
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """Stream lengths and pending counts for every stream this queue has consumed"""
+        async with self.get_redis() as redis_client:
+            streams = {}
+            for stream in sorted(self._groups_ready):
+                summary = await redis_client.xpending(stream, self.group)
+                streams[stream] = {
+                    "length": await redis_client.xlen(stream),
+                    "pending": summary["pending"] if summary else 0
+                }
+
+            return {
+                "metrics": self.metrics.copy(),
+                "agent_loads": self.agent_load.copy(),
+                "topic_subscribers": {
+                    topic: len(subscribers)
+                    for topic, subscribers in self.topic_subscribers.items()
+                },
+                "streams": streams,
+                "delayed_retries": await redis_client.zcard(self.delayed_retry_key),
+                "dead_letter_queue_size": await redis_client.xlen(self.dead_letter_stream)
+            }
+
+    async def _cleanup_expired_messages(self):
+        """Streams are trimmed on write and entries deleted on ack; only the
+        local dedup cache needs pruning"""
+        while True:
+            if len(self.deduplication_cache) > 10000:
+                self.deduplication_cache.clear()
+            await asyncio.sleep(300)
+
+    def _encode(self, message: EnhancedMessage) -> str:
+        return json.dumps(message.to_dict())
@@ -6,7 +6,6 @@ Manages workflow definition, execution, and coordination between multiple agents
 
 import asyncio
 import logging
-import json
 import time
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable, Union
@@ -14,6 +13,10 @@ from dataclasses import dataclass, field, asdict
 from enum import Enum
 import uuid
 
+from ..engines.task_scheduler import DependencyScheduler
+from .workflow_expressions import ExpressionError, evaluate_condition
+from .workflow_journal import WorkflowJournal
+
 logger = logging.getLogger(__name__)
 
 
@@ -113,15 +116,40 @@ class Workflow:
 
 
 class WorkflowEngine:
-    """Orchestrates complex multi-agent workflows."""
+    """
+    Orchestrates complex multi-agent workflows.
+    
+    Steps are scheduled eagerly: each one starts as soon as its own
+    dependencies have finished, not when the whole previous wave is done.
+    ``max_concurrency`` caps the steps running at once within a workflow,
+    and ``step_type_limits`` caps steps of a type across all workflows.
+    
+    Execution state is persisted through a WorkflowJournal: step and status
+    changes are journaled as they happen and snapshots are taken every
+    ``snapshot_every`` events, so ``recover_workflows`` can resume
+    interrupted workflows after a restart.
+    """
     
-    def __init__(self, agent_framework, storage_path: Optional[Path] = None):
+    def __init__(self,
+                 agent_framework,
+                 storage_path: Optional[Path] = None,
+                 max_concurrency: Optional[int] = None,
+                 step_type_limits: Optional[Dict[StepType, int]] = None,
+                 snapshot_every: int = 500):
         self.agent_framework = agent_framework
         self.storage_path = storage_path or Path("workflows")
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
+        self.max_concurrency = max_concurrency
+        self.step_type_semaphores: Dict[StepType, asyncio.Semaphore] = {
+            step_type: asyncio.Semaphore(limit)
+            for step_type, limit in (step_type_limits or {}).items()
+        }
+        self.journal = WorkflowJournal(self.storage_path, snapshot_every=snapshot_every)
+        
         self.active_workflows: Dict[str, Workflow] = {}
         self.workflow_tasks: Dict[str, asyncio.Task] = {}
+        self._resume_events: Dict[str, asyncio.Event] = {}  # set while not paused
         self.step_handlers: Dict[StepType, Callable] = {
             StepType.AGENT_TASK: self._execute_agent_task,
             StepType.PARALLEL_TASKS: self._execute_parallel_tasks,
@@ -182,13 +210,10 @@ class WorkflowEngine:
             # Update workflow status
             workflow.status = WorkflowStatus.RUNNING
             workflow.started_at = time.time()
+            self._record_workflow_state(workflow)
             
-            # Store active workflow
-            self.active_workflows[workflow_id] = workflow
-            
-            # Start execution task
-            task = asyncio.create_task(self._execute_workflow(workflow))
-            self.workflow_tasks[workflow_id] = task
+            # Store active workflow and start execution task
+            self._launch(workflow)
             
             # Trigger callback
             if self.on_workflow_started:
@@ -208,7 +233,8 @@ class WorkflowEngine:
         
         workflow = self.active_workflows[workflow_id]
         workflow.status = WorkflowStatus.PAUSED
-        await self._save_workflow(workflow)
+        self._resume_events[workflow_id].clear()
+        self._record_workflow_state(workflow)
         
         logger.info(f"Paused workflow: {workflow_id}")
         return True
@@ -223,7 +249,8 @@ class WorkflowEngine:
             return False
         
         workflow.status = WorkflowStatus.RUNNING
-        await self._save_workflow(workflow)
+        self._resume_events[workflow_id].set()
+        self._record_workflow_state(workflow)
         
         logger.info(f"Resumed workflow: {workflow_id}")
         return True
@@ -240,6 +267,7 @@ class WorkflowEngine:
             workflow.completed_at = time.time()
             await self._save_workflow(workflow)
             del self.active_workflows[workflow_id]
+            self._resume_events.pop(workflow_id, None)
         
         logger.info(f"Cancelled workflow: {workflow_id}")
         return True
@@ -290,69 +318,90 @@ class WorkflowEngine:
         
         return workflows
     
+    async def recover_workflows(self) -> List[str]:
+        """Resume workflows that were running or paused when the process stopped."""
+        recovered = []
+        for workflow_file in self.storage_path.glob("*.json"):
+            workflow_id = workflow_file.stem
+            if workflow_id in self.active_workflows:
+                continue
+            
+            workflow = await self._load_workflow(workflow_id)
+            if not workflow or workflow.status not in (WorkflowStatus.RUNNING, WorkflowStatus.PAUSED):
+                continue
+            
+            # Steps caught mid-run were interrupted; run them again
+            for step in workflow.steps:
+                if step.status == StepStatus.RUNNING:
+                    step.status = StepStatus.PENDING
+            
+            self._launch(workflow)
+            recovered.append(workflow_id)
+            logger.info(f"Recovered workflow: {workflow.name} ({workflow_id}, {workflow.status.value})")
+        
+        return recovered
+    
+    def _launch(self, workflow: Workflow):
+        """Register an active workflow and start its execution task."""
+        resume_event = asyncio.Event()
+        if workflow.status != WorkflowStatus.PAUSED:
+            resume_event.set()
+        self._resume_events[workflow.id] = resume_event
+        self.active_workflows[workflow.id] = workflow
+        self.workflow_tasks[workflow.id] = asyncio.create_task(self._execute_workflow(workflow))
+    
     async def _execute_workflow(self, workflow: Workflow):
         """Execute a workflow."""
+        running: Dict[asyncio.Task, WorkflowStep] = {}
         try:
             logger.info(f"Executing workflow: {workflow.name}")
             
-            # Build dependency graph
-            dependency_graph = self._build_dependency_graph(workflow.steps)
-            
-            # Execute steps in dependency order
-            executed_steps = set()
+            scheduler = self._build_scheduler(workflow)
+            steps_by_id = {step.id: step for step in workflow.steps}
             
-            while len(executed_steps) < len(workflow.steps):
-                # Find steps ready to execute
-                ready_steps = []
-                for step in workflow.steps:
-                    if (step.id not in executed_steps and 
-                        step.status == StepStatus.PENDING and
-                        all(dep in executed_steps for dep in step.dependencies)):
-                        ready_steps.append(step)
+            while True:
+                await self._wait_while_paused(workflow)
+                
+                # Start every ready step the concurrency cap allows
+                for step_type in scheduler.ready_types():
+                    while scheduler.has_ready(step_type) and (
+                        self.max_concurrency is None or len(running) < self.max_concurrency
+                    ):
+                        step = steps_by_id[scheduler.pop_ready(step_type)]
+                        running[asyncio.create_task(self._run_scheduled_step(workflow, step))] = step
                 
-                if not ready_steps:
-                    # Check for deadlock
-                    pending_steps = [s for s in workflow.steps if s.status == StepStatus.PENDING]
-                    if pending_steps:
+                if not running:
+                    if scheduler.pending_count:
                         raise RuntimeError("Workflow deadlock detected")
                     break
                 
-                # Execute ready steps
-                tasks = []
-                for step in ready_steps:
-                    task = asyncio.create_task(self._execute_step(workflow, step))
-                    tasks.append(task)
-                
-                # Wait for all tasks to complete
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
                 
                 # Process results
-                for i, result in enumerate(results):
-                    step = ready_steps[i]
-                    if isinstance(result, Exception):
+                for task in done:
+                    step = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
                         step.status = StepStatus.FAILED
-                        step.error_message = str(result)
-                        logger.error(f"Step {step.name} failed: {result}")
+                        step.error_message = str(error)
+                        logger.error(f"Step {step.name} failed: {error}")
                         
                         # Check if workflow should fail
                         if not step.conditions.get("continue_on_failure", False):
-                            raise result
+                            self._record_step(workflow, step)
+                            raise error
                     else:
                         step.status = StepStatus.COMPLETED
-                        step.outputs = result or {}
+                        step.outputs = task.result() or {}
                         
                         # Update workflow variables with step outputs
                         if step.outputs:
                             workflow.variables.update(step.outputs)
                     
-                    executed_steps.add(step.id)
-                
-                # Save progress
-                await self._save_workflow(workflow)
-                
-                # Check if workflow is paused
-                while workflow.status == WorkflowStatus.PAUSED:
-                    await asyncio.sleep(1)
+                    self._record_step(workflow, step)
+                    
+                    # Dependents of a tolerated failure still run, as before
+                    scheduler.mark_succeeded(step.id)
             
             # Workflow completed successfully
             workflow.status = WorkflowStatus.COMPLETED
@@ -371,12 +420,88 @@ class WorkflowEngine:
             logger.error(f"Workflow failed: {workflow.name} - {e}")
         
         finally:
+            # Stop steps still in flight (failure or cancellation)
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            
             # Clean up
             await self._save_workflow(workflow)
             if workflow.id in self.active_workflows:
                 del self.active_workflows[workflow.id]
             if workflow.id in self.workflow_tasks:
                 del self.workflow_tasks[workflow.id]
+            self._resume_events.pop(workflow.id, None)
+    
+    def _build_scheduler(self, workflow: Workflow) -> DependencyScheduler:
+        """Register the workflow's unfinished steps with a dependency scheduler."""
+        step_ids = {step.id for step in workflow.steps}
+        # Steps finished in an earlier run (or failed with continue_on_failure) satisfy their dependents
+        finished = {step.id for step in workflow.steps if step.status != StepStatus.PENDING}
+        
+        scheduler = DependencyScheduler()
+        for step in workflow.steps:
+            if step.id in finished:
+                continue
+            unknown = [dep for dep in step.dependencies if dep not in step_ids]
+            if unknown:
+                raise RuntimeError(f"Step {step.name} depends on unknown steps: {unknown}")
+            scheduler.add(
+                step.id,
+                step.step_type,
+                dependencies=[dep for dep in step.dependencies if dep not in finished]
+            )
+        return scheduler
+    
+    async def _run_scheduled_step(self, workflow: Workflow, step: WorkflowStep) -> Optional[Dict[str, Any]]:
+        """Execute a step once a slot for its step type is free."""
+        semaphore = self.step_type_semaphores.get(step.step_type)
+        if semaphore is None:
+            return await self._execute_step(workflow, step)
+        async with semaphore:
+            return await self._execute_step(workflow, step)
+    
+    async def _wait_while_paused(self, workflow: Workflow):
+        """Block new steps from starting while the workflow is paused."""
+        resume_event = self._resume_events.get(workflow.id)
+        if resume_event is not None:
+            await resume_event.wait()
+    
+    def _journal(self, workflow: Workflow, event: Dict[str, Any]):
+        """Journal a state change, snapshotting once enough events have built up."""
+        self.journal.append(workflow.id, event)
+        if self.journal.needs_snapshot(workflow.id):
+            self.journal.snapshot(workflow.id, workflow.to_dict())
+    
+    def _record_step(self, workflow: Workflow, step: WorkflowStep):
+        """Journal a step's finished state (and the variables it produced)."""
+        self._journal(workflow, {
+            "type": "step",
+            "step_id": step.id,
+            "fields": {
+                "status": step.status.value,
+                "outputs": step.outputs,
+                "error_message": step.error_message,
+                "retry_count": step.retry_count,
+                "start_time": step.start_time,
+                "end_time": step.end_time
+            }
+        })
+        if step.status == StepStatus.COMPLETED and step.outputs:
+            self._journal(workflow, {"type": "variables", "updates": step.outputs})
+    
+    def _record_workflow_state(self, workflow: Workflow):
+        """Journal a workflow status change."""
+        self._journal(workflow, {
+            "type": "workflow",
+            "fields": {
+                "status": workflow.status.value,
+                "started_at": workflow.started_at,
+                "completed_at": workflow.completed_at,
+                "error_message": workflow.error_message
+            }
+        })
     
     async def _execute_step(self, workflow: Workflow, step: WorkflowStep) -> Optional[Dict[str, Any]]:
         """Execute a single workflow step."""
@@ -566,13 +691,6 @@ class WorkflowEngine:
         
         return {"integration_result": result}
     
-    def _build_dependency_graph(self, steps: List[WorkflowStep]) -> Dict[str, List[str]]:
-        """Build dependency graph for steps."""
-        graph = {}
-        for step in steps:
-            graph[step.id] = step.dependencies
-        return graph
-    
     def _resolve_variables(self, text: str, variables: Dict[str, Any]) -> str:
         """Resolve variables in text using ${variable} syntax."""
         import re
@@ -584,32 +702,25 @@ class WorkflowEngine:
         return re.sub(r'\$\{([^}]+)\}', replace_var, text)
     
     def _evaluate_condition(self, condition: str, variables: Dict[str, Any]) -> bool:
-        """Evaluate a condition string."""
-        # Simple condition evaluation
-        # In production, use a safer evaluation method
+        """Evaluate a condition; invalid or failing conditions count as false."""
+        if isinstance(condition, bool):
+            return condition
         try:
-            # Replace variables
-            resolved_condition = self._resolve_variables(condition, variables)
-            return eval(resolved_condition)
-        except:
+            return evaluate_condition(condition, variables)
+        except ExpressionError as e:
+            logger.debug(f"Condition {condition!r} treated as false: {e}")
             return False
     
     async def _save_workflow(self, workflow: Workflow):
-        """Save workflow to storage."""
-        workflow_file = self.storage_path / f"{workflow.id}.json"
-        with open(workflow_file, 'w') as f:
-            json.dump(workflow.to_dict(), f, indent=2)
+        """Queue a full snapshot of the workflow (written off the event loop)."""
+        self.journal.snapshot(workflow.id, workflow.to_dict())
     
     async def _load_workflow(self, workflow_id: str) -> Optional[Workflow]:
-        """Load workflow from storage."""
-        workflow_file = self.storage_path / f"{workflow_id}.json"
-        if not workflow_file.exists():
-            return None
-        
+        """Load workflow from its snapshot plus journal."""
         try:
-            with open(workflow_file, 'r') as f:
-                data = json.load(f)
-            return Workflow.from_dict(data)
+            await self.journal.flush()
+            data = await asyncio.to_thread(self.journal.load, workflow_id)
+            return Workflow.from_dict(data) if data else None
         except Exception as e:
             logger.error(f"Error loading workflow {workflow_id}: {e}")
             return None
@@ -619,5 +730,6 @@ class WorkflowEngine:
         # Cancel all active workflows
         for workflow_id in list(self.workflow_tasks.keys()):
             await self.cancel_workflow(workflow_id)
+        await self.journal.close()
         
         logger.info("Workflow engine shutdown complete")
\ No newline at end of file
@@ -0,0 +1,315 @@
+"""
+Workflow Expressions - Safe, compiled condition language for workflow steps
+
+Conditions such as ``"'database' in features"``,
+``"params.review_mode == true"`` or ``"${retries} < 3 and not done"`` are
+parsed once into a tree of closures and cached, so evaluating one in a loop
+step costs only the closure calls. Nothing is passed to ``eval``.
+
+Supported syntax:
+    literals      numbers, 'strings' / "strings", true/false/null
+                  (True/False/None also accepted), [lists]
+    variables     name, dotted.path (mapping keys or public attributes),
+                  ${name} (also interpolated inside string literals)
+    operators     or ||, and &&, not !, == != < <= > >=, in, not in,
+                  + - * / %, parentheses
+"""
+
+import ast
+import operator
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+Evaluator = Callable[[Mapping], Any]
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+\.\d*|\.\d+|\d+)
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<var>\$\{[^}]+\})
+      | (?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+      | (?P<op>==|!=|<=|>=|&&|\|\||[<>()\[\],+\-*/%!])
+    )""", re.VERBOSE)
+
+_INTERPOLATION_RE = re.compile(r'\$\{([^}]+)\}')
+
+_CONSTANTS = {
+    "true": True, "True": True,
+    "false": False, "False": False,
+    "null": None, "None": None,
+}
+
+_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+_ARITHMETIC = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+}
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression cannot be parsed or evaluated."""
+
+
+class Expression:
+    """A compiled expression; call ``evaluate`` with a variables mapping."""
+
+    __slots__ = ("source", "_evaluator")
+
+    def __init__(self, source: str, evaluator: Evaluator):
+        self.source = source
+        self._evaluator = evaluator
+
+    def evaluate(self, variables: Mapping) -> Any:
+        try:
+            return self._evaluator(variables)
+        except ExpressionError:
+            raise
+        except Exception as e:
+            raise ExpressionError(f"Error evaluating {self.source!r}: {e}") from e
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+@lru_cache(maxsize=512)
+def compile_expression(source: str) -> Expression:
+    """Parse ``source`` into a cached Expression."""
+    return Expression(source, _Parser(source).parse())
+
+
+def evaluate_condition(source: str, variables: Mapping) -> bool:
+    """Compile (or fetch from cache) and evaluate a condition as a bool."""
+    return bool(compile_expression(source).evaluate(variables))
+
+
+def _tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    source = source.rstrip()
+    while position < len(source):
+        match = _TOKEN_RE.match(source, position)
+        if not match or match.end() == position:
+            raise ExpressionError(f"Unexpected character at {position} in {source!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _variable(path: str) -> Evaluator:
+    parts = path.split(".")
+    if any(part.startswith("_") for part in parts[1:]):
+        raise ExpressionError(f"Private attribute access is not allowed: {path}")
+    head, rest = parts[0], parts[1:]
+
+    def lookup(variables: Mapping) -> Any:
+        # A flat key with dots in it wins over walking the path
+        if path in variables:
+            return variables[path]
+        if head not in variables:
+            raise ExpressionError(f"Undefined variable: {path}")
+        value = variables[head]
+        for part in rest:
+            if isinstance(value, Mapping):
+                if part not in value:
+                    raise ExpressionError(f"Undefined variable: {path}")
+                value = value[part]
+            else:
+                value = getattr(value, part)
+        return value
+
+    return lookup
+
+
+def _string(text: str) -> Evaluator:
+    if "${" not in text:
+        return lambda variables: text
+
+    def interpolate(variables: Mapping) -> str:
+        return _INTERPOLATION_RE.sub(
+            lambda match: str(variables.get(match.group(1), match.group(0))), text
+        )
+
+    return interpolate
+
+
+class _Parser:
+    """Recursive-descent parser producing closures."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.position = 0
+
+    def parse(self) -> Evaluator:
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        evaluator = self._or()
+        if self.position < len(self.tokens):
+            raise ExpressionError(f"Unexpected {self._peek()[1]!r} in {self.source!r}")
+        return evaluator
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _accept(self, *values: str) -> Optional[str]:
+        token = self._peek()
+        if token and token[0] in ("op", "name") and token[1] in values:
+            self.position += 1
+            return token[1]
+        return None
+
+    def _expect(self, value: str):
+        if not self._accept(value):
+            raise ExpressionError(f"Expected {value!r} in {self.source!r}")
+
+    def _or(self) -> Evaluator:
+        operands = [self._and()]
+        while self._accept("or", "||"):
+            operands.append(self._and())
+        if len(operands) == 1:
+            return operands[0]
+
+        def any_of(variables):
+            value = None
+            for operand in operands:
+                value = operand(variables)
+                if value:
+                    return value
+            return value
+
+        return any_of
+
+    def _and(self) -> Evaluator:
+        operands = [self._not()]
+        while self._accept("and", "&&"):
+            operands.append(self._not())
+        if len(operands) == 1:
+            return operands[0]
+
+        def all_of(variables):
+            value = None
+            for operand in operands:
+                value = operand(variables)
+                if not value:
+                    return value
+            return value
+
+        return all_of
+
+    def _not(self) -> Evaluator:
+        if self._accept("not", "!"):
+            operand = self._not()
+            return lambda variables: not operand(variables)
+        return self._comparison()
+
+    def _comparison_operator(self) -> Optional[str]:
+        symbol = self._accept("==", "!=", "<", "<=", ">", ">=", "in")
+        if symbol:
+            return symbol
+        if self._accept("not"):
+            self._expect("in")
+            return "not in"
+        return None
+
+    def _comparison(self) -> Evaluator:
+        left = self._sum()
+        links = []
+        while True:
+            symbol = self._comparison_operator()
+            if not symbol:
+                break
+            links.append((_COMPARISONS[symbol], self._sum()))
+        if not links:
+            return left
+        if len(links) == 1:
+            compare, right = links[0]
+            return lambda variables: compare(left(variables), right(variables))
+
+        def chained(variables):
+            # Chained comparisons follow Python: a < b < c means a < b and b < c
+            value = left(variables)
+            for compare, operand in links:
+                next_value = operand(variables)
+                if not compare(value, next_value):
+                    return False
+                value = next_value
+            return True
+
+        return chained
+
+    def _binary(self, operand_parser: Callable[[], Evaluator], symbols: Tuple[str, ...]) -> Evaluator:
+        left = operand_parser()
+        while True:
+            symbol = self._accept(*symbols)
+            if not symbol:
+                return left
+            left = self._combine(_ARITHMETIC[symbol], left, operand_parser())
+
+    @staticmethod
+    def _combine(apply: Callable[[Any, Any], Any], left: Evaluator, right: Evaluator) -> Evaluator:
+        return lambda variables: apply(left(variables), right(variables))
+
+    def _sum(self) -> Evaluator:
+        return self._binary(self._term, ("+", "-"))
+
+    def _term(self) -> Evaluator:
+        return self._binary(self._unary, ("*", "/", "%"))
+
+    def _unary(self) -> Evaluator:
+        if self._accept("-"):
+            operand = self._unary()
+            return lambda variables: -operand(variables)
+        return self._primary()
+
+    def _primary(self) -> Evaluator:
+        token = self._peek()
+        if token is None:
+            raise ExpressionError(f"Unexpected end of {self.source!r}")
+        kind, text = token
+
+        if self._accept("("):
+            inner = self._or()
+            self._expect(")")
+            return inner
+
+        if self._accept("["):
+            items = []
+            if not self._accept("]"):
+                items.append(self._or())
+                while self._accept(","):
+                    items.append(self._or())
+                self._expect("]")
+            return lambda variables: [item(variables) for item in items]
+
+        self.position += 1
+        if kind == "number":
+            value = float(text) if "." in text else int(text)
+            return lambda variables: value
+        if kind == "string":
+            return _string(ast.literal_eval(text))
+        if kind == "var":
+            return _variable(text[2:-1].strip())
+        if kind == "name":
+            if text in _CONSTANTS:
+                constant = _CONSTANTS[text]
+                return lambda variables: constant
+            if text in ("and", "or", "not", "in"):
+                raise ExpressionError(f"Unexpected {text!r} in {self.source!r}")
+            return _variable(text)
+        raise ExpressionError(f"Unexpected {text!r} in {self.source!r}")
@@ -0,0 +1,196 @@
+"""
+Workflow Journal - Incremental persistence for workflow execution state
+
+State changes are appended to a per-workflow NDJSON journal by a background
+writer. Every ``snapshot_every`` events a full snapshot replaces the
+journal, so persistence cost follows the number of changes rather than the
+size of the workflow. Loading reads the snapshot and replays the journal
+tail written after it.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Snapshot key recording the last journal event the snapshot includes
+SNAPSHOT_SEQ_KEY = "_journal_seq"
+
+
+def apply_event(data: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """Apply one journal event to a workflow dictionary in place."""
+    event_type = event.get("type")
+    if event_type == "step":
+        for step in data.get("steps", []):
+            if step["id"] == event["step_id"]:
+                step.update(event["fields"])
+                break
+    elif event_type == "variables":
+        data.setdefault("variables", {}).update(event["updates"])
+    elif event_type == "workflow":
+        data.update(event["fields"])
+
+
+class WorkflowJournal:
+    """
+    Append-only step-event journal with periodic snapshots.
+
+    ``append`` and ``snapshot`` only enqueue work and never block the event
+    loop; a single writer task drains the queue and does file I/O in a worker
+    thread, grouping queued lines into one write per workflow.
+    """
+
+    def __init__(self, storage_path: Path, snapshot_every: int = 500, fsync: bool = False):
+        self.storage_path = storage_path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._seq: Dict[str, int] = {}
+        self._since_snapshot: Dict[str, int] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tail_checked: Set[str] = set()  # journals whose tail is known to end in a newline
+        self._writer: Optional[asyncio.Task] = None
+        self.stats = {"events": 0, "snapshots": 0, "flushes": 0}
+
+    def snapshot_path(self, workflow_id: str) -> Path:
+        return self.storage_path / f"{workflow_id}.json"
+
+    def journal_path(self, workflow_id: str) -> Path:
+        return self.storage_path / f"{workflow_id}.journal"
+
+    def append(self, workflow_id: str, event: Dict[str, Any]) -> int:
+        """Queue an event for the workflow's journal and return its sequence number."""
+        seq = self._seq.get(workflow_id, 0) + 1
+        self._seq[workflow_id] = seq
+        self._since_snapshot[workflow_id] = self._since_snapshot.get(workflow_id, 0) + 1
+        self.stats["events"] += 1
+        self._put(("append", workflow_id, json.dumps(dict(event, seq=seq), default=str)))
+        return seq
+
+    def needs_snapshot(self, workflow_id: str) -> bool:
+        return self._since_snapshot.get(workflow_id, 0) >= self.snapshot_every
+
+    def snapshot(self, workflow_id: str, data: Dict[str, Any]) -> None:
+        """Queue a full snapshot covering every event appended so far."""
+        data = dict(data)
+        data[SNAPSHOT_SEQ_KEY] = self._seq.get(workflow_id, 0)
+        self._since_snapshot[workflow_id] = 0
+        self._put(("snapshot", workflow_id, json.dumps(data, default=str)))
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far is on disk."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a workflow's snapshot and replay its journal (blocking; run in a thread).
+
+        A partially written last line, left by a crash mid-append, is ignored
+        here and cut off before the next append.
+        """
+        snapshot_file = self.snapshot_path(workflow_id)
+        if not snapshot_file.exists():
+            return None
+
+        with open(snapshot_file, "r") as f:
+            data = json.load(f)
+        last_seq = data.pop(SNAPSHOT_SEQ_KEY, 0)
+
+        journal_file = self.journal_path(workflow_id)
+        replayed = 0
+        if journal_file.exists():
+            with open(journal_file, "r") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Ignoring torn journal tail for workflow {workflow_id}")
+                        break
+                    # Events at or below the snapshot's seq survived a crash before truncation
+                    if event["seq"] > last_seq:
+                        apply_event(data, event)
+                        last_seq = event["seq"]
+                        replayed += 1
+
+        self._seq[workflow_id] = max(self._seq.get(workflow_id, 0), last_seq)
+        self._since_snapshot[workflow_id] = max(self._since_snapshot.get(workflow_id, 0), replayed)
+        return data
+
+    def _put(self, op: Tuple[str, str, str]) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+        self._queue.put_nowait(op)
+
+    async def _write_loop(self):
+        while True:
+            ops = [await self._queue.get()]
+            while not self._queue.empty():
+                ops.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._apply, ops)
+                self.stats["flushes"] += 1
+            except Exception as e:
+                logger.error(f"Workflow journal write failed: {e}")
+            finally:
+                for _ in ops:
+                    self._queue.task_done()
+
+    def _apply(self, ops: List[Tuple[str, str, str]]) -> None:
+        """Write a batch of queued operations in order (worker thread)."""
+        pending: Dict[str, List[str]] = {}
+        for kind, workflow_id, payload in ops:
+            if kind == "append":
+                pending.setdefault(workflow_id, []).append(payload)
+            else:
+                # The snapshot already contains anything appended before it
+                pending.pop(workflow_id, None)
+                self._write_snapshot(workflow_id, payload)
+
+        for workflow_id, lines in pending.items():
+            if workflow_id not in self._tail_checked:
+                self._repair_tail(workflow_id)
+                self._tail_checked.add(workflow_id)
+            with open(self.journal_path(workflow_id), "a") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+    def _repair_tail(self, workflow_id: str) -> None:
+        """Truncate a torn last line so new events don't get glued onto it."""
+        journal_file = self.journal_path(workflow_id)
+        if not journal_file.exists():
+            return
+        with open(journal_file, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                logger.warning(f"Truncated torn journal tail for workflow {workflow_id}")
+
+    def _write_snapshot(self, workflow_id: str, payload: str) -> None:
+        snapshot_file = self.snapshot_path(workflow_id)
+        tmp_file = snapshot_file.with_name(snapshot_file.name + ".tmp")
+        with open(tmp_file, "w") as f:
+            f.write(payload)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_file, snapshot_file)
+
+        # Start a fresh journal behind the snapshot
+        open(self.journal_path(workflow_id), "w").close()
+        self._tail_checked.add(workflow_id)
+        self.stats["snapshots"] += 1
@@ -0,0 +1,231 @@
+"""
+🏭 Execution Backends
+
+Pluggable task execution for the Parallel Mind Engine:
+- ThreadBackend: thread pool, for I/O-bound executors (the default)
+- ProcessBackend: process pool, for CPU-bound executors that the GIL
+  would otherwise serialize; tasks travel as picklable TaskEnvelopes
+- InlineBackend: runs coroutine (or trivial) executors on the event loop
+
+Every backend returns an asyncio future per task, so results stream back
+to the orchestrator through done-callbacks as each task finishes.
+"""
+
+import asyncio
+import importlib
+import inspect
+import logging
+import multiprocessing
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionMode(Enum):
+    """Where a task type's executors run."""
+    THREAD = "thread"
+    PROCESS = "process"
+    INLINE = "inline"
+
+
+@dataclass
+class TaskEnvelope:
+    """
+    Picklable view of a task handed to process workers.
+
+    Carries only the fields executors read, so the engine's live Task
+    (futures, datetimes, worker bookkeeping) never crosses the process boundary.
+    """
+    id: str
+    task_type: Any
+    description: str
+    input_data: Dict[str, Any] = field(default_factory=dict)
+    retry_count: int = 0
+
+    @classmethod
+    def from_task(cls, task: Any) -> "TaskEnvelope":
+        return cls(
+            id=task.id,
+            task_type=task.task_type,
+            description=task.description,
+            input_data=task.input_data,
+            retry_count=task.retry_count
+        )
+
+
+def run_envelope(executor: Callable[[Any], Any], envelope: TaskEnvelope) -> Any:
+    """Entry point in the worker process."""
+    return executor(envelope)
+
+
+def _warm_up_worker(modules: List[str], hold: float) -> int:
+    """Import executor modules in a worker and keep it busy briefly so the
+    pool has to start its next worker instead of reusing this one."""
+    for module in modules:
+        importlib.import_module(module)
+    time.sleep(hold)
+    return os.getpid()
+
+
+class ExecutionBackend(ABC):
+    """Runs task executors and reports completion as asyncio futures."""
+
+    mode: ExecutionMode
+
+    def __init__(self, workers: int, name: str):
+        self.workers = max(1, workers)
+        self.name = name
+        self.submitted = 0
+        self.warmed_up = False
+
+    @abstractmethod
+    def submit(self, executor: Callable[[Any], Any], task: Any) -> asyncio.Future:
+        """Start ``executor(task)``; must be called on the event loop."""
+
+    async def warm_up(self) -> None:
+        """Start workers ahead of the first task."""
+        self.warmed_up = True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting tasks and release workers."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode.value,
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "warmed_up": self.warmed_up
+        }
+
+
+class ThreadBackend(ExecutionBackend):
+    """Thread pool backend; executors share the engine's memory."""
+
+    mode = ExecutionMode.THREAD
+
+    def __init__(self, workers: int, name: str):
+        super().__init__(workers, name)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+
+    def submit(self, executor: Callable[[Any], Any], task: Any) -> asyncio.Future:
+        self.submitted += 1
+        return asyncio.wrap_future(self._pool.submit(executor, task))
+
+    async def warm_up(self) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _warm_up_worker, [], 0.01)
+            for _ in range(self.workers)
+        ))
+        self.warmed_up = True
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+class ProcessBackend(ExecutionBackend):
+    """
+    Process pool backend for CPU-bound task types.
+
+    Executors must be picklable (module-level functions or static methods)
+    and receive a TaskEnvelope instead of the engine's Task. Workers use the
+    ``spawn`` start method by default, since forking a process that already
+    runs threads is unsafe.
+    """
+
+    mode = ExecutionMode.PROCESS
+
+    def __init__(
+        self,
+        workers: int,
+        name: str,
+        preload_modules: Iterable[str] = (),
+        start_method: str = "spawn"
+    ):
+        super().__init__(workers, name)
+        self.preload_modules = list(preload_modules)
+        self.start_method = start_method
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+        self._worker_pids: List[int] = []
+
+    def submit(self, executor: Callable[[Any], Any], task: Any) -> asyncio.Future:
+        self.submitted += 1
+        envelope = TaskEnvelope.from_task(task)
+        return asyncio.wrap_future(self._pool.submit(run_envelope, executor, envelope))
+
+    async def warm_up(self) -> None:
+        """Spawn every worker process and import the executor modules in it."""
+        start = time.time()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _warm_up_worker, self.preload_modules, 0.05)
+            for _ in range(self.workers)
+        ))
+        self._worker_pids = sorted(set(pids))
+        self.warmed_up = True
+        logger.info(
+            f"🏭 Warmed up {len(self._worker_pids)} {self.name} worker processes "
+            f"in {(time.time() - start) * 1000:.0f}ms"
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "worker_pids": list(self._worker_pids)}
+
+
+class InlineBackend(ExecutionBackend):
+    """
+    Runs executors as tasks on the event loop.
+
+    Intended for coroutine executors (I/O that is already async) and for
+    trivial synchronous work; a blocking executor here blocks the loop.
+    """
+
+    mode = ExecutionMode.INLINE
+
+    def __init__(self, workers: int, name: str):
+        super().__init__(workers, name)
+        self._running = set()
+
+    def submit(self, executor: Callable[[Any], Any], task: Any) -> asyncio.Future:
+        self.submitted += 1
+        running = asyncio.get_running_loop().create_task(self._run(executor, task))
+        self._running.add(running)
+        running.add_done_callback(self._running.discard)
+        return running
+
+    async def _run(self, executor: Callable[[Any], Any], task: Any) -> Any:
+        result = executor(task)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        if not wait:
+            for running in list(self._running):
+                running.cancel()
+
+
+def create_backend(
+    mode: ExecutionMode,
+    workers: int,
+    name: str,
+    preload_modules: Optional[Iterable[str]] = None
+) -> ExecutionBackend:
+    """Build the backend for an execution mode."""
+    if mode == ExecutionMode.PROCESS:
+        return ProcessBackend(workers, name, preload_modules=preload_modules or ())
+    if mode == ExecutionMode.INLINE:
+        return InlineBackend(workers, name)
+    return ThreadBackend(workers, name)
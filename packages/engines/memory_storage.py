@@ -0,0 +1,420 @@
+"""
+💾 Memory Storage Backends
+
+Pluggable persistence for the Perfect Recall Engine:
+- MemoryStorageBackend: interface the engine writes through
+- JsonFileStorage: legacy single-document memories.json
+- SegmentLogStorage: append-only segment log with fsync batching,
+  periodic snapshot compaction and fast line-by-line replay
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+
+@dataclass
+class StorageStats:
+    """Write-path statistics for a storage backend."""
+    records_appended: int = 0
+    records_since_snapshot: int = 0
+    flushes: int = 0
+    fsyncs: int = 0
+    compactions: int = 0
+    replayed_records: int = 0
+    last_flush_ms: float = 0.0
+    last_compaction_ms: float = 0.0
+
+
+class MemoryStorageBackend(ABC):
+    """Interface for Perfect Recall persistence backends."""
+
+    def __init__(self):
+        self.stats = StorageStats()
+
+    @abstractmethod
+    def load(self) -> Iterator[Record]:
+        """Yield every live record in insertion order."""
+
+    @abstractmethod
+    def append_put(self, record: Record) -> None:
+        """Record an insert or update of ``record['id']``."""
+
+    @abstractmethod
+    def append_delete(self, record_id: str) -> None:
+        """Record the deletion of ``record_id``."""
+
+    @abstractmethod
+    async def flush(self) -> None:
+        """Make every appended record durable."""
+
+    @property
+    def should_compact(self) -> bool:
+        """Whether the backend would benefit from a compaction."""
+        return False
+
+    async def compact(
+        self,
+        snapshot: Callable[[], List[Any]],
+        encode: Callable[[Any], Record] = lambda record: record
+    ) -> None:
+        """Rewrite storage from the live state returned by ``snapshot``."""
+
+    async def close(self) -> None:
+        """Flush pending writes and release resources."""
+        await self.flush()
+
+
+class JsonFileStorage(MemoryStorageBackend):
+    """
+    Legacy storage: the whole corpus in one ``memories.json`` document.
+
+    Every flush rewrites the full file, so this backend is only suitable for
+    small corpora or for reading data written by older versions.
+    """
+
+    def __init__(self, storage_path: Path, filename: str = "memories.json"):
+        super().__init__()
+        self.path = Path(storage_path) / filename
+        self._records: Dict[str, Record] = {}
+        self._dirty = False
+
+    def load(self) -> Iterator[Record]:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        for record in data:
+            self._records[record['id']] = record
+            self.stats.replayed_records += 1
+            yield record
+
+    def append_put(self, record: Record) -> None:
+        self._records[record['id']] = record
+        self._dirty = True
+        self.stats.records_appended += 1
+
+    def append_delete(self, record_id: str) -> None:
+        if self._records.pop(record_id, None) is not None:
+            self._dirty = True
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        records = list(self._records.values())
+        await asyncio.to_thread(self._write, records)
+        self.stats.flushes += 1
+
+    def _write(self, records: List[Record]) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f)
+        os.replace(tmp_path, self.path)
+
+
+class SegmentLogStorage(MemoryStorageBackend):
+    """
+    Append-only segment log with snapshot compaction.
+
+    Layout under ``<storage_path>/log``::
+
+        snapshot.jsonl        header line + one live record per line
+        segment-000042.log    {"op": "put"|"del", ...} per line
+
+    Appends are buffered in memory and written + fsynced in a worker thread
+    once ``batch_size`` records are pending or ``flush_interval`` elapses,
+    so ``store_memory`` never blocks the event loop on disk I/O.
+    """
+
+    SNAPSHOT_NAME = "snapshot.jsonl"
+    SEGMENT_PREFIX = "segment-"
+    SEGMENT_SUFFIX = ".log"
+
+    def __init__(
+        self,
+        storage_path: Path,
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        segment_max_bytes: int = 16 * 1024 * 1024,
+        compact_threshold: int = 10000,
+        fsync: bool = True,
+        legacy_filename: str = "memories.json"
+    ):
+        super().__init__()
+        self.storage_path = Path(storage_path)
+        self.log_dir = self.storage_path / "log"
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.legacy_path = self.storage_path / legacy_filename
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+
+        self._buffer: List[str] = []
+        self._lock = asyncio.Lock()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+        # Never append to a segment left by an earlier process: it may end in
+        # a torn record, and new records would be glued onto it
+        latest_segment = self._latest_segment_index()
+        self._segment_index = max(latest_segment + 1 if latest_segment else 1, self._snapshot_next_segment())
+        self._segment_file = None
+        self._segment_bytes = 0
+
+    # Reading
+
+    def load(self) -> Iterator[Record]:
+        """Replay the snapshot and every later segment."""
+        if self._is_empty() and self.legacy_path.exists():
+            yield from self._migrate_legacy()
+            return
+
+        live: Dict[str, Record] = {}
+        first_segment = 1
+
+        snapshot_path = self.log_dir / self.SNAPSHOT_NAME
+        if snapshot_path.exists():
+            with open(snapshot_path, 'r') as f:
+                header = json.loads(f.readline() or "{}")
+                first_segment = header.get("next_segment", 1)
+                for line in f:
+                    record = json.loads(line)
+                    live[record['id']] = record
+
+        replayed = 0
+        for index, path in self._segments():
+            if index < first_segment:
+                continue
+            for op in self._read_segment(path):
+                if op.get("op") == "put":
+                    record = op["record"]
+                    live[record['id']] = record
+                elif op.get("op") == "del":
+                    live.pop(op["id"], None)
+                replayed += 1
+
+        self.stats.records_since_snapshot = replayed
+        self.stats.replayed_records = len(live)
+        yield from live.values()
+
+    # Writing
+
+    def append_put(self, record: Record) -> None:
+        self._append({"op": "put", "record": record})
+
+    def append_delete(self, record_id: str) -> None:
+        self._append({"op": "del", "id": record_id})
+
+    def _append(self, op: Record) -> None:
+        self._buffer.append(json.dumps(op, separators=(",", ":")) + "\n")
+        self.stats.records_appended += 1
+        self.stats.records_since_snapshot += 1
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. synchronous tooling): write through immediately
+            self._write_lines(self._drain())
+            return
+
+        if len(self._buffer) >= self.batch_size:
+            self._cancel_timer()
+            self._start_flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._flush_handle = None
+        self._start_flush(asyncio.get_running_loop())
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Flushes serialize on the lock; keep references so tasks are not collected
+        task = loop.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def _cancel_timer(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    async def flush(self) -> None:
+        async with self._lock:
+            self._cancel_timer()
+            lines = self._drain()
+            if lines:
+                await asyncio.to_thread(self._write_lines, lines)
+
+    def _drain(self) -> List[str]:
+        lines, self._buffer = self._buffer, []
+        return lines
+
+    def _write_lines(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        start = time.time()
+        if self._segment_file is None:
+            self._open_segment()
+
+        data = "".join(lines)
+        self._segment_file.write(data)
+        self._segment_file.flush()
+        if self.fsync:
+            os.fsync(self._segment_file.fileno())
+            self.stats.fsyncs += 1
+        self._segment_bytes += len(data)
+        self.stats.flushes += 1
+        self.stats.last_flush_ms = (time.time() - start) * 1000
+
+        if self._segment_bytes >= self.segment_max_bytes:
+            self._roll_segment()
+
+    # Compaction
+
+    @property
+    def should_compact(self) -> bool:
+        return self.stats.records_since_snapshot >= self.compact_threshold
+
+    async def compact(
+        self,
+        snapshot: Callable[[], List[Any]],
+        encode: Callable[[Any], Record] = lambda record: record
+    ) -> None:
+        """
+        Write a new snapshot and drop the segments it supersedes.
+
+        ``snapshot`` is called on the event loop after the current segment has
+        been sealed, so any mutation made afterwards lands in a newer segment.
+        """
+        async with self._lock:
+            self._cancel_timer()
+            lines = self._drain()
+            if lines:
+                await asyncio.to_thread(self._write_lines, lines)
+
+            start = time.time()
+            self._roll_segment()
+            next_segment = self._segment_index
+            records = snapshot()
+            self.stats.records_since_snapshot = 0
+
+            await asyncio.to_thread(self._write_snapshot, records, encode, next_segment)
+
+            self.stats.compactions += 1
+            self.stats.last_compaction_ms = (time.time() - start) * 1000
+            logger.info(f"💾 Compacted memory log: {len(records)} live records")
+
+    def _write_snapshot(
+        self,
+        records: List[Any],
+        encode: Callable[[Any], Record],
+        next_segment: int
+    ) -> None:
+        snapshot_path = self.log_dir / self.SNAPSHOT_NAME
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({"next_segment": next_segment}) + "\n")
+            for record in records:
+                f.write(json.dumps(encode(record), separators=(",", ":")) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, snapshot_path)
+        self._fsync_dir()
+
+        for index, path in self._segments():
+            if index < next_segment:
+                path.unlink(missing_ok=True)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+
+    # Segment helpers
+
+    def _segments(self) -> List[tuple]:
+        segments = []
+        for path in self.log_dir.glob(f"{self.SEGMENT_PREFIX}*{self.SEGMENT_SUFFIX}"):
+            try:
+                index = int(path.name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)])
+            except ValueError:
+                continue
+            segments.append((index, path))
+        return sorted(segments)
+
+    def _latest_segment_index(self) -> Optional[int]:
+        segments = self._segments()
+        return segments[-1][0] if segments else None
+
+    def _snapshot_next_segment(self) -> int:
+        snapshot_path = self.log_dir / self.SNAPSHOT_NAME
+        if not snapshot_path.exists():
+            return 1
+        with open(snapshot_path, 'r') as f:
+            return json.loads(f.readline() or "{}").get("next_segment", 1)
+
+    def _segment_path(self, index: int) -> Path:
+        return self.log_dir / f"{self.SEGMENT_PREFIX}{index:06d}{self.SEGMENT_SUFFIX}"
+
+    def _open_segment(self) -> None:
+        path = self._segment_path(self._segment_index)
+        self._segment_file = open(path, 'a')
+        self._segment_bytes = path.stat().st_size
+
+    def _roll_segment(self) -> None:
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+        if self._segment_path(self._segment_index).exists():
+            self._segment_index += 1
+        self._segment_bytes = 0
+
+    def _read_segment(self, path: Path) -> Iterator[Record]:
+        with open(path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the final record of a segment can be torn (by a crash
+                    # mid-write); a restart always appends to a fresh segment
+                    logger.warning(f"Skipping corrupt log record {path.name}:{line_number}")
+
+    def _is_empty(self) -> bool:
+        return not (self.log_dir / self.SNAPSHOT_NAME).exists() and not self._segments()
+
+    def _migrate_legacy(self) -> Iterator[Record]:
+        """Import a legacy memories.json into a fresh snapshot."""
+        with open(self.legacy_path, 'r') as f:
+            records = json.load(f)
+        self._write_snapshot(records, lambda record: record, self._segment_index)
+        self.legacy_path.rename(self.legacy_path.with_suffix(".json.migrated"))
+        self.stats.replayed_records = len(records)
+        logger.info(f"💾 Migrated {len(records)} memories from {self.legacy_path.name}")
+        yield from records
+
+    def _fsync_dir(self) -> None:
+        if not self.fsync or not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.log_dir, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -12,17 +12,21 @@ import asyncio
 import logging
 import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import AsyncIterator, Dict, List, Optional, Any, Callable, Union
 from queue import Queue, PriorityQueue
 
 try:
     from .base_engine import BaseEngine
+    from .task_scheduler import DependencyScheduler
+    from .execution_backends import ExecutionBackend, ExecutionMode, create_backend
 except ImportError:
     from base_engine import BaseEngine
+    from task_scheduler import DependencyScheduler
+    from execution_backends import ExecutionBackend, ExecutionMode, create_backend
 import threading
 
 logger = logging.getLogger(__name__)
@@ -109,9 +113,33 @@ class ParallelMindEngine(BaseEngine):
     complex problems into manageable parallel tasks and orchestrates their execution.
     """
     
-    def __init__(self, max_workers: int = None):
+    # Workers, per-worker concurrency and execution backend for each task type
+    DEFAULT_WORKER_CONFIGS = {
+        TaskType.CODE_GENERATION: {"count": 4, "max_concurrent": 2, "mode": ExecutionMode.THREAD},
+        TaskType.CODE_ANALYSIS: {"count": 2, "max_concurrent": 3, "mode": ExecutionMode.THREAD},
+        TaskType.TESTING: {"count": 3, "max_concurrent": 2, "mode": ExecutionMode.THREAD},
+        TaskType.DEBUGGING: {"count": 2, "max_concurrent": 1, "mode": ExecutionMode.THREAD},
+        TaskType.DOCUMENTATION: {"count": 2, "max_concurrent": 3, "mode": ExecutionMode.THREAD},
+        TaskType.DEPLOYMENT: {"count": 1, "max_concurrent": 1, "mode": ExecutionMode.THREAD},
+        TaskType.WEB_AUTOMATION: {"count": 2, "max_concurrent": 2, "mode": ExecutionMode.THREAD},
+        TaskType.DATA_PROCESSING: {"count": 2, "max_concurrent": 2, "mode": ExecutionMode.THREAD}
+    }
+    
+    def __init__(
+        self,
+        max_workers: int = None,
+        worker_configs: Optional[Dict[TaskType, Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            max_workers: Nominal worker budget reported in status
+            worker_configs: Per-task-type overrides of DEFAULT_WORKER_CONFIGS,
+                e.g. ``{TaskType.DATA_PROCESSING: {"count": 8, "mode": "process"}}``.
+                Process-mode executors must be picklable and receive a TaskEnvelope.
+        """
         super().__init__("parallel_mind", {})
         self.max_workers = max_workers or min(32, (asyncio.get_event_loop().get_debug() and 4) or 8)
+        self.worker_configs = self._merge_worker_configs(worker_configs or {})
         
         # Task management
         self.tasks: Dict[str, Task] = {}
@@ -120,11 +148,12 @@ class ParallelMindEngine(BaseEngine):
         
         # Worker management
         self.workers: Dict[str, Worker] = {}
-        self.worker_pools: Dict[TaskType, ThreadPoolExecutor] = {}
+        self.worker_pools: Dict[TaskType, ExecutionBackend] = {}
+        self._available_workers: Dict[TaskType, deque] = {}
         
         # Orchestration
-        self.dependency_graph: Dict[str, List[str]] = {}
         self.running_workflows: Dict[str, Dict[str, Any]] = {}
+        self.scheduler = DependencyScheduler()
         
         # Performance tracking
         self.performance_metrics = {
@@ -134,6 +163,9 @@ class ParallelMindEngine(BaseEngine):
             "parallel_efficiency": 0.0,
             "resource_utilization": 0.0
         }
+        self._finished_with_timing = 0
+        self._succeeded_with_timing = 0
+        self._total_task_duration = 0.0
         
         # Synchronization
         self._lock = threading.Lock()
@@ -150,6 +182,7 @@ class ParallelMindEngine(BaseEngine):
         try:
             self._initialize_workers()
             self._start_orchestrator()
+            await self.warm_up()
             return True
         except Exception as e:
             logger.error(f"Failed to initialize Parallel Mind Engine: {e}")
@@ -166,72 +199,161 @@ class ParallelMindEngine(BaseEngine):
             "performance_metrics": self.performance_metrics
         }
     
-    async def coordinate_parallel_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Coordinate parallel execution of multiple tasks"""
-        results = []
-        
-        # Convert dict tasks to Task objects
-        task_objects = []
-        for i, task_dict in enumerate(tasks):
-            task = Task(
-                id=task_dict.get("id", f"task_{i}"),
-                task_type=TaskType.CODE_ANALYSIS,  # Default type
-                description=task_dict.get("description", ""),
-                priority=TaskPriority.NORMAL,
-                input_data=task_dict,
-                dependencies=[]
-            )
-            task_objects.append(task)
+    async def coordinate_parallel_tasks(
+        self,
+        tasks: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        task_timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Coordinate parallel execution of multiple tasks.
         
-        # Execute tasks in parallel
-        for task in task_objects:
-            try:
-                # Simulate task execution
-                await asyncio.sleep(0.1)  # Simulate processing
-                
-                result = {
-                    "id": task.id,
-                    "status": "completed",
-                    "description": task.description,
-                    "result": f"Processed: {task.description}",
-                    "execution_time": 0.1,
-                    "worker_type": task.task_type.value
-                }
-                results.append(result)
+        Args:
+            tasks: Task dicts with ``id``, ``description`` and optionally
+                ``task_type`` (a TaskType value) and ``timeout``
+            max_concurrency: Most tasks of this call in flight at once
+                (defaults to ``max_workers``)
+            task_timeout: Seconds each task may take before it is reported
+                as ``timeout`` (defaults to the task's own timeout)
+            
+        Returns:
+            One result dict per task, in submission order
+        """
+        results = {}
+        async for result in self.stream_parallel_tasks(tasks, max_concurrency, task_timeout):
+            results[result["index"]] = result
+        return [results[i] for i in range(len(tasks))]
+    
+    async def stream_parallel_tasks(
+        self,
+        tasks: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        task_timeout: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fan tasks out to the worker pools and yield results as they complete.
+        
+        At most ``max_concurrency`` tasks of this call are submitted at once.
+        Cancelling the consumer, or closing the iterator early, cancels every
+        task of the call that has not finished yet.
+        """
+        task_objects = [self._task_from_dict(task_dict, i) for i, task_dict in enumerate(tasks)]
+        limit = max(1, max_concurrency or self.max_workers)
+        queued = deque(enumerate(task_objects))
+        in_flight: Dict[asyncio.Future, tuple] = {}
+        
+        try:
+            while queued or in_flight:
+                while queued and len(in_flight) < limit:
+                    index, task = queued.popleft()
+                    await self.submit_tasks([task])
+                    timeout = task_timeout if task_timeout is not None else task.timeout
+                    waiter = asyncio.ensure_future(
+                        asyncio.wait_for(asyncio.shield(self.scheduler.completion(task.id)), timeout)
+                    )
+                    in_flight[waiter] = (index, task, tasks[index].get("id", task.id))
                 
-            except Exception as e:
-                result = {
-                    "id": task.id,
-                    "status": "failed",
-                    "description": task.description,
-                    "error": str(e),
-                    "execution_time": 0.0
-                }
-                results.append(result)
-        
-        return results
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in done:
+                    index, task, display_id = in_flight.pop(waiter)
+                    timed_out = waiter.exception() is not None
+                    if timed_out:
+                        self.cancel_task(task.id)
+                    yield self._coordination_result(index, display_id, task, timed_out)
+        finally:
+            for waiter, (_, task, _) in in_flight.items():
+                waiter.cancel()
+                self.cancel_task(task.id)
+            self.scheduler.forget(task.id for task in task_objects)
+    
+    def _task_from_dict(self, task_dict: Dict[str, Any], index: int) -> Task:
+        """Build an engine Task from a coordinate_parallel_tasks dict."""
+        try:
+            task_type = TaskType(task_dict.get("task_type"))
+        except ValueError:
+            task_type = TaskType.CODE_ANALYSIS  # Default type
+        
+        task = Task(
+            id=f"coord-{uuid.uuid4().hex[:8]}-{index}",
+            task_type=task_type,
+            description=task_dict.get("description", ""),
+            priority=TaskPriority.NORMAL,
+            input_data=task_dict,
+            dependencies=[]
+        )
+        if task_dict.get("timeout") is not None:
+            task.timeout = float(task_dict["timeout"])
+        return task
+    
+    def _coordination_result(self, index: int, display_id: str, task: Task, timed_out: bool) -> Dict[str, Any]:
+        """Shape a finished (or abandoned) task as a coordination result."""
+        if task.start_time and task.end_time:
+            execution_time = (task.end_time - task.start_time).total_seconds()
+        elif task.start_time:
+            execution_time = (datetime.now() - task.start_time).total_seconds()
+        else:
+            execution_time = 0.0
+        
+        result = {
+            "id": display_id,
+            "index": index,
+            "description": task.description,
+            "execution_time": execution_time,
+            "worker_type": task.task_type.value
+        }
+        if timed_out:
+            result.update(status="timeout", error=f"Task exceeded {task.timeout}s")
+        elif task.status == TaskStatus.COMPLETED:
+            result.update(status="completed", result=task.result)
+        elif task.status == TaskStatus.CANCELLED:
+            result.update(status="cancelled", error=task.error)
+        else:
+            result.update(status="failed", error=task.error)
+        return result
+    
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        Cancel a submitted task.
+        
+        Queued tasks are dropped and their dependents failed. A task already
+        running on a thread or process worker cannot be interrupted: its future
+        is cancelled and whatever it returns is discarded.
+        
+        Returns:
+            True if the task was cancelled
+        """
+        task = self.tasks.get(task_id)
+        if task is None:
+            return False
+        
+        if task.status == TaskStatus.RUNNING:
+            future = getattr(task, "future", None)
+            return future is not None and future.cancel()
+        
+        task.status = TaskStatus.CANCELLED
+        task.error = "cancelled"
+        task.end_time = datetime.now()
+        self._finish_task(task)
+        for dependent_id in self.scheduler.mark_failed(task_id, task.error):
+            self._fail_without_running(dependent_id, self.scheduler.failure_reason(dependent_id))
+        return True
     
     def _initialize_workers(self):
         """Initialize specialized workers for different task types."""
-        worker_configs = {
-            TaskType.CODE_GENERATION: {"count": 4, "max_concurrent": 2},
-            TaskType.CODE_ANALYSIS: {"count": 2, "max_concurrent": 3},
-            TaskType.TESTING: {"count": 3, "max_concurrent": 2},
-            TaskType.DEBUGGING: {"count": 2, "max_concurrent": 1},
-            TaskType.DOCUMENTATION: {"count": 2, "max_concurrent": 3},
-            TaskType.DEPLOYMENT: {"count": 1, "max_concurrent": 1},
-            TaskType.WEB_AUTOMATION: {"count": 2, "max_concurrent": 2},
-            TaskType.DATA_PROCESSING: {"count": 2, "max_concurrent": 2}
-        }
+        if self.worker_pools:
+            return
         
-        for task_type, config in worker_configs.items():
-            # Create thread pool for this task type
-            self.worker_pools[task_type] = ThreadPoolExecutor(
-                max_workers=config["count"],
-                thread_name_prefix=f"ParallelMind-{task_type.value}"
+        for task_type, config in self.worker_configs.items():
+            # Create the execution backend for this task type
+            self.worker_pools[task_type] = create_backend(
+                config["mode"],
+                config["count"],
+                f"ParallelMind-{task_type.value}",
+                preload_modules=[type(self).__module__]
             )
             
             # Create worker metadata
+            self._available_workers[task_type] = deque()
             for i in range(config["count"]):
                 worker_id = f"{task_type.value}-worker-{i+1}"
                 self.workers[worker_id] = Worker(
@@ -239,64 +361,74 @@ class ParallelMindEngine(BaseEngine):
                     worker_type=task_type,
                     max_concurrent_tasks=config["max_concurrent"]
                 )
+                self._available_workers[task_type].append(self.workers[worker_id])
         
         logger.info(f"🔧 Initialized {len(self.workers)} specialized workers")
     
+    def _merge_worker_configs(self, overrides: Dict[TaskType, Dict[str, Any]]) -> Dict[TaskType, Dict[str, Any]]:
+        """Apply per-task-type overrides on top of the defaults."""
+        configs = {}
+        for task_type, defaults in self.DEFAULT_WORKER_CONFIGS.items():
+            config = {**defaults, **overrides.get(task_type, {})}
+            config["mode"] = ExecutionMode(config["mode"])
+            configs[task_type] = config
+        return configs
+    
+    async def warm_up(self):
+        """Start every backend's workers so the first tasks skip pool start-up."""
+        await asyncio.gather(*(pool.warm_up() for pool in self.worker_pools.values()))
+        logger.info("🔥 Parallel Mind workers warmed up")
+    
     def _start_orchestrator(self):
-        """Start the task orchestrator."""
-        self.orchestrator_task = asyncio.create_task(self._orchestrator_loop())
-        logger.info("🎭 Task orchestrator started")
-    
-    async def _orchestrator_loop(self):
-        """Main orchestrator loop that manages task execution."""
-        while not self._shutdown:
-            try:
-                await self._process_pending_tasks()
-                await self._check_completed_tasks()
-                await self._update_performance_metrics()
-                await asyncio.sleep(0.1)  # Small delay to prevent busy waiting
-            except Exception as e:
-                logger.error(f"Orchestrator error: {e}")
-                await asyncio.sleep(1)
-    
-    async def _process_pending_tasks(self):
-        """Process pending tasks and assign them to available workers."""
-        with self._lock:
-            # Get tasks ready for execution (dependencies satisfied)
-            ready_tasks = []
-            
-            for task in self.tasks.values():
-                if (task.status == TaskStatus.PENDING and 
-                    self._are_dependencies_satisfied(task)):
-                    ready_tasks.append(task)
-            
-            # Sort by priority
-            ready_tasks.sort(key=lambda t: t.priority.value, reverse=True)
-            
-            # Assign tasks to available workers
-            for task in ready_tasks:
-                worker = self._find_available_worker(task.task_type)
-                if worker:
-                    await self._assign_task_to_worker(task, worker)
-    
-    def _are_dependencies_satisfied(self, task: Task) -> bool:
-        """Check if all task dependencies are satisfied."""
-        for dep_id in task.dependencies:
-            if dep_id not in self.completed_tasks:
-                return False
-            if self.completed_tasks[dep_id].status != TaskStatus.COMPLETED:
-                return False
-        return True
+        """Start the task orchestrator.
+        
+        Orchestration is event-driven: tasks are dispatched when they are
+        submitted and whenever a running task finishes, so there is no
+        polling loop to start.
+        """
+        logger.info("🎭 Task orchestrator ready (event-driven)")
+    
+    async def submit_tasks(self, tasks: List[Task]) -> List[str]:
+        """
+        Submit tasks for execution; each starts as soon as its dependencies succeed.
+        
+        Returns:
+            The submitted task ids
+        """
+        for task in tasks:
+            self.tasks[task.id] = task
+        
+        for task in tasks:
+            failed_dep = self.scheduler.add(
+                task.id,
+                task.task_type,
+                task.priority.value,
+                task.dependencies
+            )
+            if failed_dep is not None:
+                self._fail_without_running(task.id, self.scheduler.failure_reason(task.id))
+        
+        self._dispatch_ready_tasks()
+        return [task.id for task in tasks]
+    
+    def _dispatch_ready_tasks(self):
+        """Assign ready tasks to workers with free capacity."""
+        for task_type in self.scheduler.ready_types():
+            while self.scheduler.has_ready(task_type):
+                worker = self._find_available_worker(task_type)
+                if worker is None:
+                    break
+                task_id = self.scheduler.pop_ready(task_type)
+                if task_id is None:
+                    break
+                self._assign_task_to_worker(self.tasks[task_id], worker)
     
     def _find_available_worker(self, task_type: TaskType) -> Optional[Worker]:
-        """Find an available worker for the given task type."""
-        for worker in self.workers.values():
-            if (worker.worker_type == task_type and 
-                len(worker.current_tasks) < worker.max_concurrent_tasks):
-                return worker
-        return None
+        """Find an available worker for the given task type (O(1))."""
+        available = self._available_workers.get(task_type)
+        return available[0] if available else None
     
-    async def _assign_task_to_worker(self, task: Task, worker: Worker):
+    def _assign_task_to_worker(self, task: Task, worker: Worker):
         """Assign a task to a worker."""
         task.status = TaskStatus.RUNNING
         task.worker_id = worker.id
@@ -305,50 +437,97 @@ class ParallelMindEngine(BaseEngine):
         worker.current_tasks.append(task.id)
         worker.is_busy = True
         worker.last_activity = datetime.now()
+        if len(worker.current_tasks) >= worker.max_concurrent_tasks:
+            self._available_workers[worker.worker_type].popleft()
         
-        # Submit task to appropriate thread pool
+        # Submit task to the backend for its type; process backends ship a
+        # TaskEnvelope, so the executor is resolved here rather than in the worker
         future = self.worker_pools[task.task_type].submit(
-            self._execute_task, task
+            self._get_task_executor(task.task_type), task
         )
         
-        # Store future for tracking
+        # Store future for tracking; completion is delivered back on the event loop
         task.future = future
+        future.add_done_callback(
+            lambda done, task=task, worker=worker: self._on_task_finished(task, worker, done)
+        )
         
-        logger.info(f"⚡ Assigned task {task.id} to worker {worker.id}")
+        logger.debug(f"⚡ Assigned task {task.id} to worker {worker.id}")
     
-    def _execute_task(self, task: Task) -> Any:
-        """Execute a single task."""
-        try:
-            # Get the appropriate task executor
-            executor = self._get_task_executor(task.task_type)
-            
-            # Execute the task
-            result = executor(task)
-            
-            # Update task status
+    def _release_worker(self, task: Task, worker: Worker):
+        """Return a worker slot after a task finishes."""
+        if task.id not in worker.current_tasks:
+            return
+        was_full = len(worker.current_tasks) >= worker.max_concurrent_tasks
+        worker.current_tasks.remove(task.id)
+        worker.is_busy = len(worker.current_tasks) > 0
+        worker.last_activity = datetime.now()
+        if was_full:
+            self._available_workers[worker.worker_type].append(worker)
+    
+    def _on_task_finished(self, task: Task, worker: Worker, done: asyncio.Future):
+        """Handle a finished task on the event loop and dispatch its dependents."""
+        self._release_worker(task, worker)
+        
+        error = None if done.cancelled() else done.exception()
+        
+        if done.cancelled():
+            task.status = TaskStatus.CANCELLED
+            task.error = "cancelled"
+            task.end_time = datetime.now()
+            self._finish_task(task)
+            for dependent_id in self.scheduler.mark_failed(task.id, task.error):
+                self._fail_without_running(dependent_id, self.scheduler.failure_reason(dependent_id))
+        elif error is None:
             task.status = TaskStatus.COMPLETED
-            task.result = result
+            task.result = done.result()
             task.end_time = datetime.now()
             task.progress = 100.0
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Task {task.id} failed: {e}")
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
+            worker.total_completed += 1
+            self._finish_task(task)
+            self.scheduler.mark_succeeded(task.id)
+        else:
+            logger.error(f"Task {task.id} failed: {error}")
+            task.error = str(error)
             task.end_time = datetime.now()
             
             # Retry logic
-            if task.retry_count < task.max_retries:
+            if task.retry_count < task.max_retries and not self._shutdown:
                 task.retry_count += 1
                 task.status = TaskStatus.PENDING
                 logger.info(f"Retrying task {task.id} (attempt {task.retry_count})")
-            
-            return None
+                self.scheduler.requeue(task.id)
+            else:
+                task.status = TaskStatus.FAILED
+                worker.total_failed += 1
+                self._finish_task(task)
+                for dependent_id in self.scheduler.mark_failed(task.id, task.error):
+                    self._fail_without_running(dependent_id, self.scheduler.failure_reason(dependent_id))
+        
+        if not self._shutdown:
+            self._dispatch_ready_tasks()
+    
+    def _fail_without_running(self, task_id: str, reason: Optional[str]):
+        """Fail a task whose dependencies can no longer succeed."""
+        task = self.tasks.get(task_id)
+        if task is None:
+            return
+        task.status = TaskStatus.FAILED
+        task.error = reason
+        task.end_time = datetime.now()
+        self._finish_task(task)
+    
+    def _finish_task(self, task: Task):
+        """Move a finished task out of the active set and update metrics."""
+        self.tasks.pop(task.id, None)
+        self.completed_tasks[task.id] = task
+        self._record_task_metrics(task)
     
     def _get_task_executor(self, task_type: TaskType) -> Callable:
-        """Get the appropriate executor function for a task type."""
+        """Get the appropriate executor function for a task type.
+        
+        Executors are static methods so process backends can pickle them.
+        """
         executors = {
             TaskType.CODE_GENERATION: self._execute_code_generation,
             TaskType.CODE_ANALYSIS: self._execute_code_analysis,
@@ -362,7 +541,8 @@ class ParallelMindEngine(BaseEngine):
         
         return executors.get(task_type, self._execute_generic_task)
     
-    def _execute_code_generation(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_code_generation(task: Task) -> Dict[str, Any]:
         """Execute code generation task."""
         # Simulate code generation
         time.sleep(2)  # Simulate processing time
@@ -374,7 +554,8 @@ class ParallelMindEngine(BaseEngine):
             "quality_score": 0.95
         }
     
-    def _execute_code_analysis(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_code_analysis(task: Task) -> Dict[str, Any]:
         """Execute code analysis task."""
         time.sleep(1)
         
@@ -389,7 +570,8 @@ class ParallelMindEngine(BaseEngine):
             "issues_found": 2
         }
     
-    def _execute_testing(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_testing(task: Task) -> Dict[str, Any]:
         """Execute testing task."""
         time.sleep(1.5)
         
@@ -404,7 +586,8 @@ class ParallelMindEngine(BaseEngine):
             "execution_time": 1.5
         }
     
-    def _execute_debugging(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_debugging(task: Task) -> Dict[str, Any]:
         """Execute debugging task."""
         time.sleep(3)
         
@@ -418,7 +601,8 @@ class ParallelMindEngine(BaseEngine):
             "remaining_issues": ["Performance bottleneck in data processing"]
         }
     
-    def _execute_documentation(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_documentation(task: Task) -> Dict[str, Any]:
         """Execute documentation task."""
         time.sleep(1)
         
@@ -432,7 +616,8 @@ class ParallelMindEngine(BaseEngine):
             "format": "markdown"
         }
     
-    def _execute_deployment(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_deployment(task: Task) -> Dict[str, Any]:
         """Execute deployment task."""
         time.sleep(4)
         
@@ -444,7 +629,8 @@ class ParallelMindEngine(BaseEngine):
             "health_check": "passed"
         }
     
-    def _execute_web_automation(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_web_automation(task: Task) -> Dict[str, Any]:
         """Execute web automation task."""
         time.sleep(2)
         
@@ -459,7 +645,8 @@ class ParallelMindEngine(BaseEngine):
             "execution_time": 2.0
         }
     
-    def _execute_data_processing(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_data_processing(task: Task) -> Dict[str, Any]:
         """Execute data processing task."""
         time.sleep(2.5)
         
@@ -474,7 +661,8 @@ class ParallelMindEngine(BaseEngine):
             "data_quality_score": 0.98
         }
     
-    def _execute_generic_task(self, task: Task) -> Dict[str, Any]:
+    @staticmethod
+    def _execute_generic_task(task: Task) -> Dict[str, Any]:
         """Execute generic task."""
         time.sleep(1)
         
@@ -484,34 +672,13 @@ class ParallelMindEngine(BaseEngine):
             "execution_time": 1.0
         }
     
-    async def _check_completed_tasks(self):
-        """Check for completed tasks and update worker status."""
-        with self._lock:
-            completed_task_ids = []
-            
-            for task in self.tasks.values():
-                if (task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED] and 
-                    hasattr(task, 'future') and task.future.done()):
-                    
-                    # Update worker status
-                    if task.worker_id:
-                        worker = self.workers.get(task.worker_id)
-                        if worker and task.id in worker.current_tasks:
-                            worker.current_tasks.remove(task.id)
-                            worker.is_busy = len(worker.current_tasks) > 0
-                            
-                            if task.status == TaskStatus.COMPLETED:
-                                worker.total_completed += 1
-                            else:
-                                worker.total_failed += 1
-                    
-                    # Move to completed tasks
-                    self.completed_tasks[task.id] = task
-                    completed_task_ids.append(task.id)
-            
-            # Remove from active tasks
-            for task_id in completed_task_ids:
-                del self.tasks[task_id]
+    def _record_task_metrics(self, task: Task):
+        """Fold a finished task into the running performance metrics."""
+        if task.start_time and task.end_time:
+            self._finished_with_timing += 1
+            self._total_task_duration += (task.end_time - task.start_time).total_seconds()
+            if task.status == TaskStatus.COMPLETED:
+                self._succeeded_with_timing += 1
     
     async def _update_performance_metrics(self):
         """Update performance metrics."""
@@ -519,22 +686,10 @@ class ParallelMindEngine(BaseEngine):
         if total_tasks == 0:
             return
         
-        # Calculate metrics
-        total_duration = 0
-        successful_tasks = 0
-        
-        for task in self.completed_tasks.values():
-            if task.start_time and task.end_time:
-                duration = (task.end_time - task.start_time).total_seconds()
-                total_duration += duration
-                
-                if task.status == TaskStatus.COMPLETED:
-                    successful_tasks += 1
-        
         self.performance_metrics.update({
             "total_tasks_processed": total_tasks,
-            "average_task_duration": total_duration / total_tasks if total_tasks > 0 else 0,
-            "success_rate": successful_tasks / total_tasks if total_tasks > 0 else 0,
+            "average_task_duration": self._total_task_duration / total_tasks,
+            "success_rate": self._succeeded_with_timing / total_tasks,
             "parallel_efficiency": self._calculate_parallel_efficiency(),
             "resource_utilization": self._calculate_resource_utilization()
         })
@@ -770,10 +925,6 @@ class ParallelMindEngine(BaseEngine):
         """
         start_time = datetime.now()
         
-        # Add tasks to the system
-        for task in tasks:
-            self.tasks[task.id] = task
-        
         # Track workflow
         self.running_workflows[workflow_id] = {
             "start_time": start_time,
@@ -783,40 +934,29 @@ class ParallelMindEngine(BaseEngine):
         
         logger.info(f"🚀 Starting workflow {workflow_id} with {len(tasks)} tasks")
         
-        # Wait for completion or timeout
+        # Submit and wait for completion signals (or timeout)
+        task_ids = await self.submit_tasks(tasks)
+        if not await self.scheduler.wait(task_ids, timeout=timeout):
+            logger.warning(f"Workflow {workflow_id} timed out")
+        
         completed_tasks = 0
         failed_tasks = 0
         results = {}
         errors = []
         
-        while True:
-            # Check completion status
-            completed_count = 0
-            failed_count = 0
-            
-            for task_id in self.running_workflows[workflow_id]["task_ids"]:
-                if task_id in self.completed_tasks:
-                    task = self.completed_tasks[task_id]
-                    if task.status == TaskStatus.COMPLETED:
-                        completed_count += 1
-                        results[task_id] = task.result
-                    elif task.status == TaskStatus.FAILED:
-                        failed_count += 1
-                        errors.append(f"Task {task_id}: {task.error}")
-            
-            completed_tasks = completed_count
-            failed_tasks = failed_count
-            
-            # Check if all tasks are done
-            if completed_tasks + failed_tasks >= len(tasks):
-                break
-            
-            # Check timeout
-            if (datetime.now() - start_time).total_seconds() > timeout:
-                logger.warning(f"Workflow {workflow_id} timed out")
-                break
-            
-            await asyncio.sleep(0.5)
+        for task_id in task_ids:
+            task = self.completed_tasks.get(task_id)
+            if task is None:
+                continue
+            if task.status == TaskStatus.COMPLETED:
+                completed_tasks += 1
+                results[task_id] = task.result
+            elif task.status == TaskStatus.FAILED:
+                failed_tasks += 1
+                errors.append(f"Task {task_id}: {task.error}")
+        self.scheduler.forget(task_ids)
+        
+        await self._update_performance_metrics()
         
         end_time = datetime.now()
         total_duration = (end_time - start_time).total_seconds()
@@ -848,6 +988,7 @@ class ParallelMindEngine(BaseEngine):
     
     async def get_system_status(self) -> Dict[str, Any]:
         """Get current system status and metrics."""
+        await self._update_performance_metrics()
         active_tasks = len(self.tasks)
         completed_tasks = len(self.completed_tasks)
         
@@ -868,6 +1009,9 @@ class ParallelMindEngine(BaseEngine):
             "completed_tasks": completed_tasks,
             "running_workflows": len(self.running_workflows),
             "workers": worker_status,
+            "execution_backends": {
+                task_type.value: pool.get_stats() for task_type, pool in self.worker_pools.items()
+            },
             "performance_metrics": self.performance_metrics,
             "system_health": "optimal" if self.performance_metrics["success_rate"] > 0.9 else "degraded"
         }
@@ -878,10 +1022,6 @@ class ParallelMindEngine(BaseEngine):
         
         self._shutdown = True
         
-        # Cancel orchestrator
-        if hasattr(self, 'orchestrator_task'):
-            self.orchestrator_task.cancel()
-        
         # Shutdown worker pools
         for pool in self.worker_pools.values():
             pool.shutdown(wait=True)
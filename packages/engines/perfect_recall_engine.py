@@ -9,7 +9,6 @@ Advanced Memory Management with Semantic Understanding:
 """
 
 import asyncio
-import json
 import logging
 import hashlib
 from datetime import datetime
@@ -19,8 +18,16 @@ from pathlib import Path
 
 try:
     from .base_engine import BaseEngine
+    from .vector_index import VectorIndex
+    from .memory_storage import MemoryStorageBackend, SegmentLogStorage
+    from ..memory.embedding_store import EmbeddingStore
+    from ..memory.embedding_service import EmbeddingService, hash_embedding
 except ImportError:
     from base_engine import BaseEngine
+    from vector_index import VectorIndex
+    from memory_storage import MemoryStorageBackend, SegmentLogStorage
+    from packages.memory.embedding_store import EmbeddingStore
+    from packages.memory.embedding_service import EmbeddingService, hash_embedding
 
 logger = logging.getLogger(__name__)
 
@@ -53,14 +60,20 @@ class PerfectRecallEngine(BaseEngine):
     with semantic understanding and intelligent pattern matching.
     """
     
-    def __init__(self, storage_path: str = "data/memory"):
+    def __init__(
+        self,
+        storage_path: str = "data/memory",
+        storage_backend: Optional[MemoryStorageBackend] = None
+    ):
         super().__init__("perfect_recall", {})
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
+        # Persistence backend (append-only segment log by default)
+        self.storage = storage_backend or SegmentLogStorage(self.storage_path)
+        
         # Memory storage
         self.memory_db = {}
-        self.embeddings_cache = {}
         self.knowledge_graph = {}
         
         # Configuration
@@ -68,6 +81,16 @@ class PerfectRecallEngine(BaseEngine):
         self.embedding_dimension = 384
         self.similarity_threshold = 0.7
         
+        # Batched, cached embedding generation off the event loop
+        self.embedding_service = EmbeddingService(dimension=self.embedding_dimension)
+        
+        # Memory-mapped float32 embeddings with an ANN index over them
+        self.embedding_store = EmbeddingStore(
+            self.embedding_dimension,
+            path=self.storage_path / "embeddings"
+        )
+        self.vector_index = VectorIndex(self.embedding_dimension, store=self.embedding_store)
+        
         # Initialize components
         self._initialize_storage()
         self._load_existing_memories()
@@ -139,63 +162,92 @@ class PerfectRecallEngine(BaseEngine):
     
     def _load_existing_memories(self):
         """Load existing memories from storage."""
-        memory_file = self.storage_path / "memories.json"
-        if memory_file.exists():
-            try:
-                with open(memory_file, 'r') as f:
-                    data = json.load(f)
-                    for entry_data in data:
-                        entry = MemoryEntry(**entry_data)
-                        entry.timestamp = datetime.fromisoformat(entry.timestamp)
-                        self.memory_db[entry.id] = entry
-                logger.info(f"📚 Loaded {len(self.memory_db)} existing memories")
-            except Exception as e:
-                logger.error(f"Failed to load memories: {e}")
+        try:
+            regenerated = 0
+            for record in self.storage.load():
+                entry = self._record_to_entry(record)
+                self.memory_db[entry.id] = entry
+                if not entry.embedding and entry.id not in self.embedding_store:
+                    # Embedding table was not flushed before shutdown
+                    entry.embedding = self._generate_embedding(entry.content)
+                    regenerated += 1
+                self._index_entry(entry)
+            if regenerated:
+                logger.warning(f"Regenerated {regenerated} missing embeddings")
+            logger.info(f"📚 Loaded {len(self.memory_db)} existing memories")
+        except Exception as e:
+            logger.error(f"Failed to load memories: {e}")
     
-    def _save_memories(self):
-        """Save memories to persistent storage."""
-        memory_file = self.storage_path / "memories.json"
+    def _entry_to_record(self, entry: MemoryEntry) -> Dict[str, Any]:
+        """Serialize a memory entry for the storage backend."""
+        record = asdict(entry)
+        record['timestamp'] = entry.timestamp.isoformat()
+        return record
+    
+    def _record_to_entry(self, record: Dict[str, Any]) -> MemoryEntry:
+        """Deserialize a storage record into a memory entry."""
+        entry = MemoryEntry(**record)
+        entry.timestamp = datetime.fromisoformat(entry.timestamp)
+        return entry
+    
+    async def _persist_memory(self, entry: MemoryEntry):
+        """Append a memory to the storage log, compacting when it grows large."""
+        await self._persist_memories([entry])
+    
+    async def _persist_memories(self, entries: List[MemoryEntry]):
+        """Append updated memories to the storage log (one group flush), compacting when it grows large."""
         try:
-            data = []
-            for entry in self.memory_db.values():
-                entry_dict = asdict(entry)
-                entry_dict['timestamp'] = entry.timestamp.isoformat()
-                data.append(entry_dict)
-            
-            with open(memory_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.debug(f"💾 Saved {len(data)} memories to storage")
+            for entry in entries:
+                self.storage.append_put(self._entry_to_record(entry))
+            if self.storage.should_compact:
+                await self.storage.compact(lambda: list(self.memory_db.values()), self._entry_to_record)
+                await asyncio.to_thread(self.embedding_store.flush)
         except Exception as e:
-            logger.error(f"Failed to save memories: {e}")
+            logger.error(f"Failed to save memory: {e}")
     
-    def _generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using available models."""
+    async def flush_memories(self):
+        """Make all stored memories durable."""
+        await self.storage.flush()
+        await asyncio.to_thread(self.embedding_store.flush)
+    
+    async def shutdown(self) -> bool:
+        """Flush pending writes and shut down the engine."""
         try:
-            # Try to use sentence-transformers if available
-            from sentence_transformers import SentenceTransformer
-            if not hasattr(self, '_embedding_model'):
-                self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-            return self._embedding_model.encode(text).tolist()
-        except ImportError:
-            # Fallback to simple hash-based embedding
-            return self._simple_embedding(text)
+            await self.storage.close()
+            await asyncio.to_thread(self.embedding_store.close)
+            await self.embedding_service.close()
+        except Exception as e:
+            logger.error(f"Failed to flush memories on shutdown: {e}")
+        return await super().shutdown()
+    
+    def _index_entry(self, entry: MemoryEntry):
+        """
+        Move a memory entry's embedding into the embedding store and index it.
+        
+        The per-entry ``List[float]`` is dropped afterwards; use
+        ``get_embedding`` for a zero-copy view of the stored vector.
+        """
+        if entry.embedding:
+            self.vector_index.add(entry.id, entry.embedding, entry.content_type, entry.tags)
+            entry.embedding = None
+        else:
+            self.vector_index.attach(entry.id, entry.content_type, entry.tags)
+    
+    def get_embedding(self, memory_id: str) -> Optional[Any]:
+        """Get a read-only (normalized) view of a memory's embedding."""
+        return self.embedding_store.get(memory_id)
+    
+    def _generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding for text on the calling thread (sync code paths)."""
+        return self.embedding_service.embed_sync(text)
+    
+    async def _generate_embedding_async(self, text: str) -> List[float]:
+        """Generate embedding for text, batched with concurrent requests."""
+        return await self.embedding_service.embed(text)
     
     def _simple_embedding(self, text: str) -> List[float]:
         """Simple hash-based embedding fallback."""
-        # Create a simple embedding based on text characteristics
-        words = text.lower().split()
-        embedding = [0.0] * self.embedding_dimension
-        
-        for i, word in enumerate(words[:self.embedding_dimension]):
-            hash_val = hash(word) % 1000
-            embedding[i % self.embedding_dimension] += hash_val / 1000.0
-        
-        # Normalize
-        magnitude = sum(x*x for x in embedding) ** 0.5
-        if magnitude > 0:
-            embedding = [x / magnitude for x in embedding]
-        
-        return embedding
+        return hash_embedding(text, self.embedding_dimension)
     
     def _calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """Calculate cosine similarity between embeddings."""
@@ -273,7 +325,7 @@ class PerfectRecallEngine(BaseEngine):
         memory_id = hashlib.md5(f"{content}{datetime.now().isoformat()}".encode()).hexdigest()
         
         # Generate embedding
-        embedding = self._generate_embedding(content)
+        embedding = await self._generate_embedding_async(content)
         
         # Create memory entry
         entry = MemoryEntry(
@@ -289,6 +341,10 @@ class PerfectRecallEngine(BaseEngine):
         
         # Store in memory database
         self.memory_db[memory_id] = entry
+        self._index_entry(entry)
+        
+        # Append to persistent storage
+        await self._persist_memory(entry)
         
         # Store in vector database if available
         if self.collection:
@@ -314,9 +370,6 @@ class PerfectRecallEngine(BaseEngine):
         if len(self.memory_db) > self.max_memory_entries:
             await self._cleanup_old_memories()
         
-        # Save to persistent storage
-        self._save_memories()
-        
         logger.info(f"🧠 Stored memory: {content_type} - {len(content)} chars")
         return memory_id
     
@@ -341,40 +394,41 @@ class PerfectRecallEngine(BaseEngine):
         Returns:
             List of recall results sorted by relevance
         """
-        query_embedding = self._generate_embedding(query)
+        query_embedding = await self._generate_embedding_async(query)
         results = []
         
         min_sim = min_similarity or self.similarity_threshold
         
-        # Search through all memories
-        for entry in self.memory_db.values():
-            # Apply filters
-            if content_types and entry.content_type not in content_types:
+        # Vectorized search with content_type/tag pre-filters applied by the index
+        hits = self.vector_index.search(
+            query_embedding,
+            content_types=content_types,
+            tags=tags,
+            min_similarity=min_sim
+        )
+        
+        for memory_id, similarity in hits:
+            entry = self.memory_db.get(memory_id)
+            if entry is None:
                 continue
             
-            if tags and not any(tag in entry.tags for tag in tags):
-                continue
+            # Calculate relevance score (combination of similarity and success score)
+            relevance = (similarity * 0.7) + (entry.success_score * 0.2) + (entry.usage_count * 0.1)
             
-            # Calculate similarity
-            if entry.embedding:
-                similarity = self._calculate_similarity(query_embedding, entry.embedding)
-                
-                if similarity >= min_sim:
-                    # Calculate relevance score (combination of similarity and success score)
-                    relevance = (similarity * 0.7) + (entry.success_score * 0.2) + (entry.usage_count * 0.1)
-                    
-                    results.append(RecallResult(
-                        entry=entry,
-                        similarity_score=similarity,
-                        relevance_score=relevance
-                    ))
+            results.append(RecallResult(
+                entry=entry,
+                similarity_score=similarity,
+                relevance_score=relevance
+            ))
         
         # Sort by relevance score
         results.sort(key=lambda x: x.relevance_score, reverse=True)
         
-        # Update usage counts
+        # Update usage counts; they drive ranking and cleanup, so log them too
         for result in results[:limit]:
             result.entry.usage_count += 1
+        if results:
+            await self._persist_memories([result.entry for result in results[:limit]])
         
         logger.info(f"🔍 Recalled {len(results[:limit])} memories for query: {query[:50]}...")
         return results[:limit]
@@ -451,6 +505,8 @@ class PerfectRecallEngine(BaseEngine):
         
         for entry in to_remove:
             del self.memory_db[entry.id]
+            self.vector_index.remove(entry.id)
+            self.storage.append_delete(entry.id)
             
             # Remove from vector database
             if self.collection:
@@ -484,6 +540,10 @@ class PerfectRecallEngine(BaseEngine):
             "total_usage_count": total_usage,
             "average_success_score": round(avg_success_score, 2),
             "knowledge_graph_entities": len(self.knowledge_graph),
+            "vector_index": asdict(self.vector_index.get_stats()),
+            "storage": asdict(self.storage.stats),
+            "embedding_store": self.embedding_store.memory_stats(),
+            "embedding_service": self.embedding_service.get_stats(),
             "storage_path": str(self.storage_path),
             "vector_db_available": self.collection is not None,
             "knowledge_graph_available": self.neo4j_driver is not None
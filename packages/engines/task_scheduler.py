@@ -0,0 +1,259 @@
+"""
+🗓️ Dependency Scheduler
+
+Event-driven DAG scheduling for the Parallel Mind Engine:
+- In-degree counters per task, decremented as dependencies finish
+- Per-task-type priority ready queues (no rescans of the task table)
+- Per-task asyncio futures resolved on completion, so waiters wake
+  immediately instead of polling
+- Failure of a dependency fails its dependents instead of stranding them
+"""
+
+import asyncio
+import heapq
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+@dataclass
+class SchedulerStats:
+    """Counters for a dependency scheduler."""
+    tasks_added: int = 0
+    tasks_ready: int = 0
+    tasks_succeeded: int = 0
+    tasks_failed: int = 0
+    tasks_requeued: int = 0
+    dependency_failures: int = 0
+
+
+class DependencyScheduler:
+    """
+    Tracks task dependencies and hands out tasks whose dependencies are met.
+
+    The scheduler is not thread-safe: all calls are expected to happen on the
+    event loop thread. Worker threads report completion back to the loop.
+    """
+
+    def __init__(self):
+        self._task_type: Dict[str, Hashable] = {}
+        self._priority: Dict[str, int] = {}
+        self._in_degree: Dict[str, int] = {}
+        self._dependents: Dict[str, List[str]] = defaultdict(list)
+        self._ready: Dict[Hashable, List[Tuple[int, int, str]]] = defaultdict(list)
+        self._succeeded: Set[str] = set()
+        self._failed: Dict[str, str] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._release_on_finish: Set[str] = set()
+        self._sequence = itertools.count()
+        self.stats = SchedulerStats()
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._task_type
+
+    @property
+    def pending_count(self) -> int:
+        """Tasks added but not finished yet."""
+        return len(self._task_type) - len(self._succeeded) - len(self._failed)
+
+    def add(
+        self,
+        task_id: str,
+        task_type: Hashable,
+        priority: int = 0,
+        dependencies: Iterable[str] = ()
+    ) -> Optional[str]:
+        """
+        Register a task.
+
+        Dependencies that have not been added yet are waited for; dependencies
+        that already failed fail the task immediately. Re-adding the id of a
+        finished task starts it afresh.
+
+        Returns:
+            The failed dependency id if the task could never run, else None
+        """
+        if task_id in self._succeeded or task_id in self._failed:
+            self._forget(task_id)
+        self._task_type[task_id] = task_type
+        self._priority[task_id] = priority
+        self.stats.tasks_added += 1
+        self.completion(task_id)
+
+        in_degree = 0
+        for dep_id in set(dependencies):
+            if dep_id in self._failed:
+                self._fail(task_id, f"Dependency {dep_id} failed")
+                return dep_id
+            if dep_id not in self._succeeded:
+                self._dependents[dep_id].append(task_id)
+                in_degree += 1
+
+        self._in_degree[task_id] = in_degree
+        if in_degree == 0:
+            self._push_ready(task_id)
+        return None
+
+    def ready_types(self) -> List[Hashable]:
+        """Task types that currently have ready tasks."""
+        return [task_type for task_type, queue in self._ready.items() if queue]
+
+    def has_ready(self, task_type: Hashable) -> bool:
+        queue = self._ready.get(task_type)
+        if not queue:
+            return False
+        self._prune(queue)
+        return bool(queue)
+
+    def pop_ready(self, task_type: Hashable) -> Optional[str]:
+        """Take the highest-priority ready task of a type."""
+        queue = self._ready.get(task_type)
+        if not queue:
+            return None
+        self._prune(queue)
+        return heapq.heappop(queue)[2] if queue else None
+
+    def requeue(self, task_id: str) -> None:
+        """Put a dispatched task back on its ready queue (e.g. for a retry)."""
+        self.stats.tasks_requeued += 1
+        self._push_ready(task_id)
+
+    def mark_succeeded(self, task_id: str) -> List[str]:
+        """
+        Record a successful task.
+
+        Returns:
+            Ids of dependents that became ready
+        """
+        self._succeeded.add(task_id)
+        self.stats.tasks_succeeded += 1
+        self._resolve(task_id, True)
+
+        newly_ready = []
+        for dependent in self._dependents.pop(task_id, ()):
+            # Skip dependents that already failed or were released by forget()
+            if dependent in self._failed or dependent not in self._task_type:
+                continue
+            self._in_degree[dependent] -= 1
+            if self._in_degree[dependent] == 0:
+                self._push_ready(dependent)
+                newly_ready.append(dependent)
+        self._release_if_forgotten(task_id)
+        return newly_ready
+
+    def mark_failed(self, task_id: str, error: str = "") -> List[str]:
+        """
+        Record a failed task and fail everything downstream of it.
+
+        Returns:
+            Ids of dependents failed as a consequence
+        """
+        self._fail(task_id, error)
+
+        cascaded = []
+        stack = [(dependent, task_id) for dependent in self._dependents.pop(task_id, ())]
+        while stack:
+            dependent, parent = stack.pop()
+            if dependent in self._failed or dependent in self._succeeded or dependent not in self._task_type:
+                continue
+            self._fail(dependent, f"Dependency {parent} failed")
+            self.stats.dependency_failures += 1
+            cascaded.append(dependent)
+            stack.extend((child, dependent) for child in self._dependents.pop(dependent, ()))
+        for failed_id in [task_id, *cascaded]:
+            self._release_if_forgotten(failed_id)
+        return cascaded
+
+    def completion(self, task_id: str) -> asyncio.Future:
+        """Future resolved with True/False when the task finishes."""
+        future = self._futures.get(task_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[task_id] = future
+            if task_id in self._succeeded:
+                future.set_result(True)
+            elif task_id in self._failed:
+                future.set_result(False)
+        return future
+
+    async def wait(self, task_ids: Iterable[str], timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every task in ``task_ids`` has finished.
+
+        Returns:
+            False if the timeout expired first
+        """
+        futures = [self.completion(task_id) for task_id in task_ids]
+        if not futures:
+            return True
+        _, pending = await asyncio.wait(futures, timeout=timeout)
+        return not pending
+
+    def failure_reason(self, task_id: str) -> Optional[str]:
+        return self._failed.get(task_id)
+
+    def forget(self, task_ids: Iterable[str]) -> int:
+        """
+        Release all state kept for tasks whose results have been delivered.
+
+        Finished tasks are dropped right away; tasks still pending or running
+        are dropped as soon as they finish. A forgotten id is unknown to the
+        scheduler afterwards, so a task added later that depends on it waits
+        for it to be added again: only forget tasks nothing will depend on.
+
+        Returns:
+            Number of tasks released immediately
+        """
+        released = 0
+        for task_id in task_ids:
+            if task_id not in self._task_type:
+                continue
+            if task_id in self._succeeded or task_id in self._failed:
+                self._release(task_id)
+                released += 1
+            else:
+                self._release_on_finish.add(task_id)
+        return released
+
+    def _prune(self, queue: List[Tuple[int, int, str]]) -> None:
+        """Drop ready entries for tasks that failed (e.g. were cancelled) or were forgotten while queued."""
+        while queue and (queue[0][2] in self._failed or queue[0][2] not in self._task_type):
+            heapq.heappop(queue)
+
+    def _forget(self, task_id: str) -> None:
+        self._succeeded.discard(task_id)
+        self._failed.pop(task_id, None)
+        future = self._futures.get(task_id)
+        if future is not None and future.done():
+            del self._futures[task_id]
+
+    def _release_if_forgotten(self, task_id: str) -> None:
+        if task_id in self._release_on_finish:
+            self._release(task_id)
+
+    def _release(self, task_id: str) -> None:
+        self._forget(task_id)
+        self._futures.pop(task_id, None)
+        self._task_type.pop(task_id, None)
+        self._priority.pop(task_id, None)
+        self._in_degree.pop(task_id, None)
+        self._dependents.pop(task_id, None)
+        self._release_on_finish.discard(task_id)
+
+    def _push_ready(self, task_id: str) -> None:
+        self.stats.tasks_ready += 1
+        heapq.heappush(
+            self._ready[self._task_type[task_id]],
+            (-self._priority[task_id], next(self._sequence), task_id)
+        )
+
+    def _fail(self, task_id: str, error: str) -> None:
+        self._failed[task_id] = error
+        self.stats.tasks_failed += 1
+        self._resolve(task_id, False)
+
+    def _resolve(self, task_id: str, success: bool) -> None:
+        future = self._futures.get(task_id)
+        if future is not None and not future.done():
+            future.set_result(success)
@@ -0,0 +1,323 @@
+"""
+🧭 Vector Index
+
+NumPy-backed embedding index for the Perfect Recall Engine:
+- Batched scoring over pre-normalized float32 rows (cosine == dot product)
+- Rows live in an EmbeddingStore (in-process or memory-mapped), so the
+  index adds filters and IVF lists without copying any vectors
+- content_type / tag pre-filters resolved before any scoring happens
+- Optional IVF (inverted file) coarse quantizer for sublinear recall
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+try:
+    from ..memory.embedding_store import EmbeddingStore
+except ImportError:
+    from packages.memory.embedding_store import EmbeddingStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VectorIndexStats:
+    """Statistics about a vector index."""
+    size: int = 0
+    capacity: int = 0
+    dimension: int = 0
+    ivf_trained: bool = False
+    ivf_lists: int = 0
+    searches: int = 0
+    rows_scored: int = 0
+    trainings: int = 0
+    content_types: Dict[str, int] = field(default_factory=dict)
+
+
+class VectorIndex:
+    """
+    Approximate-nearest-neighbour index over normalized embeddings.
+
+    Below ``ivf_threshold`` rows every search is an exact, batched matrix-vector
+    product. Above it a spherical k-means quantizer partitions the rows into
+    inverted lists and only the ``nprobe`` closest lists are scored.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        store: Optional[EmbeddingStore] = None,
+        initial_capacity: int = 1024,
+        ivf_threshold: int = 4096,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        kmeans_iterations: int = 10,
+        max_training_samples: int = 20000
+    ):
+        if store is not None and (store.dimension != dimension or not store.normalize):
+            raise ValueError("VectorIndex requires a normalizing EmbeddingStore of the same dimension")
+
+        self.dimension = dimension
+        self.store = store if store is not None else EmbeddingStore(dimension, initial_capacity=initial_capacity)
+        self.ivf_threshold = ivf_threshold
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self.max_training_samples = max_training_samples
+
+        # Rows of the store that belong to this index, with their filter metadata
+        self._meta: Dict[int, Tuple[str, Tuple[str, ...]]] = {}
+        self._indexed = np.zeros(max(1, initial_capacity), dtype=bool)
+
+        # Pre-filter postings: content_type / tag -> rows
+        self._type_rows: Dict[str, Set[int]] = {}
+        self._tag_rows: Dict[str, Set[int]] = {}
+
+        # IVF state
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(self._indexed.shape[0], dtype=np.int32)
+        self._lists: List[Set[int]] = []
+        self._trained_size = 0
+
+        self.stats = VectorIndexStats(dimension=dimension)
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def __contains__(self, item_id: str) -> bool:
+        return self.store.row_of(item_id) in self._meta
+
+    def add(
+        self,
+        item_id: str,
+        embedding: Sequence[float],
+        content_type: str = "",
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Insert or replace an embedding.
+
+        Returns:
+            False if the embedding has the wrong dimension, True otherwise
+        """
+        old_row = self.store.row_of(item_id)
+        if old_row in self._meta:
+            self._unlink_row(old_row)
+
+        row = self.store.put(item_id, embedding)
+        if row is None:
+            return False
+
+        self._link_row(row, content_type, tags)
+        return True
+
+    def attach(
+        self,
+        item_id: str,
+        content_type: str = "",
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Index an embedding that is already present in the store."""
+        row = self.store.row_of(item_id)
+        if row is None:
+            return False
+        if row in self._meta:
+            self._unlink_row(row)
+        self._link_row(row, content_type, tags)
+        return True
+
+    def remove(self, item_id: str) -> bool:
+        """Remove an embedding from the index and free its store row."""
+        row = self.store.row_of(item_id)
+        if row is None or row not in self._meta:
+            return False
+        self._unlink_row(row)
+        self.store.delete(item_id)
+        return True
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: Optional[int] = None,
+        content_types: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[str]] = None,
+        min_similarity: float = -1.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the rows most similar to ``query``.
+
+        Args:
+            query: Query embedding
+            k: Maximum number of hits (None returns every hit above the threshold)
+            content_types: Only consider entries with one of these content types
+            tags: Only consider entries carrying at least one of these tags
+            min_similarity: Minimum cosine similarity for a hit
+
+        Returns:
+            (id, similarity) pairs sorted by descending similarity
+        """
+        vector = np.asarray(query, dtype=np.float32)
+        if vector.shape != (self.dimension,) or not self._meta:
+            return []
+
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return []
+        vector = vector / norm
+
+        self._maybe_train()
+        self.stats.searches += 1
+
+        candidates = self._filter_rows(content_types, tags)
+        if candidates is not None and not candidates:
+            return []
+
+        # Small filtered sets are scored exactly; everything else goes through IVF
+        if self._centroids is not None and (candidates is None or len(candidates) > self.ivf_threshold):
+            probed = self._probe(vector)
+            candidates = probed if candidates is None else candidates & probed
+
+        if candidates is None:
+            matrix = self.store.matrix
+            if len(matrix) > self._indexed.shape[0]:
+                self._grow(len(matrix))
+            scores = matrix @ vector
+            mask = (scores >= min_similarity) & self._indexed[:len(matrix)]
+            rows = np.flatnonzero(mask)
+            scores = scores[rows]
+            self.stats.rows_scored += len(matrix)
+        else:
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            scores = self.store.matrix[rows] @ vector
+            keep = scores >= min_similarity
+            rows, scores = rows[keep], scores[keep]
+            self.stats.rows_scored += len(candidates)
+
+        if k is not None and len(rows) > k:
+            top = np.argpartition(scores, -k)[-k:]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+
+        return [(self.store.id_at(int(rows[i])), float(scores[i])) for i in order]
+
+    def train(self) -> None:
+        """(Re)build the IVF quantizer from the current rows."""
+        size = len(self._meta)
+        if size == 0:
+            return
+
+        nlist = self.nlist or max(1, int(np.sqrt(size)))
+        nlist = min(nlist, size)
+        rng = np.random.default_rng(0)
+
+        rows = np.fromiter(self._meta, dtype=np.int64, count=size)
+        sample_rows = rows
+        if size > self.max_training_samples:
+            sample_rows = rng.choice(rows, self.max_training_samples, replace=False)
+        sample = self.store.matrix[sample_rows]
+
+        # Spherical k-means: centroid is the normalized sum of its members
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            populated = norms > 0
+            centroids[populated] = sums[populated] / norms[populated, None]
+
+        self._centroids = centroids
+        self._lists = [set() for _ in range(nlist)]
+        assignments = np.argmax(self.store.matrix[rows] @ centroids.T, axis=1)
+        self._assign[rows] = assignments
+        for row, cluster in zip(rows.tolist(), assignments.tolist()):
+            self._lists[cluster].add(row)
+
+        self._trained_size = size
+        self.stats.trainings += 1
+        logger.debug(f"🧭 Trained IVF quantizer: {nlist} lists over {size} rows")
+
+    def get_stats(self) -> VectorIndexStats:
+        """Get a snapshot of the index statistics."""
+        self.stats.size = len(self._meta)
+        self.stats.capacity = self.store.memory_stats()["capacity_rows"]
+        self.stats.ivf_trained = self._centroids is not None
+        self.stats.ivf_lists = len(self._lists)
+        self.stats.content_types = {t: len(rows) for t, rows in self._type_rows.items() if rows}
+        return self.stats
+
+    def _maybe_train(self) -> None:
+        """Train once the index crosses the IVF threshold and retrain as it doubles."""
+        size = len(self._meta)
+        if size < self.ivf_threshold:
+            if self._centroids is not None and size < self.ivf_threshold // 2:
+                self._centroids = None
+                self._lists = []
+            return
+        if self._centroids is None or size >= 2 * self._trained_size:
+            self.train()
+
+    def _probe(self, vector: np.ndarray) -> Set[int]:
+        """Collect the rows of the ``nprobe`` lists closest to the query."""
+        centroid_scores = self._centroids @ vector
+        nprobe = min(self.nprobe, len(centroid_scores))
+        closest = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+        rows: Set[int] = set()
+        for cluster in closest.tolist():
+            rows |= self._lists[cluster]
+        return rows
+
+    def _filter_rows(
+        self,
+        content_types: Optional[Iterable[str]],
+        tags: Optional[Iterable[str]]
+    ) -> Optional[Set[int]]:
+        """Resolve pre-filters to a row set, or None when unfiltered."""
+        candidates: Optional[Set[int]] = None
+        if content_types:
+            candidates = set()
+            for content_type in content_types:
+                candidates |= self._type_rows.get(content_type, set())
+        if tags:
+            tagged: Set[int] = set()
+            for tag in tags:
+                tagged |= self._tag_rows.get(tag, set())
+            candidates = tagged if candidates is None else candidates & tagged
+        return candidates
+
+    def _link_row(self, row: int, content_type: str, tags: Optional[Iterable[str]]) -> None:
+        if row >= self._indexed.shape[0]:
+            self._grow(row + 1)
+
+        tag_tuple = tuple(dict.fromkeys(tags or ()))
+        self._meta[row] = (content_type, tag_tuple)
+        self._indexed[row] = True
+        self._type_rows.setdefault(content_type, set()).add(row)
+        for tag in tag_tuple:
+            self._tag_rows.setdefault(tag, set()).add(row)
+
+        if self._centroids is not None:
+            cluster = int(np.argmax(self._centroids @ self.store.matrix[row]))
+            self._assign[row] = cluster
+            self._lists[cluster].add(row)
+
+    def _unlink_row(self, row: int) -> None:
+        content_type, tags = self._meta.pop(row)
+        self._indexed[row] = False
+        self._type_rows.get(content_type, set()).discard(row)
+        for tag in tags:
+            self._tag_rows.get(tag, set()).discard(row)
+        if self._centroids is not None:
+            self._lists[self._assign[row]].discard(row)
+
+    def _grow(self, minimum: int) -> None:
+        capacity = max(minimum, self._indexed.shape[0] * 2)
+        indexed = np.zeros(capacity, dtype=bool)
+        indexed[:self._indexed.shape[0]] = self._indexed
+        self._indexed = indexed
+        assign = np.zeros(capacity, dtype=np.int32)
+        assign[:self._assign.shape[0]] = self._assign
+        self._assign = assign
@@ -0,0 +1,273 @@
+"""
+Batched embedding generation with a content-hash LRU cache.
+
+Concurrent ``embed`` calls made within a short window are coalesced into a
+single encoder call that runs in a worker thread, so the event loop never
+blocks on model inference. Identical texts are answered from the cache or
+attached to the in-flight request instead of being encoded twice.
+
+The encoder is sentence-transformers when installed, otherwise a
+deterministic hashed bag-of-words fallback.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Encoder = Callable[[List[str]], Sequence[Sequence[float]]]
+
+# Cached and in-flight embeddings are shared, so they are kept immutable and
+# every caller gets its own list
+Embedding = Tuple[float, ...]
+
+
+@dataclass
+class EmbeddingServiceStats:
+    """Cache and batching metrics for an embedding service."""
+    requests: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    coalesced: int = 0
+    batches: int = 0
+    texts_encoded: int = 0
+    encode_time_ms: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.texts_encoded / self.batches if self.batches else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "texts_encoded": self.texts_encoded,
+            "avg_batch_size": round(self.avg_batch_size, 2),
+            "encode_time_ms": round(self.encode_time_ms, 2)
+        }
+
+
+def hash_embedding(text: str, dimension: int) -> List[float]:
+    """
+    Hashed bag-of-words embedding used when no model is available.
+
+    Uses a keyed digest rather than ``hash()`` so embeddings are identical
+    across processes and can be persisted.
+    """
+    words = text.lower().split()
+    embedding = [0.0] * dimension
+
+    for i, word in enumerate(words[:dimension]):
+        digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        hash_val = int.from_bytes(digest, "little") % 1000
+        embedding[i % dimension] += hash_val / 1000.0
+
+    # Normalize
+    magnitude = sum(x * x for x in embedding) ** 0.5
+    if magnitude > 0:
+        embedding = [x / magnitude for x in embedding]
+
+    return embedding
+
+
+class EmbeddingService:
+    """Micro-batching, caching front end for an embedding encoder."""
+
+    def __init__(
+        self,
+        dimension: int = 384,
+        model_name: str = "all-MiniLM-L6-v2",
+        encoder: Optional[Encoder] = None,
+        cache_size: int = 4096,
+        batch_window: float = 0.005,
+        max_batch_size: int = 64,
+        max_workers: int = 1
+    ):
+        self.dimension = dimension
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+
+        self._encoder = encoder
+        self._encoder_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedding")
+
+        self._cache: "OrderedDict[str, Embedding]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.stats = EmbeddingServiceStats()
+
+    @property
+    def backend(self) -> str:
+        """Name of the resolved encoder backend."""
+        if self._encoder is None:
+            return "unresolved"
+        return getattr(self._encoder, "backend_name", "custom")
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text, batching it with other concurrent requests."""
+        self.stats.requests += 1
+        key = self._cache_key(text)
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            return list(cached)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return list(await asyncio.shield(inflight))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        self._pending.append((key, text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._dispatch)
+
+        return list(await asyncio.shield(future))
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed several texts; they share batches with any concurrent callers."""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def embed_sync(self, text: str) -> List[float]:
+        """Embed one text on the calling thread (for synchronous code paths)."""
+        self.stats.requests += 1
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return list(cached)
+        embedding = self._encode_batch([text])[0]
+        self._cache_put(key, embedding)
+        return list(embedding)
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            **self.stats.to_dict(),
+            "cache_entries": len(self._cache),
+            "cache_size": self.cache_size,
+            "backend": self.backend
+        }
+
+    async def close(self) -> None:
+        """Encode anything still pending and stop the worker pool."""
+        if self._pending:
+            self._dispatch()
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    def _dispatch(self) -> None:
+        """Send the pending batch to the worker pool."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        texts = [text for _, text, _ in batch]
+        task = loop.run_in_executor(self._executor, self._encode_batch, texts)
+        task.add_done_callback(lambda done: self._resolve(batch, done))
+
+    def _resolve(self, batch: List[tuple], done: asyncio.Future) -> None:
+        cancelled = done.cancelled()
+        error = None if cancelled else done.exception()
+        embeddings = None if cancelled or error else done.result()
+
+        for i, (key, _, future) in enumerate(batch):
+            self._inflight.pop(key, None)
+            if future.done():
+                continue
+            if cancelled:
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                self._cache_put(key, embeddings[i])
+                future.set_result(embeddings[i])
+
+    def _encode_batch(self, texts: List[str]) -> List[Embedding]:
+        """Encode a batch on a worker thread."""
+        encoder = self._resolve_encoder()
+        start = time.time()
+        vectors = encoder(texts)
+        embeddings = [tuple(map(float, vector)) for vector in vectors]
+        self.stats.batches += 1
+        self.stats.texts_encoded += len(texts)
+        self.stats.encode_time_ms += (time.time() - start) * 1000
+        return embeddings
+
+    def _resolve_encoder(self) -> Encoder:
+        """Pick the encoder once, loading the model on first use."""
+        if self._encoder is not None:
+            return self._encoder
+        with self._encoder_lock:
+            if self._encoder is not None:
+                return self._encoder
+            try:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(self.model_name)
+
+                def encode(texts: List[str]) -> Sequence[Sequence[float]]:
+                    return model.encode(texts, batch_size=self.max_batch_size)
+
+                encode.backend_name = "sentence_transformers"
+                self._encoder = encode
+                logger.info(f"Embedding model loaded: {self.model_name}")
+            except ImportError:
+                def encode(texts: List[str]) -> Sequence[Sequence[float]]:
+                    return [hash_embedding(text, self.dimension) for text in texts]
+
+                encode.backend_name = "hash"
+                self._encoder = encode
+                logger.warning("sentence-transformers not available, using hashed embeddings")
+            return self._encoder
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Embedding]:
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+            if embedding is None:
+                self.stats.cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.stats.cache_hits += 1
+            return embedding
+
+    def _cache_put(self, key: str, embedding: Embedding) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,220 @@
+"""
+Memory-mapped embedding storage shared by the recall engines and memory service.
+
+Embeddings live in a raw float32 file (``<path>.f32``) mapped with
+``numpy.memmap``; an id -> row table is kept in a JSON sidecar
+(``<path>.json``). Rows are stable for the lifetime of an id and freed rows
+are reused, so callers can hold zero-copy views into the mapping instead of
+per-entry ``List[float]`` copies. Without a path the store is a plain
+in-process array with the same interface.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """Fixed-dimension float32 embedding rows addressed by id."""
+
+    def __init__(
+        self,
+        dimension: int,
+        path: Optional[Union[str, Path]] = None,
+        initial_capacity: int = 1024,
+        normalize: bool = True
+    ):
+        self.dimension = dimension
+        self.normalize = normalize
+        self.path = Path(path) if path is not None else None
+
+        self._ids: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._capacity = max(1, initial_capacity)
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._dirty = False
+
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+            self._vectors = self._map(self._capacity)
+        else:
+            self._vectors = np.zeros((self._capacity, dimension), dtype=np.float32)
+
+    @property
+    def data_path(self) -> Optional[Path]:
+        return self.path.with_suffix(".f32") if self.path is not None else None
+
+    @property
+    def index_path(self) -> Optional[Path]:
+        return self.path.with_suffix(".json") if self.path is not None else None
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._row_of
+
+    @property
+    def high_water(self) -> int:
+        """Number of rows ever handed out; rows above it are unused."""
+        return len(self._ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Zero-copy view of every allocated row (free rows are zero)."""
+        return self._vectors[:self.high_water]
+
+    @property
+    def live_mask(self) -> np.ndarray:
+        """Boolean view marking which rows of ``matrix`` hold a live id."""
+        return self._live[:self.high_water]
+
+    def ids(self) -> Iterator[str]:
+        return iter(self._row_of)
+
+    def row_of(self, item_id: str) -> Optional[int]:
+        return self._row_of.get(item_id)
+
+    def id_at(self, row: int) -> Optional[str]:
+        return self._ids[row]
+
+    def put(self, item_id: str, embedding: Sequence[float]) -> Optional[int]:
+        """
+        Store an embedding, reusing the id's row if it already has one.
+
+        Returns:
+            The row the embedding was written to, or None on a dimension mismatch
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dimension,):
+            return None
+
+        if self.normalize:
+            norm = float(np.linalg.norm(vector))
+            if norm > 0:
+                vector = vector / norm
+
+        row = self._row_of.get(item_id)
+        if row is None:
+            row = self._allocate_row()
+            self._ids[row] = item_id
+            self._row_of[item_id] = row
+            self._live[row] = True
+
+        self._vectors[row] = vector
+        self._dirty = True
+        return row
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        """Return a read-only zero-copy view of an embedding."""
+        row = self._row_of.get(item_id)
+        if row is None:
+            return None
+        view = self._vectors[row]
+        view.flags.writeable = False
+        return view
+
+    def delete(self, item_id: str) -> Optional[int]:
+        """Free an id's row. Returns the freed row, if any."""
+        row = self._row_of.pop(item_id, None)
+        if row is None:
+            return None
+        self._ids[row] = None
+        self._live[row] = False
+        self._vectors[row] = 0.0
+        self._free.append(row)
+        self._dirty = True
+        return row
+
+    def flush(self) -> None:
+        """Persist the mapped rows and the id table."""
+        if self.path is None or not self._dirty:
+            return
+        self._vectors.flush()
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "dimension": self.dimension,
+                "capacity": self._capacity,
+                "ids": self._ids
+            }, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def close(self) -> None:
+        self.flush()
+
+    def memory_stats(self) -> Dict[str, int]:
+        """Sizes of the store, in rows and bytes."""
+        return {
+            "rows": len(self._row_of),
+            "allocated_rows": self.high_water,
+            "capacity_rows": self._capacity,
+            "free_rows": len(self._free),
+            "bytes": self._capacity * self.dimension * 4,
+            "memory_mapped": self.path is not None
+        }
+
+    def _allocate_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        row = len(self._ids)
+        if row >= self._capacity:
+            self._grow(self._capacity * 2)
+        self._ids.append(None)
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        if self.path is not None:
+            self._vectors.flush()
+            self._vectors = self._map(capacity)
+        else:
+            vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+            vectors[:self._capacity] = self._vectors
+            self._vectors = vectors
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._capacity] = self._live
+        self._live = live
+        self._capacity = capacity
+
+    def _map(self, capacity: int) -> np.memmap:
+        """Map the data file, extending it (sparsely) to ``capacity`` rows."""
+        size = capacity * self.dimension * 4
+        with open(self.data_path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(self.data_path, dtype=np.float32, mode='r+', shape=(capacity, self.dimension))
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists() or not self.data_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable embedding index {self.index_path}: {e}")
+            return
+        if index.get("dimension") != self.dimension:
+            logger.warning(
+                f"Embedding store {self.data_path} has dimension {index.get('dimension')}, "
+                f"expected {self.dimension}; starting empty"
+            )
+            return
+
+        self._ids = index.get("ids", [])
+        self._capacity = max(self._capacity, index.get("capacity", 0), len(self._ids))
+        self._live = np.zeros(self._capacity, dtype=bool)
+        for row, item_id in enumerate(self._ids):
+            if item_id is None:
+                self._free.append(row)
+            else:
+                self._row_of[item_id] = row
+                self._live[row] = True
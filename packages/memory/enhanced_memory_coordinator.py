@@ -8,7 +8,9 @@ import json
 import logging
 import uuid
 import hashlib
-from typing import Dict, List, Any, Optional, Set, Callable, Union
+import random
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterator, Optional, Set, Callable, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 from datetime import datetime, timedelta
@@ -16,6 +18,8 @@ import time
 from contextlib import asynccontextmanager
 import threading
 
+from ..core.deadlines import DeadlineScheduler, get_deadline_scheduler
+
 # Handle Redis import gracefully
 try:
     import redis.asyncio as redis
@@ -100,6 +104,38 @@ class MemoryVersion:
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary"""
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        data['operation'] = self.operation.value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MemoryVersion':
+        """Create from dictionary"""
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        data['operation'] = MemoryOperation(data['operation'])
+        return cls(**data)
+    
+    @classmethod
+    def for_entry(cls, entry: 'MemoryEntry', operation: MemoryOperation = MemoryOperation.WRITE) -> 'MemoryVersion':
+        """Version record describing the write that produced ``entry``"""
+        return cls(
+            version=entry.version,
+            agent_id=entry.updated_by,
+            timestamp=entry.updated_at,
+            operation=operation,
+            checksum=entry.checksum
+        )
+
+@dataclass
+class CASResult:
+    """Outcome of a compare-and-set write"""
+    success: bool
+    version: int  # the new version on success, the version found in Redis otherwise
+    entry: Optional['MemoryEntry'] = None
 
 @dataclass
 class MemoryEntry:
@@ -150,6 +186,117 @@ class MemoryEntry:
             data['last_accessed'] = datetime.fromisoformat(data['last_accessed'])
         return cls(**data)
 
+class MemoryCache:
+    """
+    LRU cache of memory entries with O(1) lookup, touch and eviction.
+
+    Entries are kept in an OrderedDict from least to most recently used, so
+    eviction pops from the front instead of scanning every key. Each entry is
+    charged its serialized size and the cache evicts until it is within both
+    ``max_entries`` and ``max_bytes``.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        # key -> (entry, size in bytes, monotonic time of last touch)
+        self._entries: "OrderedDict[str, Tuple[MemoryEntry, int, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> MemoryEntry:
+        return self._entries[key][0]
+
+    def __delitem__(self, key: str):
+        if self.pop(key) is None:
+            raise KeyError(key)
+
+    def keys(self) -> List[str]:
+        return list(self._entries.keys())
+
+    def items(self) -> Iterator[Tuple[str, MemoryEntry]]:
+        return ((key, item[0]) for key, item in self._entries.items())
+
+    def get(self, key: str, default: Optional[MemoryEntry] = None) -> Optional[MemoryEntry]:
+        """Return an entry and mark it most recently used"""
+        item = self._entries.get(key)
+        if item is None:
+            return default
+        self._entries[key] = (item[0], item[1], time.monotonic())
+        self._entries.move_to_end(key)
+        return item[0]
+
+    def put(self, key: str, entry: MemoryEntry, size: Optional[int] = None) -> List[str]:
+        """Insert or replace an entry and return the keys evicted to make room"""
+        if size is None:
+            size = len(json.dumps(entry.to_dict(), default=str))
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous[1]
+
+        self._entries[key] = (entry, size, time.monotonic())
+        self.total_bytes += size
+
+        evicted = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            lru_key, (_, lru_size, _) = self._entries.popitem(last=False)
+            self.total_bytes -= lru_size
+            self.evictions += 1
+            evicted.append(lru_key)
+        return evicted
+
+    def pop(self, key: str) -> Optional[MemoryEntry]:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return None
+        self.total_bytes -= item[1]
+        return item[0]
+
+    def evict_idle(self, max_idle_seconds: float) -> List[str]:
+        """Drop entries untouched for ``max_idle_seconds``, oldest first"""
+        cutoff = time.monotonic() - max_idle_seconds
+        evicted = []
+        while self._entries:
+            key, (_, size, touched_at) = next(iter(self._entries.items()))
+            if touched_at >= cutoff:
+                break
+            self._entries.popitem(last=False)
+            self.total_bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+# Atomically replace an entry only if its stored version still matches, and
+# record the write in the key's capped history list.
+# KEYS: entries hash, history list; ARGV: field, expected version, entry json,
+# version record json, max history length
+_CAS_WRITE_SCRIPT = """
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+local current = 0
+if raw then
+    current = tonumber(cjson.decode(raw)['version']) or 0
+end
+if current ~= tonumber(ARGV[2]) then
+    return {0, current}
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+redis.call('LPUSH', KEYS[2], ARGV[4])
+redis.call('LTRIM', KEYS[2], 0, tonumber(ARGV[5]) - 1)
+return {1, current + 1}
+"""
+
 class MemoryConflict:
     """Represents a memory conflict between agents"""
     
@@ -166,7 +313,7 @@ class EnhancedMemoryCoordinator:
     Enhanced memory coordination system for multi-agent environments
     
     Features:
-    - Distributed locking with deadlock detection
+    - Distributed locking with deadlock detection (expiry via the shared DeadlineScheduler)
     - Memory versioning and conflict resolution
     - Eventual consistency with sync queues
     - Performance optimization with caching
@@ -174,26 +321,40 @@ class EnhancedMemoryCoordinator:
     - Automatic cleanup and garbage collection
     """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379", namespace: str = "revoagent"):
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        namespace: str = "revoagent",
+        deadlines: Optional[DeadlineScheduler] = None
+    ):
         self.redis_url = redis_url
         self.namespace = namespace
         self.redis_client: Optional[redis.Redis] = None
+        self.deadlines = deadlines or get_deadline_scheduler()
         
         # Memory coordination state
         self.active_locks: Dict[str, MemoryLock] = {}
-        self.memory_versions: Dict[str, List[MemoryVersion]] = {}
         self.pending_conflicts: Dict[str, MemoryConflict] = {}
-        self.sync_queues: Dict[str, List[Dict[str, Any]]] = {}
-        
-        # Performance caches
-        self.memory_cache: Dict[str, MemoryEntry] = {}
-        self.access_patterns: Dict[str, Dict[str, int]] = {}  # agent_id -> {key: count}
+        # Coalesced eventual/batch writes: key -> (entry json, version json), last write wins
+        self.pending_syncs: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        # Batches taken by flush_pending_syncs stay readable here until Redis has them
+        self._inflight_syncs: Dict[str, Tuple[str, str]] = {}
+        self._oldest_pending_at: Optional[float] = None
+        self._sync_wakeup = asyncio.Event()
         
         # Configuration
         self.default_lock_timeout = 300  # 5 minutes
         self.max_cache_size = 10000
-        self.sync_batch_size = 100
+        self.max_cache_bytes = 64 * 1024 * 1024
+        self.sync_batch_size = 100  # flush once this many keys are pending
+        self.sync_interval = 1.0  # ...or once the oldest pending write is this old (seconds)
         self.conflict_resolution_timeout = 60  # 1 minute
+        self.max_version_history = 50  # per key, kept in Redis
+        self.cas_max_retries = 10
+        
+        # Performance caches
+        self.memory_cache = MemoryCache(self.max_cache_size, self.max_cache_bytes)
+        self.access_patterns: Dict[str, Dict[str, int]] = {}  # agent_id -> {key: count}
         
         # Redis keys
         self.locks_key = f"{namespace}:memory:locks"
@@ -201,6 +362,7 @@ class EnhancedMemoryCoordinator:
         self.conflicts_key = f"{namespace}:memory:conflicts"
         self.sync_key = f"{namespace}:memory:sync"
         self.cache_key = f"{namespace}:memory:cache"
+        self.entries_key = f"{self.cache_key}:entries"
         
         # Metrics
         self.coordination_metrics = {
@@ -210,11 +372,17 @@ class EnhancedMemoryCoordinator:
             "conflicts_resolved": 0,
             "cache_hits": 0,
             "cache_misses": 0,
-            "sync_operations": 0
+            "cache_evictions": 0,
+            "sync_operations": 0,
+            "sync_writes_coalesced": 0,
+            "sync_flushes": 0,
+            "cas_writes": 0,
+            "cas_conflicts": 0
         }
         
         # Thread safety
         self._lock = threading.RLock()
+        self._cas_script = None
     
     async def initialize(self):
         """Initialize memory coordinator"""
@@ -225,8 +393,7 @@ class EnhancedMemoryCoordinator:
             # Load existing state
             await self._load_state_from_redis()
             
-            # Start background tasks
-            asyncio.create_task(self._lock_monitor())
+            # Start background tasks (lock expiry fires from self.deadlines)
             asyncio.create_task(self._conflict_resolver())
             asyncio.create_task(self._sync_processor())
             asyncio.create_task(self._cache_manager())
@@ -241,6 +408,10 @@ class EnhancedMemoryCoordinator:
     async def close(self):
         """Close coordinator and cleanup"""
         if self.redis_client:
+            try:
+                await self.flush_pending_syncs()
+            except Exception as e:
+                logger.error(f"Failed to flush pending memory syncs on close: {e}")
             await self.redis_client.close()
     
     @asynccontextmanager
@@ -290,6 +461,7 @@ class EnhancedMemoryCoordinator:
             # Acquire lock
             with self._lock:
                 self.active_locks[lock_id] = lock
+            self._schedule_lock_expiry(lock)
             
             # Store in Redis
             async with self.get_redis() as redis_client:
@@ -321,6 +493,7 @@ class EnhancedMemoryCoordinator:
             # Remove from memory
             with self._lock:
                 del self.active_locks[lock_id]
+            self.deadlines.cancel(("memory_lock", self.namespace, lock_id))
             
             # Remove from Redis
             async with self.get_redis() as redis_client:
@@ -337,8 +510,8 @@ class EnhancedMemoryCoordinator:
         """Read memory with caching and access tracking"""
         try:
             # Check cache first
-            if key in self.memory_cache:
-                entry = self.memory_cache[key]
+            entry = self.memory_cache.get(key)
+            if entry is not None:
                 entry.access_count += 1
                 entry.last_accessed = datetime.now()
                 self.coordination_metrics["cache_hits"] += 1
@@ -408,21 +581,7 @@ class EnhancedMemoryCoordinator:
                 await self._handle_conflict(conflict)
                 return False
             
-            # Create version record
-            version_record = MemoryVersion(
-                version=new_version,
-                agent_id=agent_id,
-                timestamp=now,
-                operation=MemoryOperation.WRITE,
-                checksum=new_entry.checksum
-            )
-            
-            # Store version history
-            if key not in self.memory_versions:
-                self.memory_versions[key] = []
-            self.memory_versions[key].append(version_record)
-            
-            # Apply sync strategy
+            # Apply sync strategy (version history is recorded in Redis with the entry)
             if sync_strategy == SyncStrategy.IMMEDIATE:
                 await self._sync_immediately(key, new_entry)
             elif sync_strategy == SyncStrategy.EVENTUAL:
@@ -440,28 +599,136 @@ class EnhancedMemoryCoordinator:
             logger.error(f"Failed to write memory {key}: {e}")
             return False
     
+    async def compare_and_set(
+        self,
+        key: str,
+        value: Any,
+        agent_id: str,
+        expected_version: int
+    ) -> CASResult:
+        """
+        Write ``value`` only if the stored version is still ``expected_version``.
+        
+        The check and the write happen in one Redis script, so concurrent
+        writers on any node cannot both succeed from the same version. Use
+        ``expected_version=0`` to create a key that must not exist yet.
+        """
+        # Unflushed eventual writes must reach Redis before versions are compared
+        if key in self.pending_syncs:
+            await self.flush_pending_syncs()
+        
+        current = self.memory_cache.get(key)
+        if current is None or current.version != expected_version:
+            current = await self._load_memory_entry(key)
+        if (current.version if current else 0) != expected_version:
+            # Cheap local rejection; the script would refuse it anyway
+            self.coordination_metrics["cas_conflicts"] += 1
+            if current:
+                await self._add_to_cache(key, current)
+            else:
+                self.memory_cache.pop(key)
+            return CASResult(False, current.version if current else 0)
+        
+        now = datetime.now()
+        new_entry = MemoryEntry(
+            key=key,
+            value=value,
+            version=expected_version + 1,
+            created_by=current.created_by if current else agent_id,
+            created_at=current.created_at if current else now,
+            updated_by=agent_id,
+            updated_at=now,
+            access_count=current.access_count if current else 0,
+            tags=current.tags if current else set(),
+            metadata=current.metadata if current else {}
+        )
+        
+        async with self.get_redis() as redis_client:
+            if self._cas_script is None:
+                self._cas_script = redis_client.register_script(_CAS_WRITE_SCRIPT)
+            applied, version = await self._cas_script(
+                keys=[self.entries_key, self._history_key(key)],
+                args=[
+                    key,
+                    expected_version,
+                    json.dumps(new_entry.to_dict()),
+                    json.dumps(MemoryVersion.for_entry(new_entry).to_dict()),
+                    self.max_version_history
+                ],
+                client=redis_client
+            )
+        
+        if not applied:
+            self.coordination_metrics["cas_conflicts"] += 1
+            self.memory_cache.pop(key)  # our copy is stale
+            return CASResult(False, int(version))
+        
+        self.coordination_metrics["cas_writes"] += 1
+        await self._add_to_cache(key, new_entry)
+        return CASResult(True, int(version), new_entry)
+    
+    async def update_memory(
+        self,
+        key: str,
+        agent_id: str,
+        update_fn: Callable[[Any], Any],
+        max_retries: Optional[int] = None
+    ) -> Optional[MemoryEntry]:
+        """
+        Apply ``update_fn`` to the current value with optimistic concurrency.
+        
+        On a version conflict the latest value is re-read and ``update_fn``
+        is applied again after a short jittered backoff, instead of holding a
+        lock. Returns the written entry, or None if every attempt conflicted.
+        """
+        max_retries = self.cas_max_retries if max_retries is None else max_retries
+        
+        for attempt in range(max_retries + 1):
+            current = self.memory_cache.get(key)
+            if current is None:
+                current = await self._load_memory_entry(key)
+            
+            result = await self.compare_and_set(
+                key,
+                update_fn(current.value if current else None),
+                agent_id,
+                current.version if current else 0
+            )
+            if result.success:
+                self._track_access_pattern(agent_id, key)
+                return result.entry
+            
+            # Small jittered backoff, capped, so contended writers spread out
+            await asyncio.sleep(random.uniform(0, min(0.05, 0.001 * (2 ** attempt))))
+        
+        logger.warning(f"Optimistic update of {key} by {agent_id} gave up after {max_retries + 1} attempts")
+        return None
+    
+    async def get_version_history(self, key: str, limit: Optional[int] = None) -> List[MemoryVersion]:
+        """Recent versions of a key from Redis, newest first"""
+        end = (limit - 1) if limit else -1
+        async with self.get_redis() as redis_client:
+            records = await redis_client.lrange(self._history_key(key), 0, end)
+        return [MemoryVersion.from_dict(json.loads(record)) for record in records]
+    
     async def sync_memory(self, keys: List[str] = None) -> Dict[str, bool]:
         """Synchronize memory across all agents"""
         try:
             if keys is None:
-                keys = list(self.memory_cache.keys())
+                keys = self.memory_cache.keys()
             
             results = {}
             
             for key in keys:
-                try:
-                    entry = self.memory_cache.get(key)
-                    if entry:
-                        await self._sync_immediately(key, entry)
-                        results[key] = True
-                    else:
-                        results[key] = False
-                        
-                except Exception as e:
-                    logger.error(f"Failed to sync memory {key}: {e}")
+                entry = self.memory_cache.get(key)
+                if entry:
+                    self._coalesce_sync(key, entry)
+                    results[key] = True
+                else:
                     results[key] = False
             
-            self.coordination_metrics["sync_operations"] += len(keys)
+            # One pipelined flush for every key, plus anything already pending
+            await self.flush_pending_syncs()
             return results
             
         except Exception as e:
@@ -562,8 +829,15 @@ class EnhancedMemoryCoordinator:
             "cache_stats": {
                 "size": cache_size,
                 "max_size": self.max_cache_size,
+                "bytes": self.memory_cache.total_bytes,
+                "max_bytes": self.max_cache_bytes,
                 "hit_rate": cache_hit_rate
             },
+            "sync_stats": {
+                "pending_keys": len(self.pending_syncs),
+                "batch_size": self.sync_batch_size,
+                "interval": self.sync_interval
+            },
             "lock_stats": {
                 "active_locks": active_locks_count,
                 "lock_types": self._get_lock_type_distribution()
@@ -615,7 +889,7 @@ class EnhancedMemoryCoordinator:
         # Check if checksums differ (indicating concurrent modifications)
         if new_entry.checksum != current_entry.checksum and new_entry.version == current_entry.version:
             # Conflict detected
-            versions = self.memory_versions.get(key, [])
+            versions = await self.get_version_history(key)
             recent_versions = [v for v in versions if v.version >= current_entry.version]
             
             if len(recent_versions) > 1:
@@ -637,47 +911,96 @@ class EnhancedMemoryCoordinator:
             ConflictResolution.LAST_WRITER_WINS
         )
     
+    def _history_key(self, key: str) -> str:
+        return f"{self.versions_key}:{key}"
+    
+    def _pipe_history(self, pipe, key: str, version_json: str):
+        pipe.lpush(self._history_key(key), version_json)
+        pipe.ltrim(self._history_key(key), 0, self.max_version_history - 1)
+    
     async def _sync_immediately(self, key: str, entry: MemoryEntry):
         """Immediately sync memory entry"""
         async with self.get_redis() as redis_client:
-            await redis_client.hset(
-                f"{self.cache_key}:entries",
-                key,
-                json.dumps(entry.to_dict())
-            )
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hset(self.entries_key, key, json.dumps(entry.to_dict()))
+            self._pipe_history(pipe, key, json.dumps(MemoryVersion.for_entry(entry).to_dict()))
+            await pipe.execute()
     
     async def _queue_for_sync(self, key: str, entry: MemoryEntry):
         """Queue entry for eventual consistency sync"""
-        if key not in self.sync_queues:
-            self.sync_queues[key] = []
-        
-        self.sync_queues[key].append({
-            "entry": entry.to_dict(),
-            "queued_at": datetime.now().isoformat()
-        })
+        self._coalesce_sync(key, entry)
+        if len(self.pending_syncs) >= self.sync_batch_size:
+            self._sync_wakeup.set()
     
     async def _add_to_batch_sync(self, key: str, entry: MemoryEntry):
         """Add to batch sync queue"""
-        # Implementation for batch synchronization
         await self._queue_for_sync(key, entry)
     
+    def _coalesce_sync(self, key: str, entry: MemoryEntry):
+        """Record the latest state of a key for the next flush (last write wins)"""
+        if key in self.pending_syncs:
+            self.coordination_metrics["sync_writes_coalesced"] += 1
+        elif not self.pending_syncs:
+            self._oldest_pending_at = time.monotonic()
+        self.pending_syncs[key] = (
+            json.dumps(entry.to_dict()),
+            json.dumps(MemoryVersion.for_entry(entry).to_dict())
+        )
+    
+    async def flush_pending_syncs(self) -> int:
+        """Write all coalesced entries to Redis through a pipeline, returning the key count"""
+        if not self.pending_syncs:
+            return 0
+        
+        batch = self.pending_syncs
+        self.pending_syncs = OrderedDict()
+        self._oldest_pending_at = None
+        self._inflight_syncs.update(batch)
+        
+        try:
+            async with self.get_redis() as redis_client:
+                pipe = redis_client.pipeline(transaction=False)
+                items = list(batch.items())
+                for start in range(0, len(items), self.sync_batch_size):
+                    chunk = items[start:start + self.sync_batch_size]
+                    pipe.hset(self.entries_key, mapping={key: entry_json for key, (entry_json, _) in chunk})
+                    for key, (_, version_json) in chunk:
+                        self._pipe_history(pipe, key, version_json)
+                await pipe.execute()
+        except Exception:
+            # Put the batch back without overwriting anything written meanwhile
+            for key, payload in batch.items():
+                self.pending_syncs.setdefault(key, payload)
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = time.monotonic()
+            raise
+        finally:
+            # A later flush may have taken over a key; only drop what this one wrote
+            for key, payload in batch.items():
+                if self._inflight_syncs.get(key) is payload:
+                    del self._inflight_syncs[key]
+        
+        self.coordination_metrics["sync_operations"] += len(batch)
+        self.coordination_metrics["sync_flushes"] += 1
+        logger.debug(f"Synced {len(batch)} coalesced memory entries")
+        return len(batch)
+    
     async def _add_to_cache(self, key: str, entry: MemoryEntry):
         """Add entry to cache with size management"""
-        if len(self.memory_cache) >= self.max_cache_size:
-            # Remove least recently accessed entry
-            lru_key = min(
-                self.memory_cache.keys(),
-                key=lambda k: self.memory_cache[k].last_accessed or datetime.min
-            )
-            del self.memory_cache[lru_key]
-        
-        self.memory_cache[key] = entry
+        evicted = self.memory_cache.put(key, entry)
+        if evicted:
+            self.coordination_metrics["cache_evictions"] += len(evicted)
     
     async def _load_memory_entry(self, key: str) -> Optional[MemoryEntry]:
         """Load memory entry from persistent storage"""
         try:
+            # An entry evicted from the cache may still be waiting to be synced
+            pending = self.pending_syncs.get(key) or self._inflight_syncs.get(key)
+            if pending is not None:
+                return MemoryEntry.from_dict(json.loads(pending[0]))
+            
             async with self.get_redis() as redis_client:
-                entry_data = await redis_client.hget(f"{self.cache_key}:entries", key)
+                entry_data = await redis_client.hget(self.entries_key, key)
                 if entry_data:
                     return MemoryEntry.from_dict(json.loads(entry_data))
             return None
@@ -726,6 +1049,7 @@ class EnhancedMemoryCoordinator:
                         lock = MemoryLock(**lock_data)
                         if not lock.is_expired():
                             self.active_locks[lock_id] = lock
+                            self._schedule_lock_expiry(lock)
                     except Exception as e:
                         logger.error(f"Failed to load lock {lock_id}: {e}")
                 
@@ -734,27 +1058,18 @@ class EnhancedMemoryCoordinator:
         except Exception as e:
             logger.error(f"Failed to load state from Redis: {e}")
     
-    async def _lock_monitor(self):
-        """Monitor and cleanup expired locks"""
-        while True:
-            try:
-                current_time = datetime.now()
-                expired_locks = []
-                
-                for lock_id, lock in self.active_locks.items():
-                    if lock.is_expired():
-                        expired_locks.append(lock_id)
-                
-                # Remove expired locks
-                for lock_id in expired_locks:
-                    await self.release_lock(lock_id)
-                    logger.debug(f"Expired lock removed: {lock_id}")
-                
-                await asyncio.sleep(30)  # Check every 30 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in lock monitor: {e}")
-                await asyncio.sleep(60)
+    def _schedule_lock_expiry(self, lock: MemoryLock):
+        """Release the lock when it expires"""
+        delay = max(0.0, (lock.expires_at - datetime.now()).total_seconds())
+        self.deadlines.schedule(
+            ("memory_lock", self.namespace, lock.lock_id), delay, lambda: self._expire_lock(lock.lock_id)
+        )
+    
+    async def _expire_lock(self, lock_id: str):
+        """Remove an expired lock"""
+        if lock_id in self.active_locks:
+            await self.release_lock(lock_id)
+            logger.debug(f"Expired lock removed: {lock_id}")
     
     async def _conflict_resolver(self):
         """Background conflict resolution"""
@@ -779,24 +1094,21 @@ class EnhancedMemoryCoordinator:
                 await asyncio.sleep(60)
     
     async def _sync_processor(self):
-        """Process sync queues"""
+        """Flush coalesced writes when enough keys are pending or the oldest is due"""
         while True:
             try:
-                # Process sync queues in batches
-                for key, queue in list(self.sync_queues.items()):
-                    if len(queue) >= self.sync_batch_size:
-                        # Process batch
-                        batch = queue[:self.sync_batch_size]
-                        self.sync_queues[key] = queue[self.sync_batch_size:]
-                        
-                        # Sync batch to persistent storage
-                        for item in batch:
-                            entry = MemoryEntry.from_dict(item["entry"])
-                            await self._sync_immediately(key, entry)
-                        
-                        logger.debug(f"Synced batch of {len(batch)} entries for key {key}")
+                if self._oldest_pending_at is None:
+                    timeout = self.sync_interval
+                else:
+                    timeout = max(0.0, self._oldest_pending_at + self.sync_interval - time.monotonic())
+                
+                try:
+                    await asyncio.wait_for(self._sync_wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._sync_wakeup.clear()
                 
-                await asyncio.sleep(10)  # Process every 10 seconds
+                await self.flush_pending_syncs()
                 
             except Exception as e:
                 logger.error(f"Error in sync processor: {e}")
@@ -806,17 +1118,8 @@ class EnhancedMemoryCoordinator:
         """Manage cache size and cleanup"""
         while True:
             try:
-                # Clean up old cache entries
-                current_time = datetime.now()
-                cleanup_threshold = current_time - timedelta(hours=1)
-                
-                old_entries = [
-                    key for key, entry in self.memory_cache.items()
-                    if entry.last_accessed and entry.last_accessed < cleanup_threshold
-                ]
-                
-                for key in old_entries:
-                    del self.memory_cache[key]
+                # Clean up entries idle for over an hour (walks the LRU end only)
+                old_entries = self.memory_cache.evict_idle(3600)
                 
                 if old_entries:
                     logger.debug(f"Cleaned up {len(old_entries)} old cache entries")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+📊 Enhanced Message Queue Send/Receive Benchmark
+
+Compares the command-per-step path with the Lua-scripted path of
+EnhancedMessageQueue: messages per second for sends and receives, and
+Redis commands issued per message.
+
+Runs against fakeredis by default (no network, so it mostly shows the
+command count); pass --redis-url to measure against a real server where
+round-trip latency dominates.
+
+Usage:
+    python scripts/benchmarks/message_queue_benchmark.py --messages 5000
+    python scripts/benchmarks/message_queue_benchmark.py --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from packages.core.enhanced_message_queue import (
+    EnhancedMessage, EnhancedMessageQueue, MessagePriority
+)
+
+
+def _make_client(redis_url: Optional[str]):
+    if redis_url:
+        import redis.asyncio as redis
+        return redis.from_url(redis_url, decode_responses=True)
+    import fakeredis
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+def _count_commands(client) -> Dict[str, int]:
+    counter = {"commands": 0}
+    original = client.execute_command
+
+    async def counting(*args, **kwargs):
+        counter["commands"] += 1
+        return await original(*args, **kwargs)
+
+    client.execute_command = counting
+    return counter
+
+
+async def run_case(use_scripts: bool, messages: int, redis_url: Optional[str]) -> Dict[str, Any]:
+    namespace = f"bench-{uuid.uuid4().hex[:8]}"
+    queue = EnhancedMessageQueue(namespace=namespace, use_scripts=use_scripts)
+    queue.redis_client = _make_client(redis_url)
+    counter = _count_commands(queue.redis_client)
+
+    batch = [
+        EnhancedMessage(
+            id=f"{namespace}-{i}",
+            type="benchmark",
+            sender="bench",
+            recipient="agent-1",
+            content={"index": i, "payload": "x" * 64},
+            priority=MessagePriority.NORMAL
+        )
+        for i in range(messages)
+    ]
+
+    start = time.perf_counter()
+    for message in batch:
+        await queue.send_message(message)
+    send_seconds = time.perf_counter() - start
+    send_commands = counter["commands"]
+
+    start = time.perf_counter()
+    received = 0
+    while await queue.receive_message("agent-1") is not None:
+        received += 1
+    receive_seconds = time.perf_counter() - start
+    receive_commands = counter["commands"] - send_commands
+
+    keys = [key async for key in queue.redis_client.scan_iter(f"{namespace}:*")]
+    if keys:
+        await queue.redis_client.delete(*keys)
+    await queue.close()
+
+    return {
+        "path": "scripted" if use_scripts else "commands",
+        "sent": messages,
+        "received": received,
+        "send_per_second": round(messages / send_seconds, 1),
+        "receive_per_second": round(received / receive_seconds, 1) if receive_seconds else 0.0,
+        "commands_per_send": round(send_commands / messages, 2),
+        "commands_per_receive": round(receive_commands / max(1, received), 2)
+    }
+
+
+async def main(args):
+    target = args.redis_url or "fakeredis"
+    print(f"📨 {args.messages} messages against {target}")
+    for use_scripts in (False, True):
+        row = await run_case(use_scripts, args.messages, args.redis_url)
+        print(
+            f"{row['path']:>9}: send {row['send_per_second']:>9.1f}/s "
+            f"({row['commands_per_send']} cmds)  "
+            f"receive {row['receive_per_second']:>9.1f}/s "
+            f"({row['commands_per_receive']} cmds)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--redis-url", help="benchmark a real Redis instead of fakeredis")
+    asyncio.run(main(parser.parse_args()))
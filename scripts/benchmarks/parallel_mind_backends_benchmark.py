@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+📊 Parallel Mind Execution Backend Benchmark
+
+Runs a batch of CPU-bound DATA_PROCESSING tasks through the Parallel Mind
+Engine with the thread and process backends at increasing worker counts,
+and reports throughput and speedup over a single worker.
+
+Usage:
+    python scripts/benchmarks/parallel_mind_backends_benchmark.py --tasks 32 --work 200000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from packages.engines.execution_backends import ExecutionMode
+from packages.engines.parallel_mind_engine import (
+    ParallelMindEngine, Task, TaskPriority, TaskType
+)
+
+
+def cpu_bound_executor(task) -> Dict[str, Any]:
+    """Pure-Python number crunching that holds the GIL the whole time."""
+    n = task.input_data["work"]
+    total = 0
+    for i in range(n):
+        total += (i * i) % 7
+    return {"checksum": total, "pid": os.getpid()}
+
+
+class BenchmarkEngine(ParallelMindEngine):
+    """Engine whose DATA_PROCESSING executor is the CPU-bound workload."""
+
+    def _get_task_executor(self, task_type: TaskType):
+        return cpu_bound_executor
+
+
+async def run_case(mode: ExecutionMode, workers: int, tasks: int, work: int) -> Dict[str, Any]:
+    engine = BenchmarkEngine(
+        max_workers=workers,
+        worker_configs={
+            TaskType.DATA_PROCESSING: {"count": workers, "max_concurrent": 1, "mode": mode}
+        }
+    )
+    try:
+        warm_start = time.perf_counter()
+        await engine.warm_up()
+        warm_up_ms = (time.perf_counter() - warm_start) * 1000
+
+        batch = [
+            Task(
+                id=f"{mode.value}-{workers}-{i}",
+                task_type=TaskType.DATA_PROCESSING,
+                priority=TaskPriority.NORMAL,
+                description="cpu bound",
+                input_data={"work": work},
+                max_retries=0
+            )
+            for i in range(tasks)
+        ]
+
+        start = time.perf_counter()
+        result = await engine.execute_workflow(f"bench-{mode.value}-{workers}", batch, timeout=600)
+        elapsed = time.perf_counter() - start
+    finally:
+        await engine.shutdown()
+
+    return {
+        "mode": mode.value,
+        "workers": workers,
+        "completed": result.completed_tasks,
+        "seconds": round(elapsed, 3),
+        "tasks_per_second": round(tasks / elapsed, 2),
+        "warm_up_ms": round(warm_up_ms, 1),
+        "distinct_pids": len({r["pid"] for r in result.results.values()})
+    }
+
+
+async def main(args) -> List[Dict[str, Any]]:
+    worker_counts = sorted({w for w in (1, 2, 4, args.max_workers) if 0 < w <= args.max_workers})
+
+    rows = []
+    for mode in (ExecutionMode.THREAD, ExecutionMode.PROCESS):
+        baseline = None
+        for workers in worker_counts:
+            row = await run_case(mode, workers, args.tasks, args.work)
+            baseline = baseline or row["seconds"]
+            row["speedup"] = round(baseline / row["seconds"], 2)
+            rows.append(row)
+            print(
+                f"{row['mode']:>8} workers={row['workers']:<3} "
+                f"{row['tasks_per_second']:>8.2f} tasks/s  speedup x{row['speedup']:<5} "
+                f"warm-up {row['warm_up_ms']:.0f}ms  pids={row['distinct_pids']}"
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=32, help="tasks per run")
+    parser.add_argument("--work", type=int, default=200000, help="loop iterations per task")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    print(f"🖥️  {os.cpu_count()} CPUs, {args.tasks} tasks x {args.work} iterations")
+    results = asyncio.run(main(args))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+📊 Workflow Condition Evaluation Benchmark
+
+Compares the previous condition path of WorkflowEngine (``${var}``
+substitution with ``re.sub`` followed by ``eval`` on every check) with the
+compiled, cached expressions from packages.core.workflow_expressions:
+raw condition evaluations per second, and loop-step iterations per second
+for a loop driven by a ``while_condition``.
+
+Usage:
+    python scripts/benchmarks/workflow_condition_benchmark.py --iterations 50000
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from packages.core.workflow_engine import StepStatus, StepType, WorkflowEngine
+from packages.core.workflow_expressions import evaluate_condition
+
+CONDITION = "${counter} < 1000000000 and params.mode == 'fast' and 'loop' in tags"
+VARIABLES = {"counter": 5, "params": {"mode": "fast"}, "tags": ["loop", "bench"], "mode": "fast"}
+
+# Legacy evaluation needs the dotted name as a flat variable to be equivalent
+LEGACY_CONDITION = "${counter} < 1000000000 and '${mode}' == 'fast' and 'loop' in ['loop', 'bench']"
+
+
+def legacy_evaluate(condition: str, variables: Dict[str, Any]) -> bool:
+    """The evaluation WorkflowEngine used before compiled expressions."""
+    try:
+        resolved = re.sub(
+            r'\$\{([^}]+)\}', lambda match: str(variables.get(match.group(1), match.group(0))), condition
+        )
+        return eval(resolved)
+    except Exception:
+        return False
+
+
+def bench_conditions(iterations: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        legacy_evaluate(LEGACY_CONDITION, VARIABLES)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        evaluate_condition(CONDITION, VARIABLES)
+    compiled_seconds = time.perf_counter() - start
+
+    return {
+        "legacy_per_second": iterations / legacy_seconds,
+        "compiled_per_second": iterations / compiled_seconds
+    }
+
+
+async def bench_loop_step(iterations: int, legacy: bool) -> float:
+    with tempfile.TemporaryDirectory() as storage:
+        engine = WorkflowEngine(None, storage_path=Path(storage))
+        condition = CONDITION
+        if legacy:
+            engine._evaluate_condition = legacy_evaluate
+            condition = LEGACY_CONDITION
+
+        workflow_id = await engine.create_workflow("bench", "loop benchmark", [{
+            "id": "loop",
+            "name": "loop",
+            "step_type": StepType.LOOP.value,
+            "inputs": {"steps": [], "max_iterations": iterations},
+            "conditions": {"while_condition": condition},
+            "status": StepStatus.PENDING.value
+        }])
+        workflow = await engine._load_workflow(workflow_id)
+        workflow.variables.update(VARIABLES)
+
+        start = time.perf_counter()
+        result = await engine._execute_loop(workflow, workflow.steps[0])
+        seconds = time.perf_counter() - start
+        await engine.shutdown()
+
+    assert result["iterations"] == iterations
+    return iterations / seconds
+
+
+async def main(args):
+    print(f"🔁 {args.iterations} evaluations of: {CONDITION}")
+    rates = bench_conditions(args.iterations)
+    print(f"  condition   legacy {rates['legacy_per_second']:>12.0f}/s  "
+          f"compiled {rates['compiled_per_second']:>12.0f}/s  "
+          f"({rates['compiled_per_second'] / rates['legacy_per_second']:.1f}x)")
+
+    legacy_rate = await bench_loop_step(args.iterations, legacy=True)
+    compiled_rate = await bench_loop_step(args.iterations, legacy=False)
+    print(f"  loop step   legacy {legacy_rate:>12.0f}/s  "
+          f"compiled {compiled_rate:>12.0f}/s  ({compiled_rate / legacy_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
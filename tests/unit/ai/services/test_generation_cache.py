@@ -0,0 +1,145 @@
+"""
+Unit tests for GenerationCache service.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from packages.ai.services.generation_cache import GenerationCache
+from packages.ai.services.fallback_manager import FallbackManager
+from packages.ai.services.response_generator import ResponseGenerator
+from packages.ai.schemas import GenerationRequest, GenerationResponse
+
+
+def _request(prompt: str = "Explain Python decorators", **kwargs) -> GenerationRequest:
+    return GenerationRequest(prompt=prompt, max_tokens=100, temperature=0.2, **kwargs)
+
+
+def _response(content: str = "A decorator wraps a function.", model: str = "test-model") -> GenerationResponse:
+    return GenerationResponse(content=content, model_used=model, status="completed", response_time=1.5)
+
+
+class TestGenerationCache:
+    """Test cases for GenerationCache."""
+
+    @pytest.mark.asyncio
+    async def test_exact_hit_uses_full_prompt_and_params(self):
+        """Test that only the same full prompt, params and model hit."""
+        cache = GenerationCache()
+        prefix = "x" * 150
+        await cache.put(_request(prefix + " first"), _response(), "test-model")
+
+        hit = await cache.get(_request(prefix + " first"), "test-model")
+        assert hit.content == "A decorator wraps a function."
+        assert hit.metadata["cache"] == {"tier": "exact"}
+        assert await cache.get(_request(prefix + " second"), "test-model") is None
+        assert await cache.get(_request(prefix + " first", top_p=0.5), "test-model") is None
+        assert await cache.get(_request(prefix + " first"), "other-model") is None
+        assert cache.get_stats()["hit_ratio"] == 0.25
+
+    @pytest.mark.asyncio
+    async def test_returned_responses_are_copies(self):
+        """Test that mutating a hit does not change the stored entry."""
+        cache = GenerationCache()
+        original = _response()
+        await cache.put(_request(), original)
+        original.content = "changed by caller"
+
+        hit = await cache.get(_request())
+        hit.status = "cached_fallback"
+        again = await cache.get(_request())
+        assert again.content == "A decorator wraps a function."
+        assert again.status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_lru_entry_and_byte_budget(self):
+        """Test LRU eviction by entry count and by memory budget."""
+        cache = GenerationCache(max_entries=2)
+        await cache.put(_request("a"), _response())
+        await cache.put(_request("b"), _response())
+        await cache.get(_request("a"))
+        await cache.put(_request("c"), _response())
+        assert await cache.get(_request("b")) is None
+        assert await cache.get(_request("a")) is not None
+
+        small = GenerationCache(max_bytes=2000)
+        await small.put(_request("big one"), _response("y" * 1200))
+        await small.put(_request("big two"), _response("z" * 1200))
+        assert len(small) == 1
+        assert small.bytes_used <= 2000
+        assert small.get_stats()["evictions"] == 1
+        assert not await small.put(_request("huge"), _response("w" * 5000))
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, monkeypatch):
+        """Test that expired entries are dropped on lookup."""
+        clock = Mock(return_value=1000.0)
+        monkeypatch.setattr("packages.ai.services.generation_cache.time.time", clock)
+        cache = GenerationCache(ttl_seconds=10)
+        await cache.put(_request(), _response())
+
+        clock.return_value = 1011.0
+        assert await cache.get(_request()) is None
+        assert cache.get_stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_semantic_tier(self):
+        """Test that similar prompts hit only above the threshold and with matching params."""
+        vectors = {
+            "How do I reverse a list?": [1.0, 0.0, 0.1],
+            "How can I reverse a list?": [0.99, 0.0, 0.12],
+            "What is a monad?": [0.0, 1.0, 0.0],
+        }
+        cache = GenerationCache(embedder=AsyncMock(side_effect=lambda text: vectors[text]))
+        await cache.put(_request("How do I reverse a list?"), _response("Use reversed()."), "m")
+
+        hit = await cache.get(_request("How can I reverse a list?"), "m")
+        assert hit.content == "Use reversed()."
+        assert hit.metadata["cache"]["tier"] == "semantic"
+        assert await cache.get(_request("What is a monad?"), "m") is None
+        assert await cache.get(_request("How can I reverse a list?", top_k=5), "m") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_responses_not_cached(self):
+        """Test that errors and fallback responses are never stored."""
+        cache = GenerationCache()
+        error = GenerationResponse(content="", model_used="m", status="error", response_time=0.1)
+        fallback = GenerationResponse(content="x", model_used="m", status="completed",
+                                      response_time=0.1, fallback_used=True)
+        assert not await cache.put(_request(), error)
+        assert not await cache.put(_request(), fallback)
+        assert len(cache) == 0
+
+
+class TestGenerationCacheIntegration:
+    """Test the cache wired into ResponseGenerator and FallbackManager."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_skips_model(self):
+        """Test that a repeated prompt is answered without calling the model."""
+        model = Mock()
+        model.generate = AsyncMock(return_value="Generated text")
+        loader = Mock()
+        loader.is_model_loaded.return_value = True
+        loader.get_loaded_models.return_value = {"test-model": model}
+        generator = ResponseGenerator(loader, Mock(spec=FallbackManager))
+        generator.active_model = "test-model"
+
+        first = await generator.generate_text(_request())
+        second = await generator.generate_text(_request())
+
+        assert first.content == second.content == "Generated text"
+        assert model.generate.await_count == 1
+        assert generator.generation_cache.get_stats()["exact_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fallback_cache_returns_marked_copy(self):
+        """Test that the cached fallback no longer mutates the stored response."""
+        manager = FallbackManager()
+        manager.cache_response(_request(), _response(model="any-model"))
+
+        fallback = await manager.handle_generation_error("test-model", _request(), "boom")
+        assert fallback.status == "cached_fallback"
+        assert fallback.fallback_used is True
+        assert manager.response_cache.get_exact(_request()).status == "completed"
@@ -0,0 +1,258 @@
+"""
+Unit tests for the continuous batching scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from packages.ai.continuous_batching import (
+    BatchSequence, ContinuousBatchScheduler, DecodeBackend, TransformersBatchBackend
+)
+
+EOS = 0
+
+
+class ByteTokenizer:
+    """Byte-level tokenizer stand-in: each token id is one UTF-8 byte."""
+
+    def decode(self, token_ids, skip_special_tokens=True):
+        return bytes(token_ids).decode("utf-8", errors="replace")
+
+
+class EchoBackend(DecodeBackend):
+    """Fake model that answers each prompt with its upper-cased text, then EOS."""
+
+    tokenizer = ByteTokenizer()
+    eos_token_id = EOS
+
+    def __init__(self):
+        self.rows = []
+        self.batch_sizes = []
+
+    def prefill(self, sequences):
+        for sequence in sequences:
+            sequence.prompt_tokens = len(sequence.prompt)
+            self.rows.append([*sequence.prompt.upper().encode("utf-8"), EOS])
+        return [self.rows[-len(sequences) + i].pop(0) for i in range(len(sequences))]
+
+    def decode(self, sequences):
+        assert len(sequences) == len(self.rows)
+        self.batch_sizes.append(len(self.rows))
+        return [row.pop(0) if row else EOS for row in self.rows]
+
+    def release(self, keep):
+        self.rows = [self.rows[index] for index in keep]
+
+    def reset(self):
+        self.rows = []
+
+
+def build_tiny_lm():
+    """Randomly initialised two-layer GPT-2 with a character-level tokenizer (no downloads)."""
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from tokenizers import Tokenizer, decoders, models
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    chars = ["<eos>", "<unk>", "\n", "\t"] + [chr(c) for c in range(32, 127)]
+    backend = Tokenizer(models.BPE(vocab={c: i for i, c in enumerate(chars)}, merges=[], unk_token="<unk>"))
+    backend.decoder = decoders.Fuse()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend, eos_token="<eos>", unk_token="<unk>", model_input_names=["input_ids", "attention_mask"]
+    )
+
+    torch.manual_seed(0)
+    config = GPT2Config(
+        vocab_size=len(chars), n_positions=512, n_embd=32, n_layer=2, n_head=2,
+        bos_token_id=tokenizer.eos_token_id, eos_token_id=tokenizer.eos_token_id, tie_word_embeddings=False
+    )
+    model = GPT2LMHeadModel(config).eval()
+    with torch.no_grad():
+        # A zero EOS logit never wins greedy decoding, so outputs run to full length
+        model.lm_head.weight[tokenizer.eos_token_id].zero_()
+    return torch, model, tokenizer
+
+
+def greedy_reference(torch, model, tokenizer, prompt, steps):
+    """Token ids model.generate() picks for an unpadded prompt under greedy decoding."""
+    inputs = tokenizer(prompt, return_tensors="pt")
+    with torch.no_grad():
+        output = model.generate(
+            input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"],
+            max_new_tokens=steps, do_sample=False, pad_token_id=tokenizer.eos_token_id
+        )
+    return output[0, inputs["input_ids"].shape[1]:].tolist()
+
+
+class TestContinuousBatchScheduler:
+    """Test cases for ContinuousBatchScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_batch(self):
+        """Test that concurrent requests decode together and finish independently."""
+        backend = EchoBackend()
+        scheduler = ContinuousBatchScheduler(backend, max_batch_size=4)
+
+        prompts = ["a", "hello", "batching works"]
+        texts = await asyncio.gather(*(scheduler.generate(p, max_new_tokens=64) for p in prompts))
+
+        assert texts == [p.upper() for p in prompts]
+        assert max(backend.batch_sizes) == 3
+        # Short requests retire early instead of padding out the batch
+        assert backend.batch_sizes[-1] == 1
+        assert scheduler.get_stats()["completed"] == 3
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_waiting_requests_admitted_as_slots_free(self):
+        """Test that queued requests join the in-flight batch when a row retires."""
+        backend = EchoBackend()
+        scheduler = ContinuousBatchScheduler(backend, max_batch_size=2)
+
+        streams = [scheduler.submit(p, max_new_tokens=64) for p in ["xx", "yyyyyyyy", "zz"]]
+        texts = await asyncio.gather(*(s.text() for s in streams))
+
+        assert texts == ["XX", "YYYYYYYY", "ZZ"]
+        assert max(backend.batch_sizes) == 2
+        # "zz" was admitted while "yyyyyyyy" was still decoding
+        assert streams[2].sequence.finished_at < streams[1].sequence.finished_at
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_stream_chunks_and_limits(self):
+        """Test streaming, stop sequences and max_new_tokens."""
+        scheduler = ContinuousBatchScheduler(EchoBackend())
+
+        chunks = [c async for c in scheduler.submit("abc;def", stop_sequences=[";"])]
+        truncated = scheduler.submit("abcdef", max_new_tokens=3)
+
+        assert "".join(chunks) == "ABC"
+        assert await truncated.text() == "ABC"
+        assert truncated.sequence.finish_reason == "length"
+
+        capped = scheduler.submit("abcdef", max_length=8)
+        assert await capped.text() == "AB"
+        assert capped.sequence.finish_reason == "length"
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancel_retires_row(self):
+        """Test that a cancelled stream stops and frees its slot."""
+        backend = EchoBackend()
+        scheduler = ContinuousBatchScheduler(backend, max_batch_size=1)
+
+        long_stream = scheduler.submit("x" * 200, max_new_tokens=500)
+        queued = scheduler.submit("ok")
+        async for _ in long_stream:
+            long_stream.cancel()
+
+        assert long_stream.sequence.finish_reason == "cancelled"
+        assert len(long_stream.sequence.token_ids) < 200
+        assert await queued.text() == "OK"
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_backend_failure_fails_requests(self):
+        """Test that a decode error is surfaced to every active request."""
+
+        class BrokenBackend(EchoBackend):
+            def decode(self, sequences):
+                raise RuntimeError("device lost")
+
+        scheduler = ContinuousBatchScheduler(BrokenBackend())
+        stream = scheduler.submit("abc")
+
+        with pytest.raises(RuntimeError, match="device lost"):
+            await stream.text()
+        assert scheduler.get_stats()["failed"] == 1
+
+        # The scheduler keeps serving new requests
+        assert await scheduler.generate("", max_new_tokens=0) == ""
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_release_failure_keeps_loop_running(self):
+        """Test that an unexpected backend error fails the active batch without killing the loop."""
+
+        class FlakyReleaseBackend(EchoBackend):
+            failures = 1
+
+            def release(self, keep):
+                if self.failures:
+                    self.failures -= 1
+                    raise RuntimeError("release boom")
+                super().release(keep)
+
+        backend = FlakyReleaseBackend()
+        scheduler = ContinuousBatchScheduler(backend)
+        short, long = scheduler.submit("a"), scheduler.submit("abcdef")
+
+        assert await short.text() == "A"
+        with pytest.raises(RuntimeError, match="release boom"):
+            await asyncio.wait_for(long.text(), timeout=1)
+        assert scheduler.running and not scheduler._active
+
+        # EchoBackend.decode asserts its rows match the batch, so this also checks the reset
+        assert await asyncio.wait_for(scheduler.generate("ok"), timeout=1) == "OK"
+        await scheduler.stop()
+
+
+class TestTransformersBatchBackend:
+    """Test cases for TransformersBatchBackend on a real (tiny) model."""
+
+    def test_left_padded_batch_matches_generate(self):
+        """Test that prefill, merge, decode and release reproduce unbatched greedy output."""
+        torch, model, tokenizer = build_tiny_lm()
+        backend = TransformersBatchBackend(model, tokenizer, device="cpu")
+        prompts = ["hi", "def add(a, b):", "class Scheduler:\n    def admit(self, stream):"]
+        sequences = [BatchSequence(id=str(i), prompt=p, temperature=0.0) for i, p in enumerate(prompts)]
+        generated = {s.id: [] for s in sequences}
+
+        def record(rows, tokens):
+            for sequence, token in zip(rows, tokens):
+                generated[sequence.id].append(token)
+
+        # Two prompts of different lengths share one left-padded prefill
+        active = sequences[:2]
+        record(active, backend.prefill(active))
+        for _ in range(3):
+            record(active, backend.decode(active))
+
+        # A wider prompt joins mid-flight, so the running rows get padded further
+        record(sequences[2:], backend.prefill(sequences[2:]))
+        active = sequences
+        for _ in range(3):
+            record(active, backend.decode(active))
+        assert backend._mask.shape == (3, len(prompts[2]) + 3)
+
+        # Retiring the widest row trims columns that are now padding for everyone
+        backend.release([0, 1])
+        active = sequences[:2]
+        assert backend._mask.shape == (2, len(prompts[1]) + 6)
+        assert bool(backend._mask[1].all())
+        for _ in range(4):
+            record(active, backend.decode(active))
+
+        for sequence in sequences:
+            tokens = generated[sequence.id]
+            assert sequence.prompt_tokens == len(sequence.prompt)
+            assert tokens == greedy_reference(torch, model, tokenizer, sequence.prompt, len(tokens))
+
+        backend.release([])
+        assert backend._past is None and backend._mask is None
+
+    @pytest.mark.asyncio
+    async def test_scheduler_drives_real_model(self):
+        """Test that the scheduler streams greedy output from a real model row by row."""
+        torch, model, tokenizer = build_tiny_lm()
+        scheduler = ContinuousBatchScheduler(TransformersBatchBackend(model, tokenizer, device="cpu"), max_batch_size=2)
+
+        prompts = ["x = ", "for i in range(10):", "import os"]
+        texts = await asyncio.gather(*(
+            scheduler.generate(p, max_new_tokens=6 + i, temperature=0.0) for i, p in enumerate(prompts)
+        ))
+
+        for i, (prompt, text) in enumerate(zip(prompts, texts)):
+            assert text == tokenizer.decode(greedy_reference(torch, model, tokenizer, prompt, 6 + i))
+        await scheduler.stop()
@@ -0,0 +1,99 @@
+"""
+Unit tests for LlamaLocalIntegration.stream_generate on a tiny real model.
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+llama = pytest.importorskip("packages.ai.llama_local_integration")
+
+from tokenizers import Tokenizer, decoders, models
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+
+def build_tiny_lm():
+    """Randomly initialised two-layer GPT-2 with a character-level tokenizer (no downloads)."""
+    chars = ["<eos>", "<unk>", "\n", "\t"] + [chr(c) for c in range(32, 127)]
+    backend = Tokenizer(models.BPE(vocab={c: i for i, c in enumerate(chars)}, merges=[], unk_token="<unk>"))
+    backend.decoder = decoders.Fuse()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend, eos_token="<eos>", unk_token="<unk>", model_input_names=["input_ids", "attention_mask"]
+    )
+
+    torch.manual_seed(0)
+    config = GPT2Config(
+        vocab_size=len(chars), n_positions=512, n_embd=32, n_layer=2, n_head=2,
+        bos_token_id=tokenizer.eos_token_id, eos_token_id=tokenizer.eos_token_id, tie_word_embeddings=False
+    )
+    model = GPT2LMHeadModel(config).eval()
+    with torch.no_grad():
+        # A zero EOS logit never wins greedy decoding, so outputs run to full length
+        model.lm_head.weight[tokenizer.eos_token_id].zero_()
+    return model, tokenizer
+
+
+@pytest.fixture
+def integration():
+    """LlamaLocalIntegration wired to the tiny model instead of a downloaded checkpoint."""
+    config = llama.LlamaConfig(
+        model_size=llama.LlamaModelSize.LLAMA_7B,
+        quantization=llama.QuantizationMode.NONE,
+        max_memory_gb=1.0,
+        use_gpu=False,
+        gpu_memory_fraction=0.0
+    )
+    integration = llama.LlamaLocalIntegration(config)
+    integration.model, integration.tokenizer = build_tiny_lm()
+    integration.device = "cpu"
+    return integration
+
+
+def generate_reference(integration, request):
+    """Text model.generate() produces for the request under greedy decoding."""
+    inputs = integration.tokenizer(integration._format_prompt(request), return_tensors="pt")
+    with torch.no_grad():
+        output = integration.model.generate(
+            **inputs,
+            max_new_tokens=request.max_tokens,
+            do_sample=False,
+            pad_token_id=integration.tokenizer.eos_token_id
+        )
+    return integration.tokenizer.decode(output[0, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+
+class TestLlamaStreamGenerate:
+    """Test cases for KV-cached stream_generate."""
+
+    @pytest.mark.asyncio
+    async def test_incremental_output_matches_generate(self, integration):
+        """Test that cached one-token steps reproduce a full greedy generate()."""
+        request = llama.GenerationRequest(
+            prompt="Write a function that adds two numbers.",
+            task_type=llama.TaskType.CODE_GENERATION,
+            max_tokens=32,
+            temperature=0.0
+        )
+
+        chunks = [chunk async for chunk in integration.stream_generate(request)]
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == generate_reference(integration, request)
+        assert integration.performance_metrics["total_tokens_generated"] == 32
+
+    @pytest.mark.asyncio
+    async def test_stop_sequence_truncates_stream(self, integration):
+        """Test that a stop sequence ends the stream without emitting it."""
+        request = llama.GenerationRequest(
+            prompt="Explain continuous batching.",
+            task_type=llama.TaskType.GENERAL,
+            max_tokens=24,
+            temperature=0.0
+        )
+        expected = generate_reference(integration, request)
+        stop = expected[10:13]
+        request.stop_sequences = [stop]
+
+        text = "".join([chunk async for chunk in integration.stream_generate(request)])
+
+        assert text == expected[:expected.index(stop)]
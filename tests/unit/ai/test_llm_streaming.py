@@ -0,0 +1,75 @@
+"""
+Unit tests for streamed chat completion parsing.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from packages.ai.llm_streaming import ToolCallAssembler, iter_ndjson, iter_sse
+
+
+async def _collect(parser, body: bytes):
+    async def handler(request):
+        return httpx.Response(200, content=body)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        async with client.stream("POST", "http://llm.local/stream") as response:
+            return [item async for item in parser(response)]
+
+
+def _sse(*events) -> bytes:
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events).encode() + b"data: [DONE]\n\n"
+
+
+class TestStreamParsers:
+    """Test cases for SSE and NDJSON parsing."""
+
+    @pytest.mark.asyncio
+    async def test_sse_events_until_done(self):
+        """Test that SSE data events are decoded and comments are ignored."""
+        body = b": keep-alive\n\n" + _sse({"choices": [{"delta": {"content": "Hel"}}]},
+                                          {"choices": [{"delta": {"content": "lo"}}]})
+        body += b'data: {"ignored": true}\n\n'
+
+        events = await _collect(iter_sse, body)
+
+        assert [e["choices"][0]["delta"]["content"] for e in events] == ["Hel", "lo"]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_lines(self):
+        """Test that NDJSON objects are yielded line by line."""
+        body = b'{"response": "def", "done": false}\n\n{"response": "", "done": true, "eval_count": 3}\n'
+
+        events = await _collect(iter_ndjson, body)
+
+        assert events[0]["response"] == "def"
+        assert events[1]["done"] is True
+
+
+class TestToolCallAssembler:
+    """Test cases for ToolCallAssembler."""
+
+    def test_openai_fragments(self):
+        """Test assembling interleaved OpenAI tool-call deltas."""
+        assembler = ToolCallAssembler()
+        assembler.add_openai_delta([{"index": 0, "id": "call_1", "function": {"name": "read_file", "arguments": ""}}])
+        assembler.add_openai_delta([{"index": 0, "function": {"arguments": '{"path": "READ'}}])
+        assembler.add_openai_delta([{"index": 1, "id": "call_2", "function": {"name": "ls", "arguments": "{}"}}])
+        assembler.add_openai_delta([{"index": 0, "function": {"arguments": 'ME.md"}'}}])
+
+        assert assembler.complete() == [
+            {"name": "read_file", "arguments": {"path": "README.md"}},
+            {"name": "ls", "arguments": {}}
+        ]
+
+    def test_anthropic_style_and_invalid_json(self):
+        """Test start/append usage and that broken arguments are kept raw."""
+        assembler = ToolCallAssembler()
+        assert assembler.complete() is None
+
+        assembler.start(2, "run", "toolu_1")
+        assembler.append_arguments(2, '{"cmd": "ls"')
+
+        assert assembler.complete() == [{"name": "run", "arguments": {"raw": '{"cmd": "ls"'}}]
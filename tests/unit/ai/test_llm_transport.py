@@ -0,0 +1,132 @@
+"""
+Unit tests for the LLM transport layer (pooled clients and hedged racing).
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from packages.ai.llm_transport import (
+    LOCAL_POOL, AllAttemptsFailed, HedgedRace, LatencyTracker, build_http_client
+)
+
+
+def _mock_server(delays):
+    """Local stand-in for provider endpoints: /<name> answers after delays[name] seconds."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        name = request.url.path.strip("/")
+        delay = delays[name]
+        if delay is None:
+            return httpx.Response(503, json={"error": "unavailable"})
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"provider": name})
+    return httpx.MockTransport(handler)
+
+
+def _calls(client, names):
+    async def call(name):
+        response = await client.post(f"http://llm.local/{name}")
+        response.raise_for_status()
+        return response.json()["provider"]
+    return [(name, lambda name=name: call(name)) for name in names]
+
+
+class TestHedgedRace:
+    """Test cases for HedgedRace."""
+
+    @pytest.mark.asyncio
+    async def test_hedge_beats_slow_primary(self):
+        """Test that a backup fired after the hedge delay wins over a slow primary."""
+        client = build_http_client(LOCAL_POOL, timeout=5.0, transport=_mock_server({"local": 2.0, "cloud": 0.01}))
+        race = HedgedRace(_calls(client, ["local", "cloud"]), hedge_delay=lambda key: 0.05)
+
+        start = time.perf_counter()
+        winner, result = await race.run()
+
+        assert (winner, result) == ("cloud", "cloud")
+        assert race.hedges_fired == 1
+        assert time.perf_counter() - start < 0.5
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_sequential_fallback_without_hedging(self):
+        """Test that without a hedge delay only failures move on to the next provider."""
+        client = build_http_client(LOCAL_POOL, timeout=5.0, transport=_mock_server({"a": None, "b": 0.05, "c": 0.0}))
+        failures = []
+        race = HedgedRace(_calls(client, ["a", "b", "c"]), on_failure=lambda key, error: failures.append(key))
+
+        assert await race.run() == ("b", "b")
+        assert failures == ["a"]
+        assert race.hedges_fired == 0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_all_failed_and_losers_cancelled(self):
+        """Test error aggregation and that in-flight losers are cancelled."""
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append("slow")
+                raise
+
+        async def fast():
+            return "ok"
+
+        async def broken():
+            raise RuntimeError("down")
+
+        assert await HedgedRace([("slow", slow), ("fast", fast)], hedge_delay=lambda key: 0.01).run() == ("fast", "ok")
+        assert cancelled == ["slow"]
+
+        with pytest.raises(AllAttemptsFailed) as exc_info:
+            await HedgedRace([("x", broken), ("y", broken)]).run()
+        assert [key for key, _ in exc_info.value.errors] == ["x", "y"]
+
+    @pytest.mark.asyncio
+    async def test_simultaneous_winners_release_the_loser(self):
+        """Test that a success finishing in the same round as the winner is discarded, not leaked."""
+        gate = asyncio.Event()
+        discarded = []
+
+        async def opens(name):
+            await gate.wait()
+            return name
+
+        async def release(key, result):
+            discarded.append((key, result))
+
+        async def open_gate():
+            await asyncio.sleep(0.02)
+            gate.set()
+
+        race = HedgedRace(
+            [("a", lambda: opens("a")), ("b", lambda: opens("b"))],
+            hedge_delay=lambda key: 0.0,
+            on_discard=release
+        )
+        opener = asyncio.create_task(open_gate())
+        winner, result = await race.run()
+        await opener
+
+        assert winner == result
+        assert discarded == [("b" if winner == "a" else "a",) * 2]
+
+
+class TestLatencyTracker:
+    """Test cases for LatencyTracker."""
+
+    def test_percentiles_over_window(self):
+        """Test percentile selection and window bound."""
+        tracker = LatencyTracker(window=100)
+        for i in range(1, 201):
+            tracker.record("p", i / 1000)
+
+        assert tracker.count("p") == 100
+        assert tracker.percentile("p", 50) == pytest.approx(0.150)
+        assert tracker.percentile("p", 95) == pytest.approx(0.195)
+        assert tracker.percentile("missing", 95) is None
@@ -0,0 +1,81 @@
+"""
+Unit tests for incremental streaming decode helpers.
+"""
+
+from packages.ai.streaming_decode import IncrementalDetokenizer, StopSequenceMatcher
+
+
+class ByteTokenizer:
+    """Byte-level tokenizer stand-in: each token id is one UTF-8 byte."""
+
+    def __init__(self):
+        self.decode_calls = 0
+
+    def decode(self, token_ids, skip_special_tokens=True):
+        self.decode_calls += 1
+        return bytes(token_ids).decode("utf-8", errors="replace")
+
+
+def _stream(detokenizer, text):
+    chunks = [detokenizer.add(byte) for byte in text.encode("utf-8")]
+    chunks.append(detokenizer.flush())
+    return chunks
+
+
+class TestIncrementalDetokenizer:
+    """Test cases for IncrementalDetokenizer."""
+
+    def test_reassembles_text(self):
+        """Test that concatenated deltas equal the full decode."""
+        text = "def add(a, b):\n    return a + b"
+        assert "".join(_stream(IncrementalDetokenizer(ByteTokenizer()), text)) == text
+
+    def test_holds_back_partial_characters(self):
+        """Test that a multi-byte character is emitted only once complete."""
+        chunks = _stream(IncrementalDetokenizer(ByteTokenizer()), "a→b")
+        assert "�" not in "".join(chunks)
+        assert chunks == ["a", "", "", "→", "b", ""]
+
+    def test_decode_window_stays_small(self):
+        """Test that each step decodes a bounded window, not the whole stream."""
+        tokenizer = ByteTokenizer()
+        detokenizer = IncrementalDetokenizer(tokenizer)
+        for byte in ("x" * 500).encode("utf-8"):
+            detokenizer.add(byte)
+        assert len(detokenizer.token_ids[detokenizer._prefix_offset:]) <= 2
+
+
+class TestStopSequenceMatcher:
+    """Test cases for StopSequenceMatcher."""
+
+    def test_passthrough_without_stops(self):
+        """Test that text flows through untouched with no stop sequences."""
+        matcher = StopSequenceMatcher()
+        assert matcher.feed("hello") == ("hello", False)
+        assert matcher.flush() == ""
+
+    def test_stop_split_across_chunks(self):
+        """Test that a stop sequence spanning chunks is caught and never emitted."""
+        matcher = StopSequenceMatcher(["</code>"])
+        emitted = []
+        stopped = False
+        for chunk in ["print(1)", "</c", "ode>", "trailing"]:
+            text, stopped = matcher.feed(chunk)
+            emitted.append(text)
+            if stopped:
+                break
+        assert stopped
+        assert "".join(emitted) == "print(1)"
+
+    def test_earliest_stop_wins(self):
+        """Test that the earliest matching stop sequence truncates the output."""
+        matcher = StopSequenceMatcher(["\n\n", "END"])
+        assert matcher.feed("abcEND\n\n") == ("abc", True)
+        assert matcher.feed("more") == ("", True)
+
+    def test_flush_releases_held_text(self):
+        """Test that a near-miss tail is released when the stream ends."""
+        matcher = StopSequenceMatcher(["STOP"])
+        text, stopped = matcher.feed("xxST")
+        assert (text, stopped) == ("x", False)
+        assert text + matcher.flush() == "xxST"
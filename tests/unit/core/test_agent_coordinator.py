@@ -0,0 +1,201 @@
+"""
+Unit tests for AgentCoordinator completion-driven workflow execution.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from packages.core.agent_coordinator import (
+    AgentCoordinator, CollaborationPattern, Task, TaskStatus, Workflow, WorkflowType
+)
+from packages.core.deadlines import DeadlineScheduler
+
+
+class _Registry:
+    """Registry with a single agent that never runs out of capacity."""
+
+    def __init__(self):
+        self.agent = SimpleNamespace(agent_id="agent-1", metrics=SimpleNamespace(current_load=0))
+
+    async def select_agent(self, **kwargs):
+        return self.agent
+
+    async def get_agent(self, agent_id):
+        return self.agent
+
+    async def update_agent_status(self, *args):
+        return True
+
+class _Queue:
+    """Message queue whose "agent" reports each task done after ``delay`` seconds."""
+
+    def __init__(self, delay=0.01, failing=(), silent=()):
+        self.delay = delay
+        self.failing = set(failing)
+        self.silent = set(silent)
+        self.coordinator = None
+        self.assigned = []
+
+    async def send_message(self, message):
+        task_id = message.correlation_id
+        self.assigned.append((task_id, time.perf_counter()))
+        if task_id in self.silent:
+            return True
+
+        async def finish():
+            await asyncio.sleep(self.delay)
+            success = task_id not in self.failing
+            await self.coordinator.handle_task_completion(task_id, f"{task_id}-done", success)
+
+        asyncio.create_task(finish())
+        return True
+
+
+def _coordinator(**queue_kwargs):
+    queue = _Queue(**queue_kwargs)
+    coordinator = AgentCoordinator(queue, _Registry(), deadlines=DeadlineScheduler())
+    queue.coordinator = coordinator
+    return coordinator, queue
+
+
+def _task(task_id, deps=(), task_type="work", max_retries=0, **extra):
+    return Task(id=task_id, type=task_type, description=task_id, parameters={},
+                dependencies=list(deps), max_retries=max_retries, **extra)
+
+
+def _workflow(tasks, workflow_type):
+    return Workflow(id="wf", name="wf", description="", tasks=tasks, workflow_type=workflow_type,
+                    collaboration_pattern=CollaborationPattern.PIPELINE)
+
+
+class TestWorkflowReadiness:
+    """Test cases for the incrementally maintained ready set."""
+
+    def test_dependents_become_ready_on_completion(self):
+        """Test that a task is ready only once every dependency has been marked complete."""
+        workflow = _workflow([_task("a"), _task("b"), _task("c", deps=["a", "b"])], WorkflowType.PIPELINE)
+        assert [t.id for t in workflow.get_ready_tasks()] == ["a", "b"]
+
+        workflow.tasks[0].status = TaskStatus.COMPLETED
+        assert workflow.mark_task_completed("a") == []
+        workflow.tasks[1].status = TaskStatus.COMPLETED
+
+        assert [t.id for t in workflow.mark_task_completed("b")] == ["c"]
+        assert [t.id for t in workflow.get_ready_tasks()] == ["c"]
+        assert workflow.mark_task_completed("b") == []
+
+
+class TestCompletionDrivenExecution:
+    """Test cases for workflow strategies waiting on completion futures."""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_hands_off_immediately(self):
+        """Test that a dependent is assigned as soon as its dependency completes."""
+        coordinator, queue = _coordinator()
+        workflow = _workflow([_task("a"), _task("b", deps=["a"]), _task("c", deps=["b"])],
+                             WorkflowType.PIPELINE)
+
+        start = time.perf_counter()
+        await coordinator.execute_workflow(workflow)
+
+        assert time.perf_counter() - start < 0.5
+        assert [task_id for task_id, _ in queue.assigned] == ["a", "b", "c"]
+        assert workflow.status == TaskStatus.COMPLETED
+        assert not coordinator.task_futures
+
+    @pytest.mark.asyncio
+    async def test_pipeline_stops_on_failure(self):
+        """Test that a permanently failed task fails the pipeline without assigning dependents."""
+        coordinator, queue = _coordinator(failing={"a"})
+        workflow = _workflow([_task("a"), _task("b", deps=["a"])], WorkflowType.PIPELINE)
+
+        await coordinator.execute_workflow(workflow)
+
+        assert workflow.status == TaskStatus.FAILED
+        assert [task_id for task_id, _ in queue.assigned] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_map_reduce_and_sequential(self):
+        """Test that reduce starts right after the maps finish and sequential runs in order."""
+        coordinator, queue = _coordinator(delay=0.02)
+        maps = [_task(f"m{i}", task_type="map_chunk") for i in range(3)]
+        workflow = _workflow(maps + [_task("r", task_type="reduce_all")], WorkflowType.MAP_REDUCE)
+
+        start = time.perf_counter()
+        await coordinator.execute_workflow(workflow)
+        assigned = dict(queue.assigned)
+        assert assigned["r"] - start < 0.3
+
+        coordinator, queue = _coordinator()
+        workflow = _workflow([_task("s1"), _task("s2")], WorkflowType.SEQUENTIAL)
+        await coordinator.execute_workflow(workflow)
+        assert [task_id for task_id, _ in queue.assigned] == ["s1", "s2"]
+        assert workflow.status == TaskStatus.COMPLETED
+
+
+class TestDeadlines:
+    """Test cases for task and workflow timeouts."""
+
+    @pytest.mark.asyncio
+    async def test_silent_agent_times_out_promptly(self):
+        """Test that a task nobody reports on fails at its deadline, with one retry."""
+        coordinator, queue = _coordinator(silent={"t"})
+        task = _task("t", timeout=0.05, max_retries=1)
+
+        start = time.perf_counter()
+        await coordinator.assign_task(task)
+        await coordinator.wait_for_task(task, timeout=1)
+
+        assert 0.1 <= time.perf_counter() - start < 0.3
+        assert (task.status, task.error) == (TaskStatus.FAILED, "Task timeout")
+        assert [task_id for task_id, _ in queue.assigned] == ["t", "t"]
+        assert not coordinator.agent_timeouts and len(coordinator.deadlines) == 0
+
+    @pytest.mark.asyncio
+    async def test_workflow_deadline(self):
+        """Test that a workflow still running at its timeout is marked timed out."""
+        coordinator, _ = _coordinator(silent={"t"})
+        workflow = _workflow([_task("t")], WorkflowType.PARALLEL)
+        workflow.timeout = 0.05
+
+        await coordinator.execute_workflow(workflow)
+        await asyncio.sleep(0.08)
+
+        assert workflow.status == TaskStatus.TIMEOUT
+
+    @pytest.mark.asyncio
+    async def test_workflow_timeout_releases_waiting_strategy(self):
+        """Test that a pipeline blocked on a silent agent returns when the workflow times out."""
+        coordinator, queue = _coordinator(silent={"b"})
+        workflow = _workflow([_task("a"), _task("b", deps=["a"]), _task("c", deps=["b"])],
+                             WorkflowType.PIPELINE)
+        workflow.timeout = 0.1
+
+        await asyncio.wait_for(coordinator.execute_workflow(workflow), timeout=1)
+
+        assert workflow.status == TaskStatus.TIMEOUT
+        assert [t.status for t in workflow.tasks] == [TaskStatus.COMPLETED, TaskStatus.CANCELLED, TaskStatus.CANCELLED]
+        assert [task_id for task_id, _ in queue.assigned] == ["a", "b"]
+        assert not coordinator.task_futures and len(coordinator.deadlines) == 0
+        assert coordinator.agent_registry.agent.metrics.current_load == 0
+
+    @pytest.mark.asyncio
+    async def test_no_agent_fails_task(self):
+        """Test that a task no agent can take fails instead of waiting forever."""
+        coordinator, queue = _coordinator()
+
+        async def no_agent(**kwargs):
+            return None
+
+        coordinator.agent_registry.select_agent = no_agent
+        workflow = _workflow([_task("s1"), _task("s2")], WorkflowType.SEQUENTIAL)
+
+        await asyncio.wait_for(coordinator.execute_workflow(workflow), timeout=1)
+
+        assert workflow.status == TaskStatus.FAILED
+        assert (workflow.tasks[0].status, workflow.tasks[0].error) == (TaskStatus.FAILED, "No available agent")
+        assert workflow.tasks[1].status == TaskStatus.PENDING
+        assert not queue.assigned and not coordinator.task_futures
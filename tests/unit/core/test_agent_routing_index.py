@@ -0,0 +1,92 @@
+"""
+Unit tests for the EnhancedMessageQueue agent routing index.
+"""
+
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from packages.core.enhanced_message_queue import (
+    EnhancedMessage, EnhancedMessageQueue, RoutingStrategy
+)
+
+
+@pytest.fixture
+def queue():
+    """Create a queue on fakeredis that records the commands it sends."""
+    mq = EnhancedMessageQueue(namespace="test", agent_cache_ttl=60)
+    mq.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    mq.commands = []
+    original = mq.redis_client.execute_command
+
+    async def recording(*args, **kwargs):
+        mq.commands.append(args[0])
+        return await original(*args, **kwargs)
+
+    mq.redis_client.execute_command = recording
+    return mq
+
+
+def _message(content, strategy=RoutingStrategy.ROUND_ROBIN):
+    return EnhancedMessage(
+        id="", type="task", sender="tester", recipient="coder",
+        content=content, routing_strategy=strategy
+    )
+
+
+class TestAgentRoutingIndex:
+    """Test cases for agent registration and routing lookups."""
+
+    @pytest.mark.asyncio
+    async def test_round_robin_uses_index_not_keys(self, queue):
+        """Test routing reads the per-type index and never scans the keyspace."""
+        await queue.register_agent("coder-1", "coder")
+        await queue.register_agent("coder-2", "coder")
+
+        for i in range(4):
+            assert await queue.send_message(_message({"i": i}))
+
+        assert "KEYS" not in queue.commands
+        assert await queue.redis_client.llen("test:agent:coder-1") == 2
+        assert await queue.redis_client.llen("test:agent:coder-2") == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_serves_repeat_lookups_and_invalidates(self, queue):
+        """Test lookups hit the local cache until membership changes."""
+        await queue.register_agent("coder-1", "coder")
+        assert await queue._get_available_agents("coder") == ["coder-1"]
+
+        queue.commands.clear()
+        assert await queue._get_available_agents("coder") == ["coder-1"]
+        assert queue.commands == []
+
+        await queue.register_agent("coder-2", "coder")
+        assert sorted(await queue._get_available_agents("coder")) == ["coder-1", "coder-2"]
+
+        assert await queue.unregister_agent("coder-1")
+        assert await queue._get_available_agents("coder") == ["coder-2"]
+
+    @pytest.mark.asyncio
+    async def test_agents_without_heartbeat_are_evicted(self, queue):
+        """Test agents drop out of routing once their TTL passes."""
+        queue.agent_cache_ttl = 0
+        await queue.register_agent("stale", "coder", ttl=0.05)
+        await queue.register_agent("alive", "coder", ttl=0.05)
+
+        time.sleep(0.1)
+        await queue.heartbeat_agent("alive", "coder")
+
+        assert await queue._get_available_agents("coder") == ["alive"]
+        assert await queue.redis_client.zcard("test:routing:type:coder") == 1
+
+    @pytest.mark.asyncio
+    async def test_agents_do_not_expire_by_default(self, queue):
+        """Test agents stay routable without heartbeats unless a TTL is configured."""
+        queue.agent_cache_ttl = 0
+        await queue.register_agent("coder-1", "coder")
+
+        assert await queue.redis_client.zscore("test:routing:type:coder", "coder-1") == float("inf")
+        assert await queue._get_available_agents("coder") == ["coder-1"]
@@ -0,0 +1,66 @@
+"""
+Unit tests for the shared DeadlineScheduler.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from packages.core.deadlines import DeadlineScheduler
+
+
+class TestDeadlineScheduler:
+    """Test cases for DeadlineScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_fires_in_deadline_order_on_time(self):
+        """Test that callbacks run at their deadlines regardless of scheduling order."""
+        scheduler = DeadlineScheduler()
+        fired = []
+        start = time.monotonic()
+
+        for key, delay in (("slow", 0.06), ("fast", 0.01), ("middle", 0.03)):
+            scheduler.schedule(key, delay, lambda key=key: fired.append((key, time.monotonic() - start)))
+        await asyncio.sleep(0.1)
+
+        assert [key for key, _ in fired] == ["fast", "middle", "slow"]
+        assert all(abs(at - expected) < 0.03 for (_, at), expected in zip(fired, (0.01, 0.03, 0.06)))
+        assert len(scheduler) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_and_reschedule(self):
+        """Test that cancelled keys never fire and rescheduling replaces the deadline."""
+        scheduler = DeadlineScheduler()
+        fired = []
+
+        scheduler.schedule("a", 0.01, lambda: fired.append("a"))
+        scheduler.schedule("b", 0.01, lambda: fired.append("b-old"))
+        scheduler.schedule("b", 0.03, lambda: fired.append("b"))
+        assert scheduler.cancel("a")
+        assert not scheduler.cancel("a")
+
+        await asyncio.sleep(0.02)
+        assert fired == []
+        await asyncio.sleep(0.03)
+        assert fired == ["b"]
+        assert (scheduler.stats.scheduled, scheduler.stats.cancelled, scheduler.stats.fired) == (3, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_coroutine_callbacks_and_errors(self):
+        """Test that coroutine callbacks run as tasks and failures are counted, not raised."""
+        scheduler = DeadlineScheduler()
+        done = asyncio.Event()
+
+        async def expire():
+            done.set()
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        scheduler.schedule("ok", 0, expire)
+        scheduler.schedule("bad", 0, broken)
+        await asyncio.wait_for(done.wait(), 1)
+        await scheduler.close()
+
+        assert scheduler.stats.callback_errors == 1
@@ -0,0 +1,108 @@
+"""
+Unit tests for the Lua-scripted EnhancedMessageQueue send/receive path.
+"""
+
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from packages.core.enhanced_message_queue import (
+    EnhancedMessage, EnhancedMessageQueue, MessagePriority, MessageStatus
+)
+from packages.core.message_queue_scripts import encode_message
+
+
+def _message(message_id, content=None, recipient="agent-1"):
+    return EnhancedMessage(
+        id=message_id,
+        type="task",
+        sender="tester",
+        recipient=recipient,
+        content=content if content is not None else {"n": message_id, "items": []},
+        priority=MessagePriority.HIGH
+    )
+
+
+@pytest.fixture
+def queue():
+    """Create a scripted queue backed by fakeredis, counting commands sent."""
+    mq = EnhancedMessageQueue(namespace="test", use_scripts=True)
+    mq.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    mq.commands = []
+    original = mq.redis_client.execute_command
+
+    async def counting(*args, **kwargs):
+        mq.commands.append(args[0])
+        return await original(*args, **kwargs)
+
+    mq.redis_client.execute_command = counting
+    return mq
+
+
+class TestScriptedMessageQueue:
+    """Test cases for the scripted message path."""
+
+    @pytest.mark.asyncio
+    async def test_send_and_receive_are_single_round_trips(self, queue):
+        """Test a send and a receive each cost one command once scripts are cached."""
+        assert await queue.send_message(_message("warmup"))
+        assert await queue.receive_message("agent-1") is not None
+
+        queue.commands.clear()
+        assert await queue.send_message(_message("m1"))
+        assert queue.commands == ["EVALSHA"]
+
+        queue.commands.clear()
+        received = await queue.receive_message("agent-1")
+        assert queue.commands == ["EVALSHA"]
+
+        assert received.id == "m1"
+        assert received.status == MessageStatus.PROCESSING
+        assert received.content == {"n": "m1", "items": []}
+
+    @pytest.mark.asyncio
+    async def test_receive_marks_stored_message_processing(self, queue):
+        """Test the stored body is updated in place without mangling content."""
+        await queue.send_message(_message("m1", content={"status": "pending", "list": []}))
+        await queue.receive_message("agent-1")
+
+        stored = json.loads(await queue.redis_client.hget(queue.messages_key, "m1"))
+        assert stored["status"] == "processing"
+        assert stored["processed_at"]
+        assert stored["content"] == {"status": "pending", "list": []}
+        assert await queue.redis_client.zscore(queue.priority_queues[MessagePriority.HIGH], "m1")
+
+    @pytest.mark.asyncio
+    async def test_duplicate_rejected_across_queue_instances(self, queue):
+        """Test the dedup claim inside the script is shared through Redis."""
+        assert await queue.send_message(_message("m1", content={"same": True}))
+
+        other = EnhancedMessageQueue(namespace="test", use_scripts=True)
+        other.redis_client = queue.redis_client
+        assert await other.send_message(_message("m2", content={"same": True}))
+
+        assert await queue.redis_client.llen("test:agent:agent-1") == 1
+        assert not await queue.redis_client.hexists(queue.messages_key, "m2")
+
+    @pytest.mark.asyncio
+    async def test_empty_queue_and_legacy_bodies(self, queue):
+        """Test empty queues return None and legacy-layout bodies still decode."""
+        assert await queue.receive_message("agent-1") is None
+
+        legacy = _message("old")
+        await queue.redis_client.hset(queue.messages_key, "old", json.dumps(legacy.to_dict()))
+        await queue.redis_client.lpush("test:agent:agent-1", "old")
+
+        received = await queue.receive_message("agent-1")
+        assert received.id == "old"
+        assert received.status == MessageStatus.PROCESSING
+
+    def test_encode_message_puts_status_last(self):
+        """Test the script-friendly layout keeps every field."""
+        data = _message("m1").to_dict()
+        encoded = encode_message(data)
+        assert encoded.endswith('"status": "pending", "processed_at": null}')
+        assert json.loads(encoded) == data
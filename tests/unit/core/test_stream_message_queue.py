@@ -0,0 +1,111 @@
+"""
+Unit tests for the Redis Streams message queue backend.
+"""
+
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from packages.core.enhanced_message_queue import EnhancedMessage, MessageStatus
+from packages.core.stream_message_queue import StreamMessageQueue
+
+
+def _message(message_id, recipient="agent-1"):
+    return EnhancedMessage(
+        id=message_id,
+        type="task",
+        sender="tester",
+        recipient=recipient,
+        content={"n": message_id}
+    )
+
+
+def _queue(client, **kwargs):
+    mq = StreamMessageQueue(namespace="test", **kwargs)
+    mq.redis_client = client
+    return mq
+
+
+@pytest.fixture
+def client():
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+class TestStreamMessageQueue:
+    """Test cases for StreamMessageQueue."""
+
+    @pytest.mark.asyncio
+    async def test_ack_removes_entry(self, client):
+        """Test acknowledged messages leave neither stream entries nor pending entries."""
+        queue = _queue(client)
+        assert await queue.send_message(_message("m1"))
+
+        received = await queue.receive_message("agent-1")
+        assert received.id == "m1"
+        assert received.status == MessageStatus.PROCESSING
+        assert await queue.acknowledge_message(received)
+
+        stats = await queue.get_queue_stats()
+        assert stats["streams"]["test:stream:agent-1"] == {"length": 0, "pending": 0}
+        assert await queue.receive_message("agent-1") is None
+
+    @pytest.mark.asyncio
+    async def test_consumers_share_a_stream(self, client):
+        """Test consumers in the group each get different messages."""
+        queue = _queue(client)
+        for i in range(4):
+            await queue.send_message(_message(f"m{i}"))
+
+        seen = set()
+        for consumer in ("a", "b", "a", "b"):
+            seen.add((await queue.receive_message("agent-1", consumer=consumer)).id)
+        assert seen == {"m0", "m1", "m2", "m3"}
+
+    @pytest.mark.asyncio
+    async def test_failed_ack_schedules_delayed_retry(self, client):
+        """Test failures are retried later without blocking the acknowledger."""
+        queue = _queue(client, max_retry_delay=0.2)
+        await queue.send_message(_message("m1"))
+        received = await queue.receive_message("agent-1")
+
+        start = time.perf_counter()
+        assert await queue.acknowledge_message(received, success=False)
+        assert time.perf_counter() - start < 0.1
+
+        assert await queue.promote_due_retries() == 0
+        assert await queue.receive_message("agent-1") is None
+
+        time.sleep(0.25)
+        assert await queue.promote_due_retries() == 1
+        retried = await queue.receive_message("agent-1")
+        assert retried.id == "m1"
+        assert retried.retry_count == 1
+
+    @pytest.mark.asyncio
+    async def test_stalled_entries_are_reclaimed(self, client):
+        """Test XAUTOCLAIM hands a stalled consumer's message to another one."""
+        queue = _queue(client, claim_idle_ms=0, claim_interval=0)
+        await queue.send_message(_message("m1"))
+
+        first = await queue.receive_message("agent-1", consumer="crashed")
+        second = await queue.receive_message("agent-1", consumer="healthy")
+
+        assert first.id == second.id == "m1"
+        assert queue.metrics["messages_redelivered"] == 1
+        assert await queue.acknowledge_message(second)
+
+    @pytest.mark.asyncio
+    async def test_poison_messages_are_dead_lettered(self, client):
+        """Test entries redelivered too often go to the dead letter stream."""
+        queue = _queue(client, claim_idle_ms=0, claim_interval=0, max_deliveries=1)
+        await queue.send_message(_message("m1"))
+
+        await queue.receive_message("agent-1", consumer="a")
+        assert await queue.receive_message("agent-1", consumer="b") is None
+
+        stats = await queue.get_queue_stats()
+        assert stats["dead_letter_queue_size"] == 1
+        assert stats["streams"]["test:stream:agent-1"]["pending"] == 0
@@ -0,0 +1,234 @@
+"""
+Unit tests for WorkflowEngine step scheduling and journaled persistence.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from packages.core.workflow_engine import StepStatus, StepType, WorkflowEngine, WorkflowStatus
+from packages.core.workflow_journal import WorkflowJournal
+
+
+class _Tool:
+    """Tool that sleeps for its ``delay`` argument and records when it ran."""
+
+    def __init__(self, log):
+        self.log = log
+        self.running = 0
+        self.peak = 0
+
+    async def execute(self, name, delay=0.0, fail=False):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.log.append(("start", name, time.perf_counter()))
+        try:
+            await asyncio.sleep(delay)
+            if fail:
+                raise RuntimeError(f"{name} broke")
+            return name
+        finally:
+            self.running -= 1
+            self.log.append(("end", name, time.perf_counter()))
+
+
+class _Framework:
+    def __init__(self):
+        self.log = []
+        self.tool = _Tool(self.log)
+
+    async def get_tool(self, name):
+        return self.tool
+
+
+def _step(step_id, delay=0.0, deps=(), **extra):
+    return {
+        "id": step_id,
+        "name": step_id,
+        "step_type": StepType.TOOL_EXECUTION.value,
+        "inputs": {"tool_name": "sleep", "tool_args": {"name": step_id, "delay": delay, **extra}},
+        "dependencies": list(deps),
+        "max_retries": 0,
+        "status": StepStatus.PENDING.value
+    }
+
+
+async def _run(engine, steps):
+    workflow_id = await engine.create_workflow("wf", "test", steps)
+    assert await engine.start_workflow(workflow_id)
+    await engine.workflow_tasks[workflow_id]
+    return await engine._load_workflow(workflow_id)
+
+
+def _time_of(log, event, name):
+    return next(t for kind, step, t in log if kind == event and step == name)
+
+
+class TestEagerScheduling:
+    """Test cases for eager DAG execution."""
+
+    @pytest.mark.asyncio
+    async def test_dependent_starts_before_straggler_finishes(self, tmp_path):
+        """Test that a step starts when its own dependency finishes, not the whole wave."""
+        framework = _Framework()
+        engine = WorkflowEngine(framework, storage_path=tmp_path)
+
+        start = time.perf_counter()
+        workflow = await _run(engine, [
+            _step("fast", 0.02), _step("slow", 0.3),
+            _step("after_fast", 0.2, deps=["fast"]),
+            _step("join", 0.0, deps=["slow", "after_fast"])
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert workflow.status == WorkflowStatus.COMPLETED
+        assert _time_of(framework.log, "start", "after_fast") < _time_of(framework.log, "end", "slow")
+        assert elapsed < 0.45  # critical path is slow -> join (~0.3s), not 0.3 + 0.2
+        assert workflow.variables["tool_result"] == "join"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limits(self, tmp_path):
+        """Test max_concurrency and per-step-type limits cap running steps."""
+        framework = _Framework()
+        engine = WorkflowEngine(framework, storage_path=tmp_path, max_concurrency=3)
+        await _run(engine, [_step(f"s{i}", 0.02) for i in range(8)])
+        assert framework.tool.peak == 3
+
+        framework = _Framework()
+        engine = WorkflowEngine(framework, storage_path=tmp_path,
+                                step_type_limits={StepType.TOOL_EXECUTION: 2})
+        await _run(engine, [_step(f"s{i}", 0.02) for i in range(8)])
+        assert framework.tool.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_in_flight_steps(self, tmp_path):
+        """Test that a failing step fails the workflow and stops running siblings."""
+        framework = _Framework()
+        engine = WorkflowEngine(framework, storage_path=tmp_path)
+
+        workflow = await _run(engine, [
+            _step("bad", 0.01, fail=True), _step("long", 5.0), _step("never", deps=["bad"])
+        ])
+
+        steps = {step.id: step for step in workflow.steps}
+        assert workflow.status == WorkflowStatus.FAILED
+        assert "bad broke" in workflow.error_message
+        assert steps["never"].status == StepStatus.PENDING
+        assert ("end", "long") in [(kind, name) for kind, name, _ in framework.log]
+
+    @pytest.mark.asyncio
+    async def test_cycle_reported_as_deadlock(self, tmp_path):
+        """Test that a dependency cycle fails instead of hanging."""
+        engine = WorkflowEngine(_Framework(), storage_path=tmp_path)
+
+        workflow = await _run(engine, [_step("a", deps=["b"]), _step("b", deps=["a"])])
+
+        assert workflow.status == WorkflowStatus.FAILED
+        assert "deadlock" in workflow.error_message
+
+
+class TestWorkflowJournal:
+    """Test cases for journaled workflow persistence."""
+
+    @pytest.mark.asyncio
+    async def test_replay_after_snapshot_and_torn_tail(self, tmp_path):
+        """Test that loading applies only post-snapshot events and skips a torn last line."""
+        journal = WorkflowJournal(tmp_path, snapshot_every=3)
+        journal.snapshot("wf", {"id": "wf", "status": "pending", "variables": {},
+                                "steps": [{"id": "a", "status": "pending"}]})
+        journal.append("wf", {"type": "workflow", "fields": {"status": "running"}})
+        journal.append("wf", {"type": "step", "step_id": "a", "fields": {"status": "completed"}})
+        journal.append("wf", {"type": "variables", "updates": {"x": 1}})
+        assert journal.needs_snapshot("wf")
+        await journal.close()
+
+        with open(journal.journal_path("wf"), "a") as f:
+            f.write('{"type": "workflow", "fie')
+
+        data = WorkflowJournal(tmp_path).load("wf")
+
+        assert data["status"] == "running"
+        assert data["steps"][0]["status"] == "completed"
+        assert data["variables"] == {"x": 1}
+        assert "_journal_seq" not in data
+
+    @pytest.mark.asyncio
+    async def test_append_after_torn_tail_survives_reload(self, tmp_path):
+        """Test that events appended after a crash mid-write are not lost on the next load."""
+        journal = WorkflowJournal(tmp_path)
+        journal.snapshot("wf", {"id": "wf", "status": "running", "variables": {},
+                                "steps": [{"id": "a", "status": "pending"}, {"id": "b", "status": "pending"}]})
+        journal.append("wf", {"type": "step", "step_id": "a", "fields": {"status": "completed"}})
+        await journal.close()
+        with open(journal.journal_path("wf"), "a") as f:
+            f.write('{"type": "step", "step_id": "b", "fie')
+
+        restarted = WorkflowJournal(tmp_path)
+        assert restarted.load("wf")["steps"][1]["status"] == "pending"
+        restarted.append("wf", {"type": "step", "step_id": "b", "fields": {"status": "running"}})
+        restarted.append("wf", {"type": "step", "step_id": "b", "fields": {"status": "completed"}})
+        await restarted.close()
+
+        data = WorkflowJournal(tmp_path).load("wf")
+        assert [step["status"] for step in data["steps"]] == ["completed", "completed"]
+
+    @pytest.mark.asyncio
+    async def test_periodic_snapshot_truncates_journal(self, tmp_path):
+        """Test that a long run keeps the journal bounded by snapshot_every."""
+        engine = WorkflowEngine(_Framework(), storage_path=tmp_path, snapshot_every=4)
+        workflow = await _run(engine, [_step(f"s{i}") for i in range(10)])
+        await engine.journal.flush()
+
+        assert workflow.status == WorkflowStatus.COMPLETED
+        assert engine.journal.stats["snapshots"] >= 5
+        assert len(engine.journal.journal_path(workflow.id).read_text().splitlines()) < 4
+
+    @pytest.mark.asyncio
+    async def test_recover_resumes_unfinished_steps(self, tmp_path):
+        """Test that a restarted engine resumes a crashed workflow from its journal."""
+        engine = WorkflowEngine(_Framework(), storage_path=tmp_path)
+        workflow_id = await engine.create_workflow("wf", "test", [
+            _step("a"), _step("b", deps=["a"]), _step("c", deps=["b"])
+        ])
+        workflow = await engine._load_workflow(workflow_id)
+        steps = {step.id: step for step in workflow.steps}
+
+        # Journaled before the "crash": a finished; b was mid-run and never recorded
+        workflow.status = WorkflowStatus.RUNNING
+        engine._record_workflow_state(workflow)
+        steps["a"].status = StepStatus.COMPLETED
+        steps["a"].outputs = {"from_a": 1}
+        engine._record_step(workflow, steps["a"])
+        steps["b"].status = StepStatus.RUNNING
+        await engine.journal.close()
+
+        framework = _Framework()
+        restarted = WorkflowEngine(framework, storage_path=tmp_path)
+        assert await restarted.recover_workflows() == [workflow_id]
+        await restarted.workflow_tasks[workflow_id]
+
+        recovered = await restarted._load_workflow(workflow_id)
+        assert recovered.status == WorkflowStatus.COMPLETED
+        assert [name for kind, name, _ in framework.log if kind == "start"] == ["b", "c"]
+        assert recovered.variables["from_a"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resume_wakes_paused_workflow(self, tmp_path):
+        """Test that pausing holds back new steps and resuming releases them immediately."""
+        framework = _Framework()
+        engine = WorkflowEngine(framework, storage_path=tmp_path)
+        workflow_id = await engine.create_workflow("wf", "test", [_step("a", 0.05), _step("b", deps=["a"])])
+        await engine.start_workflow(workflow_id)
+        await asyncio.sleep(0)
+        assert await engine.pause_workflow(workflow_id)
+
+        await asyncio.sleep(0.1)
+        assert [name for kind, name, _ in framework.log if kind == "start"] == ["a"]
+
+        start = time.perf_counter()
+        assert await engine.resume_workflow(workflow_id)
+        await engine.workflow_tasks[workflow_id]
+
+        assert time.perf_counter() - start < 0.2
+        assert (await engine._load_workflow(workflow_id)).status == WorkflowStatus.COMPLETED
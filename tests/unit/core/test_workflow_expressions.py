@@ -0,0 +1,68 @@
+"""
+Unit tests for the compiled workflow condition language.
+"""
+
+import pytest
+
+from packages.core.workflow_engine import WorkflowEngine
+from packages.core.workflow_expressions import ExpressionError, compile_expression, evaluate_condition
+
+VARIABLES = {
+    "features": ["database", "testing"],
+    "params": {"review_mode": True},
+    "create_directory": {"status": "completed"},
+    "retries": 2,
+    "name": "api",
+}
+
+
+class TestExpressions:
+    """Test cases for expression parsing and evaluation."""
+
+    @pytest.mark.parametrize("source, expected", [
+        ("'database' in features", True),
+        ("'docker' not in features", True),
+        ("params.review_mode == true", True),
+        ("create_directory.status == 'completed'", True),
+        ("${retries} < 3 and not (retries % 2 == 1)", True),
+        ("retries > 5 or name == 'api'", True),
+        ("1 < retries < 2", False),
+        ("-retries + 2 * 3 == 4", True),
+        ("'${name}-v1' == 'api-v1'", True),
+        ("!(retries >= 2) || [1, 2] == [1, 2]", True),
+        ("null == None", True),
+    ])
+    def test_operators(self, source, expected):
+        """Test the syntax conditions in workflow configs use."""
+        assert evaluate_condition(source, VARIABLES) is expected
+
+    def test_compiled_once(self):
+        """Test that repeated conditions reuse one compiled expression."""
+        assert compile_expression("retries < 3") is compile_expression("retries < 3")
+
+    @pytest.mark.parametrize("source", [
+        "__import__('os').system('true')",
+        "name.__class__",
+        "retries <",
+        "retries not 3",
+        "",
+    ])
+    def test_rejects_invalid_and_unsafe(self, source):
+        """Test that calls, private attributes and malformed input don't compile."""
+        with pytest.raises(ExpressionError):
+            compile_expression(source)
+
+    def test_evaluation_errors(self):
+        """Test that undefined names and type errors surface as ExpressionError."""
+        with pytest.raises(ExpressionError, match="Undefined variable: missing"):
+            evaluate_condition("missing == 1", VARIABLES)
+        with pytest.raises(ExpressionError):
+            evaluate_condition("name < 3", VARIABLES)
+
+    def test_engine_treats_errors_as_false(self, tmp_path):
+        """Test that WorkflowEngine conditions fail closed."""
+        engine = WorkflowEngine(None, storage_path=tmp_path)
+
+        assert engine._evaluate_condition("'testing' in features", VARIABLES)
+        assert not engine._evaluate_condition("missing == 1", VARIABLES)
+        assert not engine._evaluate_condition("open('x')", VARIABLES)
@@ -0,0 +1 @@
+# Engines unit tests package
\ No newline at end of file
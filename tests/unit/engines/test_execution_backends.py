@@ -0,0 +1,111 @@
+"""
+Unit tests for Parallel Mind execution backends.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from packages.engines.execution_backends import (
+    ExecutionMode, InlineBackend, ProcessBackend, TaskEnvelope, ThreadBackend
+)
+from packages.engines.parallel_mind_engine import (
+    ParallelMindEngine, Task, TaskPriority, TaskType
+)
+
+
+def _describe(envelope):
+    """Module-level (picklable) executor used by the process backend."""
+    return {"id": envelope.id, "pid": os.getpid(), "phase": envelope.input_data["phase"]}
+
+
+def _task(task_id, task_type=TaskType.DATA_PROCESSING):
+    return Task(
+        id=task_id,
+        task_type=task_type,
+        priority=TaskPriority.NORMAL,
+        description=task_id,
+        input_data={"phase": "test"},
+        max_retries=0
+    )
+
+
+class TestExecutionBackends:
+    """Test cases for the individual backends."""
+
+    @pytest.mark.asyncio
+    async def test_process_backend_runs_envelopes_in_workers(self):
+        """Test process workers receive envelopes and run outside this process."""
+        backend = ProcessBackend(2, "test", preload_modules=[__name__])
+        try:
+            await backend.warm_up()
+            result = await backend.submit(_describe, _task("p1"))
+        finally:
+            backend.shutdown(wait=True)
+
+        assert result["id"] == "p1"
+        assert result["phase"] == "test"
+        assert result["pid"] != os.getpid()
+        assert backend.get_stats()["worker_pids"]
+
+    @pytest.mark.asyncio
+    async def test_inline_backend_awaits_coroutine_executors(self):
+        """Test inline executors may be coroutines."""
+        async def run(task):
+            await asyncio.sleep(0)
+            return task.id
+
+        backend = InlineBackend(1, "test")
+        assert await backend.submit(run, _task("i1")) == "i1"
+
+    @pytest.mark.asyncio
+    async def test_thread_backend_propagates_errors(self):
+        """Test executor exceptions surface on the returned future."""
+        def run(task):
+            raise ValueError(task.id)
+
+        backend = ThreadBackend(1, "test")
+        try:
+            with pytest.raises(ValueError):
+                await backend.submit(run, _task("t1"))
+        finally:
+            backend.shutdown(wait=True)
+
+    def test_envelope_drops_runtime_fields(self):
+        """Test envelopes only carry what executors read."""
+        task = _task("e1")
+        task.future = object()
+        envelope = TaskEnvelope.from_task(task)
+        assert not hasattr(envelope, "future")
+        assert envelope.input_data == {"phase": "test"}
+
+
+class TestEngineExecutionModes:
+    """Test per-task-type backend configuration on the engine."""
+
+    @pytest.mark.asyncio
+    async def test_worker_configs_select_backends(self):
+        """Test overrides pick the backend while other types keep threads."""
+        engine = ParallelMindEngine(
+            max_workers=8,
+            worker_configs={
+                TaskType.DATA_PROCESSING: {"count": 2, "mode": "process"},
+                TaskType.DOCUMENTATION: {"mode": ExecutionMode.INLINE}
+            }
+        )
+        engine._get_task_executor = lambda task_type: _describe
+        try:
+            assert engine.worker_pools[TaskType.DATA_PROCESSING].mode == ExecutionMode.PROCESS
+            assert engine.worker_pools[TaskType.DOCUMENTATION].mode == ExecutionMode.INLINE
+            assert engine.worker_pools[TaskType.TESTING].mode == ExecutionMode.THREAD
+            assert engine.worker_configs[TaskType.DATA_PROCESSING]["max_concurrent"] == 2
+
+            tasks = [_task("d1"), _task("d2"), _task("doc", TaskType.DOCUMENTATION)]
+            result = await engine.execute_workflow("modes", tasks, timeout=30)
+        finally:
+            await engine.shutdown()
+
+        assert result.completed_tasks == 3
+        assert result.results["d1"]["pid"] != os.getpid()
+        assert result.results["doc"]["pid"] == os.getpid()
@@ -0,0 +1,145 @@
+"""
+Unit tests for the Perfect Recall storage backends.
+"""
+
+import json
+
+import pytest
+
+from packages.engines.memory_storage import JsonFileStorage, SegmentLogStorage
+from packages.engines.perfect_recall_engine import PerfectRecallEngine
+
+
+def _record(record_id, content="x"):
+    return {"id": record_id, "content": content}
+
+
+class TestSegmentLogStorage:
+    """Test cases for SegmentLogStorage."""
+
+    @pytest.mark.asyncio
+    async def test_append_flush_and_replay(self, tmp_path):
+        """Test appended records survive a restart."""
+        storage = SegmentLogStorage(tmp_path, batch_size=2)
+        storage.append_put(_record("a"))
+        storage.append_put(_record("b"))
+        storage.append_put(_record("a", "updated"))
+        storage.append_delete("b")
+        await storage.close()
+
+        replayed = list(SegmentLogStorage(tmp_path).load())
+        assert replayed == [_record("a", "updated")]
+
+    @pytest.mark.asyncio
+    async def test_flush_batches_fsyncs(self, tmp_path):
+        """Test many appends are written with few fsyncs."""
+        storage = SegmentLogStorage(tmp_path, batch_size=1000, flush_interval=10)
+        for i in range(100):
+            storage.append_put(_record(str(i)))
+        await storage.flush()
+
+        assert storage.stats.fsyncs == 1
+        assert storage.stats.records_appended == 100
+        await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_compaction_drops_superseded_segments(self, tmp_path):
+        """Test compaction writes a snapshot and removes old segments."""
+        storage = SegmentLogStorage(tmp_path, compact_threshold=3)
+        live = {}
+        for i in range(5):
+            live[str(i)] = _record(str(i))
+            storage.append_put(live[str(i)])
+        assert storage.should_compact
+
+        await storage.compact(lambda: list(live.values()))
+        assert not storage.should_compact
+        assert not list((tmp_path / "log").glob("segment-*.log"))
+
+        storage.append_put(_record("5"))
+        await storage.close()
+
+        replayed = {r["id"] for r in SegmentLogStorage(tmp_path).load()}
+        assert replayed == {"0", "1", "2", "3", "4", "5"}
+
+    @pytest.mark.asyncio
+    async def test_writes_after_compaction_survive_restart(self, tmp_path):
+        """Test a restart after compaction keeps appending to a replayed segment."""
+        storage = SegmentLogStorage(tmp_path)
+        storage.append_put(_record("a"))
+        await storage.compact(lambda: [_record("a")])
+        await storage.close()
+
+        reopened = SegmentLogStorage(tmp_path)
+        list(reopened.load())
+        reopened.append_put(_record("b"))
+        await reopened.close()
+
+        assert {r["id"] for r in SegmentLogStorage(tmp_path).load()} == {"a", "b"}
+
+    def test_torn_tail_is_skipped(self, tmp_path):
+        """Test a partially written final record does not break replay."""
+        storage = SegmentLogStorage(tmp_path)
+        storage.append_put(_record("a"))
+        with open(tmp_path / "log" / "segment-000001.log", "a") as f:
+            f.write('{"op":"put","rec')
+
+        assert [r["id"] for r in SegmentLogStorage(tmp_path).load()] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_appends_after_torn_tail_survive(self, tmp_path):
+        """Test records written after a crash mid-write are not glued onto the torn record."""
+        storage = SegmentLogStorage(tmp_path)
+        storage.append_put(_record("a"))
+        await storage.close()
+        with open(tmp_path / "log" / "segment-000001.log", "a") as f:
+            f.write('{"op":"put","rec')
+
+        reopened = SegmentLogStorage(tmp_path)
+        list(reopened.load())
+        reopened.append_put(_record("b"))
+        reopened.append_put(_record("c"))
+        await reopened.close()
+
+        assert sorted(r["id"] for r in SegmentLogStorage(tmp_path).load()) == ["a", "b", "c"]
+
+    def test_migrates_legacy_json(self, tmp_path):
+        """Test an existing memories.json is imported once."""
+        (tmp_path / "memories.json").write_text(json.dumps([_record("old")]))
+
+        assert [r["id"] for r in SegmentLogStorage(tmp_path).load()] == ["old"]
+        assert not (tmp_path / "memories.json").exists()
+        assert [r["id"] for r in SegmentLogStorage(tmp_path).load()] == ["old"]
+
+
+class TestJsonFileStorage:
+    """Test cases for JsonFileStorage."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        """Test records are rewritten to a single JSON document."""
+        storage = JsonFileStorage(tmp_path)
+        storage.append_put(_record("a"))
+        storage.append_put(_record("b"))
+        storage.append_delete("a")
+        await storage.flush()
+
+        assert list(JsonFileStorage(tmp_path).load()) == [_record("b")]
+
+
+class TestPerfectRecallPersistence:
+    """Test cases for what PerfectRecallEngine writes to its storage log."""
+
+    @pytest.mark.asyncio
+    async def test_usage_counts_survive_restart(self, tmp_path):
+        """Test that usage counts bumped by recall are logged without waiting for compaction."""
+        engine = PerfectRecallEngine(storage_path=str(tmp_path))
+        memory_id = await engine.store_memory("retry the flaky upload with backoff", "solution")
+
+        assert [r.entry.id for r in await engine.recall_memories("retry the flaky upload with backoff")] == [memory_id]
+        await engine.recall_memories("retry the flaky upload with backoff")
+        await engine.shutdown()
+
+        restarted = PerfectRecallEngine(storage_path=str(tmp_path))
+        assert restarted.memory_db[memory_id].usage_count == 2
+        await restarted.shutdown()
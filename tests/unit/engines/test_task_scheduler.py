@@ -0,0 +1,275 @@
+"""
+Unit tests for the Parallel Mind DependencyScheduler and its engine wiring.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from packages.engines.parallel_mind_engine import (
+    ParallelMindEngine, Task, TaskPriority, TaskStatus, TaskType
+)
+from packages.engines.task_scheduler import DependencyScheduler
+
+
+def _task(task_id, task_type=TaskType.CODE_ANALYSIS, dependencies=None, priority=TaskPriority.NORMAL):
+    return Task(
+        id=task_id,
+        task_type=task_type,
+        priority=priority,
+        description=task_id,
+        input_data={},
+        dependencies=dependencies or [],
+        max_retries=0
+    )
+
+
+class TestDependencyScheduler:
+    """Test cases for DependencyScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_ready_after_dependencies(self):
+        """Test a task only becomes ready once all dependencies succeed."""
+        scheduler = DependencyScheduler()
+        scheduler.add("a", "t")
+        scheduler.add("b", "t")
+        scheduler.add("c", "t", dependencies=["a", "b"])
+
+        assert {scheduler.pop_ready("t"), scheduler.pop_ready("t")} == {"a", "b"}
+        assert scheduler.pop_ready("t") is None
+        assert scheduler.mark_succeeded("a") == []
+        assert scheduler.mark_succeeded("b") == ["c"]
+        assert scheduler.pop_ready("t") == "c"
+
+    @pytest.mark.asyncio
+    async def test_priority_order_per_type(self):
+        """Test ready queues are per type and ordered by priority."""
+        scheduler = DependencyScheduler()
+        scheduler.add("low", "x", priority=1)
+        scheduler.add("high", "x", priority=4)
+        scheduler.add("other", "y", priority=2)
+
+        assert set(scheduler.ready_types()) == {"x", "y"}
+        assert scheduler.pop_ready("x") == "high"
+        assert scheduler.pop_ready("x") == "low"
+
+    @pytest.mark.asyncio
+    async def test_failure_cascades_and_resolves_futures(self):
+        """Test dependents of a failed task fail instead of waiting forever."""
+        scheduler = DependencyScheduler()
+        scheduler.add("a", "t")
+        scheduler.add("b", "t", dependencies=["a"])
+        scheduler.add("c", "t", dependencies=["b"])
+
+        assert sorted(scheduler.mark_failed("a", "boom")) == ["b", "c"]
+        assert await scheduler.wait(["a", "b", "c"], timeout=0.1)
+        assert scheduler.completion("c").result() is False
+        assert scheduler.failure_reason("c") == "Dependency b failed"
+
+        assert scheduler.add("d", "t", dependencies=["a"]) == "a"
+
+    @pytest.mark.asyncio
+    async def test_failed_while_queued_is_skipped_and_ids_reusable(self):
+        """Test cancelled ready entries are skipped and finished ids can be re-added."""
+        scheduler = DependencyScheduler()
+        scheduler.add("a", "t")
+        scheduler.mark_failed("a", "cancelled")
+        assert not scheduler.has_ready("t")
+        assert scheduler.pop_ready("t") is None
+
+        scheduler.add("a", "t")
+        assert not scheduler.completion("a").done()
+        assert scheduler.pop_ready("t") == "a"
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self):
+        """Test wait reports unfinished tasks after the timeout."""
+        scheduler = DependencyScheduler()
+        scheduler.add("a", "t")
+        assert not await scheduler.wait(["a"], timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_forget_releases_finished_tasks(self):
+        """Test forgotten tasks leave no state behind, now or once they finish."""
+        scheduler = DependencyScheduler()
+        scheduler.add("a", "t")
+        scheduler.add("b", "t", dependencies=["a"])
+        scheduler.pop_ready("t")
+        scheduler.mark_succeeded("a")
+
+        assert scheduler.forget(["a", "b", "unknown"]) == 1
+        assert "a" not in scheduler and "b" in scheduler
+
+        scheduler.pop_ready("t")
+        scheduler.mark_failed("b", "broken")
+        assert "b" not in scheduler
+        assert scheduler.pending_count == 0
+        for state in (scheduler._task_type, scheduler._priority, scheduler._in_degree,
+                      scheduler._dependents, scheduler._succeeded, scheduler._failed,
+                      scheduler._futures, scheduler._release_on_finish):
+            assert not state
+
+    @pytest.mark.asyncio
+    async def test_success_after_forgotten_dependent_cascaded(self):
+        """Test a dependent released by a cascade is skipped when its other dependency succeeds."""
+        scheduler = DependencyScheduler()
+        scheduler.add("a", "t")
+        scheduler.add("b", "t")
+        scheduler.add("c", "t", dependencies=["a", "b"])
+        scheduler.pop_ready("t")
+        scheduler.pop_ready("t")
+        scheduler.forget(["a", "b", "c"])
+
+        assert scheduler.mark_failed("a", "broken") == ["c"]
+        assert "c" not in scheduler
+        assert scheduler.mark_succeeded("b") == []
+        assert scheduler.pending_count == 0
+        for state in (scheduler._task_type, scheduler._in_degree, scheduler._dependents,
+                      scheduler._succeeded, scheduler._failed, scheduler._futures,
+                      scheduler._release_on_finish):
+            assert not state
+
+    @pytest.mark.asyncio
+    async def test_forgotten_queued_task_is_skipped(self):
+        """Test a ready entry for a forgotten task is never handed out."""
+        scheduler = DependencyScheduler()
+        scheduler.add("a", "t")
+        scheduler.mark_failed("a", "cancelled")
+        scheduler.forget(["a"])
+        assert scheduler.pop_ready("t") is None
+
+
+class TestParallelMindWorkflow:
+    """Test the engine's event-driven workflow execution."""
+
+    @pytest.fixture
+    def engine(self):
+        """Create an engine whose executors return immediately."""
+        engine = ParallelMindEngine(max_workers=8)
+        engine._get_task_executor = lambda task_type: (lambda task: {"id": task.id})
+        yield engine
+        for pool in engine.worker_pools.values():
+            pool.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_dependency_chain_dispatches_without_polling(self, engine):
+        """Test a 20-step chain finishes far faster than per-tick polling allows."""
+        tasks = [_task("t0")] + [_task(f"t{i}", dependencies=[f"t{i - 1}"]) for i in range(1, 20)]
+
+        start = time.perf_counter()
+        result = await engine.execute_workflow("chain", tasks, timeout=5)
+        elapsed = time.perf_counter() - start
+
+        assert result.completed_tasks == 20
+        assert result.results["t19"] == {"id": "t19"}
+        assert elapsed < 1.0
+        assert not engine.scheduler._task_type and not engine.scheduler._futures
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_fails_workflow_quickly(self, engine):
+        """Test a failing task fails its dependents rather than timing out."""
+        def executor_for(task_type):
+            def run(task):
+                if task.id == "bad":
+                    raise RuntimeError("broken")
+                return "ok"
+            return run
+
+        engine._get_task_executor = executor_for
+        tasks = [_task("bad"), _task("after", dependencies=["bad"]), _task("fine")]
+
+        result = await engine.execute_workflow("fail", tasks, timeout=5)
+
+        assert result.completed_tasks == 1
+        assert result.failed_tasks == 2
+        assert engine.completed_tasks["after"].status == TaskStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_worker_capacity_is_respected(self, engine):
+        """Test no worker runs more than its max_concurrent tasks."""
+        tasks = [_task(f"d{i}", task_type=TaskType.DEPLOYMENT) for i in range(4)]
+        peak = []
+
+        def run(task):
+            worker = engine.workers[task.worker_id]
+            peak.append(len(worker.current_tasks))
+            time.sleep(0.01)
+            return True
+
+        engine._get_task_executor = lambda task_type: run
+        result = await engine.execute_workflow("cap", tasks, timeout=5)
+
+        assert result.completed_tasks == 4
+        assert max(peak) == 1
+
+
+class TestCoordinateParallelTasks:
+    """Test bounded-concurrency fan-out through coordinate_parallel_tasks."""
+
+    @pytest.fixture
+    def engine(self):
+        """Create an engine with a slow, instrumented executor."""
+        engine = ParallelMindEngine(max_workers=8)
+        engine.running = 0
+        engine.peak = 0
+
+        def run(task):
+            engine.running += 1
+            engine.peak = max(engine.peak, engine.running)
+            time.sleep(task.input_data.get("sleep", 0.05))
+            engine.running -= 1
+            return task.description
+
+        engine._get_task_executor = lambda task_type: run
+        yield engine
+        for pool in engine.worker_pools.values():
+            pool.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_fan_out_is_concurrent_and_bounded(self, engine):
+        """Test tasks overlap, respect the limit and come back in order."""
+        tasks = [
+            {"id": f"job{i}", "description": f"job {i}", "task_type": "code_generation"}
+            for i in range(8)
+        ]
+
+        start = time.perf_counter()
+        results = await engine.coordinate_parallel_tasks(tasks, max_concurrency=4)
+        elapsed = time.perf_counter() - start
+
+        assert [r["id"] for r in results] == [f"job{i}" for i in range(8)]
+        assert all(r["status"] == "completed" for r in results)
+        assert results[3]["result"] == "job 3"
+        assert engine.peak <= 4
+        assert elapsed < 8 * 0.05
+        assert not engine.scheduler._task_type and not engine.scheduler._futures
+
+    @pytest.mark.asyncio
+    async def test_per_task_timeout(self, engine):
+        """Test a slow task is reported as timed out without blocking the rest."""
+        tasks = [
+            {"id": "slow", "description": "slow", "sleep": 0.5},
+            {"id": "fast", "description": "fast"}
+        ]
+
+        results = await engine.coordinate_parallel_tasks(tasks, task_timeout=0.2)
+
+        assert results[0]["status"] == "timeout"
+        assert results[1]["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_remaining_tasks(self, engine):
+        """Test leaving the iterator early cancels tasks that have not run."""
+        tasks = [{"id": f"job{i}", "description": f"job {i}"} for i in range(6)]
+
+        stream = engine.stream_parallel_tasks(tasks, max_concurrency=6)
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.1)
+
+        statuses = [t.status for t in engine.completed_tasks.values()]
+        assert first["status"] == "completed"
+        assert TaskStatus.CANCELLED in statuses
+        assert not engine.tasks
+        assert not engine.scheduler._task_type
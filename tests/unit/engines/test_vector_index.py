@@ -0,0 +1,122 @@
+"""
+Unit tests for the Perfect Recall VectorIndex.
+"""
+
+import numpy as np
+import pytest
+
+from packages.engines.vector_index import VectorIndex
+from packages.memory.embedding_store import EmbeddingStore
+
+
+def _random_vectors(count, dimension=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((count, dimension)).astype(np.float32)
+
+
+class TestVectorIndex:
+    """Test cases for VectorIndex."""
+
+    @pytest.fixture
+    def index(self):
+        """Create a small exact-search index."""
+        return VectorIndex(dimension=16, initial_capacity=2)
+
+    def test_add_and_search_exact(self, index):
+        """Test exact search returns the closest row first."""
+        vectors = _random_vectors(10)
+        for i, vector in enumerate(vectors):
+            assert index.add(f"m{i}", vector.tolist(), "code")
+
+        hits = index.search(vectors[3], k=3)
+        assert len(hits) == 3
+        assert hits[0][0] == "m3"
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert [h[1] for h in hits] == sorted((h[1] for h in hits), reverse=True)
+
+    def test_rejects_wrong_dimension(self, index):
+        """Test embeddings with the wrong dimension are not indexed."""
+        assert not index.add("bad", [1.0, 2.0], "code")
+        assert "bad" not in index
+
+    def test_prefilters(self, index):
+        """Test content_type and tag pre-filters."""
+        vectors = _random_vectors(6)
+        for i, vector in enumerate(vectors):
+            content_type = "code" if i % 2 == 0 else "error"
+            index.add(f"m{i}", vector, content_type, tags=[f"t{i % 3}"])
+
+        hits = index.search(vectors[0], content_types=["error"])
+        assert {h[0] for h in hits} == {"m1", "m3", "m5"}
+
+        hits = index.search(vectors[0], content_types=["code"], tags=["t1"])
+        assert {h[0] for h in hits} == {"m4"}
+
+        assert index.search(vectors[0], tags=["missing"]) == []
+
+    def test_remove_keeps_rows_consistent(self, index):
+        """Test removal compacts storage without corrupting other rows."""
+        vectors = _random_vectors(8)
+        for i, vector in enumerate(vectors):
+            index.add(f"m{i}", vector, "code", tags=["a"] if i == 7 else [])
+
+        assert index.remove("m2")
+        assert not index.remove("m2")
+        assert len(index) == 7
+
+        # m7 was moved into the freed row and must keep its vector and tags
+        hits = index.search(vectors[7], k=1)
+        assert hits[0][0] == "m7"
+        assert index.search(vectors[7], tags=["a"])[0][0] == "m7"
+        assert "m2" not in {h[0] for h in index.search(vectors[2])}
+
+    def test_min_similarity_threshold(self, index):
+        """Test hits below the similarity threshold are dropped."""
+        index.add("x", [1.0] + [0.0] * 15, "code")
+        index.add("y", [0.0, 1.0] + [0.0] * 14, "code")
+
+        hits = index.search([1.0] + [0.0] * 15, min_similarity=0.5)
+        assert [h[0] for h in hits] == ["x"]
+
+    def test_ivf_search_finds_near_duplicates(self):
+        """Test the IVF path trains and still finds near-identical vectors."""
+        index = VectorIndex(dimension=16, ivf_threshold=256, nprobe=4)
+        vectors = _random_vectors(600)
+        for i, vector in enumerate(vectors):
+            index.add(f"m{i}", vector, "code")
+
+        for i in (0, 123, 599):
+            hits = index.search(vectors[i], k=1)
+            assert hits[0][0] == f"m{i}"
+
+        stats = index.get_stats()
+        assert stats.ivf_trained
+        assert stats.rows_scored < 3 * 600
+
+        # Incremental inserts and deletes keep working after training
+        index.add("new", vectors[5] * 2, "solution")
+        assert index.search(vectors[5], content_types=["solution"])[0][0] == "new"
+        index.remove("m5")
+        assert "m5" not in {h[0] for h in index.search(vectors[5], k=5)}
+
+    def test_shares_embedding_store_rows(self):
+        """Test an index over a shared store only returns its own rows."""
+        store = EmbeddingStore(dimension=16)
+        store.put("foreign", _random_vectors(1, seed=1)[0])
+        index = VectorIndex(dimension=16, store=store)
+        vectors = _random_vectors(3)
+        for i, vector in enumerate(vectors):
+            index.add(f"m{i}", vector, "code")
+
+        assert {h[0] for h in index.search(vectors[0])} == {"m0", "m1", "m2"}
+        assert index.attach("foreign", "code")
+        assert "foreign" in index
+        assert index.remove("m0")
+        assert "m0" not in store
+
+    def test_uses_given_empty_store(self):
+        """Test an empty shared store is used rather than replaced."""
+        store = EmbeddingStore(dimension=16)
+        index = VectorIndex(dimension=16, store=store)
+        index.add("m0", _random_vectors(1)[0], "code")
+        assert "m0" in store
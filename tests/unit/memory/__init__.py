@@ -0,0 +1 @@
+# Memory unit tests package
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Unit tests for the batched EmbeddingService.
+"""
+
+import asyncio
+
+import pytest
+
+from packages.memory.embedding_service import EmbeddingService, hash_embedding
+
+
+class RecordingEncoder:
+    """Encoder stub that records every batch it receives."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class TestEmbeddingService:
+    """Test cases for EmbeddingService."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_batch(self):
+        """Test concurrent embeds are encoded in a single call."""
+        encoder = RecordingEncoder()
+        service = EmbeddingService(dimension=2, encoder=encoder, batch_window=0.01)
+
+        results = await asyncio.gather(*(service.embed(f"text {i}") for i in range(10)))
+
+        assert len(encoder.batches) == 1
+        assert len(encoder.batches[0]) == 10
+        assert results[3] == [6.0, 1.0]
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size_splits_batches(self):
+        """Test batches are dispatched once they reach max_batch_size."""
+        encoder = RecordingEncoder()
+        service = EmbeddingService(dimension=2, encoder=encoder, max_batch_size=4, batch_window=1.0)
+
+        await asyncio.gather(*(service.embed(f"t{i}") for i in range(8)))
+
+        assert [len(batch) for batch in encoder.batches] == [4, 4]
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_and_inflight_dedup(self):
+        """Test repeated texts hit the cache or join the in-flight request."""
+        encoder = RecordingEncoder()
+        service = EmbeddingService(dimension=2, encoder=encoder)
+
+        await asyncio.gather(service.embed("same"), service.embed("same"))
+        await service.embed("same")
+
+        assert encoder.batches == [["same"]]
+        assert service.stats.coalesced == 1
+        assert service.stats.cache_hits == 1
+        assert service.get_stats()["hit_ratio"] > 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test the cache stays within its size bound."""
+        encoder = RecordingEncoder()
+        service = EmbeddingService(dimension=2, encoder=encoder, cache_size=2)
+
+        for text in ("a", "b", "c"):
+            await service.embed(text)
+        await service.embed("a")
+
+        assert service.get_stats()["cache_entries"] == 2
+        assert encoder.batches[-1] == ["a"]
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_encoder_errors_propagate(self):
+        """Test an encoder failure reaches every waiter in the batch."""
+        def failing(texts):
+            raise RuntimeError("model unavailable")
+
+        service = EmbeddingService(dimension=2, encoder=failing)
+        results = await asyncio.gather(service.embed("a"), service.embed("b"), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_callers_get_independent_lists(self):
+        """Test mutating a returned embedding can't corrupt the cache or other waiters."""
+        encoder = RecordingEncoder()
+        service = EmbeddingService(dimension=2, encoder=encoder)
+
+        first, second = await asyncio.gather(service.embed("same"), service.embed("same"))
+        first[0] = -1.0
+        second.append(0.0)
+
+        assert await service.embed("same") == [4.0, 1.0]
+        assert service.embed_sync("same") == [4.0, 1.0]
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_cancels_waiters(self):
+        """Test a cancelled encoder call cancels its waiters instead of raising in the callback."""
+        service = EmbeddingService(dimension=2, encoder=RecordingEncoder())
+        loop = asyncio.get_running_loop()
+        waiter, done = loop.create_future(), loop.create_future()
+        service._inflight["k"] = waiter
+        done.cancel()
+
+        service._resolve([("k", "text", waiter)], done)
+
+        assert waiter.cancelled()
+        assert not service._inflight
+        await service.close()
+
+    def test_embed_sync_uses_cache(self):
+        """Test the synchronous path shares the cache."""
+        encoder = RecordingEncoder()
+        service = EmbeddingService(dimension=2, encoder=encoder)
+
+        assert service.embed_sync("abc") == service.embed_sync("abc")
+        assert len(encoder.batches) == 1
+
+    def test_hash_embedding_is_deterministic(self):
+        """Test the fallback embedding is stable and normalized."""
+        first = hash_embedding("def foo(): return 1", 16)
+        assert first == hash_embedding("def foo(): return 1", 16)
+        assert sum(x * x for x in first) == pytest.approx(1.0)
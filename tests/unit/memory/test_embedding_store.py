@@ -0,0 +1,61 @@
+"""
+Unit tests for the memory-mapped EmbeddingStore.
+"""
+
+import numpy as np
+
+from packages.memory.embedding_store import EmbeddingStore
+
+
+class TestEmbeddingStore:
+    """Test cases for EmbeddingStore."""
+
+    def test_put_get_normalizes(self):
+        """Test stored rows are normalized float32 views."""
+        store = EmbeddingStore(dimension=4)
+        row = store.put("a", [3.0, 4.0, 0.0, 0.0])
+
+        view = store.get("a")
+        assert row == 0
+        assert view.dtype == np.float32
+        assert np.allclose(view, [0.6, 0.8, 0.0, 0.0])
+        assert not view.flags.writeable
+        assert store.put("bad", [1.0]) is None
+
+    def test_rows_are_stable_and_reused(self):
+        """Test deleting frees a row that the next insert reuses."""
+        store = EmbeddingStore(dimension=2, initial_capacity=2)
+        store.put("a", [1.0, 0.0])
+        store.put("b", [0.0, 1.0])
+        store.put("c", [1.0, 1.0])
+
+        assert store.row_of("b") == 1
+        assert store.delete("b") == 1
+        assert store.put("d", [1.0, 0.0]) == 1
+        assert store.row_of("c") == 2
+        assert list(store.live_mask) == [True, True, True]
+
+    def test_memory_mapped_round_trip(self, tmp_path):
+        """Test a flushed store reopens with the same rows."""
+        store = EmbeddingStore(dimension=8, path=tmp_path / "embeddings", initial_capacity=2)
+        vectors = np.random.default_rng(0).standard_normal((5, 8)).astype(np.float32)
+        for i, vector in enumerate(vectors):
+            store.put(f"m{i}", vector)
+        store.delete("m1")
+        store.close()
+
+        assert isinstance(store.matrix, np.memmap)
+        reopened = EmbeddingStore(dimension=8, path=tmp_path / "embeddings")
+        assert len(reopened) == 4
+        assert "m1" not in reopened
+        expected = vectors[3] / np.linalg.norm(vectors[3])
+        assert np.allclose(reopened.get("m3"), expected, atol=1e-6)
+        assert reopened.put("new", vectors[0]) == 1
+
+    def test_dimension_mismatch_starts_empty(self, tmp_path):
+        """Test a store written with another dimension is not misread."""
+        store = EmbeddingStore(dimension=4, path=tmp_path / "embeddings")
+        store.put("a", [1.0, 0.0, 0.0, 0.0])
+        store.close()
+
+        assert len(EmbeddingStore(dimension=8, path=tmp_path / "embeddings")) == 0
@@ -0,0 +1,205 @@
+"""
+Unit tests for EnhancedMemoryCoordinator caching, sync batching and compare-and-set writes.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from packages.memory.enhanced_memory_coordinator import (
+    EnhancedMemoryCoordinator, MemoryCache, MemoryEntry, SyncStrategy
+)
+
+
+def _entry(key: str, value="v") -> MemoryEntry:
+    now = datetime.now()
+    return MemoryEntry(key=key, value=value, version=1, created_by="a", created_at=now,
+                       updated_by="a", updated_at=now)
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = EnhancedMemoryCoordinator(namespace="test")
+    coordinator.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return coordinator
+
+
+class TestMemoryCache:
+    """Test cases for MemoryCache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that touching an entry protects it from eviction."""
+        cache = MemoryCache(max_entries=2)
+        cache.put("a", _entry("a"))
+        cache.put("b", _entry("b"))
+        cache.get("a")
+
+        assert cache.put("c", _entry("c")) == ["b"]
+        assert cache.keys() == ["a", "c"]
+        assert cache.evictions == 1
+
+    def test_byte_budget(self):
+        """Test that entries are charged their size and evicted to fit max_bytes."""
+        cache = MemoryCache(max_entries=100, max_bytes=250)
+        cache.put("a", _entry("a"), size=100)
+        cache.put("b", _entry("b"), size=100)
+        cache.put("a", _entry("a"), size=120)
+
+        assert cache.total_bytes == 220
+        assert cache.put("c", _entry("c"), size=100) == ["b"]
+        assert cache.total_bytes == 220
+        assert cache.pop("a").key == "a"
+        assert cache.total_bytes == 100
+
+
+class TestSyncBatching:
+    """Test cases for coalesced Redis sync."""
+
+    @pytest.mark.asyncio
+    async def test_writes_coalesce_until_flush(self, coordinator):
+        """Test that repeated eventual writes to a key are flushed once with the last value."""
+        for i in range(5):
+            assert await coordinator.write_memory("k", i, "agent", sync_strategy=SyncStrategy.EVENTUAL)
+        await coordinator.write_memory("other", "x", "agent", sync_strategy=SyncStrategy.BATCH)
+
+        assert list(coordinator.pending_syncs) == ["k", "other"]
+        assert coordinator.coordination_metrics["sync_writes_coalesced"] == 4
+
+        assert await coordinator.flush_pending_syncs() == 2
+        loaded = await coordinator._load_memory_entry("k")
+        assert (loaded.value, loaded.version) == (4, 5)
+        assert coordinator.coordination_metrics["sync_flushes"] == 1
+        assert not coordinator.pending_syncs
+
+    @pytest.mark.asyncio
+    async def test_evicted_pending_entry_still_readable(self, coordinator):
+        """Test that an entry evicted before its flush is served from the pending set."""
+        coordinator.memory_cache = MemoryCache(max_entries=1)
+        await coordinator.write_memory("a", "first", "agent", sync_strategy=SyncStrategy.EVENTUAL)
+        await coordinator.write_memory("b", "second", "agent", sync_strategy=SyncStrategy.EVENTUAL)
+
+        assert "a" not in coordinator.memory_cache
+        entry = await coordinator.read_memory("a", "agent")
+        assert entry.value == "first"
+
+    @pytest.mark.asyncio
+    async def test_entry_readable_while_flush_in_flight(self, coordinator, monkeypatch):
+        """Test that an evicted entry stays readable while its flush pipeline is still executing."""
+        coordinator.memory_cache = MemoryCache(max_entries=1)
+        await coordinator.write_memory("a", "first", "agent", sync_strategy=SyncStrategy.EVENTUAL)
+        await coordinator.write_memory("b", "second", "agent", sync_strategy=SyncStrategy.EVENTUAL)
+
+        gate = asyncio.Event()
+        make_pipeline = coordinator.redis_client.pipeline
+
+        def gated_pipeline(**kwargs):
+            pipe = make_pipeline(**kwargs)
+            execute = pipe.execute
+
+            async def gated_execute():
+                await gate.wait()
+                return await execute()
+
+            pipe.execute = gated_execute
+            return pipe
+
+        monkeypatch.setattr(coordinator.redis_client, "pipeline", gated_pipeline)
+        flush = asyncio.create_task(coordinator.flush_pending_syncs())
+        await asyncio.sleep(0)
+
+        assert not coordinator.pending_syncs
+        assert (await coordinator._load_memory_entry("a")).value == "first"
+
+        gate.set()
+        assert await flush == 2
+        assert not coordinator._inflight_syncs
+        assert (await coordinator._load_memory_entry("a")).value == "first"
+
+    @pytest.mark.asyncio
+    async def test_size_trigger_wakes_processor(self, coordinator):
+        """Test that reaching sync_batch_size signals the background flush."""
+        coordinator.sync_batch_size = 3
+        for key in ("a", "b"):
+            await coordinator.write_memory(key, 1, "agent", sync_strategy=SyncStrategy.EVENTUAL)
+        assert not coordinator._sync_wakeup.is_set()
+
+        await coordinator.write_memory("c", 1, "agent", sync_strategy=SyncStrategy.EVENTUAL)
+        assert coordinator._sync_wakeup.is_set()
+
+
+class TestCompareAndSet:
+    """Test cases for the optimistic-concurrency write path."""
+
+    @pytest.mark.asyncio
+    async def test_stale_version_rejected(self, coordinator):
+        """Test that only the writer holding the current version succeeds."""
+        created = await coordinator.compare_and_set("k", "a", "agent1", expected_version=0)
+        assert (created.success, created.version) == (True, 1)
+
+        assert (await coordinator.compare_and_set("k", "b", "agent2", expected_version=1)).success
+        stale = await coordinator.compare_and_set("k", "c", "agent1", expected_version=1)
+
+        assert (stale.success, stale.version) == (False, 2)
+        assert (await coordinator._load_memory_entry("k")).value == "b"
+        assert coordinator.coordination_metrics["cas_conflicts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_conflict_detected_across_coordinators(self, coordinator):
+        """Test that a second node's write makes a cached version stale in Redis."""
+        other = EnhancedMemoryCoordinator(namespace="test")
+        other.redis_client = coordinator.redis_client
+
+        await coordinator.compare_and_set("k", 1, "a", expected_version=0)
+        await other.compare_and_set("k", 2, "b", expected_version=1)
+
+        result = await coordinator.compare_and_set("k", 3, "a", expected_version=1)
+        assert (result.success, result.version) == (False, 2)
+        assert "k" not in coordinator.memory_cache
+
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_all_apply(self, coordinator):
+        """Test that contended read-modify-write updates retry until none are lost."""
+        nodes = [EnhancedMemoryCoordinator(namespace="test") for _ in range(4)]
+        for node in nodes:
+            node.redis_client = coordinator.redis_client
+            node.max_version_history = 5
+
+        await asyncio.gather(*(
+            node.update_memory("counter", f"agent{i}", lambda value: (value or 0) + 1, max_retries=50)
+            for i, node in enumerate(nodes) for _ in range(5)
+        ))
+
+        entry = await coordinator._load_memory_entry("counter")
+        assert (entry.value, entry.version) == (20, 20)
+        history = await coordinator.get_version_history("counter")
+        assert [v.version for v in history] == [20, 19, 18, 17, 16]
+
+
+class TestLockExpiry:
+    """Test cases for lock deadlines."""
+
+    @pytest.mark.asyncio
+    async def test_lock_deadline_registered_and_cancelled(self, coordinator):
+        """Test that acquiring a lock schedules its expiry and releasing cancels it."""
+        lock_id = await coordinator.acquire_lock("k", "agent", timeout=60)
+        key = ("memory_lock", "test", lock_id)
+        assert key in coordinator.deadlines
+
+        assert await coordinator.release_lock(lock_id)
+        assert key not in coordinator.deadlines
+
+    @pytest.mark.asyncio
+    async def test_expired_lock_released(self, coordinator):
+        """Test that a lock is removed as soon as its deadline fires."""
+        lock_id = await coordinator.acquire_lock("k", "agent", timeout=60)
+        coordinator.deadlines.schedule(
+            ("memory_lock", "test", lock_id), 0.01, lambda: coordinator._expire_lock(lock_id)
+        )
+        await asyncio.sleep(0.05)
+
+        assert lock_id not in coordinator.active_locks
+        assert not await coordinator.redis_client.hexists(coordinator.locks_key, lock_id)
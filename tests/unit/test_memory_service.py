@@ -0,0 +1,278 @@
+"""
+Unit tests for the memory service (SQLite search and writes, federated reads).
+"""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+import pytest_asyncio
+
+from apps.backend.services.memory_service import (
+    InMemoryProvider, MemoryEntry, MemoryProvider, MemoryType, SQLiteProvider, UnifiedMemoryService,
+    reciprocal_rank_fusion
+)
+
+
+def _entry(entry_id, text, memory_type=MemoryType.KNOWLEDGE_BASE, embedding=None, timestamp=None):
+    return MemoryEntry(
+        id=entry_id,
+        type=memory_type,
+        content={"text": text},
+        metadata={},
+        timestamp=timestamp or time.time(),
+        embedding=embedding
+    )
+
+
+@pytest_asyncio.fixture
+async def provider(tmp_path):
+    provider = SQLiteProvider({"db_path": str(tmp_path / "memory.db"), "vector_scan_chunk": 2})
+    assert await provider.initialize()
+    yield provider
+    await provider.close()
+
+
+class TestSQLiteProviderSearch:
+    """Test cases for FTS5 and vector search."""
+
+    @pytest.mark.asyncio
+    async def test_fts_ranking_and_trigger_sync(self, provider):
+        """Test BM25 ordering, type filtering and that updates/deletes reach the index."""
+        await provider.store(_entry("a", "python asyncio event loop internals"))
+        await provider.store(_entry("b", "python python python asyncio"))
+        await provider.store(_entry("c", "rust async runtime", MemoryType.CONVERSATION))
+
+        assert [e.id for e in await provider.search("python asyncio")] == ["b", "a"]
+        assert [e.id for e in await provider.search("asyn", MemoryType.CONVERSATION)] == ["c"]
+
+        await provider.store(_entry("a", "go goroutines"))
+        await provider.delete("b")
+
+        assert await provider.search("python") == []
+        assert [e.id for e in await provider.search("goroutines")] == ["a"]
+        assert await provider.search("!!!") == []
+
+    @pytest.mark.asyncio
+    async def test_vector_search_across_chunks(self, provider):
+        """Test that top-k is kept across scan chunks and dimension mismatches are skipped."""
+        await provider.store(_entry("x", "x", embedding=[1.0, 0.0, 0.0]))
+        await provider.store(_entry("y", "y", embedding=[0.0, 1.0, 0.0]))
+        await provider.store(_entry("xy", "xy", embedding=[1.0, 1.0, 0.0]))
+        await provider.store(_entry("z", "z", embedding=[0.0, 0.0, 1.0]))
+        await provider.store(_entry("short", "short", embedding=[1.0, 0.0]))
+        await provider.store(_entry("none", "none"))
+
+        results = await provider.vector_search([2.0, 0.1, 0.0], limit=2)
+
+        assert [entry.id for entry, _ in results] == ["x", "xy"]
+        assert results[0][1] == pytest.approx(0.9988, abs=1e-3)
+
+
+class TestSQLiteProviderWrites:
+    """Test cases for the group-commit write queue."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_stores_share_commits(self, provider):
+        """Test that concurrent stores are committed in batches and visible afterwards."""
+        results = await asyncio.gather(*(provider.store(_entry(f"e{i}", f"note {i}")) for i in range(50)))
+
+        assert all(results)
+        assert provider.write_stats["statements"] == 50
+        assert provider.write_stats["commits"] < 50
+        assert len(await provider.list_entries(limit=100)) == 50
+        assert await provider.cleanup(older_than=time.time() + 1) == 50
+
+    @pytest.mark.asyncio
+    async def test_writer_survives_failed_rollback(self, provider, monkeypatch):
+        """Test that a rollback error fails only the bad write and the writer keeps serving."""
+        async def broken_rollback():
+            raise sqlite3.OperationalError("rollback boom")
+
+        monkeypatch.setattr(provider.db, "rollback", broken_rollback)
+        results = await asyncio.wait_for(asyncio.gather(
+            provider._write("INSERT INTO missing_table VALUES (1)"),
+            provider.store(_entry("ok", "still written")),
+            return_exceptions=True
+        ), timeout=2)
+
+        assert isinstance(results[0], sqlite3.OperationalError) and results[1] is True
+        assert await asyncio.wait_for(provider.store(_entry("later", "after")), timeout=2)
+        assert not provider._writer_task.done()
+
+    @pytest.mark.asyncio
+    async def test_write_fails_fast_without_writer(self, provider):
+        """Test that writes are refused instead of queued once the writer task has ended."""
+        provider._writer_task.cancel()
+        await asyncio.gather(provider._writer_task, return_exceptions=True)
+
+        with pytest.raises(RuntimeError, match="not running"):
+            await asyncio.wait_for(provider._write("DELETE FROM memory_entries"), timeout=1)
+        assert await provider.store(_entry("x", "x")) is False
+
+    @pytest.mark.asyncio
+    async def test_existing_rows_backfilled(self, tmp_path):
+        """Test that a database created before the FTS index gets its rows indexed."""
+        path = tmp_path / "old.db"
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE memory_entries (id TEXT PRIMARY KEY, type TEXT NOT NULL, content TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, timestamp REAL NOT NULL, user_id TEXT, session_id TEXT, agent_id TEXT)"
+        )
+        connection.execute(
+            "INSERT INTO memory_entries VALUES ('old', 'knowledge_base', '{\"text\": \"legacy row\"}', '{}', 1.0, "
+            "NULL, NULL, NULL)"
+        )
+        connection.commit()
+        connection.close()
+
+        provider = SQLiteProvider({"db_path": str(path)})
+        assert await provider.initialize()
+        try:
+            assert [e.id for e in await provider.search("legacy")] == ["old"]
+        finally:
+            await provider.close()
+
+
+class _SlowProvider(InMemoryProvider):
+    """In-memory provider that answers after a delay."""
+
+    def __init__(self, delay):
+        super().__init__({})
+        self.delay = delay
+        self.calls = 0
+
+    async def search(self, query, memory_type=None, limit=10):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return await super().search(query, memory_type, limit)
+
+
+class TestFederatedQueries:
+    """Test cases for UnifiedMemoryService federated reads."""
+
+    @pytest.mark.asyncio
+    async def test_slow_provider_bounded_and_results_fused(self):
+        """Test that a provider past its deadline is skipped and duplicates are fused."""
+        fast, slow = InMemoryProvider({}), _SlowProvider(delay=1.0)
+        service = UnifiedMemoryService({"federated": {"enabled": True, "deadlines": {"cognee": 0.05}}})
+        service.providers = {MemoryProvider.SQLITE: fast, MemoryProvider.COGNEE: slow}
+        service.primary_provider = fast
+
+        shared = _entry("shared", "memory fusion")
+        await fast.store(shared)
+        await fast.store(_entry("fast-only", "memory"))
+        await slow.store(shared)
+
+        start = time.perf_counter()
+        results = await service.search("memory")
+
+        assert time.perf_counter() - start < 0.5
+        assert {e.id for e in results} == {"shared", "fast-only"}
+        assert service.stats["provider_timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_read_cache_invalidated_by_writes(self):
+        """Test that searches are cached until a store changes the result set."""
+        provider = _SlowProvider(delay=0)
+        service = UnifiedMemoryService({"federated": {"enabled": True}})
+        service.providers = {MemoryProvider.IN_MEMORY: provider}
+        service.primary_provider = provider
+
+        await service.store(MemoryType.KNOWLEDGE_BASE, {"text": "alpha"})
+        assert len(await service.search("alpha")) == 1
+        assert len(await service.search("alpha")) == 1
+        assert provider.calls == 1
+
+        entry_id = await service.store(MemoryType.KNOWLEDGE_BASE, {"text": "alpha two"})
+        assert len(await service.search("alpha")) == 2
+        assert (await service.retrieve(entry_id)).content == {"text": "alpha two"}
+        assert service.get_stats()["read_cache"]["hits"] == 1
+
+
+class TestServiceVectorSearch:
+    """Test cases for UnifiedMemoryService.vector_search."""
+
+    @staticmethod
+    async def _store_vectors(service):
+        ids = {}
+        for name, vector, memory_type in [
+            ("x", [1.0, 0.0, 0.0], MemoryType.KNOWLEDGE_BASE),
+            ("xy", [1.0, 1.0, 0.0], MemoryType.KNOWLEDGE_BASE),
+            ("x-chat", [1.0, 0.05, 0.0], MemoryType.CONVERSATION),
+            ("z", [0.0, 0.0, 1.0], MemoryType.KNOWLEDGE_BASE),
+        ]:
+            ids[await service.store(memory_type, {"text": name}, embedding=vector)] = name
+        return ids
+
+    @pytest.mark.asyncio
+    async def test_embedding_store_is_the_only_copy(self, provider):
+        """Test that with an embedding store, vectors are kept and searched there, not in SQLite."""
+        service = UnifiedMemoryService({"embeddings": {"dimension": 3}})
+        service.providers = {MemoryProvider.SQLITE: provider}
+        service.primary_provider = provider
+        ids = await self._store_vectors(service)
+
+        results = await service.vector_search([2.0, 0.1, 0.0], MemoryType.KNOWLEDGE_BASE, limit=2)
+
+        assert [ids[entry.id] for entry, _ in results] == ["x", "xy"]
+        assert results[0][1] == pytest.approx(0.9988, abs=1e-3)
+        assert len(service.embedding_store) == 4
+        cursor = await provider.read_db.execute("SELECT COUNT(*) FROM memory_entries WHERE embedding IS NOT NULL")
+        assert (await cursor.fetchone())[0] == 0
+
+        await service.delete(results[0][0].id)
+        assert [ids[entry.id] for entry, _ in await service.vector_search([1.0, 0.0, 0.0], limit=1)] == ["x-chat"]
+
+    @pytest.mark.asyncio
+    async def test_store_search_resolves_bounded_candidates(self):
+        """Test that only the oversampled top-k ids reach the provider, without retrieve() side effects."""
+        provider = InMemoryProvider({})
+        service = UnifiedMemoryService({"embeddings": {"dimension": 3, "oversample": 2}})
+        service.providers = {MemoryProvider.IN_MEMORY: provider}
+        service.primary_provider = provider
+        for i in range(50):
+            # Ids a shared recall engine put in the store are not memory entries
+            service.embedding_store.put(f"recall-{i}", [0.0, 1.0, float(i)])
+        ids = await self._store_vectors(service)
+
+        lookups = []
+        retrieve = provider.retrieve
+
+        async def counting_retrieve(entry_id):
+            lookups.append(entry_id)
+            return await retrieve(entry_id)
+
+        provider.retrieve = counting_retrieve
+        results = await service.vector_search([1.0, 0.0, 0.0], limit=2)
+
+        assert [ids[entry.id] for entry, _ in results] == ["x", "x-chat"]
+        assert len(lookups) == 4
+        assert service.stats["entries_retrieved"] == 0
+
+    @pytest.mark.asyncio
+    async def test_provider_search_without_embedding_store(self, provider):
+        """Test that without an embedding store the provider's vector search is used."""
+        service = UnifiedMemoryService()
+        service.providers = {MemoryProvider.SQLITE: provider}
+        service.primary_provider = provider
+        ids = await self._store_vectors(service)
+
+        results = await service.vector_search([2.0, 0.1, 0.0], limit=2)
+
+        assert [ids[entry.id] for entry, _ in results] == ["x-chat", "x"]
+        assert service.embedding_store is None
+
+
+class TestReciprocalRankFusion:
+    """Test cases for reciprocal_rank_fusion."""
+
+    def test_items_ranked_well_everywhere_win(self):
+        """Test that an entry ranked by several providers outranks single-list leaders."""
+        a, b, c = (_entry(name, name, timestamp=ts) for name, ts in (("a", 1.0), ("b", 2.0), ("c", 3.0)))
+
+        fused = reciprocal_rank_fusion([[a, b], [c, b], [b]])
+
+        # b appears in all three lists; a and c tie and the newer one goes first
+        assert [e.id for e in fused] == ["b", "c", "a"]
@@ -0,0 +1,116 @@
+"""
+Unit tests for the two-tier response cache in the performance middleware.
+"""
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from apps.backend.middleware.performance import CacheManager
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.aioredis.FakeRedis()
+
+
+class TestCacheManager:
+    """Test cases for CacheManager."""
+
+    @pytest.mark.asyncio
+    async def test_binary_safe_compression_round_trip(self, redis_client):
+        """Test that large values are stored gzipped as bytes and read back from Redis."""
+        cache = CacheManager(redis_client, compress_threshold=64)
+        value = {"text": "é" * 500, "items": list(range(50))}
+
+        assert await cache.set("api:big", value, ttl=60)
+        stored = await redis_client.get("api:big")
+        assert stored[:1] == b"z" and len(stored) < len(str(value))
+
+        fresh = CacheManager(redis_client)
+        assert await fresh.get("api:big") == value
+        assert fresh.stats["redis_hits"] == 1
+        assert await fresh.get("api:big") == value
+        assert fresh.stats["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self, redis_client):
+        """Test that concurrent misses for one key compute once."""
+        cache = CacheManager(redis_client)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"answer": 42}
+
+        results = await asyncio.gather(*(cache.get_or_compute("api:k", compute, ttl=60) for _ in range(10)))
+
+        assert calls == 1
+        assert all(result == {"answer": 42} for result in results)
+        assert cache.stats["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_single_flight_error_reaches_waiters(self, redis_client):
+        """Test that a failed computation is raised to every waiter and not cached."""
+        cache = CacheManager(redis_client)
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute("api:err", compute) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await cache.get("api:err") is None
+
+    @pytest.mark.asyncio
+    async def test_scan_and_tag_invalidation(self, redis_client):
+        """Test pattern clearing via SCAN and tag-based invalidation across both tiers."""
+        cache = CacheManager(redis_client)
+        for i in range(5):
+            await cache.set(f"models:{i}", i, ttl=60, tags=["models"])
+        await cache.set("chat:1", "hello", ttl=60, tags=["chat", "user:7"])
+        await cache.set("chat:2", "bye", ttl=60, tags=["chat"])
+
+        assert await cache.clear_pattern("models:*", batch_size=2) == 5
+        assert await cache.get("models:3") is None
+
+        assert await cache.invalidate_tags("user:7") == 1
+        assert await cache.get("chat:1") is None
+        assert await cache.get("chat:2") == "bye"
+        assert not await redis_client.exists("cache-tag:user:7")
+
+    @pytest.mark.asyncio
+    async def test_works_without_redis(self):
+        """Test that the local tier alone still caches."""
+        cache = CacheManager(None)
+
+        assert await cache.set("api:x", [1, 2], ttl=60)
+        assert await cache.get("api:x") == [1, 2]
+        assert await cache.delete("api:x")
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_cancelled_computation(self, redis_client):
+        """Test that cancelling the computing caller doesn't cancel waiters."""
+        cache = CacheManager(redis_client)
+        started = asyncio.Event()
+
+        async def compute():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(cache.get_or_compute("api:c", compute))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_compute("api:c", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await waiter == "done"
+        assert cache.stats["coalesced"] == 1